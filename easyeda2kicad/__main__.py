@@ -5,22 +5,35 @@ import argparse
 import ctypes
 import logging
 import sys
+import zipfile
 from pathlib import Path
 from typing import Any
 
 # Local imports
 from ._version import __version__
-from .easyeda.easyeda_api import EasyedaApi
-from .easyeda.easyeda_importer import (
-    Easyeda3dModelImporter,
-    EasyedaFootprintImporter,
-    EasyedaSymbolImporter,
+from .batch import (
+    ComponentConversion,
+    FootprintBatch,
+    default_jobs,
+    prepare_in_pool,
+)
+from .easyeda.blob_store import MATERIALIZE_MODES
+from .easyeda.cache_bundle import (
+    CacheBundle,
+    export_cache_bundle,
+    import_cache_bundle,
+    read_bom_lcsc_ids,
 )
+from .easyeda.easyeda_api import EasyedaApi
 from .easyeda.easyeda_svg_renderer import render_footprint_svg, render_symbol_svg
 from .easyeda.parameters_easyeda import EeSymbol
-from .kicad.export_kicad_3d_model import Exporter3dModelKicad
-from .kicad.export_kicad_footprint import ExporterFootprintKicad
-from .kicad.export_kicad_symbol import ExporterSymbolKicad
+from .kicad.export_kicad_footprint import FootprintLibWriter, write_footprint_file
+from .kicad.export_kicad_symbol import (
+    id_already_in_symbol_lib,
+    write_component_in_symbol_lib_file,
+)
+from .kicad.output_files import WriteStats, encode_text, write_if_changed
+from .kicad.symbol_lib_index import SymbolLibrary, compact_symbol_lib
 
 
 def parse_custom_fields(custom_field_args: list[str]) -> dict[str, str]:
@@ -61,6 +74,14 @@ def get_parser() -> argparse.ArgumentParser:
         nargs="+",
     )
 
+    parser.add_argument(
+        "--bom",
+        help="CSV bill of materials; every LCSC id (C123...) found in it is processed",
+        required=False,
+        metavar="bom.csv",
+        type=str,
+    )
+
     parser.add_argument(
         "--symbol", help="Get symbol of this id", required=False, action="store_true"
     )
@@ -111,6 +132,28 @@ def get_parser() -> argparse.ArgumentParser:
         action="store_true",
     )
 
+    parser.add_argument(
+        "--dedup-symbols",
+        dest="dedup_symbols",
+        required=False,
+        help=(
+            "write symbols whose graphics and pins are already in the library as"
+            " derived symbols (extends) holding only their properties"
+        ),
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--compact-symbol-lib",
+        dest="compact_symbol_lib",
+        required=False,
+        help=(
+            "rewrite the symbol library of --output with derived symbols for all"
+            " repeated graphics and pins; runs after the given ids, if any"
+        ),
+        action="store_true",
+    )
+
     parser.add_argument(
         "--project-relative",
         required=False,
@@ -129,12 +172,69 @@ def get_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "--use-cache",
         dest="use_cache",
-        help="cache API responses in .easyeda_cache/ to avoid repeated network requests",
+        help=(
+            "cache API responses in .easyeda_cache/ to avoid repeated network requests; "
+            "3D models are then linked from the cache instead of copied"
+        ),
         required=False,
         default=False,
         action="store_true",
     )
 
+    parser.add_argument(
+        "--blob-mode",
+        dest="blob_mode",
+        help=(
+            "how --use-cache places 3D models from the cache: auto (reflink, "
+            "else copy), hardlink (no extra disk space, but editing an output "
+            "model in place also changes the cache), reflink or copy"
+        ),
+        required=False,
+        default="auto",
+        choices=MATERIALIZE_MODES,
+    )
+
+    parser.add_argument(
+        "--export-cache-bundle",
+        dest="export_cache_bundle",
+        metavar="bundle.zip",
+        help="pack the cache entries of the given ids/BOM into one archive and exit",
+        required=False,
+        type=str,
+    )
+
+    parser.add_argument(
+        "--import-cache-bundle",
+        dest="import_cache_bundle",
+        metavar="bundle.zip",
+        help="unpack a cache bundle into .easyeda_cache/ (implies --use-cache)",
+        required=False,
+        type=str,
+    )
+
+    parser.add_argument(
+        "--cache-bundle",
+        dest="cache_bundle",
+        metavar="bundle.zip",
+        help="read API data directly from a cache bundle without unpacking it",
+        required=False,
+        type=str,
+    )
+
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        dest="jobs",
+        metavar="N",
+        help=(
+            "convert components in N worker processes (0: one per CPU core); "
+            "files are still written in input order"
+        ),
+        required=False,
+        default=1,
+        type=int,
+    )
+
     parser.add_argument(
         "--custom-field",
         dest="custom_field",
@@ -148,9 +248,39 @@ def get_parser() -> argparse.ArgumentParser:
 
 
 def valid_arguments(arguments: dict[str, Any]) -> bool:
-    if not arguments.get("lcsc_id") and not arguments.get("uuid"):
-        logging.error("Either --lcsc_id or --uuid must be provided")
+    jobs = arguments.get("jobs", 1)
+    if jobs < 0:
+        logging.error(f"--jobs must be 0 or a positive number, got {jobs}")
         return False
+    arguments["jobs"] = jobs or default_jobs()
+
+    if arguments.get("bom"):
+        if not Path(arguments["bom"]).is_file():
+            logging.error(f"Can't find the BOM file : {arguments['bom']}")
+            return False
+        bom_ids = read_bom_lcsc_ids(arguments["bom"])
+        if not bom_ids:
+            logging.error(f"No LCSC ids found in BOM : {arguments['bom']}")
+            return False
+        arguments["lcsc_id"] = list(
+            dict.fromkeys((arguments.get("lcsc_id") or []) + bom_ids)
+        )
+
+    for option in ("import_cache_bundle", "cache_bundle"):
+        if arguments.get(option) and not Path(arguments[option]).is_file():
+            logging.error(f"Can't find the cache bundle : {arguments[option]}")
+            return False
+
+    if not arguments.get("lcsc_id") and not arguments.get("uuid"):
+        if arguments.get("import_cache_bundle") and not arguments.get(
+            "export_cache_bundle"
+        ):
+            # Only seeding the cache
+            arguments["import_only"] = True
+            return True
+        if not arguments.get("compact_symbol_lib"):
+            logging.error("Either --lcsc_id, --uuid or --bom must be provided")
+            return False
 
     if arguments.get("lcsc_id"):
         for lcsc_id in arguments["lcsc_id"]:
@@ -161,9 +291,13 @@ def valid_arguments(arguments: dict[str, Any]) -> bool:
     if arguments["full"]:
         arguments["symbol"], arguments["footprint"], arguments["3d"] = True, True, True
 
+    if arguments.get("export_cache_bundle"):
+        # Packing the cache needs no conversion action
+        return True
+
     if not any(
         [arguments["symbol"], arguments["footprint"], arguments["3d"], arguments["svg"]]
-    ):
+    ) and (arguments.get("lcsc_id") or arguments.get("uuid")):
         logging.error(
             "Missing action arguments\n"
             "  easyeda2kicad --lcsc_id=C2040 --footprint\n"
@@ -218,36 +352,68 @@ def _process_component(
     api: EasyedaApi,
     lcsc_id: str | None = None,
     uuid: str | None = None,
+    conversion: ComponentConversion | None = None,
+    library: SymbolLibrary | None = None,
+    stats: WriteStats | None = None,
+    footprints: FootprintBatch | None = None,
+    footprint_writer: FootprintLibWriter | None = None,
 ) -> bool:
-    """Process a single component. Returns True on success, False on error."""
+    """Process a single component. Returns True on success, False on error.
+
+    *conversion* holds contents already computed by a worker process (--jobs).
+    *library* is the symbol library session of a batch; without it the symbol
+    is written to the library file right away. *stats* counts the outputs
+    written and those left untouched because they were unchanged. With
+    *footprints*, a footprint already written by the batch is not written
+    again. *footprint_writer* writes the footprints of a batch into the
+    .pretty directory; without it the footprint is written right away.
+    """
     component_id = lcsc_id or uuid
-    cad_data = api.get_cad_data_of_component(lcsc_id=lcsc_id, uuid=uuid)
-    if not cad_data:
-        logging.error(f"Failed to fetch data from EasyEDA API for part {component_id}")
-        return False
+    if conversion is None:
+        cad_data = api.get_cad_data_of_component(lcsc_id=lcsc_id, uuid=uuid)
+        if not cad_data:
+            logging.error(
+                f"Failed to fetch data from EasyEDA API for part {component_id}"
+            )
+            return False
+        conversion = ComponentConversion(
+            cad_data, arguments, api, symbol_lib_version=_lib_version(library)
+        )
 
     output = arguments["output"]
+    # set on an error that does not stop the other outputs of the component
+    had_errors = False
 
     if arguments["symbol"]:
         # ---------------- SYMBOL ----------------
-        easyeda_symbol: EeSymbol = EasyedaSymbolImporter(
-            easyeda_cp_cad_data=cad_data
-        ).get_symbol()
-        lib_path = f"{output}.kicad_sym"
-        exporter = ExporterSymbolKicad(
-            symbol=easyeda_symbol,
-            lib_path=lib_path,
-            custom_fields=arguments["custom_fields"],
-        )
-        if not exporter.save_to_lib(
-            lib_path=lib_path,
-            footprint_lib_name=Path(output).stem,
-            overwrite=arguments["overwrite"],
-        ):
+        easyeda_symbol: EeSymbol = conversion.symbol
+        lib_path = conversion.lib_path
+        if library is not None:
+            already_exists = library.id_already_in(easyeda_symbol.info.name)
+        else:
+            already_exists = id_already_in_symbol_lib(
+                lib_path=lib_path, component_name=easyeda_symbol.info.name
+            )
+        if already_exists and not arguments["overwrite"]:
             logging.error(
                 f"Symbol for {component_id} already exists. Use --overwrite to update"
             )
             return False
+        if library is not None:
+            library.write_component(
+                component_name=easyeda_symbol.info.name,
+                component_content=conversion.symbol_content,
+                version=conversion.symbol_version,
+            )
+        else:
+            write_component_in_symbol_lib_file(
+                lib_path=lib_path,
+                component_name=easyeda_symbol.info.name,
+                component_content=conversion.symbol_content,
+                version=conversion.symbol_version,
+                stats=stats,
+                dedup=arguments.get("dedup_symbols", False),
+            )
         if easyeda_symbol.sub_symbols:
             logging.info(
                 f"Integrated {len(easyeda_symbol.sub_symbols)} sub-symbols into main symbol"
@@ -260,70 +426,93 @@ def _process_component(
 
     if arguments["footprint"]:
         # ---------------- FOOTPRINT ----------------
-        easyeda_footprint = EasyedaFootprintImporter(
-            easyeda_cp_cad_data=cad_data
-        ).get_footprint()
+        # Only the header is parsed until the footprint is actually written
+        footprint_name = conversion.footprint_info.name
+        footprint_path = Path(f"{output}.pretty")
+        footprint_filename = f"{footprint_name}.kicad_mod"
+        if footprints is None:
+            footprints = FootprintBatch()
+        footprints.requested += 1
+        earlier = footprints.written.get(footprint_name)
         if (
-            Path(f"{output}.pretty") / f"{easyeda_footprint.info.name}.kicad_mod"
-        ).is_file() and not arguments["overwrite"]:
+            earlier is not None
+            and footprint_writer is not None
+            and not footprint_writer.wait(footprint_filename)
+        ):
+            # the earlier write failed, this component writes the footprint
+            footprints.discard(footprint_name)
+            earlier = None
+        if earlier is not None and not footprints.is_shared(conversion):
+            logging.error(
+                f"Footprint {footprint_name} of {component_id} differs from the"
+                f" one written for {earlier.component_id}, not overwritten"
+            )
+            had_errors = True
+        elif earlier is not None:
+            logging.info(
+                f"Kicad footprint for ID: {component_id} is the one of"
+                f" {earlier.component_id}\n"
+                f"       Footprint path: {footprint_path / footprint_filename}"
+            )
+        elif not arguments["overwrite"] and (
+            footprint_writer.exists(footprint_filename)
+            if footprint_writer is not None
+            else (footprint_path / footprint_filename).is_file()
+        ):
             logging.error(
                 f"Footprint for {component_id} already exists. Use --overwrite to replace"
             )
             return False
-        footprint_path = Path(f"{output}.pretty")
-        if arguments.get("use_default_folder"):
-            model_3d_path = "${EASYEDA2KICAD}/easyeda2kicad.3dshapes"
-        elif arguments["project_relative"]:
-            model_3d_path = (
-                "${KIPRJMOD}/"
-                + Path(f"{output}.3dshapes").relative_to(Path.cwd()).as_posix()
+        elif footprint_writer is not None:
+            # reported by the writer once the file is written
+            footprint_writer.write(
+                footprint_filename, conversion.footprint_content, component_id
             )
+            footprints.add(component_id, conversion)
         else:
-            model_3d_path = Path(f"{output}.3dshapes").as_posix()
-        footprint_filename = f"{easyeda_footprint.info.name}.kicad_mod"
-        ExporterFootprintKicad(footprint=easyeda_footprint).export(
-            footprint_full_path=str(footprint_path / footprint_filename),
-            model_3d_path=model_3d_path,
-        )
-        logging.info(
-            f"Created Kicad footprint for ID: {component_id}\n"
-            f"       Footprint name: {easyeda_footprint.info.name}\n"
-            f"       Footprint path: {footprint_path / footprint_filename}"
-        )
+            write_footprint_file(
+                str(footprint_path / footprint_filename),
+                conversion.footprint_content,
+                stats=stats,
+            )
+            footprints.add(component_id, conversion)
+            logging.info(
+                f"Created Kicad footprint for ID: {component_id}\n"
+                f"       Footprint name: {footprint_name}\n"
+                f"       Footprint path: {footprint_path / footprint_filename}"
+            )
 
     if arguments["svg"]:
         # ---------------- SVG ----------------
+        cad_data = conversion.cad_data
         svg_dir = Path(f"{output}.svgs")
         svg_dir.mkdir(parents=True, exist_ok=True)
 
         sym_svg_path = svg_dir / f"{component_id}_symbol.svg"
         sym_svg = render_symbol_svg(cad_data)
-        sym_svg_path.write_text(sym_svg, encoding="utf-8")
+        write_if_changed(sym_svg_path, encode_text(sym_svg), stats)
         logging.info(
             f"Created SVG symbol for ID: {component_id}\n       Path: {sym_svg_path}"
         )
 
         fp_svg_path = svg_dir / f"{component_id}_footprint.svg"
         fp_svg = render_footprint_svg(cad_data)
-        fp_svg_path.write_text(fp_svg, encoding="utf-8")
+        write_if_changed(fp_svg_path, encode_text(fp_svg), stats)
         logging.info(
             f"Created SVG footprint for ID: {component_id}\n       Path: {fp_svg_path}"
         )
 
     if arguments["3d"]:
         # ---------------- 3D MODEL ----------------
-        model_exporter = Exporter3dModelKicad(
-            model_3d=Easyeda3dModelImporter(
-                easyeda_cp_cad_data=cad_data,
-                download_raw_3d_model=True,
-                api=api,
-            ).output,
-        )
+        model_exporter = conversion.model_exporter
         output_dir = Path(f"{output}.3dshapes")
         if not model_exporter.output:
             logging.warning(f"No 3D model available for ID: {component_id}")
         elif not model_exporter.export(
-            output_dir=str(output_dir), overwrite=arguments["overwrite"]
+            output_dir=str(output_dir),
+            overwrite=arguments["overwrite"],
+            blob_store=api.blob_store if arguments["use_cache"] else None,
+            stats=stats,
         ):
             logging.error(
                 f"3D model for {component_id} already exists. Use --overwrite to replace"
@@ -338,7 +527,7 @@ def _process_component(
                 f"       3D model path (step): {output_dir / f'{model_name}.step'}"
             )
 
-    return True
+    return not had_errors
 
 
 def main(argv: list[str] = sys.argv[1:]) -> int:
@@ -366,20 +555,157 @@ def main(argv: list[str] = sys.argv[1:]) -> int:
     if not valid_arguments(arguments=arguments):
         return 1
 
-    api = EasyedaApi(use_cache=arguments["use_cache"])
-    had_errors = False
+    if arguments.get("import_cache_bundle"):
+        arguments["use_cache"] = True
+    api = EasyedaApi(
+        use_cache=arguments["use_cache"] or bool(arguments.get("export_cache_bundle"))
+    )
+    api.blob_mode = arguments.get("blob_mode", "auto")
+
+    if arguments.get("import_cache_bundle"):
+        try:
+            import_cache_bundle(arguments["import_cache_bundle"], api.cache_dir)
+        except (ValueError, OSError, zipfile.BadZipFile) as err:
+            logging.error(f"Failed to import cache bundle: {err}")
+            return 1
+        if arguments.get("import_only"):
+            return 0
+
+    if arguments.get("cache_bundle"):
+        try:
+            api.cache_bundle = CacheBundle(arguments["cache_bundle"])
+        except (ValueError, OSError, zipfile.BadZipFile) as err:
+            logging.error(f"Failed to open cache bundle: {err}")
+            return 1
+
+    if arguments.get("export_cache_bundle"):
+        ok = export_cache_bundle(
+            arguments["export_cache_bundle"],
+            api,
+            lcsc_ids=arguments.get("lcsc_id") or [],
+            uuids=arguments.get("uuid") or [],
+        )
+        return 0 if ok else 1
+
+    # (lcsc_id, uuid) of every component, in command line order
+    components: list[tuple[str | None, str | None]] = [
+        (lcsc_id, None) for lcsc_id in arguments.get("lcsc_id") or []
+    ] + [(None, uuid) for uuid in arguments.get("uuid") or []]
+
+    stats = WriteStats()
+    footprints = FootprintBatch()
+    # The symbol library is read once and written once for all components
+    lib_path = f"{arguments['output']}.kicad_sym"
+    # The footprints are written by a thread pool, each file atomically and
+    # durably: synced before its rename, the directory once for the batch
+    footprint_writer = FootprintLibWriter(
+        f"{arguments['output']}.pretty", stats, fsync=True
+    )
+    with footprint_writer:
+        with SymbolLibrary(
+            lib_path, stats=stats, dedup=arguments["dedup_symbols"]
+        ) as library:
+            if arguments["jobs"] > 1 and len(components) > 1:
+                had_errors = _process_components_in_pool(
+                    arguments,
+                    api,
+                    components,
+                    library,
+                    stats,
+                    footprints,
+                    footprint_writer,
+                )
+            else:
+                had_errors = False
+                for lcsc_id, uuid in components:
+                    if not _process_component(
+                        arguments,
+                        api,
+                        lcsc_id=lcsc_id,
+                        uuid=uuid,
+                        library=library,
+                        stats=stats,
+                        footprints=footprints,
+                        footprint_writer=footprint_writer,
+                    ):
+                        had_errors = True
+    if footprint_writer.failed:
+        had_errors = True
+    for footprint_filename in footprint_writer.failed_files:
+        footprints.discard(Path(footprint_filename).stem)
+
+    if stats.written or stats.skipped:
+        logging.info(stats.summary())
+    if footprints.requested:
+        logging.info(footprints.summary())
+
+    if arguments["compact_symbol_lib"]:
+        if not Path(lib_path).is_file():
+            logging.error(f"Can't find the symbol lib : {lib_path}")
+            return 1
+        compacted = compact_symbol_lib(lib_path)
+        if compacted is None:
+            return 1
+        logging.info(f"Compacted {lib_path}: {compacted} derived symbol(s) written")
+    return 1 if had_errors else 0
 
-    if arguments.get("lcsc_id"):
-        for lcsc_id in arguments["lcsc_id"]:
-            if not _process_component(arguments, api, lcsc_id=lcsc_id):
-                had_errors = True
 
-    if arguments.get("uuid"):
-        for uuid in arguments["uuid"]:
-            if not _process_component(arguments, api, uuid=uuid):
-                had_errors = True
+def _lib_version(library: SymbolLibrary | None) -> int | None:
+    return library.version if library is not None else None
 
-    return 1 if had_errors else 0
+
+def _process_components_in_pool(
+    arguments: dict[str, Any],
+    api: EasyedaApi,
+    components: list[tuple[str | None, str | None]],
+    library: SymbolLibrary,
+    stats: WriteStats | None = None,
+    footprints: FootprintBatch | None = None,
+    footprint_writer: FootprintLibWriter | None = None,
+) -> bool:
+    """Convert in worker processes, write from this process in input order.
+
+    Returns True if any component failed.
+    """
+    had_errors = False
+    fetched = []
+    for lcsc_id, uuid in components:
+        cad_data = api.get_cad_data_of_component(lcsc_id=lcsc_id, uuid=uuid)
+        if not cad_data:
+            logging.error(
+                f"Failed to fetch data from EasyEDA API for part {lcsc_id or uuid}"
+            )
+            had_errors = True
+        else:
+            conversion = ComponentConversion(
+                cad_data, arguments, api, symbol_lib_version=library.version
+            )
+            fetched.append((lcsc_id, uuid, conversion))
+
+    if footprints is not None and arguments["footprint"]:
+        footprints.mark_shared(conversion for _, _, conversion in fetched)
+    prepared = prepare_in_pool(
+        (conversion for _, _, conversion in fetched), jobs=arguments["jobs"]
+    )
+    for (lcsc_id, uuid, _), result in zip(fetched, prepared):
+        if isinstance(result, Exception):
+            logging.error(f"Failed to convert part {lcsc_id or uuid}: {result!r}")
+            had_errors = True
+            continue
+        if not _process_component(
+            arguments,
+            api,
+            lcsc_id=lcsc_id,
+            uuid=uuid,
+            conversion=result,
+            library=library,
+            stats=stats,
+            footprints=footprints,
+            footprint_writer=footprint_writer,
+        ):
+            had_errors = True
+
+    return had_errors
 
 
 if __name__ == "__main__":
@@ -0,0 +1,269 @@
+"""
+Conversion of components in worker processes.
+
+Parsing and KiCad generation are CPU bound and run serially under the GIL.
+With ``--jobs N`` every component is converted into the final file contents
+by a process pool, while the parent process keeps all network/cache access
+and all library writes. Results are written in input order, so the output is
+identical to a serial run.
+"""
+
+from __future__ import annotations
+
+# Global imports
+import os
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import Any
+
+# Local imports
+from .easyeda.easyeda_api import EasyedaApi
+from .easyeda.easyeda_importer import (
+    Easyeda3dModelImporter,
+    EasyedaFootprintImporter,
+    EasyedaSymbolImporter,
+)
+from .easyeda.parameters_easyeda import Ee3dModel, EeFootprintInfo, EeSymbol
+from .kicad.export_kicad_3d_model import Exporter3dModelKicad
+from .kicad.export_kicad_footprint import ExporterFootprintKicad, footprint_geometry
+from .kicad.export_kicad_symbol import ExporterSymbolKicad
+
+# Inputs and intermediate objects, not sent back once the results are computed
+_NOT_RETURNED = (
+    "cad_data",
+    "_symbol_importer",
+    "_footprint_importer",
+    "symbol_exporter",
+    "model_3d",
+)
+
+
+def model_3d_path(arguments: dict[str, Any]) -> str:
+    """Path of the .3dshapes folder as referenced from the footprints."""
+    output = arguments["output"]
+    if arguments.get("use_default_folder"):
+        return "${EASYEDA2KICAD}/easyeda2kicad.3dshapes"
+    if arguments["project_relative"]:
+        return (
+            "${KIPRJMOD}/"
+            + Path(f"{output}.3dshapes").relative_to(Path.cwd()).as_posix()
+        )
+    return Path(f"{output}.3dshapes").as_posix()
+
+
+class ComponentConversion:
+    """Everything the CLI writes for one component, computed on first access.
+
+    A serial run only computes what it actually writes. ``prefetch`` (parent,
+    I/O) and ``prepare`` (worker, CPU) compute all requested parts ahead of
+    time so the object can be converted in another process.
+    """
+
+    def __init__(
+        self,
+        cad_data: dict[str, Any],
+        arguments: dict[str, Any],
+        api: EasyedaApi | None = None,
+        symbol_lib_version: int | None = None,
+    ) -> None:
+        self.cad_data = cad_data
+        self.arguments = arguments
+        self.api = api
+        # None: read from the library when the symbol is exported
+        self.symbol_lib_version = symbol_lib_version
+        self.prepared = False
+        # the footprint is the one of an earlier component of the batch
+        self.footprint_shared = False
+
+    def __getstate__(self) -> dict[str, Any]:
+        # The api (session, cache) stays in the parent process
+        state = dict(self.__dict__, api=None)
+        if state["prepared"]:
+            for name in _NOT_RETURNED:
+                state.pop(name, None)
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.__dict__.setdefault("cad_data", {})
+
+    @property
+    def lib_path(self) -> str:
+        return f"{self.arguments['output']}.kicad_sym"
+
+    # ---------------- SYMBOL ----------------
+
+    @cached_property
+    def _symbol_importer(self) -> EasyedaSymbolImporter:
+        return EasyedaSymbolImporter(easyeda_cp_cad_data=self.cad_data)
+
+    @cached_property
+    def symbol(self) -> EeSymbol:
+        return self._symbol_importer.get_symbol()
+
+    @cached_property
+    def symbol_exporter(self) -> ExporterSymbolKicad:
+        return ExporterSymbolKicad(
+            symbol=self.symbol,
+            lib_path=self.lib_path,
+            version=self.symbol_lib_version,
+            custom_fields=self.arguments["custom_fields"],
+        )
+
+    @cached_property
+    def symbol_version(self) -> int:
+        return self.symbol_exporter.version
+
+    @cached_property
+    def symbol_content(self) -> str:
+        return self.symbol_exporter.export(
+            footprint_lib_name=Path(self.arguments["output"]).stem
+        )
+
+    # ---------------- FOOTPRINT ----------------
+
+    @cached_property
+    def _footprint_importer(self) -> EasyedaFootprintImporter:
+        return EasyedaFootprintImporter(easyeda_cp_cad_data=self.cad_data)
+
+    @cached_property
+    def footprint_info(self) -> EeFootprintInfo:
+        return self._footprint_importer.info
+
+    @cached_property
+    def footprint_source(self) -> str:
+        return self._footprint_importer.source_digest
+
+    @cached_property
+    def footprint_content(self) -> str:
+        return ExporterFootprintKicad(
+            footprint=self._footprint_importer.get_footprint()
+        ).render(model_3d_path=model_3d_path(self.arguments))
+
+    # ---------------- 3D MODEL ----------------
+
+    @cached_property
+    def model_3d(self) -> Ee3dModel | None:
+        return Easyeda3dModelImporter(
+            easyeda_cp_cad_data=self.cad_data,
+            download_raw_3d_model=True,
+            api=self.api,
+        ).output
+
+    @cached_property
+    def model_exporter(self) -> Exporter3dModelKicad:
+        return Exporter3dModelKicad(model_3d=self.model_3d)
+
+    # ---------------------------------------
+
+    def prefetch(self) -> ComponentConversion:
+        """Download (or read from the cache) the 3D model data if requested."""
+        if self.arguments["3d"]:
+            _ = self.model_3d
+        return self
+
+    def prepare(self) -> ComponentConversion:
+        """Compute the contents of every requested file."""
+        if self.arguments["symbol"]:
+            _ = self.symbol_version, self.symbol_content
+        if self.arguments["footprint"]:
+            _ = self.footprint_info
+            if not self.footprint_shared:
+                _ = self.footprint_content
+        if self.arguments["3d"]:
+            _ = self.model_exporter
+        self.prepared = True
+        return self
+
+
+@dataclass
+class BatchFootprint:
+    component_id: str | None
+    source: str
+    geometry: str
+
+
+class FootprintBatch:
+    """The footprints written by one run, so that each is written only once.
+
+    Many parts share a package. A part whose footprint data matches the one
+    of a part written before (``footprint_source``) is not converted again;
+    otherwise the generated footprints are compared by their geometry, see
+    ``footprint_geometry``. Two different footprints with the same file name
+    are a collision and are not overwritten.
+    """
+
+    def __init__(self) -> None:
+        self.written: dict[str, BatchFootprint] = {}
+        self.requested = 0
+
+    def add(self, component_id: str | None, conversion: ComponentConversion) -> None:
+        self.written[conversion.footprint_info.name] = BatchFootprint(
+            component_id,
+            conversion.footprint_source,
+            footprint_geometry(conversion.footprint_content),
+        )
+
+    def discard(self, footprint_name: str) -> None:
+        """Forget a footprint whose write failed."""
+        self.written.pop(footprint_name, None)
+
+    def is_shared(self, conversion: ComponentConversion) -> bool:
+        """Whether an identical footprint was written before in this batch."""
+        earlier = self.written.get(conversion.footprint_info.name)
+        return earlier is not None and (
+            earlier.source == conversion.footprint_source
+            or earlier.geometry == footprint_geometry(conversion.footprint_content)
+        )
+
+    def mark_shared(self, conversions: Iterable[ComponentConversion]) -> None:
+        """Flag the conversions whose footprint data repeats an earlier one,
+        so that their footprint is not converted ahead of time."""
+        seen: set[tuple[str, str]] = set()
+        for conversion in conversions:
+            key = (conversion.footprint_info.name, conversion.footprint_source)
+            conversion.footprint_shared = key in seen
+            seen.add(key)
+
+    def summary(self) -> str:
+        distinct = len(self.written)
+        ratio = self.requested / distinct if distinct else 0.0
+        return (
+            f"{self.requested} footprints requested, {distinct} distinct written"
+            f" (dedup ratio {ratio:.2f})"
+        )
+
+
+def _prepare(conversion: ComponentConversion) -> ComponentConversion | Exception:
+    # returned instead of raised, pool.map would give up on the whole batch
+    try:
+        return conversion.prepare()
+    except Exception as e:
+        return e
+
+
+def default_jobs() -> int:
+    return os.cpu_count() or 1
+
+
+def prepare_in_pool(
+    conversions: Iterable[ComponentConversion], jobs: int
+) -> Iterator[ComponentConversion | Exception]:
+    """Prepare *conversions* in *jobs* worker processes, yielded in input order.
+
+    The yielded objects are the workers' copies with the inputs (cad data,
+    api) of the originals attached again, or the exception a conversion
+    raised.
+    """
+    originals = [c.prefetch() for c in conversions]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for original, prepared in zip(originals, pool.map(_prepare, originals)):
+            if isinstance(prepared, Exception):
+                yield prepared
+                continue
+            prepared.cad_data = original.cad_data
+            prepared.api = original.api
+            yield prepared
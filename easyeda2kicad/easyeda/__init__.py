@@ -3,6 +3,14 @@ EasyEDA module - Handle EasyEDA data import and processing
 """
 
 # Local imports
+from .blob_store import BlobStore
+from .bulk_import import BulkImportRecord, BulkImportStats, iter_import
+from .cache_bundle import (
+    CacheBundle,
+    export_cache_bundle,
+    import_cache_bundle,
+    read_bom_lcsc_ids,
+)
 from .easyeda_api import EasyedaApi
 from .easyeda_importer import (
     Easyeda3dModelImporter,
@@ -27,7 +35,15 @@ from .parameters_easyeda import (
 __all__ = [
     # API
     "EasyedaApi",
+    "BlobStore",
+    "CacheBundle",
+    "export_cache_bundle",
+    "import_cache_bundle",
+    "read_bom_lcsc_ids",
     # Importers
+    "iter_import",
+    "BulkImportRecord",
+    "BulkImportStats",
     "EasyedaSymbolImporter",
     "EasyedaFootprintImporter",
     "Easyeda3dModelImporter",
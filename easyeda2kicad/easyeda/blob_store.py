@@ -0,0 +1,174 @@
+"""
+Content-addressed storage for 3D model assets (OBJ, STEP and generated WRL).
+
+Every blob is stored once under its SHA-256 digest. Output files are then
+materialized from the store by reflink (copy-on-write clone) or, where the
+filesystem cannot clone, a plain copy, so building many libraries from the
+same parts does not rewrite identical bytes over and over.
+
+Hardlinks are opt-in (``mode="hardlink"``): an output file edited in place
+would change the blob and every other file linked to it. Where a hardlink
+cannot be made (e.g. across filesystems) the file is copied instead.
+
+Blobs are checked against their digest when they are read. Storing a blob
+again only compares its size, so repeated exports do not re-read every
+asset; a blob of the wrong size is replaced.
+"""
+
+from __future__ import annotations
+
+# Global imports
+import hashlib
+import logging
+import os
+import shutil
+import sys
+from pathlib import Path
+
+# Linux FICLONE ioctl (btrfs, xfs, bcachefs, ...): _IOW(0x94, 9, int)
+_FICLONE = 0x40049409
+
+MATERIALIZE_MODES = ("auto", "hardlink", "reflink", "copy")
+
+
+def blob_digest(data: bytes) -> str:
+    """Return the hex SHA-256 digest used as the blob key."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _reflink(src: Path, dst: Path) -> bool:
+    """Clone *src* to the new file *dst* sharing its extents.
+
+    Returns False when the platform or filesystem does not support it.
+    """
+    if sys.platform.startswith("linux"):
+        import fcntl
+
+        try:
+            with open(src, "rb") as fsrc, open(dst, "xb") as fdst:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            return True
+        except OSError:
+            dst.unlink(missing_ok=True)
+            return False
+
+    if sys.platform == "darwin":
+        import ctypes
+        import ctypes.util
+
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            return libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0
+        except (OSError, AttributeError):
+            return False
+
+    return False
+
+
+class BlobStore:
+    """Store blobs by content hash and link them into output folders."""
+
+    def __init__(self, root: str | Path, mode: str = "auto") -> None:
+        if mode not in MATERIALIZE_MODES:
+            raise ValueError(f"Unknown materialize mode: {mode}")
+        self.root = Path(root)
+        self.mode = mode
+
+    def path_for(self, digest: str) -> Path:
+        """Location of a blob inside the store (sharded by the first byte)."""
+        return self.root / digest[:2] / digest
+
+    def has(self, digest: str) -> bool:
+        return self.path_for(digest).is_file()
+
+    def put(self, data: bytes) -> str:
+        """Add *data* to the store (no-op if already present) and return its digest.
+
+        An existing blob of the right size is trusted without reading it back.
+        """
+        digest = blob_digest(data)
+        blob_path = self.path_for(digest)
+        try:
+            if blob_path.stat().st_size == len(data):
+                return digest
+            logging.warning(f"Blob {digest} does not match its digest, replacing it")
+        except FileNotFoundError:
+            pass
+
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = blob_path.with_name(f".{digest}.{os.getpid()}.tmp")
+        try:
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, blob_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        logging.debug(f"Blob stored: {digest}")
+        return digest
+
+    def get(self, digest: str) -> bytes | None:
+        """Content of blob *digest*, None if missing or damaged."""
+        try:
+            data = self.path_for(digest).read_bytes()
+        except OSError:
+            return None
+        if blob_digest(data) != digest:
+            logging.warning(f"Blob {digest} does not match its digest, ignored")
+            return None
+        return data
+
+    def materialize(
+        self, digest: str, dest: str | Path, mode: str | None = None
+    ) -> str:
+        """Make *dest* hold the content of blob *digest*.
+
+        The file is prepared under a temporary name and moved over *dest*
+        with ``os.replace``, so an existing *dest* that is itself a hardlink
+        to another blob is never truncated in place. *mode* overrides the
+        materialize mode of the store for this file.
+
+        Returns the method used: "unchanged", "hardlink", "reflink" or "copy".
+        """
+        mode = mode or self.mode
+        if mode not in MATERIALIZE_MODES:
+            raise ValueError(f"Unknown materialize mode: {mode}")
+        blob_path = self.path_for(digest)
+        if not blob_path.is_file():
+            raise FileNotFoundError(f"Blob not in store: {digest}")
+
+        dest = Path(dest)
+        try:
+            if os.path.samefile(blob_path, dest):
+                return "unchanged"
+        except OSError:
+            pass
+
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+        tmp_path.unlink(missing_ok=True)
+        try:
+            method = self._link(blob_path, tmp_path, mode)
+            os.replace(tmp_path, dest)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        logging.debug(f"Materialized {dest} ({method})")
+        return method
+
+    @staticmethod
+    def _link(src: Path, dst: Path, mode: str) -> str:
+        if mode == "hardlink":
+            try:
+                os.link(src, dst)
+                return "hardlink"
+            except OSError as err:
+                logging.debug(f"Cannot hardlink {dst} ({err}), copying it")
+        elif mode in ("auto", "reflink"):
+            if _reflink(src, dst):
+                return "reflink"
+            if mode == "reflink":
+                raise OSError(f"Reflink not supported for {dst}")
+        shutil.copyfile(src, dst)
+        return "copy"
+
+    def write(self, data: bytes, dest: str | Path, mode: str | None = None) -> str:
+        """Store *data* and materialize it at *dest*; returns the method used."""
+        return self.materialize(self.put(data), dest, mode)
@@ -0,0 +1,129 @@
+"""
+Streaming import of EasyEDA component dumps.
+
+A dump is a JSONL file (optionally gzip compressed) with one component per
+line, either the raw API response (``{"success": true, "result": {...}}``) or
+the ``result`` object itself. Records are parsed one at a time, so memory use
+does not grow with the size of the dump.
+"""
+
+from __future__ import annotations
+
+# Global imports
+import gzip
+import json
+import logging
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any
+
+# Local imports
+from .easyeda_importer import (
+    Easyeda3dModelImporter,
+    EasyedaFootprintImporter,
+    EasyedaSymbolImporter,
+)
+from .parameters_easyeda import Ee3dModel, EeFootprint, EeSymbol
+
+BULK_SECTIONS = frozenset({"symbol", "footprint", "3d"})
+
+# Errors raised by malformed records (json.JSONDecodeError is a ValueError)
+_RECORD_ERRORS = (KeyError, IndexError, TypeError, ValueError, AttributeError)
+
+
+@dataclass
+class BulkImportStats:
+    records: int = 0
+    imported: int = 0
+    errors: int = 0
+    # error count per exception type, e.g. {"KeyError": 3}
+    error_types: dict[str, int] = field(default_factory=dict)
+
+    def add_error(self, line_number: int, error: Exception) -> None:
+        self.errors += 1
+        name = type(error).__name__
+        self.error_types[name] = self.error_types.get(name, 0) + 1
+        logging.debug(f"Skipping record on line {line_number}: {name}: {error}")
+
+
+@dataclass
+class BulkImportRecord:
+    line_number: int
+    lcsc_id: str
+    symbol: EeSymbol | None = None
+    footprint: EeFootprint | None = None
+    model_3d: Ee3dModel | None = None
+
+
+def _open_dump(path: Path) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def _cad_data(record: Any) -> dict[str, Any]:
+    if not isinstance(record, dict):
+        raise TypeError(f"expected an object, got {type(record).__name__}")
+    result = record.get("result", record)
+    if not isinstance(result, dict):
+        raise TypeError("record has no component data")
+    return result
+
+
+def _lcsc_id(cad_data: dict[str, Any]) -> str:
+    lcsc = cad_data.get("lcsc") or {}
+    c_para = cad_data.get("dataStr", {}).get("head", {}).get("c_para", {})
+    return str(
+        lcsc.get("number", "")
+        or c_para.get("Supplier Part", "")
+        or c_para.get("LCSC Part", "")
+    )
+
+
+def iter_import(
+    path: str | Path,
+    want: Iterable[str] = ("symbol", "footprint"),
+    stats: BulkImportStats | None = None,
+) -> Iterator[BulkImportRecord]:
+    """Yield the imported sections of every record in the dump at *path*.
+
+    *want* selects the sections to parse (``"symbol"``, ``"footprint"``,
+    ``"3d"``); 3D models are read from the footprint without downloading
+    the model files. Malformed records are skipped and counted in *stats*.
+    """
+    sections = set(want)
+    if not sections <= BULK_SECTIONS:
+        raise ValueError(f"Unknown sections: {sorted(sections - BULK_SECTIONS)}")
+    if stats is None:
+        stats = BulkImportStats()
+
+    with _open_dump(Path(path)) as dump:
+        for line_number, line in enumerate(dump, start=1):
+            if not line.strip():
+                continue
+            stats.records += 1
+            try:
+                cad_data = _cad_data(json.loads(line))
+                imported = BulkImportRecord(
+                    line_number=line_number, lcsc_id=_lcsc_id(cad_data)
+                )
+                if "symbol" in sections:
+                    imported.symbol = EasyedaSymbolImporter(cad_data).output
+                if "footprint" in sections:
+                    imported.footprint = EasyedaFootprintImporter(cad_data).output
+                if "3d" in sections:
+                    imported.model_3d = Easyeda3dModelImporter(
+                        easyeda_cp_cad_data=cad_data, download_raw_3d_model=False
+                    ).output
+            except _RECORD_ERRORS as e:
+                stats.add_error(line_number, e)
+                continue
+            stats.imported += 1
+            yield imported
+
+    if stats.errors:
+        logging.warning(
+            f"Bulk import of {path}: skipped {stats.errors} of "
+            f"{stats.records} records ({stats.error_types})"
+        )
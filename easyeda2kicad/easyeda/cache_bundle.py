@@ -0,0 +1,249 @@
+"""
+Pack and unpack .easyeda_cache entries as a single compressed bundle.
+
+A bundle is a zip archive (deflate) holding the flat cache files
+(``C2040.json``, ``C2040_svg.json``, ``<uuid>.obj``, ``<uuid>.step``) plus an
+``index.json`` listing the entries of every component and their checksums.
+It can be unpacked into a cache directory or read directly by
+:class:`~easyeda2kicad.easyeda.easyeda_api.EasyedaApi` via ``cache_bundle``.
+"""
+
+from __future__ import annotations
+
+# Global imports
+import csv
+import hashlib
+import json
+import logging
+import re
+import zipfile
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+# Local imports
+from .blob_store import BlobStore
+from .easyeda_api import EasyedaApi
+from .easyeda_importer import Easyeda3dModelImporter
+
+try:
+    from .._version import __version__
+except ImportError:
+    __version__ = "1.0.0"
+
+BUNDLE_INDEX = "index.json"
+BUNDLE_FORMAT = 1
+
+_LCSC_ID_REGEX = re.compile(r"^C\d+$")
+_BLOB_SUFFIXES = (".obj", ".step")
+
+
+def read_bom_lcsc_ids(bom_path: str | Path) -> list[str]:
+    """Collect LCSC ids (``C`` followed by digits) from a CSV BOM.
+
+    If the header names an LCSC/JLCPCB column only that column is read,
+    otherwise every cell except reference designators ("C1" is also a
+    capacitor). Cells holding several ids ("C1, C2") are split; duplicates
+    are dropped while keeping the BOM order.
+    """
+    with open(bom_path, newline="", encoding="utf-8-sig") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect: Any = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        rows = list(csv.reader(f, dialect))
+    if not rows:
+        return []
+
+    header = [cell.strip().lower() for cell in rows[0]]
+    columns = [i for i, name in enumerate(header) if "lcsc" in name or "jlc" in name]
+    if columns:
+        rows = rows[1:]
+    else:
+        skip = {
+            i
+            for i, name in enumerate(header)
+            if name.startswith("ref") or "designator" in name
+        }
+        columns = [i for i in range(max(map(len, rows))) if i not in skip]
+
+    ids: dict[str, None] = {}
+    for row in rows:
+        for i in columns:
+            if i >= len(row):
+                continue
+            for token in re.split(r"[,;\s]+", row[i].strip()):
+                if _LCSC_ID_REGEX.match(token):
+                    ids[token] = None
+    return list(ids)
+
+
+def _is_safe_entry_name(name: str) -> bool:
+    return bool(name) and Path(name).name == name and name not in (".", "..")
+
+
+def _component_entry_names(
+    api: EasyedaApi, lcsc_id: str | None = None, uuid: str | None = None
+) -> list[str]:
+    """Fetch (through the cache) everything the CLI reads for one component."""
+    identifier = lcsc_id or uuid or ""
+    cad_data = api.get_cad_data_of_component(lcsc_id=lcsc_id, uuid=uuid)
+    if not cad_data:
+        logging.error(f"Failed to fetch data from EasyEDA API for part {identifier}")
+        return []
+
+    candidates = [api.get_cache_path(identifier, "json")]
+    if lcsc_id:
+        # the pre-rendered SVGs are only cached once requested
+        if not any(api.get_svg_from_api(lcsc_id).values()):
+            logging.warning(f"No pre-rendered SVGs for part {lcsc_id}")
+        candidates.append(api.get_cache_path(f"{lcsc_id}_svg", "json"))
+
+    model_3d = Easyeda3dModelImporter(
+        easyeda_cp_cad_data=cad_data, download_raw_3d_model=False
+    ).output
+    if model_3d and model_3d.uuid:
+        api.get_raw_3d_model_obj(uuid=model_3d.uuid)
+        api.get_step_3d_model(uuid=model_3d.uuid)
+        candidates.append(api.get_cache_path(model_3d.uuid, "obj"))
+        candidates.append(api.get_cache_path(model_3d.uuid, "step"))
+
+    return [path.name for path in candidates if path.is_file()]
+
+
+def export_cache_bundle(
+    bundle_path: str | Path,
+    api: EasyedaApi,
+    lcsc_ids: Iterable[str] = (),
+    uuids: Iterable[str] = (),
+) -> bool:
+    """Write the cache entries of the given components into *bundle_path*.
+
+    Missing entries are fetched first (the api must have ``use_cache`` set).
+    Returns False if any component could not be resolved.
+    """
+    if not api.use_cache:
+        logging.error("Exporting a cache bundle requires the cache to be enabled")
+        return False
+
+    components: dict[str, list[str]] = {}
+    ok = True
+    for lcsc_id in lcsc_ids:
+        components[lcsc_id] = _component_entry_names(api, lcsc_id=lcsc_id)
+    for uuid in uuids:
+        components[uuid] = _component_entry_names(api, uuid=uuid)
+    for component_id, names in components.items():
+        if not names:
+            ok = False
+            logging.warning(f"No cache entries for {component_id}")
+
+    entries: dict[str, dict[str, Any]] = {}
+    bundle_path = Path(bundle_path)
+    bundle_path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(bundle_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for names in components.values():
+            for name in names:
+                if name in entries:
+                    continue
+                data = (api.cache_dir / name).read_bytes()
+                entries[name] = {
+                    "size": len(data),
+                    "sha256": hashlib.sha256(data).hexdigest(),
+                }
+                zf.writestr(name, data)
+        index = {
+            "format": BUNDLE_FORMAT,
+            "generator": f"easyeda2kicad {__version__}",
+            "components": components,
+            "entries": entries,
+        }
+        zf.writestr(BUNDLE_INDEX, json.dumps(index, indent=2))
+
+    logging.info(
+        f"Cache bundle written: {bundle_path} "
+        f"({len(components)} components, {len(entries)} entries)"
+    )
+    return ok
+
+
+class CacheBundle:
+    """Read-only access to the entries of a cache bundle without unpacking it."""
+
+    def __init__(self, bundle_path: str | Path) -> None:
+        self.path = Path(bundle_path)
+        self._zip = zipfile.ZipFile(self.path, "r")
+        try:
+            index: dict[str, Any] = json.loads(self._zip.read(BUNDLE_INDEX))
+        except (KeyError, json.JSONDecodeError) as e:
+            self._zip.close()
+            raise ValueError(f"Not a cache bundle: {self.path} ({e})") from e
+        if index.get("format") != BUNDLE_FORMAT:
+            self._zip.close()
+            raise ValueError(
+                f"Unsupported cache bundle format {index.get('format')!r}: {self.path}"
+            )
+        self.components: dict[str, list[str]] = index.get("components", {})
+        self.entries: dict[str, dict[str, Any]] = index.get("entries", {})
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.entries
+
+    def __enter__(self) -> CacheBundle:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._zip.close()
+
+    def read(self, name: str) -> bytes | None:
+        """Return the content of cache entry *name*, or None if absent or corrupt."""
+        meta = self.entries.get(name)
+        if meta is None:
+            return None
+        try:
+            data = self._zip.read(name)
+        except (KeyError, zipfile.BadZipFile) as e:
+            logging.warning(f"Failed to read {name} from {self.path}: {e}")
+            return None
+        if hashlib.sha256(data).hexdigest() != meta.get("sha256"):
+            logging.warning(f"Checksum mismatch for {name} in {self.path}")
+            return None
+        return data
+
+    def unpack(self, cache_dir: str | Path, overwrite: bool = False) -> int:
+        """Write all entries into *cache_dir*; returns the number of files written."""
+        cache_dir = Path(cache_dir)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        blob_store = BlobStore(cache_dir / "blobs")
+        written = 0
+        for name in self.entries:
+            if not _is_safe_entry_name(name):
+                logging.warning(f"Skipping unsafe bundle entry: {name!r}")
+                continue
+            target = cache_dir / name
+            if target.exists() and not overwrite:
+                continue
+            data = self.read(name)
+            if data is None:
+                continue
+            if target.suffix in _BLOB_SUFFIXES:
+                blob_store.write(data, target)
+            else:
+                target.write_bytes(data)
+            written += 1
+        logging.info(
+            f"Unpacked {written} cache entries from {self.path} to {cache_dir}"
+        )
+        return written
+
+
+def import_cache_bundle(
+    bundle_path: str | Path, cache_dir: str | Path, overwrite: bool = False
+) -> int:
+    """Unpack *bundle_path* into *cache_dir*; returns the number of files written."""
+    with CacheBundle(bundle_path) as bundle:
+        return bundle.unpack(cache_dir, overwrite=overwrite)
@@ -13,9 +13,14 @@ import urllib.parse
 import urllib.request
 from pathlib import Path
 from types import ModuleType
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 # Local imports
+from .blob_store import BlobStore
+
+if TYPE_CHECKING:
+    from .cache_bundle import CacheBundle
+
 try:
     from .._version import __version__
 except ImportError:
@@ -65,27 +70,41 @@ class EasyedaApi:
         self.ssl_context = self._create_ssl_context()
         self.cache_dir = Path.cwd() / ".easyeda_cache"
         self.use_cache = use_cache
-
-    def _get_cache_path(self, identifier: str, extension: str) -> Path:
-        """Get the cache file path for a specific resource."""
+        # Read-only bundle consulted when an entry is not in cache_dir
+        self.cache_bundle: CacheBundle | None = None
+        # How 3D models are materialized from the blob store (see MATERIALIZE_MODES)
+        self.blob_mode = "auto"
+
+    @property
+    def blob_store(self) -> BlobStore:
+        """Content-addressed store for 3D assets, kept inside the cache directory."""
+        return BlobStore(self.cache_dir / "blobs", mode=self.blob_mode)
+
+    def get_cache_path(self, identifier: str, extension: str) -> Path:
+        """Return the cache file path of a resource (whether it is cached or not)."""
         safe_id = identifier.replace("/", "_").replace("\\", "_")
         return self.cache_dir / f"{safe_id}.{extension}"
 
     def _read_from_cache(
         self, cache_path: Path, binary: bool = False
     ) -> str | bytes | None:
-        """Read data from cache if it exists."""
-        if not self.use_cache or not cache_path.exists():
-            return None
-        try:
-            mode = "rb" if binary else "r"
-            with open(cache_path, mode) as f:
-                data: str | bytes = f.read()
-            logging.debug(f"Cache hit: {cache_path}")
-            return data
-        except Exception as e:
-            logging.warning(f"Failed to read cache {cache_path}: {e}")
-            return None
+        """Read data from cache if it exists, falling back to the cache bundle."""
+        if self.use_cache and cache_path.exists():
+            try:
+                mode = "rb" if binary else "r"
+                with open(cache_path, mode) as f:
+                    data: str | bytes = f.read()
+                logging.debug(f"Cache hit: {cache_path}")
+                return data
+            except Exception as e:
+                logging.warning(f"Failed to read cache {cache_path}: {e}")
+
+        if self.cache_bundle is not None:
+            raw = self.cache_bundle.read(cache_path.name)
+            if raw is not None:
+                logging.debug(f"Cache bundle hit: {cache_path.name}")
+                return raw if binary else raw.decode("utf-8")
+        return None
 
     def _write_to_cache(
         self, cache_path: Path, data: str | bytes, binary: bool = False
@@ -109,6 +128,14 @@ class EasyedaApi:
                     # If not valid JSON, fall back to normal write
                     pass
 
+            # 3D assets go through the blob store so exports can link them;
+            # the cache entry is a hardlink to the blob, not a second copy
+            if cache_path.suffix in (".obj", ".step"):
+                raw = data.encode("utf-8") if isinstance(data, str) else data
+                self.blob_store.write(raw, cache_path, mode="hardlink")
+                logging.debug(f"Cached (blob): {cache_path}")
+                return
+
             mode = "wb" if binary else "w"
             with open(cache_path, mode) as f:
                 f.write(data)
@@ -169,7 +196,7 @@ class EasyedaApi:
         if not identifier:
             return {}
 
-        cache_path = self._get_cache_path(identifier, "json")
+        cache_path = self.get_cache_path(identifier, "json")
         cached_data = self._read_from_cache(cache_path, binary=False)
         if cached_data is not None:
             try:
@@ -218,7 +245,7 @@ class EasyedaApi:
 
     def get_raw_3d_model_obj(self, uuid: str) -> str | None:
         # Try to read from cache first
-        cache_path = self._get_cache_path(uuid, "obj")
+        cache_path = self.get_cache_path(uuid, "obj")
         cached_data = self._read_from_cache(cache_path, binary=False)
         if cached_data is not None:
             if not isinstance(cached_data, str):
@@ -248,7 +275,7 @@ class EasyedaApi:
 
     def get_step_3d_model(self, uuid: str) -> bytes | None:
         # Try to read from cache first
-        cache_path = self._get_cache_path(uuid, "step")
+        cache_path = self.get_cache_path(uuid, "step")
         cached_data = self._read_from_cache(cache_path, binary=True)
         if cached_data is not None:
             if not isinstance(cached_data, bytes):
@@ -418,7 +445,7 @@ class EasyedaApi:
         Multi-unit symbols yield multiple symbol SVGs; only the first unit is returned here.
         Results are cached as JSON when caching is enabled.
         """
-        cache_path = self._get_cache_path(f"{lcsc_id}_svg", "json")
+        cache_path = self.get_cache_path(f"{lcsc_id}_svg", "json")
         cached_data = self._read_from_cache(cache_path, binary=False)
         if cached_data is not None:
             try:
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import re
-from dataclasses import fields
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, fields
+from functools import cached_property
 from typing import Any, Union, get_args, get_origin, get_type_hints
 
 __all__ = [
@@ -76,6 +79,114 @@ def _sanitize_component_name(name: str) -> str:
     return name.strip()
 
 
+def _converter_for(field_type: Any) -> Callable[[Any], Any] | None:
+    """Return the string converter for a resolved field annotation (None = keep)."""
+    if get_origin(field_type) is Union:
+        args = get_args(field_type)
+        if args and type(None) in args:
+            # It's Optional[T], get the non-None type
+            field_type = next((arg for arg in args if arg is not type(None)), str)
+
+    if field_type is float or field_type == "float":
+        return _safe_float
+    if field_type is int or field_type == "int":
+        return _safe_int
+    if field_type is bool or field_type == "bool":
+        return _safe_bool
+    return None
+
+
+@dataclass(frozen=True)
+class _FieldSchema:
+    """Field names and converters of an Ee* dataclass, resolved once.
+
+    Resolving ``typing.get_type_hints`` and ``dataclasses.fields`` is far more
+    expensive than building the object, so it must not happen per shape line.
+    Defaults stay with the dataclass ``__init__``, which already applies them
+    to any trailing fields a shape line does not provide.
+    """
+
+    cls: type
+    names: tuple[str, ...]
+    converters: tuple[Callable[[Any], Any] | None, ...]
+    by_name: dict[str, Callable[[Any], Any] | None]
+
+    @classmethod
+    def of(cls, dataclass_type: type) -> _FieldSchema:
+        names = tuple(f.name for f in fields(dataclass_type))
+        try:
+            type_hints = get_type_hints(dataclass_type)
+        except Exception:
+            # Fallback if type hints can't be resolved: no conversion
+            type_hints = {}
+        converters = tuple(
+            _converter_for(type_hints[name]) if name in type_hints else None
+            for name in names
+        )
+        return cls(
+            cls=dataclass_type,
+            names=names,
+            converters=converters,
+            by_name={name: _converter_for(hint) for name, hint in type_hints.items()},
+        )
+
+    def convert(self, field_dict: dict[str, Any]) -> dict[str, Any]:
+        converted = {}
+        for key, value in field_dict.items():
+            converter = self.by_name.get(key)
+            converted[key] = value if converter is None else converter(value)
+        return converted
+
+    def build(self, values: Sequence[Any], convert: bool = True, start: int = 0) -> Any:
+        """Construct the dataclass from positional EasyEDA field values.
+
+        Values before *start* are skipped (e.g. the shape designator). Extra
+        values are ignored and missing trailing ones fall back to the
+        dataclass defaults, like ``cls(**dict(zip(names, values)))``.
+        """
+        if not convert:
+            return self.cls(*values[start : start + len(self.names)])
+        if start:
+            values = values[start:]
+        return self.cls(
+            *[
+                value if converter is None else converter(value)
+                for converter, value in zip(self.converters, values)
+            ]
+        )
+
+
+_SCHEMAS: dict[type, _FieldSchema] = {
+    dataclass_type: _FieldSchema.of(dataclass_type)
+    for dataclass_type in (
+        EeSymbolPinSettings,
+        EeSymbolPinName,
+        EeSymbolRectangle,
+        EeSymbolPolyline,
+        EeSymbolPolygon,
+        EeSymbolPath,
+        EeSymbolCircle,
+        EeSymbolEllipse,
+        EeSymbolArc,
+        EeFootprintPad,
+        EeFootprintTrack,
+        EeFootprintHole,
+        EeFootprintVia,
+        EeFootprintCircle,
+        EeFootprintArc,
+        EeFootprintRectangle,
+        EeFootprintText,
+    )
+}
+
+
+def _schema(dataclass_type: type) -> _FieldSchema:
+    schema = _SCHEMAS.get(dataclass_type)
+    if schema is None:
+        schema = _SCHEMAS[dataclass_type] = _FieldSchema.of(dataclass_type)
+    return schema
+
+
 def convert_fields_to_types(
     field_dict: dict[str, Any], dataclass_type: type
 ) -> dict[str, Any]:
@@ -84,38 +195,7 @@ def convert_fields_to_types(
     the dataclass type annotations. Needed because EasyEDA API returns all
     field values as strings regardless of their intended type.
     """
-    try:
-        type_hints = get_type_hints(dataclass_type)
-    except Exception:
-        # Fallback if type hints can't be resolved
-        return field_dict
-
-    converted = {}
-    for key, value in field_dict.items():
-        if key not in type_hints:
-            converted[key] = value
-            continue
-
-        field_type = type_hints[key]
-
-        origin = get_origin(field_type)
-        if origin is Union:
-            args = get_args(field_type)
-            if args and type(None) in args:
-                # It's Optional[T], get the non-None type
-                field_type = next((arg for arg in args if arg is not type(None)), str)
-
-        # Convert based on type
-        if field_type is float or field_type == "float":
-            converted[key] = _safe_float(value)
-        elif field_type is int or field_type == "int":
-            converted[key] = _safe_int(value)
-        elif field_type is bool or field_type == "bool":
-            converted[key] = _safe_bool(value)
-        else:
-            converted[key] = value
-
-    return converted
+    return _schema(dataclass_type).convert(field_dict)
 
 
 def add_easyeda_pin(pin_data: str, ee_symbol: EeSymbol) -> None:
@@ -138,10 +218,8 @@ def add_easyeda_pin(pin_data: str, ee_symbol: EeSymbol) -> None:
     pin_settings_data = (
         ee_segments[0][1:] if len(ee_segments) > 0 and len(ee_segments[0]) > 1 else []
     )
-    pin_settings_fields = [f.name for f in fields(EeSymbolPinSettings)]
-    pin_settings_dict = dict(zip(pin_settings_fields, pin_settings_data))
-    pin_settings = EeSymbolPinSettings(
-        **convert_fields_to_types(pin_settings_dict, EeSymbolPinSettings)
+    pin_settings: EeSymbolPinSettings = _SCHEMAS[EeSymbolPinSettings].build(
+        pin_settings_data
     )
 
     # Override spice_pin_number with the correct KiCad pin number if found
@@ -176,14 +254,8 @@ def add_easyeda_pin(pin_data: str, ee_symbol: EeSymbol) -> None:
             else ""
         ),
     )
-    pin_name_dict = dict(
-        zip(
-            [f.name for f in fields(EeSymbolPinName)],
-            ee_segments[3][:] if len(ee_segments) > 3 else [],
-        )
-    )
-    pin_name = EeSymbolPinName(
-        **convert_fields_to_types(pin_name_dict, EeSymbolPinName)
+    pin_name = _SCHEMAS[EeSymbolPinName].build(
+        ee_segments[3] if len(ee_segments) > 3 else []
     )
 
     pin_dot_bis = EeSymbolPinDotBis(
@@ -259,12 +331,8 @@ def add_easyeda_rectangle(rectangle_data: str, ee_symbol: EeSymbol) -> None:
         normalized_parts = parts
 
     # Build dict for dataclass fields (without rx, ry first)
-    rectangle_dict = dict(
-        zip(
-            [f.name for f in fields(EeSymbolRectangle)],
-            normalized_parts,
-        )
-    )
+    schema = _SCHEMAS[EeSymbolRectangle]
+    rectangle_dict = dict(zip(schema.names, normalized_parts))
 
     # Add rx, ry at the end if they were extracted
     if rx is not None:
@@ -272,74 +340,43 @@ def add_easyeda_rectangle(rectangle_data: str, ee_symbol: EeSymbol) -> None:
     if ry is not None:
         rectangle_dict["ry"] = ry
 
-    ee_symbol.rectangles.append(
-        EeSymbolRectangle(**convert_fields_to_types(rectangle_dict, EeSymbolRectangle))
-    )
+    ee_symbol.rectangles.append(EeSymbolRectangle(**schema.convert(rectangle_dict)))
 
 
 def add_easyeda_polyline(polyline_data: str, ee_symbol: EeSymbol) -> None:
     # Format: PL~points~stroke_color~stroke_width~stroke_style~fill_color~id~locked
-    polyline_dict = dict(
-        zip(
-            [f.name for f in fields(EeSymbolPolyline)],
-            polyline_data.split("~")[1:],
-        )
-    )
     ee_symbol.polylines.append(
-        EeSymbolPolyline(**convert_fields_to_types(polyline_dict, EeSymbolPolyline))
+        _SCHEMAS[EeSymbolPolyline].build(polyline_data.split("~")[1:])
     )
 
 
 def add_easyeda_polygon(polygon_data: str, ee_symbol: EeSymbol) -> None:
     # Format: PG~points~stroke_color~stroke_width~stroke_style~fill_color~id~locked
-    polygon_dict = dict(
-        zip(
-            [f.name for f in fields(EeSymbolPolygon)],
-            polygon_data.split("~")[1:],
-        )
-    )
     ee_symbol.polygons.append(
-        EeSymbolPolygon(**convert_fields_to_types(polygon_dict, EeSymbolPolygon))
+        _SCHEMAS[EeSymbolPolygon].build(polygon_data.split("~")[1:])
     )
 
 
 def add_easyeda_path(path_data: str, ee_symbol: EeSymbol) -> None:
     # Format: PT~path~stroke_color~stroke_width~stroke_style~fill_color~id~locked
-    path_dict = dict(
-        zip([f.name for f in fields(EeSymbolPath)], path_data.split("~")[1:])
-    )
-    ee_symbol.paths.append(
-        EeSymbolPath(**convert_fields_to_types(path_dict, EeSymbolPath))
-    )
+    ee_symbol.paths.append(_SCHEMAS[EeSymbolPath].build(path_data.split("~")[1:]))
 
 
 def add_easyeda_circle(circle_data: str, ee_symbol: EeSymbol) -> None:
     # Format: C~center_x~center_y~radius~stroke_color~stroke_width~stroke_style~fill_color~id~locked
-    circle_dict = dict(
-        zip([f.name for f in fields(EeSymbolCircle)], circle_data.split("~")[1:])
-    )
-    ee_symbol.circles.append(
-        EeSymbolCircle(**convert_fields_to_types(circle_dict, EeSymbolCircle))
-    )
+    ee_symbol.circles.append(_SCHEMAS[EeSymbolCircle].build(circle_data.split("~")[1:]))
 
 
 def add_easyeda_ellipse(ellipse_data: str, ee_symbol: EeSymbol) -> None:
     # Format: E~center_x~center_y~radius_x~radius_y~stroke_color~stroke_width~stroke_style~fill_color~id~locked
-    ellipse_dict = dict(
-        zip(
-            [f.name for f in fields(EeSymbolEllipse)],
-            ellipse_data.split("~")[1:],
-        )
-    )
     ee_symbol.ellipses.append(
-        EeSymbolEllipse(**convert_fields_to_types(ellipse_dict, EeSymbolEllipse))
+        _SCHEMAS[EeSymbolEllipse].build(ellipse_data.split("~")[1:])
     )
 
 
 def add_easyeda_arc(arc_data: str, ee_symbol: EeSymbol) -> None:
     # Format: A~path~helper_dots~stroke_color~stroke_width~stroke_style~fill_color~id~locked
-    arc_dict = dict(zip([f.name for f in fields(EeSymbolArc)], arc_data.split("~")[1:]))
-    ee_symbol.arcs.append(EeSymbolArc(**convert_fields_to_types(arc_dict, EeSymbolArc)))
+    ee_symbol.arcs.append(_SCHEMAS[EeSymbolArc].build(arc_data.split("~")[1:]))
 
 
 def add_easyeda_text(text_data: str, ee_symbol: EeSymbol) -> None:
@@ -379,10 +416,27 @@ easyeda_handlers = {
 }
 
 
+# Footprint shape designator -> (dataclass, EeFootprint list it is collected in)
+_FOOTPRINT_SHAPES: dict[str, tuple[type, str]] = {
+    "PAD": (EeFootprintPad, "pads"),
+    "TRACK": (EeFootprintTrack, "tracks"),
+    "HOLE": (EeFootprintHole, "holes"),
+    "VIA": (EeFootprintVia, "vias"),
+    "CIRCLE": (EeFootprintCircle, "circles"),
+    "ARC": (EeFootprintArc, "arcs"),
+    "RECT": (EeFootprintRectangle, "rectangles"),
+    "TEXT": (EeFootprintText, "texts"),
+}
+
+
 class EasyedaSymbolImporter:
     def __init__(self, easyeda_cp_cad_data: dict[str, Any]):
         self.input = easyeda_cp_cad_data
-        self.output: EeSymbol = self._extract(easyeda_cp_cad_data)
+
+    @cached_property
+    def output(self) -> EeSymbol:
+        """The symbol and its units, parsed on first access."""
+        return self._extract(self.input)
 
     def get_symbol(self) -> EeSymbol:
         return self.output
@@ -498,8 +552,18 @@ class EasyedaSymbolImporter:
 
 
 class EasyedaFootprintImporter:
+    """Footprint importer; each part of the result is parsed on first access.
+
+    ``info`` only reads the package header, ``model_3d`` only the SVGNODE and
+    ``output`` (the full footprint) walks all shape lines once.
+    """
+
     def __init__(self, easyeda_cp_cad_data: dict[str, Any]):
         self.input = easyeda_cp_cad_data
+
+    @cached_property
+    def _header(self) -> dict[str, Any]:
+        """Keyword arguments of ``extract_easyeda_data`` derived from the header."""
         _c_para = self.input["packageDetail"]["dataStr"]["head"]["c_para"]
         # Primary source: customData.jlcPara.assemblyProcess ("SMT" / "THT").
         # Fallback: top-level SMT flag + title heuristic for older API responses.
@@ -521,16 +585,59 @@ class EasyedaFootprintImporter:
             or _c_para.get("Supplier Part", "")
             or _c_para.get("LCSC Part", "")
         )
-        self.output = self.extract_easyeda_data(
-            ee_data_str=self.input["packageDetail"]["dataStr"],
-            ee_data_info=_c_para,
-            is_smd=_is_smd,
-            lcsc_id=_lcsc_id,
-            manufacturer=_c_para.get("Manufacturer", "")
+        return {
+            "ee_data_info": _c_para,
+            "is_smd": _is_smd,
+            "lcsc_id": _lcsc_id,
+            "manufacturer": _c_para.get("Manufacturer", "")
             or _c_para.get("BOM_Manufacturer", ""),
-            mpn=_c_para.get("Manufacturer Part", "")
+            "mpn": _c_para.get("Manufacturer Part", "")
             or _c_para.get("BOM_Manufacturer Part", ""),
-            description=self.input.get("description", ""),
+            "description": self.input.get("description", ""),
+        }
+
+    @cached_property
+    def info(self) -> EeFootprintInfo:
+        """Footprint name and metadata, without parsing any shape."""
+        if "output" in self.__dict__:
+            return self.output.info
+        return _footprint_info(**self._header)
+
+    @cached_property
+    def model_3d(self) -> Ee3dModel | None:
+        """3D model metadata from the (last) SVGNODE of the footprint."""
+        if "output" in self.__dict__:
+            return self.output.model_3d
+        ee_data_str = self.input["packageDetail"]["dataStr"]
+        svgnode_line = None
+        for line in ee_data_str["shape"]:
+            if line.startswith("SVGNODE~"):
+                svgnode_line = line
+        return _footprint_model_3d(ee_data_str, svgnode_line)
+
+    @cached_property
+    def source_digest(self) -> str:
+        """Digest of the data the footprint is generated from.
+
+        Parts with the same digest get the same footprint, apart from their
+        part properties (LCSC Part, manufacturer, MPN, description).
+        """
+        ee_data_str = self.input["packageDetail"]["dataStr"]
+        head = ee_data_str["head"]
+        source = [
+            self.info.name,
+            self.info.fp_type,
+            head.get("x"),
+            head.get("y"),
+            ee_data_str["shape"],
+        ]
+        return hashlib.sha256(json.dumps(source).encode("utf-8")).hexdigest()
+
+    @cached_property
+    def output(self) -> EeFootprint:
+        """The complete footprint, parsed on first access."""
+        return self.extract_easyeda_data(
+            ee_data_str=self.input["packageDetail"]["dataStr"], **self._header
         )
 
     def get_footprint(self) -> EeFootprint:
@@ -547,10 +654,9 @@ class EasyedaFootprintImporter:
         description: str = "",
     ) -> EeFootprint:
         new_ee_footprint = EeFootprint(
-            info=EeFootprintInfo(
-                name=_sanitize_footprint_name(ee_data_info["package"]),
-                fp_type="smd" if is_smd else "tht",
-                model_3d_name=ee_data_info.get("3DModel", ""),
+            info=_footprint_info(
+                ee_data_info=ee_data_info,
+                is_smd=is_smd,
                 lcsc_id=lcsc_id,
                 manufacturer=manufacturer,
                 mpn=mpn,
@@ -563,86 +669,81 @@ class EasyedaFootprintImporter:
             model_3d=None,
         )
 
+        # Single pass: every shape line is split once and dispatched by its
+        # designator; the SVGNODE is only remembered and parsed afterwards.
+        shape_targets = {
+            designator: (_SCHEMAS[cls], getattr(new_ee_footprint, attr))
+            for designator, (cls, attr) in _FOOTPRINT_SHAPES.items()
+        }
+        svgnode_line = None
         for line in ee_data_str["shape"]:
-            ee_designator = line.split("~")[0]
-            ee_fields = line.split("~")[1:]
+            ee_fields = line.split("~")
+            ee_designator = ee_fields[0]
 
-            if ee_designator == "PAD":
-                ee_pad = EeFootprintPad(
-                    **dict(
-                        zip([f.name for f in fields(EeFootprintPad)], ee_fields[:18])
-                    )
-                )
-                new_ee_footprint.pads.append(ee_pad)
-            elif ee_designator == "TRACK":
-                ee_track = EeFootprintTrack(
-                    **dict(zip([f.name for f in fields(EeFootprintTrack)], ee_fields))
-                )
-                new_ee_footprint.tracks.append(ee_track)
-            elif ee_designator == "HOLE":
-                ee_hole = EeFootprintHole(
-                    **dict(zip([f.name for f in fields(EeFootprintHole)], ee_fields))
-                )
-                new_ee_footprint.holes.append(ee_hole)
-            elif ee_designator == "VIA":
-                ee_via = EeFootprintVia(
-                    **dict(zip([f.name for f in fields(EeFootprintVia)], ee_fields))
-                )
-                new_ee_footprint.vias.append(ee_via)
-            elif ee_designator == "CIRCLE":
-                ee_circle = EeFootprintCircle(
-                    **dict(zip([f.name for f in fields(EeFootprintCircle)], ee_fields))
-                )
-                new_ee_footprint.circles.append(ee_circle)
-            elif ee_designator == "ARC":
-                ee_arc = EeFootprintArc(
-                    **dict(zip([f.name for f in fields(EeFootprintArc)], ee_fields))
-                )
-                new_ee_footprint.arcs.append(ee_arc)
-            elif ee_designator == "RECT":
-                ee_rectangle = EeFootprintRectangle(
-                    **dict(
-                        zip([f.name for f in fields(EeFootprintRectangle)], ee_fields)
-                    )
-                )
-                new_ee_footprint.rectangles.append(ee_rectangle)
-            elif ee_designator == "TEXT":
-                ee_text = EeFootprintText(
-                    **dict(zip([f.name for f in fields(EeFootprintText)], ee_fields))
-                )
-                new_ee_footprint.texts.append(ee_text)
+            target = shape_targets.get(ee_designator)
+            if target is not None:
+                schema, shapes = target
+                shapes.append(schema.build(ee_fields, convert=False, start=1))
             elif ee_designator == "SVGNODE":
-                # canvas.split("~")[16] and [17] are the authoritative canvas origin.
-                # Fall back to head.x/y if the canvas string is absent or too short.
-                _canvas_parts = ee_data_str.get("canvas", "").split("~")
-                if len(_canvas_parts) > 17:
-                    _cox = _safe_float(_canvas_parts[16])
-                    _coy = _safe_float(_canvas_parts[17])
-                else:
-                    _cox = _safe_float(ee_data_str["head"].get("x"))
-                    _coy = _safe_float(ee_data_str["head"].get("y"))
-                new_ee_footprint.model_3d = Easyeda3dModelImporter(
-                    easyeda_cp_cad_data=[line],
-                    download_raw_3d_model=False,
-                    canvas_origin_x=_cox,
-                    canvas_origin_y=_coy,
-                ).output
-
+                # Several SVGNODEs: the last one wins
+                svgnode_line = line
             elif ee_designator == "SOLIDREGION":
                 # Format: SOLIDREGION~layer_id~net~path~region_type~id~~[is_locked]
-                if len(ee_fields) >= 4:
+                if len(ee_fields) >= 5:
                     region = EeFootprintSolidRegion(
-                        layer_id=_safe_int(ee_fields[0], 3),
-                        path=ee_fields[2] if len(ee_fields) > 2 else "",
-                        region_type=ee_fields[3] if len(ee_fields) > 3 else "solid",
+                        layer_id=_safe_int(ee_fields[1], 3),
+                        path=ee_fields[3],
+                        region_type=ee_fields[4],
                     )
                     new_ee_footprint.solid_regions.append(region)
             else:
                 logging.warning(f"Unknown footprint designator: {ee_designator}")
 
+        new_ee_footprint.model_3d = _footprint_model_3d(ee_data_str, svgnode_line)
         return new_ee_footprint
 
 
+def _footprint_info(
+    ee_data_info: dict[str, Any],
+    is_smd: bool,
+    lcsc_id: str = "",
+    manufacturer: str = "",
+    mpn: str = "",
+    description: str = "",
+) -> EeFootprintInfo:
+    return EeFootprintInfo(
+        name=_sanitize_footprint_name(ee_data_info["package"]),
+        fp_type="smd" if is_smd else "tht",
+        model_3d_name=ee_data_info.get("3DModel", ""),
+        lcsc_id=lcsc_id,
+        manufacturer=manufacturer,
+        mpn=mpn,
+        description=description,
+    )
+
+
+def _footprint_model_3d(
+    ee_data_str: dict[str, Any], svgnode_line: str | None
+) -> Ee3dModel | None:
+    if svgnode_line is None:
+        return None
+    # canvas.split("~")[16] and [17] are the authoritative canvas origin.
+    # Fall back to head.x/y if the canvas string is absent or too short.
+    _canvas_parts = ee_data_str.get("canvas", "").split("~")
+    if len(_canvas_parts) > 17:
+        _cox = _safe_float(_canvas_parts[16])
+        _coy = _safe_float(_canvas_parts[17])
+    else:
+        _cox = _safe_float(ee_data_str["head"].get("x"))
+        _coy = _safe_float(ee_data_str["head"].get("y"))
+    return Easyeda3dModelImporter(
+        easyeda_cp_cad_data=[svgnode_line],
+        download_raw_3d_model=False,
+        canvas_origin_x=_cox,
+        canvas_origin_y=_coy,
+    ).output
+
+
 # ------------------------------------------------------------------------------
 
 
@@ -676,7 +777,11 @@ class Easyeda3dModelImporter:
         else:
             self.canvas_origin_x = canvas_origin_x
             self.canvas_origin_y = canvas_origin_y
-        self.output = self.create_3d_model()
+
+    @cached_property
+    def output(self) -> Ee3dModel | None:
+        """Model metadata (and raw data if requested), resolved on first access."""
+        return self.create_3d_model()
 
     def create_3d_model(self) -> Ee3dModel | None:
         ee_data = (
@@ -698,18 +803,16 @@ class Easyeda3dModelImporter:
 
     def get_3d_model_info(self, ee_data: list[str]) -> dict[str, Any]:
         for line in ee_data:
-            ee_designator = line.split("~")[0]
-            if ee_designator == "SVGNODE":
-                split_data = line.split("~")[1:]
-                if split_data:
-                    raw_json = split_data[0]
-                    try:
-                        parsed_json: dict[str, Any] = json.loads(raw_json)
-                        # Return full node so parse_3d_model_info can access childNodes
-                        return parsed_json
-                    except json.JSONDecodeError as e:
-                        logging.error(f"Failed to parse 3D model JSON: {e}")
-                        return {}
+            # Prefix test instead of splitting every (possibly huge) shape line
+            if line.startswith("SVGNODE~"):
+                raw_json = line[len("SVGNODE~") :].partition("~")[0]
+                try:
+                    parsed_json: dict[str, Any] = json.loads(raw_json)
+                    # Return full node so parse_3d_model_info can access childNodes
+                    return parsed_json
+                except json.JSONDecodeError as e:
+                    logging.error(f"Failed to parse 3D model JSON: {e}")
+                    return {}
         return {}
 
     def _outline_centre_mm(self, node: dict[str, Any]) -> tuple[float, float] | None:
@@ -31,6 +31,8 @@ import logging
 import re
 from typing import Any
 
+from .svg_path_parser import parse_path
+
 logger = logging.getLogger(__name__)
 
 _PADDING = 1  # minimal margin so strokes at the bbox edge are not clipped (= max stroke-width / 2)
@@ -139,20 +141,12 @@ class _BBox:
 
 
 def _bbox_from_path(path_d: str, bbox: _BBox) -> None:
-    """Approximate bounding box from an SVG path by extracting consecutive numeric pairs.
+    """Approximate bounding box from the end and control points of an SVG path.
 
-    Inherently imprecise: arc commands (A) have 7 parameters per segment (rx, ry,
-    rotation, large-arc-flag, sweep-flag, x, y), H/V commands have only one
-    coordinate, and Bezier control points extend beyond the rendered curve.
-    Acceptable only for simple M/L paths; for arc-heavy paths the API BBox is
-    authoritative.
+    Bezier control points extend beyond the rendered curve and arcs only add
+    their end point; for arc-heavy paths the API BBox is authoritative.
     """
-    nums = re.findall(r"[-+]?\d*\.?\d+", path_d)
-    for i in range(0, len(nums) - 1, 2):
-        try:
-            bbox.add(float(nums[i]), float(nums[i + 1]))
-        except (ValueError, IndexError):
-            pass
+    bbox.add_pts(parse_path(path_d).points())
 
 
 def _seed_bbox_from_api(data_str: dict[str, Any], bbox: _BBox) -> None:
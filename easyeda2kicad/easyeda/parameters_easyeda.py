@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 # Global imports
-from dataclasses import dataclass, field
+import sys
+from dataclasses import dataclass, field, fields
 from enum import Enum
-from typing import Any, Optional, Union
+from typing import Any, Optional, TypeVar, Union
 
 # Local imports
 from .svg_path_parser import parse_svg_path
@@ -46,6 +47,39 @@ def _safe_bool(
         return default
 
 
+_T = TypeVar("_T")
+
+
+def _slotted(cls: type[_T]) -> type[_T]:
+    """Rebuild a dataclass with ``__slots__`` (``dataclass(slots=True)`` is 3.10+).
+
+    Parsed components are kept in memory by the thousand; dropping the
+    per-instance ``__dict__`` roughly halves the size of every shape object.
+    """
+    field_names = [f.name for f in fields(cls)]  # type: ignore[arg-type]
+    inherited = {
+        name for base in cls.__mro__[1:] for name in getattr(base, "__slots__", ())
+    }
+    cls_dict = dict(cls.__dict__)
+    cls_dict["__slots__"] = tuple(n for n in field_names if n not in inherited)
+    for name in field_names:
+        # Defaults live in the generated __init__ and the Field objects
+        cls_dict.pop(name, None)
+    cls_dict.pop("__dict__", None)
+    cls_dict.pop("__weakref__", None)
+    slotted_cls: type[_T] = type(cls.__name__, cls.__bases__, cls_dict)
+    slotted_cls.__qualname__ = cls.__qualname__
+    return slotted_cls
+
+
+def _intern_str(obj: Any, *names: str) -> None:
+    """Intern repeated string fields (colors, fonts, nets, ...) in place."""
+    for name in names:
+        value = getattr(obj, name)
+        if isinstance(value, str):
+            setattr(obj, name, sys.intern(value))
+
+
 class EasyedaPinType(Enum):
     unspecified = 0
     _input = 1
@@ -55,6 +89,7 @@ class EasyedaPinType(Enum):
 
 
 # ------------------------- Symbol -------------------------
+@_slotted
 @dataclass
 class EeSymbolBbox:
     x: float
@@ -71,6 +106,7 @@ class EeSymbolBbox:
 
 
 # ---------------- PIN ----------------
+@_slotted
 @dataclass
 class EeSymbolPinSettings:
     is_displayed: bool
@@ -101,6 +137,7 @@ class EeSymbolPinSettings:
             )
 
 
+@_slotted
 @dataclass
 class EeSymbolPinDot:
     dot_x: float
@@ -111,6 +148,7 @@ class EeSymbolPinDot:
         self.dot_y = _safe_float(self.dot_y)
 
 
+@_slotted
 @dataclass
 class EeSymbolPinPath:
     path: str
@@ -119,8 +157,10 @@ class EeSymbolPinPath:
     def __post_init__(self) -> None:
         if isinstance(self.path, str):
             self.path = self.path.replace("v", "h")
+        _intern_str(self, "color")
 
 
+@_slotted
 @dataclass
 class EeSymbolPinName:
     is_displayed: bool
@@ -142,8 +182,10 @@ class EeSymbolPinName:
             self.font_size = _safe_float(self.font_size.replace("pt", ""), 7.0)
         else:
             self.font_size = _safe_float(self.font_size, 7.0)
+        _intern_str(self, "text_anchor", "font")
 
 
+@_slotted
 @dataclass
 class EeSymbolPinDotBis:
     is_displayed: bool
@@ -156,6 +198,7 @@ class EeSymbolPinDotBis:
         self.is_displayed = _safe_bool(self.is_displayed, True)
 
 
+@_slotted
 @dataclass
 class EeSymbolPinClock:
     is_displayed: bool
@@ -165,6 +208,7 @@ class EeSymbolPinClock:
         self.is_displayed = _safe_bool(self.is_displayed, True)
 
 
+@_slotted
 @dataclass
 class EeSymbolPin:
     settings: EeSymbolPinSettings
@@ -176,6 +220,7 @@ class EeSymbolPin:
 
 
 # ---------------- RECTANGLE ----------------
+@_slotted
 @dataclass
 class EeSymbolRectangle:
     pos_x: float
@@ -200,6 +245,7 @@ class EeSymbolRectangle:
         self.width = _safe_float(self.width)
         self.height = _safe_float(self.height)
         self.is_locked = _safe_bool(self.is_locked)
+        _intern_str(self, "stroke_color", "stroke_width", "stroke_style", "fill_color")
         # Convert empty strings to None for all string fields
         for field_name in [
             "stroke_color",
@@ -214,6 +260,7 @@ class EeSymbolRectangle:
 
 
 # ---------------- CIRCLE ----------------
+@_slotted
 @dataclass
 class EeSymbolCircle:
     center_x: float
@@ -238,9 +285,11 @@ class EeSymbolCircle:
             )
         else:
             self.fill_color = _safe_bool(self.fill_color)
+        _intern_str(self, "stroke_color", "stroke_width", "stroke_style")
 
 
 # ---------------- ARC ----------------
+@_slotted
 @dataclass
 class EeSymbolArc:
     path: list[Any]
@@ -261,10 +310,12 @@ class EeSymbolArc:
             )
         else:
             self.fill_color = _safe_bool(self.fill_color)
+        _intern_str(self, "stroke_color", "stroke_width", "stroke_style")
         if isinstance(self.path, str):
             self.path = parse_svg_path(svg_path=self.path)
 
 
+@_slotted
 @dataclass
 class EeSymbolEllipse:
     center_x: float
@@ -291,9 +342,11 @@ class EeSymbolEllipse:
             )
         else:
             self.fill_color = _safe_bool(self.fill_color)
+        _intern_str(self, "stroke_color", "stroke_width", "stroke_style")
 
 
 # ---------------- POLYLINE ----------------
+@_slotted
 @dataclass
 class EeSymbolPolyline:
     points: str
@@ -313,14 +366,17 @@ class EeSymbolPolyline:
             )
         else:
             self.fill_color = _safe_bool(self.fill_color)
+        _intern_str(self, "stroke_color", "stroke_width", "stroke_style")
 
 
 # ---------------- POLYGON ----------------
+@_slotted
 @dataclass
 class EeSymbolPolygon(EeSymbolPolyline):
     pass
 
 
+@_slotted
 @dataclass
 class EeSymbolPath:
     paths: str
@@ -340,9 +396,11 @@ class EeSymbolPath:
             )
         else:
             self.fill_color = _safe_bool(self.fill_color)
+        _intern_str(self, "stroke_color", "stroke_width", "stroke_style")
 
 
 # ---------------- TEXT ----------------
+@_slotted
 @dataclass
 class EeSymbolText:
     text: str
@@ -359,6 +417,7 @@ class EeSymbolText:
 
 
 # ---------------- SYMBOL ----------------
+@_slotted
 @dataclass
 class EeSymbolInfo:
     name: str = ""
@@ -372,6 +431,7 @@ class EeSymbolInfo:
     description: str = ""
 
 
+@_slotted
 @dataclass
 class EeSymbol:
     info: EeSymbolInfo
@@ -397,22 +457,25 @@ def convert_to_mm(dim: float) -> float:
     return round(float(dim) * 10 * 0.0254, 6)
 
 
+@_slotted
 @dataclass
 class EeFootprintBbox:
     x: float
     y: float
+    # raw EE units, set in __post_init__
+    x_px: float = field(init=False, repr=False, compare=False)
+    y_px: float = field(init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         x_raw = _safe_float(self.x)
         y_raw = _safe_float(self.y)
-        self.x_px: float = (
-            x_raw  # raw EE units — needed for SOLIDREGION path subtraction
-        )
-        self.y_px: float = y_raw
+        self.x_px = x_raw  # raw EE units — needed for SOLIDREGION path subtraction
+        self.y_px = y_raw
         self.x = convert_to_mm(x_raw)
         self.y = convert_to_mm(y_raw)
 
 
+@_slotted
 @dataclass
 class EeFootprintPad:
     shape: str
@@ -443,8 +506,10 @@ class EeFootprintPad:
         self.layer_id = _safe_int(self.layer_id)
         self.is_locked = _safe_bool(self.is_locked)
         self.is_plated = _safe_bool(self.is_plated, True)
+        _intern_str(self, "shape", "net")
 
 
+@_slotted
 @dataclass
 class EeFootprintTrack:
     stroke_width: float
@@ -458,8 +523,10 @@ class EeFootprintTrack:
         self.stroke_width = convert_to_mm(_safe_float(self.stroke_width))
         self.layer_id = _safe_int(self.layer_id)
         self.is_locked = _safe_bool(self.is_locked)
+        _intern_str(self, "net")
 
 
+@_slotted
 @dataclass
 class EeFootprintHole:
     center_x: float
@@ -475,6 +542,7 @@ class EeFootprintHole:
         self.is_locked = _safe_bool(self.is_locked)
 
 
+@_slotted
 @dataclass
 class EeFootprintVia:
     center_x: float
@@ -491,8 +559,10 @@ class EeFootprintVia:
         self.diameter = convert_to_mm(_safe_float(self.diameter))
         self.radius = convert_to_mm(_safe_float(self.radius))
         self.is_locked = _safe_bool(self.is_locked)
+        _intern_str(self, "net")
 
 
+@_slotted
 @dataclass
 class EeFootprintCircle:
     cx: float
@@ -512,6 +582,7 @@ class EeFootprintCircle:
         self.is_locked = _safe_bool(self.is_locked)
 
 
+@_slotted
 @dataclass
 class EeFootprintRectangle:
     x: float
@@ -533,6 +604,7 @@ class EeFootprintRectangle:
         self.is_locked = _safe_bool(self.is_locked)
 
 
+@_slotted
 @dataclass
 class EeFootprintArc:
     stroke_width: float
@@ -547,8 +619,10 @@ class EeFootprintArc:
         self.stroke_width = convert_to_mm(_safe_float(self.stroke_width))
         self.layer_id = _safe_int(self.layer_id)
         self.is_locked = _safe_bool(self.is_locked)
+        _intern_str(self, "net")
 
 
+@_slotted
 @dataclass
 class EeFootprintSolidRegion:
     layer_id: int
@@ -557,8 +631,10 @@ class EeFootprintSolidRegion:
 
     def __post_init__(self) -> None:
         self.layer_id = _safe_int(self.layer_id, 3)
+        _intern_str(self, "region_type")
 
 
+@_slotted
 @dataclass
 class EeFootprintText:
     type: str
@@ -585,11 +661,13 @@ class EeFootprintText:
         self.layer_id = _safe_int(self.layer_id)
         self.is_displayed = _safe_bool(self.is_displayed, True)
         self.is_locked = _safe_bool(self.is_locked)
+        _intern_str(self, "type", "mirror", "net")
 
 
 # ---------------- FOOTPRINT ----------------
 
 
+@_slotted
 @dataclass
 class EeFootprintInfo:
     name: str
@@ -602,6 +680,7 @@ class EeFootprintInfo:
 
 
 # ------------------------- 3D MODEL -------------------------
+@_slotted
 @dataclass
 class Ee3dModelBase:
     x: float = 0.0
@@ -615,6 +694,7 @@ class Ee3dModelBase:
         self.z = _safe_float(self.z)
 
 
+@_slotted
 @dataclass
 class Ee3dModel:
     name: str
@@ -625,6 +705,7 @@ class Ee3dModel:
     step: Optional[bytes] = None
 
 
+@_slotted
 @dataclass
 class EeFootprint:
     info: EeFootprintInfo
@@ -3,22 +3,24 @@ from __future__ import annotations
 # Global imports
 import logging
 import re
-from dataclasses import dataclass, fields
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import NamedTuple, Union
 
 
-@dataclass
+@dataclass(frozen=True)
 class SvgPathMoveTo:
     start_x: float
     start_y: float
 
 
-@dataclass
+@dataclass(frozen=True)
 class SvgPathLineTo:
     pos_x: float
     pos_y: float
 
 
-@dataclass
+@dataclass(frozen=True)
 class SvgPathEllipticalArc:
     radius_x: float
     radius_y: float
@@ -31,15 +33,19 @@ class SvgPathEllipticalArc:
     def __post_init__(self) -> None:
         # SVG arc flags arrive as raw strings '0'/'1' from the parser.
         # bool('0') == True, so explicit int conversion is required.
-        self.flag_large_arc = bool(int(self.flag_large_arc))
-        self.flag_sweep = bool(int(self.flag_sweep))
+        object.__setattr__(self, "flag_large_arc", bool(int(self.flag_large_arc)))
+        object.__setattr__(self, "flag_sweep", bool(int(self.flag_sweep)))
 
 
-@dataclass
+@dataclass(frozen=True)
 class SvgPathClosePath:
     pass
 
 
+SvgPathCommand = Union[
+    SvgPathMoveTo, SvgPathEllipticalArc, SvgPathLineTo, SvgPathClosePath
+]
+
 svg_path_handlers = {
     "M": (SvgPathMoveTo, 2),
     "A": (SvgPathEllipticalArc, 7),
@@ -47,46 +53,145 @@ svg_path_handlers = {
     "Z": (SvgPathClosePath, 0),
 }
 
-
-def parse_svg_path(
-    svg_path: str,
-) -> list[SvgPathMoveTo | SvgPathEllipticalArc | SvgPathLineTo | SvgPathClosePath]:
-    if not svg_path.endswith(" "):
-        svg_path += " "
-    svg_path = svg_path.replace(",", " ")
-
-    path_splited = re.findall(r"([a-zA-Z])([ ,\-\+.\d]+)", svg_path)
-
-    parsed_path = []
-    for path_command in path_splited:
-        if cmd_class_info := svg_path_handlers.get(path_command[0]):
-            cmd_class, cmd_nb_arguments = cmd_class_info
-            arguments = path_command[1].strip().split()
-            # if multiple (x y) in a command
-            # Create instances using dataclass fields
-
-            field_names = [f.name for f in fields(cmd_class)]
-            # Safe argument extraction with bounds checking
-            for i in range(0, len(arguments), cmd_nb_arguments or 1):
-                arg_slice = arguments[i : i + cmd_nb_arguments]
-                if len(arg_slice) >= cmd_nb_arguments:
-                    try:
-                        parsed_path.append(
-                            cmd_class(**dict(zip(field_names, arg_slice)))
-                        )
-                    except (ValueError, TypeError) as e:
-                        logging.warning(
-                            f"Failed to create SVG path element {cmd_class.__name__}: {e}"
-                        )
-                else:
-                    logging.warning(
-                        f"Insufficient arguments for SVG command {cmd_class.__name__}, expected {cmd_nb_arguments}, got {len(arg_slice)}"
-                    )
-                    break
+# Distinct path strings kept parsed; pins and arcs of big symbols repeat a few
+SVG_PATH_CACHE_SIZE = 4096
+
+# Number of arguments of each path command
+_PATH_ARGUMENTS = {"M": 2, "L": 2, "H": 1, "V": 1, "C": 6, "Q": 4, "A": 7, "Z": 0}
+
+# A command letter or a number, separators are skipped
+_PATH_TOKEN_REGEX = re.compile(
+    r"([A-Za-z])|([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)"
+)
+
+
+class SvgSegment(NamedTuple):
+    # M, L, C, Q, A or Z; H and V become L
+    command: str
+    # the arguments of the command in absolute coordinates, end point last
+    args: tuple[float, ...]
+
+
+@dataclass(frozen=True)
+class SvgPath:
+    """A tokenized SVG path, shared by everything that reads the same string."""
+
+    segments: tuple[SvgSegment, ...]
+    # letters of the commands that were unsupported or lacked arguments
+    skipped: tuple[str, ...] = ()
+
+    def points(self) -> list[tuple[float, float]]:
+        """End and control points of all segments; arcs only give their end point."""
+        points: list[tuple[float, float]] = []
+        for command, args in self.segments:
+            if command == "A":
+                points.append((args[5], args[6]))
+            else:
+                points.extend(zip(args[0::2], args[1::2]))
+        return points
+
+
+@lru_cache(maxsize=SVG_PATH_CACHE_SIZE)
+def parse_path(svg_path: str) -> SvgPath:
+    """Parse an SVG path (M, L, H, V, C, Q, A and Z, absolute and relative).
+
+    Implicit repetitions of a command are split into single segments and
+    coordinates after an ``M`` are lines, as in the SVG specification.
+    """
+    segments: list[SvgSegment] = []
+    skipped: list[str] = []
+    x = y = start_x = start_y = 0.0
+    for letter, numbers in _split_commands(svg_path):
+        command = letter.upper()
+        count = _PATH_ARGUMENTS.get(command)
+        if count is None:
+            skipped.append(letter)
+            continue
+        if count == 0:
+            segments.append(SvgSegment("Z", ()))
+            x, y = start_x, start_y
+            continue
+        if len(numbers) < count or len(numbers) % count:
+            skipped.append(letter)
+        relative = letter != command
+        for i in range(0, len(numbers) - count + 1, count):
+            args = numbers[i : i + count]
+            if command == "H":
+                x = x + args[0] if relative else args[0]
+                segments.append(SvgSegment("L", (x, y)))
+                continue
+            if command == "V":
+                y = y + args[0] if relative else args[0]
+                segments.append(SvgSegment("L", (x, y)))
+                continue
+            if command == "A":
+                if relative:
+                    args = (*args[:5], x + args[5], y + args[6])
+            elif relative:
+                args = tuple(
+                    value + (y if k % 2 else x) for k, value in enumerate(args)
+                )
+            x, y = args[-2], args[-1]
+            if command == "M" and i == 0:
+                start_x, start_y = x, y
+                segments.append(SvgSegment("M", args))
+            else:
+                segments.append(SvgSegment("L" if command == "M" else command, args))
+    return SvgPath(tuple(segments), tuple(skipped))
+
+
+def _split_commands(svg_path: str) -> list[tuple[str, tuple[float, ...]]]:
+    """Command letters with the numbers that follow them."""
+    commands: list[tuple[str, tuple[float, ...]]] = []
+    letter = ""
+    numbers: list[float] = []
+    for command, number in _PATH_TOKEN_REGEX.findall(svg_path):
+        if command:
+            if letter:
+                commands.append((letter, tuple(numbers)))
+            letter, numbers = command, []
+        elif letter:
+            numbers.append(float(number))
+    if letter:
+        commands.append((letter, tuple(numbers)))
+    return commands
+
+
+def parse_svg_path(svg_path: str) -> list[SvgPathCommand]:
+    """Parse an SVG path into its commands.
+
+    Identical path strings are parsed only once; the (frozen) commands are
+    shared between the returned lists.
+    """
+    return list(_parse_svg_path_cached(svg_path))
+
+
+@lru_cache(maxsize=SVG_PATH_CACHE_SIZE)
+def _parse_svg_path_cached(svg_path: str) -> tuple[SvgPathCommand, ...]:
+    return _path_commands(parse_path(svg_path))
+
+
+def _path_commands(path: SvgPath) -> tuple[SvgPathCommand, ...]:
+    for letter in path.skipped:
+        if letter.upper() in _PATH_ARGUMENTS:
+            logging.warning(f"Insufficient arguments for SVG command {letter}")
         else:
             logging.warning("SVG command path not supported")
 
-    return parsed_path
+    parsed_path: list[SvgPathCommand] = []
+    for command, args in path.segments:
+        handler = svg_path_handlers.get(command)
+        if handler is None:
+            logging.warning(f"SVG command {command} not supported")
+            continue
+        cmd_class = handler[0]
+        try:
+            parsed_path.append(cmd_class(*args))
+        except (ValueError, TypeError, OverflowError) as e:
+            logging.warning(
+                f"Failed to create SVG path element {cmd_class.__name__}: {e}"
+            )
+    return tuple(parsed_path)
 
 
 if __name__ == "__main__":
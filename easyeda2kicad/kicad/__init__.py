@@ -5,7 +5,7 @@ KiCad module - Handle KiCad format export and data structures
 # Local imports
 from .export_kicad_3d_model import Exporter3dModelKicad
 from .export_kicad_footprint import ExporterFootprintKicad
-from .export_kicad_symbol import ExporterSymbolKicad, integrate_sub_units
+from .export_kicad_symbol import ExporterSymbolKicad
 from .parameters_kicad_footprint import (
     Ki3dModel,
     KiFootprint,
@@ -25,7 +25,6 @@ from .parameters_kicad_symbol import (
 __all__ = [
     # Exporters
     "ExporterSymbolKicad",
-    "integrate_sub_units",
     "ExporterFootprintKicad",
     "Exporter3dModelKicad",
     # Symbol parameters
@@ -6,12 +6,19 @@ from __future__ import annotations
 
 # Global imports
 import logging
-import re
-import textwrap
+from array import array
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from itertools import islice
+from math import copysign
+from mmap import mmap
 from pathlib import Path
+from typing import Union
 
 # Local imports
+from ..easyeda.blob_store import BlobStore
 from ..easyeda.parameters_easyeda import Ee3dModel
+from .output_files import WriteStats, encode_text, has_content, write_if_changed
 from .parameters_kicad_footprint import Ki3dModel, Ki3dModelBase
 
 VRML_HEADER = """#VRML V2.0 utf8
@@ -19,34 +26,210 @@ VRML_HEADER = """#VRML V2.0 utf8
 """
 
 
-def get_materials(obj_data: str) -> dict[str, dict[str, str | list[str]]]:
-    material_regex = "newmtl .*?endmtl"
-    matchs = re.findall(pattern=material_regex, string=obj_data, flags=re.DOTALL)
-
-    materials = {}
-    for match in matchs:
-        material = {}
-        material_id = None
-        for value in match.splitlines():
-            if value.startswith("newmtl"):
-                material_id = value.split()[1]
-            elif value.startswith("Ka"):
-                material["ambient_color"] = value.split()[1:]
-            elif value.startswith("Kd"):
-                material["diffuse_color"] = value.split()[1:]
-            elif value.startswith("Ks"):
-                material["specular_color"] = value.split()[1:]
-            elif value.startswith("d "):
-                # EasyEDA uses d as transparency directly (0.0 = opaque, 1.0 = transparent),
-                # which matches VRML transparency semantics — use value as-is.
-                try:
-                    material["transparency"] = str(round(float(value.split()[1]), 4))
-                except (ValueError, IndexError):
-                    material["transparency"] = "0"
+# Line sources accepted by parse_obj, besides whole texts / buffers
+ObjLines = Union[Iterable[str], Iterable[bytes]]
+
+# Text parsed at once: characters of a text or buffer, lines of a file
+_CHUNK_SIZE = 1 << 20
+_CHUNK_LINES = 1 << 14
+
+# VRML shape of one material, as generated before by textwrap.dedent
+_WRL_SHAPE = """
+Shape{{
+    appearance Appearance {{
+        material  Material \t{{
+            diffuseColor {diffuse}
+            specularColor {specular}
+            ambientIntensity {ambient_intensity}
+            transparency {transparency}
+            shininess 0.5
+        }}
+    }}
+    geometry IndexedFaceSet {{
+        ccw TRUE
+        solid FALSE
+        coord DEF co Coordinate {{
+            point [
+{points}
+            ]
+        }}
+        coordIndex [
+{coord_index}
+        ]
+    }}
+}}"""
+
+
+@dataclass
+class ObjShape:
+    """Faces of one ``usemtl`` section of an OBJ file."""
+
+    # material name with the spaces removed
+    material: str
+    # OBJ vertex index (1-based) of every face corner, ``face_ends[i]`` is
+    # the end of face i in it
+    corners: array[int] = field(default_factory=lambda: array("q"))
+    face_ends: array[int] = field(default_factory=lambda: array("q"))
+
+
+@dataclass
+class ObjModel:
+    """Vertices, materials and faces of an OBJ file."""
+
+    xs: array[float] = field(default_factory=lambda: array("d"))
+    ys: array[float] = field(default_factory=lambda: array("d"))
+    zs: array[float] = field(default_factory=lambda: array("d"))
+    materials: dict[str, dict[str, str | list[str]]] = field(default_factory=dict)
+    shapes: list[ObjShape] = field(default_factory=list)
+
+    def bbox(
+        self,
+    ) -> tuple[tuple[float, float], tuple[float, float], tuple[float, float]] | None:
+        """((x_min, x_max), (y_min, y_max), (z_min, z_max)), None without vertices."""
+        if not self.xs:
+            return None
+        return (
+            (min(self.xs), max(self.xs)),
+            (min(self.ys), max(self.ys)),
+            (min(self.zs), max(self.zs)),
+        )
 
+
+def _material(lines: list[str]) -> tuple[str | None, dict[str, str | list[str]]]:
+    """Name and colors of a ``newmtl ... endmtl`` block."""
+    material: dict[str, str | list[str]] = {}
+    material_id = None
+    for value in lines:
+        if value.startswith("newmtl"):
+            material_id = value.split()[1]
+        elif value.startswith("Ka"):
+            material["ambient_color"] = value.split()[1:]
+        elif value.startswith("Kd"):
+            material["diffuse_color"] = value.split()[1:]
+        elif value.startswith("Ks"):
+            material["specular_color"] = value.split()[1:]
+        elif value.startswith("d "):
+            # EasyEDA uses d as transparency directly (0.0 = opaque, 1.0 = transparent),
+            # which matches VRML transparency semantics — use value as-is.
+            try:
+                material["transparency"] = str(round(float(value.split()[1]), 4))
+            except (ValueError, IndexError):
+                material["transparency"] = "0"
+    return material_id, material
+
+
+def _iter_line_chunks(
+    source: str | bytes | bytearray | mmap | ObjLines,
+) -> Iterator[list[str]]:
+    """Lines of *source* in chunks of about ``_CHUNK_SIZE`` characters.
+
+    Lines may keep a trailing ``\\r`` (``\\r\\n`` for file objects).
+    """
+    if isinstance(source, str):
+        start, size = 0, len(source)
+        while start < size:
+            end = source.find("\n", min(start + _CHUNK_SIZE, size))
+            end = size if end < 0 else end
+            yield source[start:end].split("\n")
+            start = end + 1
+    elif isinstance(source, (bytes, bytearray, mmap)):
+        start, size = 0, len(source)
+        while start < size:
+            end = source.find(b"\n", min(start + _CHUNK_SIZE, size))
+            end = size if end < 0 else end
+            yield source[start:end].decode("utf-8").split("\n")
+            start = end + 1
+    else:
+        lines: Iterator[str | bytes] = iter(source)
+        while chunk := list(islice(lines, _CHUNK_LINES)):
+            yield [
+                line.decode("utf-8") if isinstance(line, bytes) else line
+                for line in chunk
+            ]
+
+
+def parse_obj(source: str | bytes | bytearray | mmap | ObjLines) -> ObjModel:
+    """Read an OBJ model in one pass over its lines.
+
+    *source* is the OBJ text, its bytes (or an mmap of the file) or an open
+    file, read in chunks. Vertices are kept as arrays of floats, the faces
+    of each ``usemtl`` section as arrays of vertex indices.
+    """
+    model = ObjModel()
+    add_x, add_y, add_z = model.xs.append, model.ys.append, model.zs.append
+    shape: ObjShape | None = None
+    # lines of the material block being read
+    block: list[str] | None = None
+
+    for lines in _iter_line_chunks(source):
+        for line in lines:
+            parts = line.split()
+            if not parts:
+                continue
+            plain = block is None and "mtl" not in line
+            if parts[0] == "v" and len(parts) >= 4:
+                add_x(float(parts[1]))
+                add_y(float(parts[2]))
+                add_z(float(parts[3]))
+                if plain:
+                    continue
+            elif plain:
+                if shape is not None and parts[0] == "f":
+                    _read_face(shape, parts)
+                continue
+
+            # material blocks and sections, also inside other lines
+            line = line.rstrip("\r\n")
+            if block is not None or "newmtl " in line:
+                block = _read_material_line(model, line, block)
+            if "usemtl" in line:
+                # a new section starts right after every "usemtl"
+                head, *sections = line.split("usemtl")
+                if shape is not None:
+                    _read_face(shape, head.split())
+                for section in sections:
+                    shape = ObjShape(section.replace(" ", ""))
+                    model.shapes.append(shape)
+            elif shape is not None and parts[0] == "f":
+                _read_face(shape, parts)
+
+    return model
+
+
+def _read_material_line(
+    model: ObjModel, line: str, block: list[str] | None
+) -> list[str] | None:
+    """Add *line* to the material *block*, returns the block still open."""
+    skip = 0
+    if block is None:
+        line = line[line.find("newmtl ") :]
+        block, skip = [], len("newmtl ")
+    while True:
+        end = line.find("endmtl", skip)
+        if end < 0:
+            block.append(line)
+            return block
+        end += len("endmtl")
+        block.append(line[:end])
+        material_id, material = _material(block)
         if material_id is not None:
-            materials[material_id] = material
-    return materials
+            model.materials[material_id] = material
+        line = line[end:]
+        start = line.find("newmtl ")
+        if start < 0:
+            return None
+        line = line[start:]
+        block, skip = [], len("newmtl ")
+
+
+def _read_face(shape: ObjShape, parts: list[str]) -> None:
+    if parts and parts[0] == "f":
+        shape.corners.extend([int(tok.partition("/")[0]) for tok in parts[1:]])
+        shape.face_ends.append(len(shape.corners))
+
+
+def get_materials(obj_data: str) -> dict[str, dict[str, str | list[str]]]:
+    return parse_obj(obj_data).materials
 
 
 def get_vertices(
@@ -55,44 +238,80 @@ def get_vertices(
     offset_y: float = 0.0,
     offset_z: float = 0.0,
 ) -> list[str]:
-    result = []
-    for line in obj_data.splitlines():
-        parts = line.split()
-        if len(parts) < 4 or parts[0] != "v":
-            continue
-        x, y, z = float(parts[1]), float(parts[2]), float(parts[3])
-        result.append(
-            " ".join(
-                [
-                    str(round((x + offset_x) / 2.54, 4)),
-                    str(round((y + offset_y) / 2.54, 4)),
-                    str(round((z + offset_z) / 2.54, 4)),
-                ]
-            )
-        )
-    return result
-
-
-def _get_obj_bbox(
-    raw_obj: str,
-) -> tuple[tuple[float, float], tuple[float, float], tuple[float, float]] | None:
-    """Returns ((x_min, x_max), (y_min, y_max), (z_min, z_max)) or None if no vertices."""
-    x_vals, y_vals, z_vals = [], [], []
-    for line in raw_obj.splitlines():
-        parts = line.split()
-        if len(parts) < 4 or parts[0] != "v":
-            continue
-        x_vals.append(float(parts[1]))
-        y_vals.append(float(parts[2]))
-        z_vals.append(float(parts[3]))
+    model = parse_obj(obj_data)
+    return _format_vertices(
+        model, list(range(len(model.xs))), (offset_x, offset_y, offset_z)
+    )
 
-    if not x_vals:
-        return None
 
-    return (
-        (min(x_vals), max(x_vals)),
-        (min(y_vals), max(y_vals)),
-        (min(z_vals), max(z_vals)),
+def _format_vertices(
+    model: ObjModel, indices: list[int], offset: tuple[float, float, float]
+) -> list[str]:
+    """Vertices at *indices* in VRML units (0.1 inch), moved by *offset* in mm."""
+    xs, ys, zs = (
+        _coordinates(values, indices, axis_offset)
+        for values, axis_offset in zip((model.xs, model.ys, model.zs), offset)
+    )
+    return [f"{x} {y} {z}" for x, y, z in zip(xs, ys, zs)]
+
+
+def _coordinates(values: array[float], indices: list[int], offset: float) -> list[str]:
+    """One coordinate of the vertices at *indices*, see ``_format_vertices``.
+
+    Models repeat coordinates a lot, each distinct value is formatted once.
+    """
+    column = [values[i] for i in indices]
+    distinct = set(column)
+    if (offset == 0 and copysign(1.0, offset) < 0) or any(v != v for v in distinct):
+        # a dict does not tell -0.0 from 0.0 apart and never finds a NaN
+        return [str(round((v + offset) / 2.54, 4)) for v in column]
+    names = {v: str(round((v + offset) / 2.54, 4)) for v in distinct}
+    return [names[v] for v in column]
+
+
+def _shape_wrl(
+    shape: ObjShape,
+    material: dict[str, str | list[str]],
+    model: ObjModel,
+    offset: tuple[float, float, float],
+) -> str:
+    # the vertices of the shape are numbered in order of first use, the
+    # value is computed before setdefault inserts a new index
+    link_dict: dict[int, int] = {}
+    setdefault = link_dict.setdefault
+    local = array("q", [setdefault(i, len(link_dict)) for i in shape.corners])
+    # OBJ indices are 1-based (negative ones are taken as they come)
+    points = _format_vertices(model, [i - 1 for i in link_dict], offset)
+    # local indices with the end of face marker -1 (the last name)
+    names = [str(i) for i in range(len(points))] + ["-1"]
+    coord_index = array("q")
+    start = 0
+    for end in shape.face_ends:
+        coord_index += local[start:end]
+        coord_index.append(-1)
+        start = end
+
+    # ambientIntensity: VRML expects a scalar (0-1), not an RGB triplet.
+    # Compute luminance from Ka using Rec.601 weights.
+    try:
+        ka = material.get("ambient_color", ["0.2", "0.2", "0.2"])
+        ambient_intensity = round(
+            0.299 * float(ka[0]) + 0.587 * float(ka[1]) + 0.114 * float(ka[2]), 4
+        )
+    except (ValueError, IndexError):
+        ambient_intensity = 0.2
+
+    return _WRL_SHAPE.format(
+        diffuse=" ".join(material["diffuse_color"]),
+        specular=" ".join(material["specular_color"]),
+        ambient_intensity=ambient_intensity,
+        transparency=material.get("transparency", "0"),
+        points=" " * 16 + ", ".join(points) if points else "",
+        coord_index=(
+            " " * 12 + ",".join([names[i] for i in coord_index]) + ","
+            if coord_index
+            else ""
+        ),
     )
 
 
@@ -105,14 +324,15 @@ def generate_wrl_model(model_3d: Ee3dModel) -> Ki3dModel:
             raw_wrl=None,
         )
 
-    materials = get_materials(obj_data=model_3d.raw_obj)
+    model = parse_obj(model_3d.raw_obj)
 
     # Step 1: Center XY on (0,0); shift Z so bottom sits at z=0 (always).
     # Step 2: Apply EE metadata offset (c_origin - canvas_origin) in mm.
     # translate(-bbox_cx, -bbox_cy, -z_min) then apply EE offset,
     # applied unconditionally for both SMD and THT.
     offset_x, offset_y, offset_z = 0.0, 0.0, 0.0
-    bbox = _get_obj_bbox(model_3d.raw_obj)
+    bbox = model.bbox()
+    _log_obj_bbox(bbox)
     if bbox:
         (x_min, x_max), (y_min, y_max), (z_min, _) = bbox
         offset_x = -(x_min + x_max) / 2.0
@@ -126,16 +346,7 @@ def generate_wrl_model(model_3d: Ee3dModel) -> Ki3dModel:
         f"3D centering offset: X={offset_x:.2f} Y={offset_y:.2f} Z={offset_z:.2f}"
     )
 
-    vertices = get_vertices(
-        obj_data=model_3d.raw_obj,
-        offset_x=offset_x,
-        offset_y=offset_y,
-        offset_z=offset_z,
-    )
-
-    raw_wrl = VRML_HEADER
-    shapes = model_3d.raw_obj.split("usemtl")[1:]
-    if not shapes:
+    if not model.shapes:
         logging.warning(
             f"3D model '{model_3d.name}': OBJ has no 'usemtl' sections; no geometry exported"
         )
@@ -145,86 +356,28 @@ def generate_wrl_model(model_3d: Ee3dModel) -> Ki3dModel:
             name=model_3d.name,
             raw_wrl=None,
         )
-    for shape in shapes:
-        lines = shape.splitlines()
-        material_name = lines[0].replace(" ", "")
-        material = materials.get(material_name)
+    parts = [VRML_HEADER]
+    for shape in model.shapes:
+        material = model.materials.get(shape.material)
         if material is None:
             logging.warning(
-                f"3D model material '{material_name}' not found, skipping shape"
+                f"3D model material '{shape.material}' not found, skipping shape"
             )
             continue
-        index_counter = 0
-        link_dict = {}
-        coord_index = []
-        points = []
-        for line in lines[1:]:
-            if line.strip() and line.split()[0] == "f":
-                face = [int(tok.split("/")[0]) for tok in line.split()[1:]]
-                face_index = []
-                for index in face:
-                    if index not in link_dict:
-                        link_dict[index] = index_counter
-                        face_index.append(str(index_counter))
-                        points.append(vertices[index - 1])
-                        index_counter += 1
-                    else:
-                        face_index.append(str(link_dict[index]))
-                face_index.append("-1")
-                coord_index.append(",".join(face_index) + ",")
-
-        # ambientIntensity: VRML expects a scalar (0-1), not an RGB triplet.
-        # Compute luminance from Ka using Rec.601 weights.
-        try:
-            ka = material.get("ambient_color", ["0.2", "0.2", "0.2"])
-            ambient_intensity = round(
-                0.299 * float(ka[0]) + 0.587 * float(ka[1]) + 0.114 * float(ka[2]), 4
-            )
-        except (ValueError, IndexError):
-            ambient_intensity = 0.2
-
-        transparency = material.get("transparency", "0")
-
-        shape_str = textwrap.dedent(
-            f"""
-            Shape{{
-                appearance Appearance {{
-                    material  Material 	{{
-                        diffuseColor {" ".join(material["diffuse_color"])}
-                        specularColor {" ".join(material["specular_color"])}
-                        ambientIntensity {ambient_intensity}
-                        transparency {transparency}
-                        shininess 0.5
-                    }}
-                }}
-                geometry IndexedFaceSet {{
-                    ccw TRUE
-                    solid FALSE
-                    coord DEF co Coordinate {{
-                        point [
-                            {(", ").join(points)}
-                        ]
-                    }}
-                    coordIndex [
-                        {"".join(coord_index)}
-                    ]
-                }}
-            }}"""
-        )
-
-        raw_wrl += shape_str
+        parts.append(_shape_wrl(shape, material, model, (offset_x, offset_y, offset_z)))
 
     return Ki3dModel(
         translation=Ki3dModelBase(),
         rotation=Ki3dModelBase(),
         name=model_3d.name,
-        raw_wrl=raw_wrl,
+        raw_wrl="".join(parts),
     )
 
 
-def _log_obj_bbox(raw_obj: str) -> None:
+def _log_obj_bbox(
+    bbox: tuple[tuple[float, float], tuple[float, float], tuple[float, float]] | None,
+) -> None:
     """Log the OBJ vertex bounding box at DEBUG level."""
-    bbox = _get_obj_bbox(raw_obj)
     if not bbox:
         logging.debug("3D OBJ: no vertices found")
         return
@@ -238,11 +391,19 @@ def _log_obj_bbox(raw_obj: str) -> None:
     )
 
 
+def _link_if_changed(
+    blob_store: BlobStore, data: bytes, path: Path, stats: WriteStats | None
+) -> None:
+    unchanged = has_content(path, data)
+    if not unchanged:
+        blob_store.write(data, path)
+    if stats is not None:
+        stats.record(not unchanged)
+
+
 class Exporter3dModelKicad:
     def __init__(self, model_3d: Ee3dModel | None):
         self.input = model_3d
-        if model_3d and model_3d.raw_obj:
-            _log_obj_bbox(model_3d.raw_obj)
         self.output = (
             generate_wrl_model(model_3d=model_3d)
             if model_3d and model_3d.raw_obj
@@ -250,10 +411,20 @@ class Exporter3dModelKicad:
         )
         self.output_step = model_3d.step if model_3d else None
 
-    def export(self, output_dir: str, overwrite: bool = True) -> bool:
+    def export(
+        self,
+        output_dir: str,
+        overwrite: bool = True,
+        blob_store: BlobStore | None = None,
+        stats: WriteStats | None = None,
+    ) -> bool:
         """Write WRL and STEP files into *output_dir* (the .3dshapes folder).
 
         EasyEDA always provides both OBJ (→WRL) and STEP for the same UUID.
+        With a *blob_store* the files are cloned (or copied) from the store
+        instead of being rewritten for every output library. Files that
+        already hold the same content are not touched, they are counted in
+        *stats*.
         Returns False if files already exist and overwrite is False, True otherwise.
         """
         if not self.output:
@@ -271,7 +442,12 @@ class Exporter3dModelKicad:
         output_path.mkdir(parents=True, exist_ok=True)
 
         if self.output.raw_wrl:
-            wrl_path.write_text(self.output.raw_wrl, encoding="utf-8")
+            if blob_store:
+                _link_if_changed(
+                    blob_store, self.output.raw_wrl.encode("utf-8"), wrl_path, stats
+                )
+            else:
+                write_if_changed(wrl_path, encode_text(self.output.raw_wrl), stats)
 
         if self.output_step:
             # TODO: STEP is copied as-is without offset baking (unlike WRL).
@@ -279,6 +455,9 @@ class Exporter3dModelKicad:
             # model_3d.translation != (0,0,0) (i.e. c_origin != canvas_origin).
             # Fix options: (a) write translation into .kicad_mod and remove WRL baking
             # to avoid double-offset; (b) transform STEP geometry (needs opencascade).
-            step_path.write_bytes(self.output_step)
+            if blob_store:
+                _link_if_changed(blob_store, self.output_step, step_path, stats)
+            else:
+                write_if_changed(step_path, self.output_step, stats)
 
         return True
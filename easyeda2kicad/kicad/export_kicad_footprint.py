@@ -1,33 +1,33 @@
 from __future__ import annotations
 
 # Global imports
+import hashlib
 import logging
+import os
 import re
-from math import acos, cos, isnan, pi, sin, sqrt
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from math import cos, isnan, pi, sin
 from pathlib import Path
 
 # Local imports
 from ..easyeda.parameters_easyeda import EeFootprint, EeFootprintSolidRegion
+from ..easyeda.svg_path_parser import parse_path
+from . import geometry_kernel as gk
+from .footprint_columns import PadColumns, TrackColumns, point_columns
+from .output_files import (
+    WriteStats,
+    encode_text,
+    fsync_directory,
+    has_content,
+    write_atomic,
+    write_if_changed,
+)
 from .parameters_kicad_footprint import (
-    KI_ARC,
-    KI_CIRCLE,
-    KI_END_FILE,
-    KI_FAB_REF,
-    KI_FP_POLY,
-    KI_FP_TYPE,
-    KI_HOLE,
     KI_LAYERS,
-    KI_LINE,
-    KI_MODEL_3D,
-    KI_MODULE_INFO,
-    KI_PACKAGE_VALUE,
-    KI_PAD,
     KI_PAD_LAYER,
     KI_PAD_LAYER_THT,
     KI_PAD_SHAPE,
-    KI_REFERENCE,
-    KI_TEXT,
-    KI_VIA,
     Ki3dModel,
     Ki3dModelBase,
     KiFootprint,
@@ -41,6 +41,8 @@ from .parameters_kicad_footprint import (
     KiFootprintText,
     KiFootprintTrack,
     KiFootprintVia,
+    Write,
+    custom_pad_primitives,
 )
 
 # ---------------------------------------
@@ -54,10 +56,6 @@ def to_degrees(n: float) -> float:
     return (n / pi) * 180.0
 
 
-# Elliptical arc implementation based on the SVG specification notes
-# https://www.w3.org/TR/SVG11/implnote.html#ArcConversionEndpointToCenter
-
-
 def compute_arc(
     start_x: float,
     start_y: float,
@@ -69,76 +67,18 @@ def compute_arc(
     end_x: float,
     end_y: float,
 ) -> tuple[float, float, float]:
-    # Compute the half distance between the current and the final point
-    dx2 = (start_x - end_x) / 2.0
-    dy2 = (start_y - end_y) / 2.0
-
-    # Convert angle from degrees to radians
-    angle = to_radians(angle % 360.0)
-    cos_angle = cos(angle)
-    sin_angle = sin(angle)
-
-    # Step 1 : Compute (x1, y1)
-    x1 = cos_angle * dx2 + sin_angle * dy2
-    y1 = -sin_angle * dx2 + cos_angle * dy2
-
-    # Ensure radii are large enough
-    radius_x = abs(radius_x)
-    radius_y = abs(radius_y)
-    rx_sq = radius_x * radius_x
-    ry_sq = radius_y * radius_y
-    x1_sq = x1 * x1
-    y1_sq = y1 * y1
-
-    # Check that radii are large enough; scale up if not (per SVG spec §10.7)
-    radii_check = x1_sq / rx_sq + y1_sq / ry_sq if rx_sq != 0 and ry_sq != 0 else 0
-    if radii_check > 1:
-        radius_x = sqrt(radii_check) * radius_x
-        radius_y = sqrt(radii_check) * radius_y
-        rx_sq = radius_x * radius_x
-        ry_sq = radius_y * radius_y
-
-    # Step 2 : Compute (cx1, cy1)
-    sign = -1 if large_arc_flag == sweep_flag else 1
-    sq = 0.0
-    if rx_sq * y1_sq + ry_sq * x1_sq > 0:
-        sq = (rx_sq * ry_sq - rx_sq * y1_sq - ry_sq * x1_sq) / (
-            rx_sq * y1_sq + ry_sq * x1_sq
-        )
-    sq = max(sq, 0)
-    coef = sign * sqrt(sq)
-    cx1 = coef * ((radius_x * y1) / radius_y)
-    cy1 = coef * -((radius_y * x1) / radius_x) if radius_x != 0 else 0
-
-    # Step 3 : Compute (cx, cy) from (cx1, cy1)
-    sx2 = (start_x + end_x) / 2.0
-    sy2 = (start_y + end_y) / 2.0
-    cx = sx2 + (cos_angle * cx1 - sin_angle * cy1)
-    cy = sy2 + (sin_angle * cx1 + cos_angle * cy1)
-
-    # Step 4 : Compute the angle_extent (dangle)
-    ux = (x1 - cx1) / radius_x if radius_x != 0 else 0
-    uy = (y1 - cy1) / radius_y if radius_y != 0 else 0
-    vx = (-x1 - cx1) / radius_x if radius_x != 0 else 0
-    vy = (-y1 - cy1) / radius_y if radius_y != 0 else 0
-
-    # Compute the angle extent
-    n = sqrt((ux * ux + uy * uy) * (vx * vx + vy * vy))
-    p = ux * vx + uy * vy
-    sign = -1 if (ux * vy - uy * vx) < 0 else 1
-    if n != 0:
-        angle_extent = to_degrees(sign * acos(max(-1.0, min(1.0, p / n))))
-    else:
-        angle_extent = 360 + 359
-    if not (sweep_flag) and angle_extent > 0:
-        angle_extent -= 360
-    elif sweep_flag and angle_extent < 0:
-        angle_extent += 360
-
-    angleExtent_sign = 1 if angle_extent < 0 else -1
-    angle_extent = (abs(angle_extent) % 360) * angleExtent_sign
-
-    return cx, cy, angle_extent
+    """Center and angle extent of an SVG arc, see ``geometry_kernel.arc_center``."""
+    return gk.arc_center(
+        start_x,
+        start_y,
+        radius_x,
+        radius_y,
+        angle,
+        large_arc_flag,
+        sweep_flag,
+        end_x,
+        end_y,
+    )
 
 
 # ---------------------------------------
@@ -215,38 +155,22 @@ def _parse_solid_region_path(
 ) -> list[tuple[float, float]]:
     """Convert an EasyEDA SVG path string to a list of (x, y) mm points.
 
-    Handles M, L, H, V, Z commands. Arc commands (A) are approximated by
-    their endpoint only — sufficient for simple rounded shapes.
+    Every segment adds its end point: arcs and Bezier curves are approximated
+    by it, which is sufficient for simple rounded shapes. Z closes the outline.
     Subtracts bbox in pixel space before converting to mm to avoid
     float rounding artifacts from subtracting two independently rounded values.
     """
     points: list[tuple[float, float]] = []
-    cur_x = cur_y = 0.0
-
-    for token in re.split(r"(?=[MLHVAZmlhvaz])", path.strip()):
-        token = token.strip()
-        if not token:
-            continue
-        cmd = token[0]
-        args = [a for a in re.split(r"[,\s]+", token[1:].strip()) if a]
-
-        if cmd == "M" and len(args) >= 2:
-            cur_x, cur_y = float(args[0]), float(args[1])
-            points.append((fp_to_ki(cur_x - bbox_x_px), fp_to_ki(cur_y - bbox_y_px)))
-        elif cmd == "L" and len(args) >= 2:
-            cur_x, cur_y = float(args[0]), float(args[1])
-            points.append((fp_to_ki(cur_x - bbox_x_px), fp_to_ki(cur_y - bbox_y_px)))
-        elif cmd == "H" and len(args) >= 1:
-            cur_x = float(args[0])
-            points.append((fp_to_ki(cur_x - bbox_x_px), fp_to_ki(cur_y - bbox_y_px)))
-        elif cmd == "V" and len(args) >= 1:
-            cur_y = float(args[0])
-            points.append((fp_to_ki(cur_x - bbox_x_px), fp_to_ki(cur_y - bbox_y_px)))
-        elif cmd == "A" and len(args) >= 7:
-            # Approximate arc by its endpoint only
-            cur_x, cur_y = float(args[5]), float(args[6])
-            points.append((fp_to_ki(cur_x - bbox_x_px), fp_to_ki(cur_y - bbox_y_px)))
-        elif cmd == "Z" and points and points[0] != points[-1]:
+    for command, args in parse_path(path).segments:
+        if command != "Z":
+            # fp_to_ki: the parsed coordinates are floats and never NaN
+            points.append(
+                (
+                    round((args[-2] - bbox_x_px) * 10 * 0.0254, 6),
+                    round((args[-1] - bbox_y_px) * 10 * 0.0254, 6),
+                )
+            )
+        elif points and points[0] != points[-1]:
             points.append(points[0])
 
     return points
@@ -320,8 +244,48 @@ class ExporterFootprintKicad:
 
         self.output = KiFootprint(info=ki_info, model_3d=ki_3d_model_info)
 
-        # For pads
-        for ee_pad in self.input.pads:
+        # For pads: positions, sizes and orientations are computed per column
+        pad_columns = PadColumns.from_pads(self.input.pads).offset(
+            self.input.bbox.x, self.input.bbox.y
+        )
+        pad_xs = gk.to_list(pad_columns.center_x)
+        pad_ys = gk.to_list(pad_columns.center_y)
+
+        # For custom pads: the polygon points of all of them are converted as
+        # one column, relative to the position of their pad
+        custom_pads = [
+            index
+            for index, ee_pad in enumerate(self.input.pads)
+            if KI_PAD_SHAPE.get(ee_pad.shape, "custom") == "custom"
+        ]
+        polygon_xs, polygon_ys, polygon_starts = point_columns(
+            self.input.pads[index].points for index in custom_pads
+        )
+        polygon_counts = [
+            last - first for first, last in zip(polygon_starts, polygon_starts[1:])
+        ]
+        polygon_xs = gk.to_list(
+            gk.subtract(
+                gk.offset(polygon_xs, self.input.bbox.x),
+                gk.repeat(gk.as_column(pad_xs[i] for i in custom_pads), polygon_counts),
+            )
+        )
+        polygon_ys = gk.to_list(
+            gk.subtract(
+                gk.offset(polygon_ys, self.input.bbox.y),
+                gk.repeat(gk.as_column(pad_ys[i] for i in custom_pads), polygon_counts),
+            )
+        )
+        polygon_spans = zip(polygon_starts, polygon_starts[1:])
+
+        for ee_pad, pos_x, pos_y, width, height, orientation in zip(
+            self.input.pads,
+            pad_xs,
+            pad_ys,
+            gk.to_list(gk.clamp_min(pad_columns.width, 0.01)),
+            gk.to_list(gk.clamp_min(pad_columns.height, 0.01)),
+            gk.to_list(gk.angle_to_ki(pad_columns.rotation)),
+        ):
             ki_pad = KiFootprintPad(
                 type="thru_hole" if ee_pad.hole_radius > 0 else "smd",
                 shape=(
@@ -329,16 +293,16 @@ class ExporterFootprintKicad:
                     if ee_pad.shape in KI_PAD_SHAPE
                     else "custom"
                 ),
-                pos_x=ee_pad.center_x - self.input.bbox.x,
-                pos_y=ee_pad.center_y - self.input.bbox.y,
-                width=max(ee_pad.width, 0.01),
-                height=max(ee_pad.height, 0.01),
+                pos_x=pos_x,
+                pos_y=pos_y,
+                width=width,
+                height=height,
                 layers=(
                     KI_PAD_LAYER if ee_pad.hole_radius <= 0 else KI_PAD_LAYER_THT
                 ).get(ee_pad.layer_id, ""),
                 number=ee_pad.number,
                 drill="",
-                orientation=angle_to_ki(ee_pad.rotation),
+                orientation=orientation,
                 polygon="",
             )
 
@@ -355,10 +319,9 @@ class ExporterFootprintKicad:
                 ki_pad.number = normalized
 
             # For custom polygon
-            is_custom_shape = ki_pad.shape == "custom"
-            point_list = [fp_to_ki(point) for point in ee_pad.points.split()]
-            if is_custom_shape:
-                if len(point_list) <= 0:
+            if ki_pad.shape == "custom":
+                first, last = next(polygon_spans)
+                if not ee_pad.points.split():
                     logging.warning(
                         f"PAD ${ee_pad.id} is a polygon, but has no points defined"
                     )
@@ -375,22 +338,20 @@ class ExporterFootprintKicad:
                     ki_pad.orientation = 0
 
                     # Generate polygon with coordinates relative to the base pad's position.
-                    path = "".join(
-                        "(xy {:.6f} {:.6f})".format(
-                            point_list[i] - self.input.bbox.x - ki_pad.pos_x,
-                            point_list[i + 1] - self.input.bbox.y - ki_pad.pos_y,
-                        )
-                        for i in range(0, len(point_list), 2)
-                    )
-                    ki_pad.polygon = (
-                        "\n\t\t(primitives \n\t\t\t(gr_poly \n\t\t\t\t(pts"
-                        f" {path}\n\t\t\t\t) \n\t\t\t\t(width 0.1) \n\t\t\t)\n\t\t)\n\t"
+                    ki_pad.polygon = custom_pad_primitives(
+                        polygon_xs[first:last], polygon_ys[first:last]
                     )
 
             self.output.pads.append(ki_pad)
 
-        # For tracks
-        for ee_track in self.input.tracks:
+        # For tracks: the points of all tracks are converted as one column
+        track_columns = TrackColumns.from_tracks(self.input.tracks).offset(
+            self.input.bbox.x, self.input.bbox.y
+        )
+        track_xs = gk.to_list(track_columns.xs)
+        track_ys = gk.to_list(track_columns.ys)
+        starts = track_columns.starts
+        for index, ee_track in enumerate(self.input.tracks):
             ki_track = KiFootprintTrack(
                 layers=(
                     KI_LAYERS[ee_track.layer_id]
@@ -400,13 +361,13 @@ class ExporterFootprintKicad:
                 stroke_width=max(ee_track.stroke_width, 0.01),
             )
 
-            # Generate line
-            point_list = [fp_to_ki(point) for point in ee_track.points.split()]
-            for i in range(0, len(point_list) - 2, 2):
-                ki_track.points_start_x.append(point_list[i] - self.input.bbox.x)
-                ki_track.points_start_y.append(point_list[i + 1] - self.input.bbox.y)
-                ki_track.points_end_x.append(point_list[i + 2] - self.input.bbox.x)
-                ki_track.points_end_y.append(point_list[i + 3] - self.input.bbox.y)
+            # Generate line: one segment per pair of consecutive points
+            first, last = starts[index], starts[index + 1]
+            if last - first > 1:
+                ki_track.points_start_x = track_xs[first : last - 1]
+                ki_track.points_start_y = track_ys[first : last - 1]
+                ki_track.points_end_x = track_xs[first + 1 : last]
+                ki_track.points_end_y = track_ys[first + 1 : last]
 
             self.output.tracks.append(ki_track)
 
@@ -492,16 +453,18 @@ class ExporterFootprintKicad:
 
             self.output.rectangles.append(ki_rectangle)
 
-        # For arcs
+        # For arcs: the end points are parsed arc by arc, then converted and
+        # solved for the centers as columns
+        arc_tokens: list[list[str]] = [[] for _ in range(6)]
+        arc_rotations: list[str] = []
+        large_arcs: list[bool] = []
+        sweeps: list[bool] = []
         for ee_arc in self.input.arcs:
             arc_path = (
                 ee_arc.path.replace(",", " ").replace("M ", "M").replace("A ", "A")
             )
 
             start_x_str, start_y_str = arc_path.split("A")[0][1:].split(" ", 1)
-            start_x = fp_to_ki(start_x_str) - self.input.bbox.x
-            start_y = fp_to_ki(start_y_str) - self.input.bbox.y
-
             arc_parameters = arc_path.split("A")[1].replace("  ", " ")
             (
                 svg_rx,
@@ -512,27 +475,45 @@ class ExporterFootprintKicad:
                 end_x_str,
                 end_y_str,
             ) = arc_parameters.split(" ", 6)
-            rx, ry = rotate(fp_to_ki(svg_rx), fp_to_ki(svg_ry), 0)
-
-            end_x = fp_to_ki(end_x_str) - self.input.bbox.x
-            end_y = fp_to_ki(end_y_str) - self.input.bbox.y
-            if ry != 0:
-                cx, cy, extent = compute_arc(
-                    start_x,
-                    start_y,
-                    rx,
-                    ry,
-                    float(x_axis_rotation),
-                    large_arc == "1",
-                    sweep == "1",
-                    end_x,
-                    end_y,
-                )
-            else:
-                cx = 0.0
-                cy = 0.0
-                extent = 0.0
+            for tokens, token in zip(
+                arc_tokens,
+                (start_x_str, start_y_str, svg_rx, svg_ry, end_x_str, end_y_str),
+            ):
+                tokens.append(token)
+            arc_rotations.append(x_axis_rotation)
+            large_arcs.append(large_arc == "1")
+            sweeps.append(sweep == "1")
+
+        start_xs, start_ys, radii_x, radii_y, end_xs, end_ys = (
+            gk.parse_mm(tokens) for tokens in arc_tokens
+        )
+        end_xs = gk.offset(end_xs, self.input.bbox.x)
+        end_ys = gk.offset(end_ys, self.input.bbox.y)
+        # the rotation is only parsed for arcs that are computed
+        rotations = [
+            float(rotation) if ry != 0 else 0.0
+            for rotation, ry in zip(arc_rotations, gk.to_list(radii_y))
+        ]
+        centers_x, centers_y, extents = gk.arc_centers(
+            gk.offset(start_xs, self.input.bbox.x),
+            gk.offset(start_ys, self.input.bbox.y),
+            radii_x,
+            radii_y,
+            rotations,
+            large_arcs,
+            sweeps,
+            end_xs,
+            end_ys,
+        )
 
+        for ee_arc, cx, cy, end_x, end_y, extent in zip(
+            self.input.arcs,
+            gk.to_list(centers_x),
+            gk.to_list(centers_y),
+            gk.to_list(end_xs),
+            gk.to_list(end_ys),
+            gk.to_list(extents),
+        ):
             ki_arc = KiFootprintArc(
                 start_x=cx,
                 start_y=cy,
@@ -582,109 +563,206 @@ class ExporterFootprintKicad:
     def get_ki_footprint(self) -> KiFootprint:
         return self.output
 
+    def emit(
+        self, write: Write, model_3d_path: str, model_3d_extension: str = "wrl"
+    ) -> None:
+        """Write the .kicad_mod file piece by piece, e.g. to a text file's write."""
+        self.output.emit(write, model_3d_path, model_3d_extension)
+
+    def render(self, model_3d_path: str, model_3d_extension: str = "wrl") -> str:
+        """Return the content of the .kicad_mod file."""
+        parts: list[str] = []
+        self.output.emit(parts.append, model_3d_path, model_3d_extension)
+        return "".join(parts)
+
     def export(
         self,
         footprint_full_path: str,
         model_3d_path: str,
         model_3d_extension: str = "wrl",
-    ) -> None:
-        ki = self.output
-        ki_lib = ""
-
-        ki_lib += KI_MODULE_INFO.format(
-            package_lib="easyeda2kicad", package_name=ki.info.name, edit="5DC5F6A4"
+        stats: WriteStats | None = None,
+    ) -> bool:
+        return write_footprint_file(
+            footprint_full_path,
+            self.render(
+                model_3d_path=model_3d_path, model_3d_extension=model_3d_extension
+            ),
+            stats=stats,
         )
-        if ki.info.description:
-            ki_lib += f'\t(descr "{ki.info.description}")\n'
 
-        if ki.info.fp_type:
-            ki_lib += KI_FP_TYPE.format(
-                component_type=("smd" if ki.info.fp_type == "smd" else "through_hole")
-            )
 
-        # Get y_min and y_max to place reference and value text
-        y_low = min((pad.pos_y for pad in ki.pads), default=0)
-        y_high = max((pad.pos_y for pad in ki.pads), default=0)
+# Lines of a .kicad_mod describing the part rather than the footprint
+_PART_LINES = ("\t(descr ", "\t(property ")
 
-        ki_lib += KI_REFERENCE.format(pos_x=0.0, pos_y=y_low - 4)
 
-        ki_lib += KI_PACKAGE_VALUE.format(
-            package_name=ki.info.name, pos_x=0.0, pos_y=y_high + 4
-        )
-        ki_lib += KI_FAB_REF
-
-        if ki.info.lcsc_id:
-            ki_lib += f'\t(property "LCSC Part" "{ki.info.lcsc_id}")\n'
-        if ki.info.manufacturer:
-            ki_lib += f'\t(property "Manufacturer" "{ki.info.manufacturer}")\n'
-        if ki.info.mpn:
-            ki_lib += f'\t(property "MPN" "{ki.info.mpn}")\n'
-
-        # ---------------------------------------
-
-        for track in ki.tracks + ki.rectangles:
-            for i in range(len(track.points_start_x)):
-                ki_lib += KI_LINE.format(
-                    start_x=track.points_start_x[i],
-                    start_y=track.points_start_y[i],
-                    end_x=track.points_end_x[i],
-                    end_y=track.points_end_y[i],
-                    layers=track.layers,
-                    stroke_width=track.stroke_width,
-                )
+def footprint_geometry(content: str) -> str:
+    """Fingerprint of a .kicad_mod, leaving out the part properties.
 
-        for pad in ki.pads:
-            ki_lib += KI_PAD.format(**vars(pad))
+    Parts sharing a package get the same fingerprint although their
+    LCSC Part, manufacturer, MPN and description differ.
+    """
+    digest = hashlib.sha256()
+    for line in content.splitlines(keepends=True):
+        if not line.startswith(_PART_LINES):
+            digest.update(line.encode("utf-8"))
+    return digest.hexdigest()
 
-        for hole in ki.holes:
-            ki_lib += KI_HOLE.format(**vars(hole))
 
-        for via in ki.vias:
-            ki_lib += KI_VIA.format(**vars(via))
+def write_footprint_file(
+    footprint_full_path: str, content: str, stats: WriteStats | None = None
+) -> bool:
+    """Write a .kicad_mod file, returns False if it already held *content*."""
+    Path(footprint_full_path).parent.mkdir(parents=True, exist_ok=True)
+    return write_if_changed(footprint_full_path, encode_text(content), stats)
 
-        for circle in ki.circles:
-            ki_lib += KI_CIRCLE.format(**vars(circle))
 
-        for arc in ki.arcs:
-            ki_lib += KI_ARC.format(**vars(arc))
+# Threads of a FootprintLibWriter, writes are I/O bound (mostly fsync)
+FOOTPRINT_WRITE_THREADS = 4
 
-        for text in ki.texts:
-            ki_lib += KI_TEXT.format(**vars(text))
 
-        for region in ki.solid_regions:
-            if region.layer == "F.CrtYd":
-                # Layer 99 (ComponentShapeLayer) has no fill in EasyEDA — emit as outline lines.
-                pts = region.points
-                for i in range(len(pts) - 1):
-                    ki_lib += KI_LINE.format(
-                        start_x=pts[i][0],
-                        start_y=pts[i][1],
-                        end_x=pts[i + 1][0],
-                        end_y=pts[i + 1][1],
-                        layers="F.CrtYd",
-                        stroke_width=0.05,
-                    )
-            else:
-                pts_str = " ".join(f"(xy {x:.6f} {y:.6f})" for x, y in region.points)
-                ki_lib += KI_FP_POLY.format(pts=pts_str, layer=region.layer)
-
-        if ki.model_3d is not None:
-            ki_lib += KI_MODEL_3D.format(
-                file_3d=f"{model_3d_path}/{ki.model_3d.name}.{model_3d_extension}",
-                pos_x=ki.model_3d.translation.x,
-                pos_y=ki.model_3d.translation.y,
-                pos_z=ki.model_3d.translation.z,
-                rot_x=ki.model_3d.rotation.x,
-                rot_y=ki.model_3d.rotation.y,
-                rot_z=ki.model_3d.rotation.z,
-            )
+@dataclass
+class _PendingFootprint:
+    component_id: str | None
+    path: Path
+    future: Future[bool]
+    # whether the file was in the directory before the write
+    existed: bool
+
+
+class FootprintLibWriter:
+    """Writes the .kicad_mod files of a batch into one .pretty directory.
+
+    The directory is listed once, existence checks are set lookups instead of
+    a ``stat`` per footprint. Files are written by a small thread pool, each
+    to a temporary file that is renamed over the footprint, so an interrupted
+    run leaves either the old or the new footprint behind. With *fsync* the
+    files are synced before the rename and the directory once at the end,
+    which makes all renames durable.
 
-        ki_lib += KI_END_FILE
+    A footprint is reported as created once its write has completed; a
+    failed write is logged for its component, counted in ``failed`` and its
+    file name kept in ``failed_files``.
+    A footprint already holding its new content is not written (see
+    ``write_if_changed``); only files found by the listing are compared.
+    """
+
+    def __init__(
+        self,
+        pretty_path: str,
+        stats: WriteStats | None = None,
+        threads: int = FOOTPRINT_WRITE_THREADS,
+        fsync: bool = False,
+    ) -> None:
+        if threads < 1:
+            raise ValueError("threads must be at least 1")
+        self.pretty_path = Path(pretty_path)
+        self.stats = stats
+        self.threads = threads
+        self.fsync = fsync
+        # number of footprints that could not be written
+        self.failed = 0
+        # names of the files whose last write failed
+        self.failed_files: set[str] = set()
+        self._files: set[str] | None = None
+        self._pool: ThreadPoolExecutor | None = None
+        # pending write per file name, in submission order
+        self._pending: dict[str, _PendingFootprint] = {}
+        self._written_any = False
+
+    def __enter__(self) -> FootprintLibWriter:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    @property
+    def files(self) -> set[str]:
+        """Names of the files in the directory, listed on first use."""
+        if self._files is None:
+            try:
+                self._files = set(os.listdir(self.pretty_path))
+            except OSError:
+                self._files = set()
+        return self._files
+
+    def exists(self, footprint_filename: str) -> bool:
+        return footprint_filename in self.files
+
+    def write(
+        self,
+        footprint_filename: str,
+        content: str,
+        component_id: str | None = None,
+    ) -> None:
+        """Queue writing *content* to *footprint_filename* in the directory."""
+        if self._pool is None:
+            self.pretty_path.mkdir(parents=True, exist_ok=True)
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.threads, thread_name_prefix="footprint-writer"
+            )
+        # the same file is not written by two threads at once
+        self.wait(footprint_filename)
+        path = self.pretty_path / footprint_filename
+        existed = self.exists(footprint_filename)
+        self._pending[footprint_filename] = _PendingFootprint(
+            component_id,
+            path,
+            self._pool.submit(self._write, path, encode_text(content), existed),
+            existed,
+        )
+        self.files.add(footprint_filename)
+
+    def wait(self, footprint_filename: str) -> bool:
+        """Wait for the queued write of *footprint_filename*, if any.
+
+        Returns False if the last write of the file failed.
+        """
+        pending = self._pending.pop(footprint_filename, None)
+        if pending is not None:
+            self._finish(footprint_filename, pending)
+        return footprint_filename not in self.failed_files
+
+    def _write(self, path: Path, data: bytes, existed: bool) -> bool:
+        if existed and has_content(path, data):
+            logging.debug(f"Unchanged, not rewritten: {path}")
+            return False
+        write_atomic(path, data, fsync=self.fsync)
+        return True
+
+    def _finish(self, footprint_filename: str, pending: _PendingFootprint) -> None:
+        """Wait for a write and report it."""
+        try:
+            written = pending.future.result()
+        except OSError as err:
+            self.failed += 1
+            self.failed_files.add(footprint_filename)
+            if not pending.existed:
+                self.files.discard(footprint_filename)
+            logging.error(
+                f"Failed to write the footprint for ID: {pending.component_id}"
+                f" to {pending.path}: {err}"
+            )
+            return
+        self.failed_files.discard(footprint_filename)
+        self._written_any |= written
+        if self.stats is not None:
+            self.stats.record(written)
+        logging.info(
+            f"Created Kicad footprint for ID: {pending.component_id}\n"
+            f"       Footprint name: {pending.path.stem}\n"
+            f"       Footprint path: {pending.path}"
+        )
 
-        Path(footprint_full_path).parent.mkdir(parents=True, exist_ok=True)
-        with open(
-            file=footprint_full_path,
-            mode="w",
-            encoding="utf-8",
-        ) as my_lib:
-            my_lib.write(ki_lib)
+    def close(self) -> None:
+        """Wait for all writes, report them and sync the directory."""
+        if self._pool is None:
+            return
+        pending, self._pending = self._pending, {}
+        try:
+            for footprint_filename, item in pending.items():
+                self._finish(footprint_filename, item)
+        finally:
+            self._pool.shutdown()
+            self._pool = None
+        if self.fsync and self._written_any:
+            fsync_directory(self.pretty_path)
@@ -4,6 +4,7 @@ from __future__ import annotations
 import logging
 import math
 import re
+from functools import lru_cache
 from pathlib import Path
 from typing import Sequence
 
@@ -23,7 +24,12 @@ from ..easyeda.parameters_easyeda import (
     EeSymbolRectangle,
     EeSymbolText,
 )
-from ..easyeda.svg_path_parser import SvgPathEllipticalArc, SvgPathMoveTo
+from ..easyeda.svg_path_parser import (
+    SvgPathEllipticalArc,
+    SvgPathMoveTo,
+    parse_path,
+)
+from . import geometry_kernel as gk
 from .parameters_kicad_symbol import (
     KICAD_SYM_VERSIONS_SORTED,
     KiPinStyle,
@@ -38,48 +44,40 @@ from .parameters_kicad_symbol import (
     KiSymbolRectangle,
     KiSymbolText,
 )
-
-_SYM_LIB_REGEX = r'\n(\s*)\(symbol "{component_name}".*?\n\1\)(?=\n|$)'
-
-
-def read_symbol_lib_version(lib_path: str | None) -> int:
-    """Return the .kicad_sym format version to use for the given library file.
-
-    - If lib_path is None or the file cannot be read: oldest known version.
-    - If the file has no (version ...) field: oldest known version.
-    - Otherwise: the largest known version that is <= the version in the file.
-    """
-    if lib_path is not None:
-        try:
-            with open(lib_path, encoding="utf-8") as f:
-                content = f.read(512)  # version is always near the top
-            match = re.search(r"\(version\s+(\d+)\)", content)
-            if match:
-                file_version = int(match.group(1))
-                result = KICAD_SYM_VERSIONS_SORTED[0]
-                for v in KICAD_SYM_VERSIONS_SORTED:
-                    if v <= file_version:
-                        result = v
-                return result
-        except OSError:
-            pass
-    return KICAD_SYM_VERSIONS_SORTED[0]
+from .output_files import WriteStats, encode_text, write_if_changed
+from .symbol_lib_index import (
+    _SYM_LIB_REGEX,
+    SymbolLibrary,
+    derive_in_symbol_lib,
+    empty_symbol_lib,
+    invalidate_symbol_lib_index,
+    load_symbol_lib_index,
+    read_symbol_lib_version,
+    recover_symbol_lib,
+    rewrite_symbol_lib,
+    splice_symbol,
+)
 
 
 def id_already_in_symbol_lib(lib_path: str, component_name: str) -> bool:
     if not Path(lib_path).is_file():
         return False
-    with open(lib_path, encoding="utf-8") as lib_file:
-        current_lib = lib_file.read()
-        component = re.findall(
-            _SYM_LIB_REGEX.format(component_name=re.escape(component_name)),
-            current_lib,
-            flags=re.DOTALL,
-        )
-        if component != []:
-            logging.warning(f"This id is already in {lib_path}")
-            return True
-    return False
+    # a lookup never writes the index, the library may well be read-only
+    index = load_symbol_lib_index(lib_path, scan=False)
+    if index is not None:
+        found = component_name in index.symbols
+    else:
+        with open(lib_path, encoding="utf-8") as lib_file:
+            found = bool(
+                re.search(
+                    _SYM_LIB_REGEX.format(component_name=re.escape(component_name)),
+                    lib_file.read(),
+                    flags=re.DOTALL,
+                )
+            )
+    if found:
+        logging.warning(f"This id is already in {lib_path}")
+    return found
 
 
 def write_component_in_symbol_lib_file(
@@ -88,40 +86,36 @@ def write_component_in_symbol_lib_file(
     component_content: str,
     version: int = KICAD_SYM_VERSIONS_SORTED[0],
     generator: str = GENERATOR_URL,
+    stats: WriteStats | None = None,
+    dedup: bool = False,
 ) -> None:
-    """Write a symbol into the library, replacing it if it already exists."""
+    """Write a symbol into the library, replacing it if it already exists.
+
+    Only the affected part of the library is rewritten if it can be indexed,
+    see ``symbol_lib_index``. A library already holding the symbol as is is
+    not written at all, this is counted in *stats*. With *dedup*, a symbol
+    with the graphics and pins of a symbol of the library is written as a
+    derived symbol of it.
+    """
+    recover_symbol_lib(lib_path)
     if not Path(lib_path).is_file():
         Path(lib_path).write_text(
-            f"(kicad_symbol_lib\n  (version {version})\n  (generator {generator})\n)",
-            encoding="utf-8",
+            empty_symbol_lib(version, generator), encoding="utf-8"
         )
         logging.debug(f"Created symbol lib: {lib_path}")
+        invalidate_symbol_lib_index(lib_path)
 
-    current = Path(lib_path).read_text(encoding="utf-8")
-
-    pattern = _SYM_LIB_REGEX.format(component_name=re.escape(component_name))
-    if re.search(pattern, current, flags=re.DOTALL):
-        # Symbol exists — replace it
-        new_lib = re.sub(
-            pattern, component_content.rstrip("\n"), current, flags=re.DOTALL
-        )
-    else:
-        # Symbol is new — insert before closing parenthesis
-        last_paren_pos = current.rfind(")")
-        if last_paren_pos == -1:
-            raise ValueError("Invalid KiCad library file: no closing parenthesis found")
-        sep = "" if component_content.endswith("\n") else "\n"
-        new_lib = (
-            current[:last_paren_pos]
-            + component_content
-            + sep
-            + current[last_paren_pos:]
+    if dedup:
+        component_content = derive_in_symbol_lib(
+            lib_path, component_name, component_content
         )
+    if splice_symbol(lib_path, component_name, component_content, stats=stats):
+        return
 
-    new_lib = new_lib.replace(
-        "(generator kicad_symbol_editor)", f"(generator {GENERATOR_URL})"
-    )
-    Path(lib_path).write_text(new_lib, encoding="utf-8")
+    current = Path(lib_path).read_text(encoding="utf-8")
+    new_lib = rewrite_symbol_lib(current, component_name, component_content)
+    if write_if_changed(lib_path, encode_text(new_lib), stats):
+        invalidate_symbol_lib_index(lib_path)
 
 
 # EasyEDA uses a 5px grid (= 1.27mm = 50mil). Snapping bbox coordinates to this
@@ -162,22 +156,40 @@ def snap_bbox(
     return snapped_x, snapped_y
 
 
+@lru_cache(maxsize=1024)
+def _pin_length_mm(length_px: str) -> float:
+    # Pins are placed anywhere but only come in a handful of lengths
+    return px_to_mm_grid(abs(int(float(length_px))))
+
+
 def convert_ee_pins(
     ee_pins: list[EeSymbolPin], ee_bbox: EeSymbolBbox
 ) -> list[KiSymbolPin]:
+    # Positions of all pins are converted and snapped to the grid at once
+    pos_x = gk.px_to_mm_grid(
+        gk.as_column(ee_pin.settings.pos_x for ee_pin in ee_pins), origin=ee_bbox.x
+    )
+    pos_y = gk.negate(
+        gk.px_to_mm_grid(
+            gk.as_column(ee_pin.settings.pos_y for ee_pin in ee_pins),
+            origin=ee_bbox.y,
+        )
+    )
+
     kicad_pins = []
-    for ee_pin in ee_pins:
-        pin_length = abs(int(float(ee_pin.pin_path.path.split("h")[-1].split()[0])))
+    for ee_pin, x, y in zip(ee_pins, gk.to_list(pos_x), gk.to_list(pos_y)):
+        # Pin path: "M x y h length" ("v" is turned into "h" on import)
+        length_px = ee_pin.pin_path.path.split("h")[-1].split()[0]
 
         ki_pin = KiSymbolPin(
             name=ee_pin.name.text.replace(" ", ""),
             number=ee_pin.settings.spice_pin_number.replace(" ", ""),
             style=KiPinStyle.line,
-            length=px_to_mm_grid(pin_length),
+            length=_pin_length_mm(length_px),
             type=ee_pin_type_to_ki_pin_type[ee_pin.settings.type],
             orientation=ee_pin.settings.rotation,
-            pos_x=px_to_mm_grid(ee_pin.settings.pos_x - ee_bbox.x),
-            pos_y=-px_to_mm_grid(ee_pin.settings.pos_y - ee_bbox.y),
+            pos_x=x,
+            pos_y=y,
         )
 
         if ee_pin.dot.is_displayed and ee_pin.clock.is_displayed:
@@ -334,7 +346,9 @@ def convert_ee_arcs(
     ee_arcs: list[EeSymbolArc],
     ee_bbox: EeSymbolBbox,
 ) -> list[KiSymbolArc]:
-    kicad_arcs = []
+    # Start, mid and end point of every arc in EasyEDA pixels, converted at once
+    svg_x: list[float] = []
+    svg_y: list[float] = []
     for ee_arc in ee_arcs:
         if (
             len(ee_arc.path) < 2
@@ -368,56 +382,71 @@ def convert_ee_arcs(
                 sweep=svg_arc.flag_sweep,
             )
 
-            # Transform to KiCad coordinates (shift by bbox origin, flip Y-axis).
-            # Start and end are swapped: the Y-flip mirrors the arc, reversing the
-            # traversal direction, which would move the mid-point to the wrong side
-            # of the chord. Swapping start/end preserves the correct winding.
-            start_x = px_to_mm(svg_ex - ee_bbox.x)
-            start_y = -px_to_mm(svg_ey - ee_bbox.y)
-            middle_x = px_to_mm(svg_mid_x - ee_bbox.x)
-            middle_y = -px_to_mm(svg_mid_y - ee_bbox.y)
-            end_x = px_to_mm(svg_sx - ee_bbox.x)
-            end_y = -px_to_mm(svg_sy - ee_bbox.y)
-
-            ki_arc = KiSymbolArc(
-                start_x=start_x,
-                start_y=start_y,
-                middle_x=middle_x,
-                middle_y=middle_y,
-                end_x=end_x,
-                end_y=end_y,
-                # angle_start != angle_end (default 0.0) disables background fill.
-                angle_start=1.0,
-                angle_end=0.0,
-            )
-            kicad_arcs.append(ki_arc)
+            # Start and end are swapped: the Y-flip to KiCad coordinates mirrors
+            # the arc, reversing the traversal direction, which would move the
+            # mid-point to the wrong side of the chord. Swapping start/end
+            # preserves the correct winding.
+            svg_x += (svg_ex, svg_mid_x, svg_sx)
+            svg_y += (svg_ey, svg_mid_y, svg_sy)
 
-    return kicad_arcs
+    # Transform to KiCad coordinates (shift by bbox origin, flip Y-axis)
+    xs = gk.to_list(gk.px_to_mm(gk.as_column(svg_x), origin=ee_bbox.x))
+    ys = gk.to_list(gk.negate(gk.px_to_mm(gk.as_column(svg_y), origin=ee_bbox.y)))
+    return [
+        KiSymbolArc(
+            start_x=xs[i],
+            start_y=ys[i],
+            middle_x=xs[i + 1],
+            middle_y=ys[i + 1],
+            end_x=xs[i + 2],
+            end_y=ys[i + 2],
+            # angle_start != angle_end (default 0.0) disables background fill.
+            angle_start=1.0,
+            angle_end=0.0,
+        )
+        for i in range(0, len(xs), 3)
+    ]
 
 
 def convert_ee_polylines(
     ee_polylines: Sequence[EeSymbolPolyline | EeSymbolPolygon],
     ee_bbox: EeSymbolBbox,
 ) -> list[KiSymbolPolygon]:
+    # Points of all polylines are converted at once, then split up again
+    coordinates = [
+        [float(token) for token in ee_polyline.points.split()]
+        for ee_polyline in ee_polylines
+    ]
+    all_x = gk.to_list(
+        gk.px_to_mm(
+            gk.as_column(v for values in coordinates for v in values[0::2]),
+            origin=ee_bbox.x,
+        )
+    )
+    all_y = gk.to_list(
+        gk.negate(
+            gk.px_to_mm(
+                gk.as_column(v for values in coordinates for v in values[1::2]),
+                origin=ee_bbox.y,
+            )
+        )
+    )
+
     kicad_polygons = []
-    for ee_polyline in ee_polylines:
-        raw_pts = ee_polyline.points.split()
-        x_points = [
-            px_to_mm(float(raw_pts[i]) - ee_bbox.x) for i in range(0, len(raw_pts), 2)
-        ]
-        y_points = [
-            -px_to_mm(float(raw_pts[i]) - ee_bbox.y) for i in range(1, len(raw_pts), 2)
-        ]
+    x_start = y_start = 0
+    for ee_polyline, values in zip(ee_polylines, coordinates):
+        x_end = x_start + (len(values) + 1) // 2
+        y_end = y_start + len(values) // 2
+        x_points = all_x[x_start:x_end]
+        y_points = all_y[y_start:y_end]
+        x_start, y_start = x_end, y_end
 
         if isinstance(ee_polyline, EeSymbolPolygon) or ee_polyline.fill_color:
             x_points.append(x_points[0])
             y_points.append(y_points[0])
         if len(x_points) > 0 and len(y_points) > 0:
             kicad_polygon = KiSymbolPolygon(
-                points=[
-                    [x_points[i], y_points[i]]
-                    for i in range(min(len(x_points), len(y_points)))
-                ],
+                points=[[x, y] for x, y in zip(x_points, y_points)],
                 points_number=min(len(x_points), len(y_points)),
                 is_closed=x_points[0] == x_points[-1] and y_points[0] == y_points[-1],
             )
@@ -441,7 +470,7 @@ def convert_ee_paths(
 ) -> tuple[list[KiSymbolPolygon], list[KiSymbolBezier]]:
     """Convert EasyEDA PT path shapes to KiCad polygons and bezier curves.
 
-    M, L, Z → KiSymbolPolygon segments (straight lines).
+    M, L, H, V, Z → KiSymbolPolygon segments (straight lines).
     C       → KiSymbolBezier with 4 control points [start, c1, c2, end].
     Q       → KiSymbolBezier with 4 control points (elevated to cubic).
 
@@ -449,95 +478,106 @@ def convert_ee_paths(
     sub-paths and each C/Q becomes a separate KiSymbolBezier, all sharing
     endpoints so the segments stay visually connected.
 
+    Relative commands are resolved by the shared path parser; arcs are not
+    converted.
+
     KiSymbolBezier requires KiCad format >= 20220914; older versions fall back
     to a straight line in KiSymbolBezier.export().
     """
-    polygons: list[KiSymbolPolygon] = []
-    beziers: list[KiSymbolBezier] = []
-
-    def _ki(ex: float, ey: float) -> list[float]:
-        return [px_to_mm(ex - ee_bbox.x), -px_to_mm(ey - ee_bbox.y)]
+    # Points in EasyEDA pixels; the shapes refer to them by index until all
+    # points are converted at once
+    raw_x: list[float] = []
+    raw_y: list[float] = []
+    polygon_points: list[list[int]] = []
+    bezier_points: list[list[int]] = []
+
+    def _point(ex: float, ey: float) -> int:
+        raw_x.append(ex)
+        raw_y.append(ey)
+        return len(raw_x) - 1
 
     for ee_path in ee_paths:
-        raw_pts = ee_path.paths.split()
-        n_before = len(polygons) + len(beziers)
+        n_before = len(polygon_points) + len(bezier_points)
 
-        poly_pts: list[list[float]] = []  # current polygon sub-path (KiCad mm)
+        poly_pts: list[int] = []  # current polygon sub-path
         cur_x = 0.0  # current pen position in EE pixels
         cur_y = 0.0
-        first_pt: list[float] = []  # for Z close
+        first_pt: int | None = None  # for Z close
 
         def _flush_poly() -> None:
             if len(poly_pts) >= 2:
-                closed = poly_pts[0] == poly_pts[-1]
-                polygons.append(
-                    KiSymbolPolygon(
-                        points=list(poly_pts),
-                        points_number=len(poly_pts),
-                        is_closed=closed,
-                    )
-                )
+                polygon_points.append(list(poly_pts))
             poly_pts.clear()
 
-        # Minimal SVG path parser: https://www.w3.org/TR/SVG11/paths.html#PathElement
-        idx = 0
-        while idx < len(raw_pts):
-            cmd = raw_pts[idx]
-            if cmd in ("M", "L"):
-                cur_x = float(raw_pts[idx + 1])
-                cur_y = float(raw_pts[idx + 2])
-                pt = _ki(cur_x, cur_y)
+        for command, args in parse_path(ee_path.paths).segments:
+            if command in ("M", "L"):
+                cur_x, cur_y = args
+                pt = _point(cur_x, cur_y)
                 poly_pts.append(pt)
-                if cmd == "M":
+                if command == "M":
                     first_pt = pt
-                idx += 3
-            elif cmd == "Z":
-                if poly_pts and first_pt:
-                    poly_pts.append(first_pt)
-                idx += 1
-            elif cmd == "C":
-                x1, y1 = float(raw_pts[idx + 1]), float(raw_pts[idx + 2])
-                x2, y2 = float(raw_pts[idx + 3]), float(raw_pts[idx + 4])
-                x, y = float(raw_pts[idx + 5]), float(raw_pts[idx + 6])
+            elif command == "Z":
+                if first_pt is not None:
+                    if poly_pts:
+                        poly_pts.append(first_pt)
+                    cur_x, cur_y = raw_x[first_pt], raw_y[first_pt]
+            elif command == "C":
+                x1, y1, x2, y2, x, y = args
                 _flush_poly()
-                beziers.append(
-                    KiSymbolBezier(
-                        points=[_ki(cur_x, cur_y), _ki(x1, y1), _ki(x2, y2), _ki(x, y)]
-                    )
+                bezier_points.append(
+                    [
+                        _point(cur_x, cur_y),
+                        _point(x1, y1),
+                        _point(x2, y2),
+                        _point(x, y),
+                    ]
                 )
                 cur_x, cur_y = x, y
-                poly_pts.append(_ki(cur_x, cur_y))  # anchor for next M/L/C segment
-                idx += 7
-            elif cmd == "Q":
-                qx1, qy1 = float(raw_pts[idx + 1]), float(raw_pts[idx + 2])
-                qx, qy = float(raw_pts[idx + 3]), float(raw_pts[idx + 4])
+                poly_pts.append(_point(cur_x, cur_y))  # anchor for next M/L/C segment
+            elif command == "Q":
+                qx1, qy1, qx, qy = args
                 # Degree elevation: quadratic → cubic
                 cx1 = cur_x + 2 / 3 * (qx1 - cur_x)
                 cy1 = cur_y + 2 / 3 * (qy1 - cur_y)
                 cx2 = qx + 2 / 3 * (qx1 - qx)
                 cy2 = qy + 2 / 3 * (qy1 - qy)
                 _flush_poly()
-                beziers.append(
-                    KiSymbolBezier(
-                        points=[
-                            _ki(cur_x, cur_y),
-                            _ki(cx1, cy1),
-                            _ki(cx2, cy2),
-                            _ki(qx, qy),
-                        ]
-                    )
+                bezier_points.append(
+                    [
+                        _point(cur_x, cur_y),
+                        _point(cx1, cy1),
+                        _point(cx2, cy2),
+                        _point(qx, qy),
+                    ]
                 )
                 cur_x, cur_y = qx, qy
-                poly_pts.append(_ki(cur_x, cur_y))
-                idx += 5
+                poly_pts.append(_point(cur_x, cur_y))
             else:
-                idx += 1  # unknown cmd or stray coordinate
+                # arcs are not converted, the pen moves on to their end point
+                cur_x, cur_y = args[-2:]
 
         _flush_poly()
 
-        if len(polygons) + len(beziers) == n_before:
+        if len(polygon_points) + len(bezier_points) == n_before:
             logging.warning("PT path: skipping shape with no parseable points")
 
+    xs = gk.to_list(gk.px_to_mm(gk.as_column(raw_x), origin=ee_bbox.x))
+    ys = gk.to_list(gk.negate(gk.px_to_mm(gk.as_column(raw_y), origin=ee_bbox.y)))
+
+    def _ki(indices: list[int]) -> list[list[float]]:
+        return [[xs[i], ys[i]] for i in indices]
+
+    polygons = []
+    for indices in polygon_points:
+        points = _ki(indices)
+        polygons.append(
+            KiSymbolPolygon(
+                points=points,
+                points_number=len(points),
+                is_closed=points[0] == points[-1],
+            )
+        )
+    beziers = [KiSymbolBezier(points=_ki(indices)) for indices in bezier_points]
     return polygons, beziers
 
 
@@ -607,6 +647,9 @@ def convert_to_kicad(
     kicad_symbol.texts = convert_ee_texts(
         ee_texts=ee_symbol.texts, ee_bbox=snapped_bbox
     )
+    kicad_symbol.units = [
+        convert_to_kicad(ee_symbol=sub) for sub in ee_symbol.sub_symbols
+    ]
 
     return kicad_symbol
 
@@ -615,45 +658,6 @@ def tune_footprint_ref_path(ki_symbol: KiSymbol, footprint_lib_name: str) -> Non
     ki_symbol.info.package = f"{footprint_lib_name}:{ki_symbol.info.package}"
 
 
-def integrate_sub_units(
-    main_symbol: str,
-    sub_symbols: list[str],
-    component_name: str,
-) -> str:
-    """Integrate sub-unit symbols into a multi-unit KiCad symbol string.
-
-    Extracts the _0_1 body block from each sub_symbol, renames it to _1_1,
-    _2_1, ... and replaces the placeholder _0_1 block in main_symbol.
-    Returns main_symbol unchanged if sub_symbols is empty or no match is found.
-    """
-    if not sub_symbols:
-        return main_symbol
-
-    name = re.escape(component_name)
-    sub_units = []
-    for i, sub_content in enumerate(sub_symbols, 1):
-        match = re.search(
-            rf'( +)\(symbol "{name}_0_1".*?\n\1\)(?=\n)', sub_content, re.DOTALL
-        )
-        if match:
-            sub_units.append(
-                match.group(0).replace(
-                    f'"{component_name}_0_1"', f'"{component_name}_{i}_1"'
-                )
-            )
-
-    if not sub_units:
-        return main_symbol
-
-    return re.sub(
-        rf'( *)\(symbol "{name}_0_1".*?\n\1\)',
-        "\n".join(sub_units),
-        main_symbol,
-        count=1,
-        flags=re.DOTALL,
-    )
-
-
 class ExporterSymbolKicad:
     def __init__(
         self,
@@ -675,41 +679,42 @@ class ExporterSymbolKicad:
             ki_symbol=self.output,
             footprint_lib_name=footprint_lib_name,
         )
-        main_content = self.output.export(version=self.version)
-
-        if not self.input.sub_symbols:
-            return main_content
-
-        sub_contents = [
-            ExporterSymbolKicad(symbol=sub, version=self.version).export(
-                footprint_lib_name=footprint_lib_name
-            )
-            for sub in self.input.sub_symbols
-        ]
-        return integrate_sub_units(
-            main_symbol=main_content,
-            sub_symbols=sub_contents,
-            component_name=self.input.info.name,
-        )
+        return self.output.export(version=self.version)
 
     def save_to_lib(
-        self, lib_path: str, footprint_lib_name: str, overwrite: bool
+        self,
+        lib_path: str,
+        footprint_lib_name: str,
+        overwrite: bool,
+        library: SymbolLibrary | None = None,
     ) -> bool:
         """Export the symbol and write it into the .kicad_sym library file.
 
+        With *library* (a session for *lib_path*) the symbol is only written
+        when the session is flushed.
         Returns False if the symbol already exists and overwrite is False.
         """
-        already_exists = id_already_in_symbol_lib(
-            lib_path=lib_path, component_name=self.input.info.name
-        )
+        if library is not None:
+            already_exists = library.id_already_in(self.input.info.name)
+        else:
+            already_exists = id_already_in_symbol_lib(
+                lib_path=lib_path, component_name=self.input.info.name
+            )
         if already_exists and not overwrite:
             return False
 
         content = self.export(footprint_lib_name=footprint_lib_name)
-        write_component_in_symbol_lib_file(
-            lib_path=lib_path,
-            component_name=self.input.info.name,
-            component_content=content,
-            version=self.version,
-        )
+        if library is not None:
+            library.write_component(
+                component_name=self.input.info.name,
+                component_content=content,
+                version=self.version,
+            )
+        else:
+            write_component_in_symbol_lib_file(
+                lib_path=lib_path,
+                component_name=self.input.info.name,
+                component_content=content,
+                version=self.version,
+            )
         return True
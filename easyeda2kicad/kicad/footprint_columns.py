@@ -0,0 +1,109 @@
+"""
+Columnar (structure-of-arrays) view of footprint pads and tracks.
+
+Big connector and BGA footprints carry thousands of pads and track points.
+Their coordinates, sizes and layers are gathered into flat columns (see
+``geometry_kernel``) and offset with whole-column operations instead of object
+by object. Track point strings are converted to mm as one column; pads are
+already in mm when they are gathered.
+"""
+
+from __future__ import annotations
+
+# Global imports
+from array import array
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, replace
+
+# Local imports
+from ..easyeda.parameters_easyeda import EeFootprintPad, EeFootprintTrack
+from . import geometry_kernel as gk
+from .geometry_kernel import Column
+
+
+@dataclass
+class PadColumns:
+    """Pad geometry in mm, one column entry per pad."""
+
+    center_x: Column
+    center_y: Column
+    width: Column
+    height: Column
+    rotation: Column
+    hole_radius: Column
+    hole_length: Column
+    layer_id: array[int]
+
+    def __len__(self) -> int:
+        return len(self.layer_id)
+
+    @classmethod
+    def from_pads(cls, pads: Sequence[EeFootprintPad]) -> PadColumns:
+        """Gather pads that were already converted to mm at import."""
+        return cls(
+            center_x=gk.as_column(p.center_x for p in pads),
+            center_y=gk.as_column(p.center_y for p in pads),
+            width=gk.as_column(p.width for p in pads),
+            height=gk.as_column(p.height for p in pads),
+            rotation=gk.as_column(p.rotation for p in pads),
+            hole_radius=gk.as_column(p.hole_radius for p in pads),
+            hole_length=gk.as_column(p.hole_length for p in pads),
+            layer_id=array("l", (p.layer_id for p in pads)),
+        )
+
+    def offset(self, dx: float, dy: float) -> PadColumns:
+        """Pads moved by (-dx, -dy), e.g. relative to the footprint bbox origin."""
+        return replace(
+            self,
+            center_x=gk.offset(self.center_x, dx),
+            center_y=gk.offset(self.center_y, dy),
+        )
+
+
+def point_columns(points: Iterable[str]) -> tuple[Column, Column, array[int]]:
+    """x and y columns in mm of ``"x0 y0 x1 y1 ..."`` point strings, back to back.
+
+    The points of string ``i`` are ``xs[starts[i]:starts[i + 1]]``.
+    """
+    tokens: list[str] = []
+    starts = array("l", [0])
+    for values in points:
+        split = values.split()
+        # A dangling x without y is dropped
+        tokens.extend(split[: len(split) & ~1])
+        starts.append(len(tokens) // 2)
+    xs, ys = gk.split_xy(gk.parse_mm(tokens))
+    return xs, ys, starts
+
+
+@dataclass
+class TrackColumns:
+    """Track polylines in mm.
+
+    Points of all tracks are stored back to back; the points of track ``i``
+    are ``xs[starts[i]:starts[i + 1]]``.
+    """
+
+    stroke_width: Column
+    layer_id: array[int]
+    xs: Column
+    ys: Column
+    starts: array[int]
+
+    def __len__(self) -> int:
+        return len(self.layer_id)
+
+    @classmethod
+    def from_tracks(cls, tracks: Sequence[EeFootprintTrack]) -> TrackColumns:
+        """Convert the point strings of all tracks to mm in one go."""
+        xs, ys, starts = point_columns([track.points for track in tracks])
+        return cls(
+            stroke_width=gk.as_column(t.stroke_width for t in tracks),
+            layer_id=array("l", (t.layer_id for t in tracks)),
+            xs=xs,
+            ys=ys,
+            starts=starts,
+        )
+
+    def offset(self, dx: float, dy: float) -> TrackColumns:
+        return replace(self, xs=gk.offset(self.xs, dx), ys=gk.offset(self.ys, dy))
@@ -0,0 +1,403 @@
+"""
+Whole-column geometry helpers for footprint and symbol conversion.
+
+A column is a flat sequence of float coordinates: a NumPy ``float64`` array
+when NumPy is installed, an ``array('d')`` otherwise. Every operation gives
+exactly the same floats as the scalar helpers it replaces (``convert_to_mm``,
+``fp_to_ki``, ``angle_to_ki``, ``max(v, minimum)``, ``px_to_mm``,
+``px_to_mm_grid``), so the generated files do not depend on whether NumPy is
+available.
+"""
+
+from __future__ import annotations
+
+# Global imports
+from array import array
+from collections.abc import Iterable, Sequence
+from math import acos, cos, isnan, pi, sin, sqrt
+from typing import Any
+
+# Optional import for vectorized column math
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# numpy.ndarray (float64) when NumPy is installed, array("d") otherwise
+Column = Any
+
+# EasyEDA footprint unit (10 mil) -> mm, rounded to KiCad's 1 nm resolution
+_MM_PER_UNIT = 0.0254
+_MM_DECIMALS = 6
+
+# EasyEDA symbol pixel (10 mil) -> mm, not rounded
+_MM_PER_PX = 0.0254
+
+
+def _parse_float(token: str) -> float:
+    """``fp_to_ki`` parsing: empty, invalid and NaN tokens become 0.0."""
+    try:
+        value = float(token)
+    except (ValueError, TypeError):
+        return 0.0
+    return 0.0 if isnan(value) else value
+
+
+def as_column(values: Iterable[float]) -> Column:
+    if HAS_NUMPY:
+        return np.fromiter(values, dtype=np.float64)
+    return array("d", values)
+
+
+def parse_column(tokens: Sequence[str]) -> Column:
+    """Parse string tokens into a column (invalid or NaN tokens become 0.0)."""
+    try:
+        values = array("d", map(float, tokens))
+    except ValueError:
+        values = array("d", map(_parse_float, tokens))
+    if values != values:  # NaN never compares equal to itself
+        values = array("d", [0.0 if isnan(v) else v for v in values])
+    return np.frombuffer(values, dtype=np.float64) if HAS_NUMPY else values
+
+
+def to_list(col: Column) -> list[float]:
+    """Plain Python floats, e.g. for the Ki* dataclasses."""
+    values: list[float] = col.tolist()
+    return values
+
+
+def _round_mm(scaled: Column) -> Column:
+    """NumPy ``round(v, 6)`` for every element, bit-identical to Python's ``round``.
+
+    ``np.round`` computes ``rint(v * 1e6) / 1e6``; the multiplication may
+    push values lying next to a rounding tie to the other side. Those few
+    elements are recomputed with the correctly rounded builtin.
+    """
+    shifted = scaled * 10.0**_MM_DECIMALS
+    rounded: Column = np.round(scaled, _MM_DECIMALS)
+    near_tie = np.abs(shifted - np.floor(shifted) - 0.5) < 1e-3
+    for i in np.flatnonzero(near_tie).tolist():
+        rounded[i] = round(float(scaled[i]), _MM_DECIMALS)
+    return rounded
+
+
+def to_mm(col: Column) -> Column:
+    """``round(v * 10 * 0.0254, 6)`` for every element (see ``convert_to_mm``)."""
+    if HAS_NUMPY:
+        return _round_mm(col * 10 * _MM_PER_UNIT)
+    return array("d", [round(v * 10 * _MM_PER_UNIT, _MM_DECIMALS) for v in col])
+
+
+def parse_mm(tokens: Sequence[str]) -> Column:
+    """``to_mm(parse_column(tokens))``, i.e. ``fp_to_ki`` for every token.
+
+    Without NumPy parsing and conversion are fused into a single pass.
+    """
+    if HAS_NUMPY:
+        return to_mm(parse_column(tokens))
+    try:
+        values = array(
+            "d", [round(float(t) * 10 * _MM_PER_UNIT, _MM_DECIMALS) for t in tokens]
+        )
+    except ValueError:
+        return to_mm(parse_column(tokens))
+    if values != values:  # NaN tokens
+        return to_mm(parse_column(tokens))
+    return values
+
+
+def offset(col: Column, delta: float) -> Column:
+    """``v - delta`` for every element."""
+    if HAS_NUMPY:
+        return col - delta
+    return array("d", [v - delta for v in col])
+
+
+def clamp_min(col: Column, minimum: float) -> Column:
+    """``max(v, minimum)`` for every element (NaN stays NaN, like ``max``)."""
+    if HAS_NUMPY:
+        return np.where(col >= minimum, col, np.where(np.isnan(col), col, minimum))
+    return array("d", [max(v, minimum) for v in col])
+
+
+def angle_to_ki(col: Column) -> Column:
+    """EasyEDA rotation (0..360) to KiCad orientation (-180..180], NaN -> 0."""
+    if HAS_NUMPY:
+        wrapped = np.where(col > 180, -(360 - col), col)
+        return np.where(np.isnan(col), 0.0, wrapped)
+    return array(
+        "d",
+        [0.0 if isnan(v) else (-(360 - v) if v > 180 else v) for v in col],
+    )
+
+
+def subtract(col: Column, other: Column) -> Column:
+    """``v - w`` for every pair of elements of two columns of the same length."""
+    if HAS_NUMPY:
+        return col - other
+    return array("d", [v - w for v, w in zip(col, other)])
+
+
+def repeat(col: Column, counts: Sequence[int]) -> Column:
+    """Every element repeated *counts* times, e.g. a pad position per polygon point."""
+    if HAS_NUMPY:
+        return np.repeat(col, counts)
+    repeated = array("d")
+    for value, count in zip(col, counts):
+        repeated.extend([value] * count)
+    return repeated
+
+
+def split_xy(col: Sequence[float]) -> tuple[Column, Column]:
+    """Split interleaved ``x0 y0 x1 y1 ...`` values into x and y columns."""
+    if HAS_NUMPY:
+        flat = np.asarray(col, dtype=np.float64)
+        return flat[0::2].copy(), flat[1::2].copy()
+    return array("d", col[0::2]), array("d", col[1::2])
+
+
+def negate(col: Column) -> Column:
+    """``-v`` for every element (e.g. to flip the y axis)."""
+    if HAS_NUMPY:
+        return -col
+    return array("d", [-v for v in col])
+
+
+def px_to_mm(col: Column, origin: float = 0.0) -> Column:
+    """``10.0 * (v - origin) * 0.0254`` for every element (symbol ``px_to_mm``)."""
+    if HAS_NUMPY:
+        return 10.0 * (col - origin) * _MM_PER_PX
+    return array("d", [10.0 * (v - origin) * _MM_PER_PX for v in col])
+
+
+def px_to_mm_grid(col: Column, origin: float = 0.0, grid: float = 1.27) -> Column:
+    """``px_to_mm`` snapped to multiples of *grid* (symbol ``px_to_mm_grid``)."""
+    if HAS_NUMPY:
+        # rint rounds half to even like round(); + 0.0 turns -0.0 into the
+        # 0 that round() returns
+        return (np.rint(px_to_mm(col, origin) / grid) + 0.0) * grid
+    return array(
+        "d",
+        [round(10.0 * (v - origin) * _MM_PER_PX / grid) * grid for v in col],
+    )
+
+
+# Elliptical arc implementation based on the SVG specification notes
+# https://www.w3.org/TR/SVG11/implnote.html#ArcConversionEndpointToCenter
+
+
+def arc_center(
+    start_x: float,
+    start_y: float,
+    radius_x: float,
+    radius_y: float,
+    angle: float,
+    large_arc_flag: bool,
+    sweep_flag: bool,
+    end_x: float,
+    end_y: float,
+) -> tuple[float, float, float]:
+    """Center and angle extent of an SVG arc given by its end points."""
+    # Compute the half distance between the current and the final point
+    dx2 = (start_x - end_x) / 2.0
+    dy2 = (start_y - end_y) / 2.0
+
+    # Convert angle from degrees to radians
+    angle = ((angle % 360.0) / 180.0) * pi
+    cos_angle = cos(angle)
+    sin_angle = sin(angle)
+
+    # Step 1 : Compute (x1, y1)
+    x1 = cos_angle * dx2 + sin_angle * dy2
+    y1 = -sin_angle * dx2 + cos_angle * dy2
+
+    # Ensure radii are large enough
+    radius_x = abs(radius_x)
+    radius_y = abs(radius_y)
+    rx_sq = radius_x * radius_x
+    ry_sq = radius_y * radius_y
+    x1_sq = x1 * x1
+    y1_sq = y1 * y1
+
+    # Check that radii are large enough; scale up if not (per SVG spec §10.7)
+    radii_check = x1_sq / rx_sq + y1_sq / ry_sq if rx_sq != 0 and ry_sq != 0 else 0
+    if radii_check > 1:
+        radius_x = sqrt(radii_check) * radius_x
+        radius_y = sqrt(radii_check) * radius_y
+        rx_sq = radius_x * radius_x
+        ry_sq = radius_y * radius_y
+
+    # Step 2 : Compute (cx1, cy1)
+    sign = -1 if large_arc_flag == sweep_flag else 1
+    sq = 0.0
+    if rx_sq * y1_sq + ry_sq * x1_sq > 0:
+        sq = (rx_sq * ry_sq - rx_sq * y1_sq - ry_sq * x1_sq) / (
+            rx_sq * y1_sq + ry_sq * x1_sq
+        )
+    sq = max(sq, 0)
+    coef = sign * sqrt(sq)
+    cx1 = coef * ((radius_x * y1) / radius_y)
+    cy1 = coef * -((radius_y * x1) / radius_x) if radius_x != 0 else 0
+
+    # Step 3 : Compute (cx, cy) from (cx1, cy1)
+    sx2 = (start_x + end_x) / 2.0
+    sy2 = (start_y + end_y) / 2.0
+    cx = sx2 + (cos_angle * cx1 - sin_angle * cy1)
+    cy = sy2 + (sin_angle * cx1 + cos_angle * cy1)
+
+    # Step 4 : Compute the angle_extent (dangle)
+    ux = (x1 - cx1) / radius_x if radius_x != 0 else 0
+    uy = (y1 - cy1) / radius_y if radius_y != 0 else 0
+    vx = (-x1 - cx1) / radius_x if radius_x != 0 else 0
+    vy = (-y1 - cy1) / radius_y if radius_y != 0 else 0
+
+    # Compute the angle extent
+    n = sqrt((ux * ux + uy * uy) * (vx * vx + vy * vy))
+    p = ux * vx + uy * vy
+    sign = -1 if (ux * vy - uy * vx) < 0 else 1
+    if n != 0:
+        angle_extent = ((sign * acos(max(-1.0, min(1.0, p / n)))) / pi) * 180.0
+    else:
+        angle_extent = 360 + 359
+    if not (sweep_flag) and angle_extent > 0:
+        angle_extent -= 360
+    elif sweep_flag and angle_extent < 0:
+        angle_extent += 360
+
+    angleExtent_sign = 1 if angle_extent < 0 else -1
+    angle_extent = (abs(angle_extent) % 360) * angleExtent_sign
+
+    return cx, cy, angle_extent
+
+
+def arc_centers(
+    start_x: Column,
+    start_y: Column,
+    radius_x: Column,
+    radius_y: Column,
+    angle: Sequence[float],
+    large_arc_flag: Sequence[bool],
+    sweep_flag: Sequence[bool],
+    end_x: Column,
+    end_y: Column,
+) -> tuple[Column, Column, Column]:
+    """``arc_center`` for every arc; arcs with a zero y radius give (0, 0, 0).
+
+    The NumPy path follows ``arc_center`` operation by operation, with
+    ``where`` for its branches. cos, sin and acos are taken from ``math``
+    element by element, as NumPy's vectorized versions may differ from the
+    C library in the last bit.
+    """
+    if not HAS_NUMPY:
+        cx, cy, extent = array("d"), array("d"), array("d")
+        for args in zip(
+            start_x,
+            start_y,
+            radius_x,
+            radius_y,
+            angle,
+            large_arc_flag,
+            sweep_flag,
+            end_x,
+            end_y,
+        ):
+            center = arc_center(*args) if args[3] != 0 else (0.0, 0.0, 0.0)
+            cx.append(center[0])
+            cy.append(center[1])
+            extent.append(center[2])
+        return cx, cy, extent
+
+    with np.errstate(all="ignore"):
+        return _arc_centers_numpy(
+            start_x,
+            start_y,
+            radius_x,
+            radius_y,
+            angle,
+            np.asarray(large_arc_flag, dtype=bool),
+            np.asarray(sweep_flag, dtype=bool),
+            end_x,
+            end_y,
+        )
+
+
+def _arc_centers_numpy(
+    start_x: Column,
+    start_y: Column,
+    radius_x: Column,
+    radius_y: Column,
+    angle: Sequence[float],
+    large_arc_flag: Column,
+    sweep_flag: Column,
+    end_x: Column,
+    end_y: Column,
+) -> tuple[Column, Column, Column]:
+    degenerate = radius_y == 0
+    dx2 = (start_x - end_x) / 2.0
+    dy2 = (start_y - end_y) / 2.0
+    theta = [((a % 360.0) / 180.0) * pi for a in angle]
+    cos_angle = as_column(map(cos, theta))
+    sin_angle = as_column(map(sin, theta))
+
+    x1 = cos_angle * dx2 + sin_angle * dy2
+    y1 = -sin_angle * dx2 + cos_angle * dy2
+
+    radius_x = np.abs(radius_x)
+    radius_y = np.abs(radius_y)
+    x1_sq = x1 * x1
+    y1_sq = y1 * y1
+    rx_sq = radius_x * radius_x
+    ry_sq = radius_y * radius_y
+    radii_check = np.where(
+        (rx_sq != 0) & (ry_sq != 0), x1_sq / rx_sq + y1_sq / ry_sq, 0.0
+    )
+    scale = radii_check > 1
+    radius_x = np.where(scale, np.sqrt(radii_check) * radius_x, radius_x)
+    radius_y = np.where(scale, np.sqrt(radii_check) * radius_y, radius_y)
+    rx_sq = radius_x * radius_x
+    ry_sq = radius_y * radius_y
+
+    sign = np.where(large_arc_flag == sweep_flag, -1.0, 1.0)
+    denominator = rx_sq * y1_sq + ry_sq * x1_sq
+    sq = np.where(
+        denominator > 0,
+        (rx_sq * ry_sq - rx_sq * y1_sq - ry_sq * x1_sq) / denominator,
+        0.0,
+    )
+    sq = np.where(0 > sq, 0.0, sq)  # max(sq, 0) keeps NaN
+    coef = sign * np.sqrt(sq)
+    cx1 = coef * ((radius_x * y1) / radius_y)
+    cy1 = np.where(radius_x != 0, coef * -((radius_y * x1) / radius_x), 0.0)
+
+    sx2 = (start_x + end_x) / 2.0
+    sy2 = (start_y + end_y) / 2.0
+    cx = sx2 + (cos_angle * cx1 - sin_angle * cy1)
+    cy = sy2 + (sin_angle * cx1 + cos_angle * cy1)
+
+    has_rx, has_ry = radius_x != 0, radius_y != 0
+    ux = np.where(has_rx, (x1 - cx1) / radius_x, 0.0)
+    uy = np.where(has_ry, (y1 - cy1) / radius_y, 0.0)
+    vx = np.where(has_rx, (-x1 - cx1) / radius_x, 0.0)
+    vy = np.where(has_ry, (-y1 - cy1) / radius_y, 0.0)
+
+    n = np.sqrt((ux * ux + uy * uy) * (vx * vx + vy * vy))
+    p = ux * vx + uy * vy
+    sign = np.where((ux * vy - uy * vx) < 0, -1.0, 1.0)
+    cosine = p / n
+    # max(-1.0, min(1.0, cosine)), NaN becomes 1.0 like with the builtins
+    cosine = np.where(cosine < 1.0, cosine, 1.0)
+    cosine = np.where(cosine > -1.0, cosine, -1.0)
+    extent = ((sign * as_column(map(acos, cosine.tolist()))) / pi) * 180.0
+    extent = np.where(n != 0, extent, 360.0 + 359.0)
+    extent = np.where(~sweep_flag & (extent > 0), extent - 360, extent)
+    extent = np.where(sweep_flag & (extent < 0), extent + 360, extent)
+    extent_sign = np.where(extent < 0, 1.0, -1.0)
+    extent = np.remainder(np.abs(extent), 360.0) * extent_sign
+
+    return (
+        np.where(degenerate, 0.0, cx),
+        np.where(degenerate, 0.0, cy),
+        np.where(degenerate, 0.0, extent),
+    )
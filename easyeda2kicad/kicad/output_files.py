@@ -0,0 +1,145 @@
+"""
+Writes of output files that leave identical files untouched.
+
+With ``--overwrite`` a library is typically regenerated from the same parts
+again. Rewriting files whose content did not change costs I/O and touches
+their mtime, which makes KiCad reload them and version control or backup
+tools pick them up. The new content is compared with the file on disk first:
+a size mismatch is detected from ``stat`` alone, only files of equal size are
+read.
+
+Files are written to a temporary file that is renamed over the target, so an
+interrupted run never leaves a truncated output behind.
+"""
+
+from __future__ import annotations
+
+# Global imports
+import logging
+import os
+import stat
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+
+@dataclass
+class WriteStats:
+    """Number of outputs written and left untouched because they were unchanged."""
+
+    written: int = 0
+    skipped: int = 0
+
+    def record(self, written: bool) -> None:
+        if written:
+            self.written += 1
+        else:
+            self.skipped += 1
+
+    def summary(self) -> str:
+        return f"{self.written} outputs written, {self.skipped} unchanged"
+
+
+def encode_text(content: str) -> bytes:
+    """*content* as written by ``Path.write_text`` (newline translation, utf-8)."""
+    return content.replace("\n", os.linesep).encode("utf-8")
+
+
+def has_content(path: str | Path, data: bytes) -> bool:
+    """Whether the file at *path* holds exactly *data*."""
+    try:
+        if os.stat(path).st_size != len(data):
+            return False
+        return Path(path).read_bytes() == data
+    except OSError:
+        return False
+
+
+@contextmanager
+def atomic_file(path: str | Path, fsync: bool = False) -> Iterator[BinaryIO]:
+    """A temporary file that replaces the file at *path* when the block ends.
+
+    If the block raises, *path* is left untouched. The replacement keeps the
+    permission bits (and, where allowed, the owner) of an existing file.
+    With *fsync* the data is on disk before the rename; the rename itself is
+    only durable once the directory is synced, see ``fsync_directory``.
+    """
+    path = Path(path)
+    if path.is_symlink():
+        # replace the file linked to, not the link
+        path = Path(os.path.realpath(path))
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, "wb") as file:
+            yield file
+            if fsync:
+                file.flush()
+                os.fsync(file.fileno())
+        _copy_permissions(path, tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _copy_permissions(path: Path, tmp_path: Path) -> None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return
+    os.chmod(tmp_path, stat.S_IMODE(st.st_mode))
+    if hasattr(os, "chown"):
+        try:
+            os.chown(tmp_path, st.st_uid, st.st_gid)
+        except OSError:
+            # only privileged users may give files away
+            pass
+
+
+def write_atomic(
+    path: str | Path, data: bytes | bytearray, fsync: bool = False
+) -> None:
+    """Replace the file at *path* by one holding *data*, see ``atomic_file``."""
+    with atomic_file(path, fsync=fsync) as file:
+        file.write(data)
+
+
+def fsync_directory(path: str | Path) -> None:
+    """Make the renames in the directory *path* durable (no-op on Windows)."""
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        # directories cannot be synced on every platform / file system
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_if_changed(
+    path: str | Path,
+    data: bytes,
+    stats: WriteStats | None = None,
+    fsync: bool = False,
+) -> bool:
+    """Write *data* to *path* unless the file already holds it.
+
+    Returns True if the file was written. The file is replaced rather than
+    written in place (see ``write_atomic``), so a file that shares its inode
+    with another file (a blob store link) does not modify the other file.
+    """
+    path = Path(path)
+    if has_content(path, data):
+        logging.debug(f"Unchanged, not rewritten: {path}")
+        if stats is not None:
+            stats.record(False)
+        return False
+    write_atomic(path, data, fsync=fsync)
+    if stats is not None:
+        stats.record(True)
+    return True
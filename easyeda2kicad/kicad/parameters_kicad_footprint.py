@@ -1,10 +1,16 @@
 from __future__ import annotations
 
 # Global imports
+from collections.abc import Callable
 from dataclasses import dataclass, field
 from typing import Optional
 
+# Sink for the streaming emitters, e.g. list.append or a text file's write
+Write = Callable[[str], object]
+
 # ---------------------------- FOOTPRINT PART ----------------------------
+# Formats of the .kicad_mod elements; the emit methods below write the same
+# text with f-strings, without building a keyword dict per element.
 
 KI_MODULE_INFO = "(module {package_lib}:{package_name} (layer F.Cu) (tedit {edit})\n"
 KI_DESCRIPTION = (
@@ -25,6 +31,7 @@ KI_FAB_REF = (
     " (thickness 0.15)))\n\t)\n"
 )
 KI_END_FILE = ")"
+_TEXT_EFFECTS = "\n\t\t(effects (font (size 1 1) (thickness 0.15)))\n\t)\n"
 
 KI_PAD_SIZE_MIN = 0.001
 KI_PAD = (
@@ -127,6 +134,38 @@ class KiFootprintPad:
     orientation: float
     polygon: str
 
+    def emit(self, write: Write) -> None:
+        write(
+            f"\t(pad {self.number} {self.type} {self.shape}"
+            f" (at {self.pos_x:.2f} {self.pos_y:.2f} {self.orientation:.2f})"
+            f" (size {self.width:.3f} {self.height:.3f}) (layers {self.layers})"
+            f"{self.drill}{self.polygon})\n"
+        )
+
+
+def custom_pad_primitives(xs: list[float], ys: list[float]) -> str:
+    """``polygon`` of a custom pad with the given points relative to the pad."""
+    path = "".join([f"(xy {x:.6f} {y:.6f})" for x, y in zip(xs, ys)])
+    return (
+        "\n\t\t(primitives \n\t\t\t(gr_poly \n\t\t\t\t(pts"
+        f" {path}\n\t\t\t\t) \n\t\t\t\t(width 0.1) \n\t\t\t)\n\t\t)\n\t"
+    )
+
+
+def emit_line(
+    write: Write,
+    start_x: float,
+    start_y: float,
+    end_x: float,
+    end_y: float,
+    layers: str,
+    stroke_width: float,
+) -> None:
+    write(
+        f"\t(fp_line (start {start_x:.2f} {start_y:.2f}) (end {end_x:.2f} {end_y:.2f})"
+        f" (layer {layers}) (width {stroke_width:.2f}))\n"
+    )
+
 
 # ---------------- TRACK ----------------
 @dataclass
@@ -138,6 +177,19 @@ class KiFootprintTrack:
     stroke_width: float = 0
     layers: str = ""
 
+    def emit(self, write: Write) -> None:
+        tail = f" (layer {self.layers}) (width {self.stroke_width:.2f}))\n"
+        for start_x, start_y, end_x, end_y in zip(
+            self.points_start_x,
+            self.points_start_y,
+            self.points_end_x,
+            self.points_end_y,
+        ):
+            write(
+                f"\t(fp_line (start {start_x:.2f} {start_y:.2f})"
+                f" (end {end_x:.2f} {end_y:.2f}){tail}"
+            )
+
 
 # ---------------- HOLE ----------------
 @dataclass
@@ -146,6 +198,13 @@ class KiFootprintHole:
     pos_y: float
     size: float
 
+    def emit(self, write: Write) -> None:
+        size = f"{self.size:.2f}"
+        write(
+            f'\t(pad "" thru_hole circle (at {self.pos_x:.2f} {self.pos_y:.2f})'
+            f" (size {size} {size}) (drill {size}) (layers *.Cu *.Mask))\n"
+        )
+
 
 # ---------------- CIRCLE ----------------
 @dataclass
@@ -157,6 +216,13 @@ class KiFootprintCircle:
     layers: str
     stroke_width: float
 
+    def emit(self, write: Write) -> None:
+        write(
+            f"\t(fp_circle (center {self.cx:.2f} {self.cy:.2f})"
+            f" (end {self.end_x:.2f} {self.end_y:.2f}) (layer {self.layers})"
+            f" (width {self.stroke_width:.2f}))\n"
+        )
+
 
 # ---------------- RECTANGLE ----------------
 @dataclass
@@ -174,6 +240,13 @@ class KiFootprintArc:
     layers: str
     stroke_width: float
 
+    def emit(self, write: Write) -> None:
+        write(
+            f"\t(fp_arc (start {self.start_x:.2f} {self.start_y:.2f})"
+            f" (end {self.end_x:.2f} {self.end_y:.2f}) (angle {self.angle:.2f})"
+            f" (layer {self.layers}) (width {self.stroke_width:.2f}))\n"
+        )
+
 
 # ---------------- TEXT ----------------
 @dataclass
@@ -188,6 +261,16 @@ class KiFootprintText:
     display: str
     mirror: str
 
+    def emit(self, write: Write) -> None:
+        font_size = f"{self.font_size:.2f}"
+        write(
+            f"\t(fp_text user {self.text}"
+            f" (at {self.pos_x:.2f} {self.pos_y:.2f} {self.orientation:.2f})"
+            f" (layer {self.layers}){self.display}\n\t\t(effects (font"
+            f" (size {font_size} {font_size}) (thickness {self.thickness:.2f}))"
+            f" (justify left{self.mirror}))\n\t)\n"
+        )
+
 
 # ---------------- VIA ----------------
 @dataclass
@@ -197,6 +280,14 @@ class KiFootprintVia:
     size: float
     diameter: float
 
+    def emit(self, write: Write) -> None:
+        diameter = f"{self.diameter:.2f}"
+        write(
+            f'\t(pad "" thru_hole circle (at {self.pos_x:.2f} {self.pos_y:.2f})'
+            f" (size {diameter} {diameter}) (drill {self.size:.2f})"
+            " (layers *.Cu *.Paste *.Mask))\n"
+        )
+
 
 # ---------------- SOLID REGION ----------------
 # EasyEDA SOLIDREGION: filled polygon on silkscreen or fab layer
@@ -207,6 +298,19 @@ class KiFootprintSolidRegion:
     layer: str
     points: list[tuple[float, float]]
 
+    def emit(self, write: Write) -> None:
+        points = self.points
+        if self.layer == "F.CrtYd":
+            # Layer 99 (ComponentShapeLayer) has no fill in EasyEDA — emit as outline lines.
+            for (start_x, start_y), (end_x, end_y) in zip(points, points[1:]):
+                emit_line(write, start_x, start_y, end_x, end_y, "F.CrtYd", 0.05)
+        else:
+            pts = " ".join([f"(xy {x:.6f} {y:.6f})" for x, y in points])
+            write(
+                f"\t(fp_poly (pts {pts}) (stroke (width 0) (type solid))"
+                f' (fill solid) (layer "{self.layer}"))\n'
+            )
+
 
 # ---------------- COPPER AREA ----------------
 # EasyEDA COPPERAREA: copper fill zone (ground plane, thermal relief area).
@@ -242,6 +346,14 @@ class Ki3dModel:
     rotation: Ki3dModelBase
     raw_wrl: Optional[str] = None
 
+    def emit(self, write: Write, file_3d: str) -> None:
+        offset, rotation = self.translation, self.rotation
+        write(
+            f'\t(model "{file_3d}"\n\t\t(offset (xyz {offset.x:.3f} {offset.y:.3f}'
+            f" {offset.z:.3f}))\n\t\t(scale (xyz 1 1 1))\n\t\t(rotate (xyz"
+            f" {rotation.x:.0f} {rotation.y:.0f} {rotation.z:.0f}))\n\t)\n"
+        )
+
 
 # ---------------- FOOTPRINT  ----------------
 @dataclass
@@ -258,3 +370,57 @@ class KiFootprint:
     texts: list[KiFootprintText] = field(default_factory=list)
     solid_regions: list[KiFootprintSolidRegion] = field(default_factory=list)
     copper_areas: list[KiFootprintCopperArea] = field(default_factory=list)
+
+    def emit(
+        self, write: Write, model_3d_path: str, model_3d_extension: str = "wrl"
+    ) -> None:
+        """Write the .kicad_mod file to *write* piece by piece, in a single pass."""
+        info = self.info
+        write(f"(module easyeda2kicad:{info.name} (layer F.Cu) (tedit 5DC5F6A4)\n")
+        if info.description:
+            write(f'\t(descr "{info.description}")\n')
+        if info.fp_type:
+            fp_type = "smd" if info.fp_type == "smd" else "through_hole"
+            write(f"\t(attr {fp_type})\n")
+
+        # Get y_min and y_max to place reference and value text
+        y_low = min((pad.pos_y for pad in self.pads), default=0)
+        y_high = max((pad.pos_y for pad in self.pads), default=0)
+        write(
+            f"\t(fp_text reference REF** (at 0.000 {y_low - 4:.3f}) (layer F.SilkS)"
+            f"{_TEXT_EFFECTS}"
+            f"\t(fp_text value {info.name} (at 0.000 {y_high + 4:.3f}) (layer F.Fab)"
+            f"{_TEXT_EFFECTS}{KI_FAB_REF}"
+        )
+
+        if info.lcsc_id:
+            write(f'\t(property "LCSC Part" "{info.lcsc_id}")\n')
+        if info.manufacturer:
+            write(f'\t(property "Manufacturer" "{info.manufacturer}")\n')
+        if info.mpn:
+            write(f'\t(property "MPN" "{info.mpn}")\n')
+
+        for track in self.tracks:
+            track.emit(write)
+        for rectangle in self.rectangles:
+            rectangle.emit(write)
+        for pad in self.pads:
+            pad.emit(write)
+        for hole in self.holes:
+            hole.emit(write)
+        for via in self.vias:
+            via.emit(write)
+        for circle in self.circles:
+            circle.emit(write)
+        for arc in self.arcs:
+            arc.emit(write)
+        for text in self.texts:
+            text.emit(write)
+        for region in self.solid_regions:
+            region.emit(write)
+
+        if self.model_3d is not None:
+            self.model_3d.emit(
+                write, f"{model_3d_path}/{self.model_3d.name}.{model_3d_extension}"
+            )
+        write(KI_END_FILE)
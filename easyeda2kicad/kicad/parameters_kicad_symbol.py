@@ -3,9 +3,10 @@ from __future__ import annotations
 # Global imports
 import itertools
 import re
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
 from typing import Union
-import textwrap
-from dataclasses import dataclass, field, fields
+from dataclasses import dataclass, field
 from enum import Enum, auto
 
 
@@ -83,6 +84,12 @@ class KiSymbolDefaults(Enum):
 _ILLEGAL_SYMBOL_ID_RE = re.compile(r'[/\\:<>"\t\n\r]')
 
 
+_LINE_WIDTH = KiSymbolDefaults.DEFAULT_BOX_LINE_WIDTH.value
+
+# Sink for the streaming emitters, e.g. list.append or a text file's write
+Write = Callable[[str], object]
+
+
 def sanitize_fields(name: str) -> str:
     return _ILLEGAL_SYMBOL_ID_RE.sub("_", name).replace(" ", "")
 
@@ -106,6 +113,7 @@ def _make_property(
     style: str,
     hide: str,
     version: int,
+    indent: str = "  ",
 ) -> str:
     """Render a KiCad symbol property S-expression.
 
@@ -118,24 +126,19 @@ def _make_property(
     if version >= KICAD_SYM_VERSION_20220914:
         id_part = ""
     else:
-        id_part = f"\n          (id {id_})"
+        id_part = f"\n{indent}  (id {id_})"
 
     if version >= KICAD_SYM_VERSION_20251024:
-        hide_token = "\n          (hide yes)" if hide else ""
+        hide_token = f"\n{indent}  (hide yes)" if hide else ""
         effects = f"(effects (font (size {font_size} {font_size}) {style}))"
     else:
         hide_token = ""
         effects = f"(effects (font (size {font_size} {font_size}) {style}) {hide})"
 
-    return textwrap.indent(
-        textwrap.dedent(f"""
-        (property
-          "{key}"
-          "{value}"{id_part}
-          (at 0 {pos_y:.2f} 0){hide_token}
-          {effects}
-        )"""),
-        "  ",
+    return (
+        f'\n{indent}(property\n{indent}  "{key}"\n{indent}  "{value}"{id_part}'
+        f"\n{indent}  (at 0 {pos_y:.2f} 0){hide_token}\n{indent}  {effects}"
+        f"\n{indent})"
     )
 
 
@@ -155,157 +158,78 @@ class KiSymbolInfo:
     y_low: Union[int, float] = 0
     y_high: Union[int, float] = 0
 
-    def export(self, version: int = KICAD_SYM_VERSION_20211014) -> list[str]:
+    def _properties(self, version: int) -> Iterator[tuple[str, str, int, float, str]]:
+        """Yield (key, value, id, y position, hide) of every property."""
         description_key = (
             "Description" if version >= KICAD_SYM_VERSION_20230620 else "ki_description"
         )
 
         field_offset_y = KiSymbolDefaults.FIELD_OFFSET_START.value
-        header: list[str] = [
-            _make_property(
-                key="Reference",
-                value=self.prefix,
-                id_=0,
-                pos_y=self.y_high + field_offset_y,
-                font_size=KiSymbolDefaults.PROPERTY_FONT_SIZE.value,
-                style="",
-                hide="",
-                version=version,
-            ),
-            _make_property(
-                key="Value",
-                value=self.name,
-                id_=1,
-                pos_y=self.y_low - field_offset_y,
-                font_size=KiSymbolDefaults.PROPERTY_FONT_SIZE.value,
-                style="",
-                hide="",
-                version=version,
-            ),
-        ]
-        if self.package:
-            field_offset_y += KiSymbolDefaults.FIELD_OFFSET_INCREMENT.value
-            header.append(
-                _make_property(
-                    key="Footprint",
-                    value=self.package,
-                    id_=2,
-                    pos_y=self.y_low - field_offset_y,
-                    font_size=KiSymbolDefaults.PROPERTY_FONT_SIZE.value,
-                    style="",
-                    hide="hide",
-                    version=version,
-                )
-            )
-        if self.datasheet:
-            field_offset_y += KiSymbolDefaults.FIELD_OFFSET_INCREMENT.value
-            header.append(
-                _make_property(
-                    key="Datasheet",
-                    value=self.datasheet,
-                    id_=3,
-                    pos_y=self.y_low - field_offset_y,
-                    font_size=KiSymbolDefaults.PROPERTY_FONT_SIZE.value,
-                    style="",
-                    hide="hide",
-                    version=version,
-                )
-            )
-        if self.manufacturer:
-            field_offset_y += KiSymbolDefaults.FIELD_OFFSET_INCREMENT.value
-            header.append(
-                _make_property(
-                    key="Manufacturer",
-                    value=self.manufacturer,
-                    id_=4,
-                    pos_y=self.y_low - field_offset_y,
-                    font_size=KiSymbolDefaults.PROPERTY_FONT_SIZE.value,
-                    style="",
-                    hide="hide",
-                    version=version,
-                )
-            )
-        if self.mpn:
-            field_offset_y += KiSymbolDefaults.FIELD_OFFSET_INCREMENT.value
-            header.append(
-                _make_property(
-                    key="MPN",
-                    value=self.mpn,
-                    id_=5,
-                    pos_y=self.y_low - field_offset_y,
-                    font_size=KiSymbolDefaults.PROPERTY_FONT_SIZE.value,
-                    style="",
-                    hide="hide",
-                    version=version,
-                )
-            )
-        if self.lcsc_id:
-            field_offset_y += KiSymbolDefaults.FIELD_OFFSET_INCREMENT.value
-            header.append(
-                _make_property(
-                    key="LCSC Part",
-                    value=self.lcsc_id,
-                    id_=6,
-                    pos_y=self.y_low - field_offset_y,
-                    font_size=KiSymbolDefaults.PROPERTY_FONT_SIZE.value,
-                    style="",
-                    hide="hide",
-                    version=version,
-                )
-            )
-        if self.keywords:
-            field_offset_y += KiSymbolDefaults.FIELD_OFFSET_INCREMENT.value
-            header.append(
-                _make_property(
-                    key="ki_keywords",
-                    value=self.keywords,
-                    id_=8,
-                    pos_y=self.y_low - field_offset_y,
-                    font_size=KiSymbolDefaults.PROPERTY_FONT_SIZE.value,
-                    style="",
-                    hide="hide",
-                    version=version,
-                )
-            )
-        if self.description:
-            field_offset_y += KiSymbolDefaults.FIELD_OFFSET_INCREMENT.value
-            header.append(
-                _make_property(
-                    key=description_key,
-                    value=self.description,
-                    id_=9,
-                    pos_y=self.y_low - field_offset_y,
-                    font_size=KiSymbolDefaults.PROPERTY_FONT_SIZE.value,
-                    style="",
-                    hide="hide",
-                    version=version,
-                )
-            )
+        yield "Reference", self.prefix, 0, self.y_high + field_offset_y, ""
+        yield "Value", self.name, 1, self.y_low - field_offset_y, ""
+
+        hidden = (
+            ("Footprint", self.package, 2),
+            ("Datasheet", self.datasheet, 3),
+            ("Manufacturer", self.manufacturer, 4),
+            ("MPN", self.mpn, 5),
+            ("LCSC Part", self.lcsc_id, 6),
+            ("ki_keywords", self.keywords, 8),
+            (description_key, self.description, 9),
+        )
+        for key, value, id_ in hidden:
+            if value:
+                field_offset_y += KiSymbolDefaults.FIELD_OFFSET_INCREMENT.value
+                yield key, value, id_, self.y_low - field_offset_y, "hide"
 
         # Built-in property IDs 0–9 are reserved; custom fields start at 10
-        property_id = 10
-        for key, value in self.custom_fields.items():
+        for property_id, (key, value) in enumerate(
+            self.custom_fields.items(), start=10
+        ):
             field_offset_y += KiSymbolDefaults.FIELD_OFFSET_INCREMENT.value
-            header.append(
+            yield key, value, property_id, self.y_low - field_offset_y, "hide"
+
+    def emit(
+        self, write: Write, indent: str, version: int = KICAD_SYM_VERSION_20211014
+    ) -> None:
+        for key, value, id_, pos_y, hide in self._properties(version):
+            write(
                 _make_property(
                     key=key,
                     value=value,
-                    id_=property_id,
-                    pos_y=self.y_low - field_offset_y,
+                    id_=id_,
+                    pos_y=pos_y,
                     font_size=KiSymbolDefaults.PROPERTY_FONT_SIZE.value,
                     style="",
-                    hide="hide",
+                    hide=hide,
                     version=version,
+                    indent=indent,
                 )
             )
-            property_id += 1
 
+    def export(self, version: int = KICAD_SYM_VERSION_20211014) -> list[str]:
+        header: list[str] = []
+        self.emit(header.append, "  ", version)
         return header
 
 
+class _SymbolItem(ABC):
+    """Graphic item or pin of a symbol."""
+
+    @abstractmethod
+    def emit(
+        self, write: Write, indent: str, version: int = KICAD_SYM_VERSION_20211014
+    ) -> None: ...
+
+    def export(self, version: int = KICAD_SYM_VERSION_20211014) -> str:
+        parts: list[str] = []
+        self.emit(parts.append, " " * 12, version)
+        return "".join(parts)
+
+
 # ---------------- PIN ----------------
 @dataclass
-class KiSymbolPin:
+class KiSymbolPin(_SymbolItem):
     name: str
     number: str
     style: KiPinStyle
@@ -315,110 +239,101 @@ class KiSymbolPin:
     pos_x: Union[int, float]
     pos_y: Union[int, float]
 
-    def export(self, version: int = KICAD_SYM_VERSION_20211014) -> str:
-        return """
-            (pin {pin_type} {pin_style}
-              (at {x:.2f} {y:.2f} {orientation})
-              (length {pin_length})
-              (name "{pin_name}" (effects (font (size {name_size} {name_size}))))
-              (number "{pin_num}" (effects (font (size {num_size} {num_size}))))
-            )""".format(
-            pin_type=(
-                self.type.name[1:] if self.type.name.startswith("_") else self.type.name
-            ),
-            pin_style=self.style.name,
-            x=self.pos_x,
-            y=self.pos_y,
-            # KiCad pin orientation is offset by 180° from EasyEDA's convention
-            orientation=(180 + self.orientation) % 360,
-            pin_length=self.length,
-            pin_name=apply_pin_name_style(pin_name=self.name),
-            name_size=KiSymbolDefaults.PIN_NAME_SIZE.value,
-            pin_num=self.number,
-            num_size=KiSymbolDefaults.PIN_NUM_SIZE.value,
+    def emit(
+        self, write: Write, indent: str, version: int = KICAD_SYM_VERSION_20211014
+    ) -> None:
+        pin_type = (
+            self.type.name[1:] if self.type.name.startswith("_") else self.type.name
+        )
+        # KiCad pin orientation is offset by 180° from EasyEDA's convention
+        orientation = (180 + self.orientation) % 360
+        name_size = KiSymbolDefaults.PIN_NAME_SIZE.value
+        num_size = KiSymbolDefaults.PIN_NUM_SIZE.value
+        write(
+            f"\n{indent}(pin {pin_type} {self.style.name}"
+            f"\n{indent}  (at {self.pos_x:.2f} {self.pos_y:.2f} {orientation})"
+            f"\n{indent}  (length {self.length})"
+            f'\n{indent}  (name "{apply_pin_name_style(pin_name=self.name)}"'
+            f" (effects (font (size {name_size} {name_size}))))"
+            f'\n{indent}  (number "{self.number}"'
+            f" (effects (font (size {num_size} {num_size}))))"
+            f"\n{indent})"
         )
 
 
 # ---------------- RECTANGLE ----------------
 @dataclass
-class KiSymbolRectangle:
+class KiSymbolRectangle(_SymbolItem):
     pos_x0: Union[int, float] = 0
     pos_y0: Union[int, float] = 0
     pos_x1: Union[int, float] = 0
     pos_y1: Union[int, float] = 0
 
-    def export(self, version: int = KICAD_SYM_VERSION_20211014) -> str:
-        return """
-            (rectangle
-              (start {x0:.2f} {y0:.2f})
-              (end {x1:.2f} {y1:.2f})
-              (stroke (width {line_width}) (type default))
-              (fill (type {fill}))
-            )""".format(
-            x0=self.pos_x0,
-            y0=self.pos_y0,
-            x1=self.pos_x1,
-            y1=self.pos_y1,
-            line_width=KiSymbolDefaults.DEFAULT_BOX_LINE_WIDTH.value,
-            fill=KiBoxFill.background.name,
+    def emit(
+        self, write: Write, indent: str, version: int = KICAD_SYM_VERSION_20211014
+    ) -> None:
+        write(
+            f"\n{indent}(rectangle"
+            f"\n{indent}  (start {self.pos_x0:.2f} {self.pos_y0:.2f})"
+            f"\n{indent}  (end {self.pos_x1:.2f} {self.pos_y1:.2f})"
+            f"\n{indent}  (stroke (width {_LINE_WIDTH}) (type default))"
+            f"\n{indent}  (fill (type {KiBoxFill.background.name}))"
+            f"\n{indent})"
         )
 
 
 # ---------------- POLYGON ----------------
 @dataclass
-class KiSymbolPolygon:
+class KiSymbolPolygon(_SymbolItem):
     points: list[list[float]] = field(default_factory=list)
     points_number: int = 0
     is_closed: bool = False
 
-    def export(self, version: int = KICAD_SYM_VERSION_20211014) -> str:
-        return """
-            (polyline
-              (pts
-                {polyline_path}
-              )
-              (stroke (width {line_width}) (type default))
-              (fill (type {fill}))
-            )""".format(
-            polyline_path=" ".join(
-                [f"(xy {pts[0]:.2f} {pts[1]:.2f})" for pts in self.points]
-            ),
-            line_width=KiSymbolDefaults.DEFAULT_BOX_LINE_WIDTH.value,
-            fill=KiBoxFill.background.name if self.is_closed else KiBoxFill.none.name,
+    def emit(
+        self, write: Write, indent: str, version: int = KICAD_SYM_VERSION_20211014
+    ) -> None:
+        fill = KiBoxFill.background.name if self.is_closed else KiBoxFill.none.name
+        write(f"\n{indent}(polyline\n{indent}  (pts")
+        if self.points:
+            write(f"\n{indent}    ")
+            write(" ".join([f"(xy {pts[0]:.2f} {pts[1]:.2f})" for pts in self.points]))
+        write(
+            f"\n{indent}  )"
+            f"\n{indent}  (stroke (width {_LINE_WIDTH}) (type default))"
+            f"\n{indent}  (fill (type {fill}))"
+            f"\n{indent})"
         )
 
 
 # ---------------- CIRCLE ----------------
 @dataclass
-class KiSymbolCircle:
+class KiSymbolCircle(_SymbolItem):
     pos_x: Union[int, float] = 0
     pos_y: Union[int, float] = 0
     radius: Union[int, float] = 0
     background_filling: bool = False
 
-    def export(self, version: int = KICAD_SYM_VERSION_20211014) -> str:
-        return """
-            (circle
-              (center {pos_x:.2f} {pos_y:.2f})
-              (radius {radius:.2f})
-              (stroke (width {line_width}) (type default))
-              (fill (type {fill}))
-            )""".format(
-            pos_x=self.pos_x,
-            pos_y=self.pos_y,
-            radius=self.radius,
-            line_width=KiSymbolDefaults.DEFAULT_BOX_LINE_WIDTH.value,
-            fill=(
-                KiBoxFill.background.name
-                if self.background_filling
-                else KiBoxFill.none.name
-            ),
+    def emit(
+        self, write: Write, indent: str, version: int = KICAD_SYM_VERSION_20211014
+    ) -> None:
+        fill = (
+            KiBoxFill.background.name
+            if self.background_filling
+            else KiBoxFill.none.name
+        )
+        write(
+            f"\n{indent}(circle"
+            f"\n{indent}  (center {self.pos_x:.2f} {self.pos_y:.2f})"
+            f"\n{indent}  (radius {self.radius:.2f})"
+            f"\n{indent}  (stroke (width {_LINE_WIDTH}) (type default))"
+            f"\n{indent}  (fill (type {fill}))"
+            f"\n{indent})"
         )
 
 
 # ---------------- ARC ----------------
 @dataclass
-class KiSymbolArc:
+class KiSymbolArc(_SymbolItem):
     angle_start: float = 0.0
     angle_end: float = 0.0
     start_x: float = 0
@@ -428,62 +343,59 @@ class KiSymbolArc:
     end_x: float = 0
     end_y: float = 0
 
-    def export(self, version: int = KICAD_SYM_VERSION_20211014) -> str:
-        return """
-            (arc
-              (start {start_x:.2f} {start_y:.2f})
-              (mid {middle_x:.2f} {middle_y:.2f})
-              (end {end_x:.2f} {end_y:.2f})
-              (stroke (width {line_width}) (type default))
-              (fill (type {fill}))
-            )""".format(
-            start_x=self.start_x,
-            start_y=self.start_y,
-            middle_x=self.middle_x,
-            middle_y=self.middle_y,
-            end_x=self.end_x,
-            end_y=self.end_y,
-            line_width=KiSymbolDefaults.DEFAULT_BOX_LINE_WIDTH.value,
-            fill=(
-                KiBoxFill.background.name
-                if self.angle_start == self.angle_end
-                else KiBoxFill.none.name
-            ),
+    def emit(
+        self, write: Write, indent: str, version: int = KICAD_SYM_VERSION_20211014
+    ) -> None:
+        fill = (
+            KiBoxFill.background.name
+            if self.angle_start == self.angle_end
+            else KiBoxFill.none.name
+        )
+        write(
+            f"\n{indent}(arc"
+            f"\n{indent}  (start {self.start_x:.2f} {self.start_y:.2f})"
+            f"\n{indent}  (mid {self.middle_x:.2f} {self.middle_y:.2f})"
+            f"\n{indent}  (end {self.end_x:.2f} {self.end_y:.2f})"
+            f"\n{indent}  (stroke (width {_LINE_WIDTH}) (type default))"
+            f"\n{indent}  (fill (type {fill}))"
+            f"\n{indent})"
         )
 
 
 # ---------------- BEZIER CURVE ----------------
 @dataclass
-class KiSymbolBezier:
+class KiSymbolBezier(_SymbolItem):
     points: list[list[float]] = field(default_factory=list)
     points_number: int = 0
     is_closed: bool = False
 
-    def export(self, version: int = KICAD_SYM_VERSION_20211014) -> str:
-        fmt_pts = " ".join(f"(xy {p[0]:.2f} {p[1]:.2f})" for p in self.points)
+    def emit(
+        self, write: Write, indent: str, version: int = KICAD_SYM_VERSION_20211014
+    ) -> None:
         fill = KiBoxFill.background.name if self.is_closed else KiBoxFill.none.name
-        lw = KiSymbolDefaults.DEFAULT_BOX_LINE_WIDTH.value
         if version >= KICAD_SYM_VERSION_20220914:
-            return f"""
-            (bezier
-              (pts {fmt_pts})
-              (stroke (width {lw}) (type default))
-              (fill (type {fill}))
-            )"""
-        # Format < 20220914 has no (bezier ...) — emit straight line start→end
-        start = self.points[0] if self.points else [0, 0]
-        end = self.points[-1] if len(self.points) > 1 else start
-        return f"""
-            (polyline
-              (pts (xy {start[0]:.2f} {start[1]:.2f}) (xy {end[0]:.2f} {end[1]:.2f}))
-              (stroke (width {lw}) (type default))
-              (fill (type {fill}))
-            )"""
+            fmt_pts = " ".join(f"(xy {p[0]:.2f} {p[1]:.2f})" for p in self.points)
+            pts = f"\n{indent}  (pts {fmt_pts})"
+            write(f"\n{indent}(bezier{pts}")
+        else:
+            # Format < 20220914 has no (bezier ...) — emit straight line start→end
+            start = self.points[0] if self.points else [0, 0]
+            end = self.points[-1] if len(self.points) > 1 else start
+            write(
+                f"\n{indent}(polyline"
+                f"\n{indent}  (pts (xy {start[0]:.2f} {start[1]:.2f})"
+                f" (xy {end[0]:.2f} {end[1]:.2f}))"
+            )
+        write(
+            f"\n{indent}  (stroke (width {_LINE_WIDTH}) (type default))"
+            f"\n{indent}  (fill (type {fill}))"
+            f"\n{indent})"
+        )
 
 
 # ---------------- TEXT ----------------
 @dataclass
-class KiSymbolText:
+class KiSymbolText(_SymbolItem):
     # Represents a free text label from EasyEDA (T~ command).
     #
     # (text ...) is a valid graphic primitive in KiCad symbol libraries from KiCad 6+
@@ -500,17 +412,16 @@ class KiSymbolText:
     rotation: float = 0.0
     font_size: float = 1.27  # mm
 
-    def export(self, version: int = KICAD_SYM_VERSION_20211014) -> str:
-        return """
-            (text "{text}"
-              (at {pos_x:.2f} {pos_y:.2f} {rotation:.0f})
-              (effects (font (size {font_size:.2f} {font_size:.2f})))
-            )""".format(
-            text=self.text.replace('"', '\\"'),
-            pos_x=self.pos_x,
-            pos_y=self.pos_y,
-            rotation=self.rotation,
-            font_size=self.font_size,
+    def emit(
+        self, write: Write, indent: str, version: int = KICAD_SYM_VERSION_20211014
+    ) -> None:
+        text = self.text.replace('"', '\\"')
+        size = f"{self.font_size:.2f}"
+        write(
+            f'\n{indent}(text "{text}"'
+            f"\n{indent}  (at {self.pos_x:.2f} {self.pos_y:.2f} {self.rotation:.0f})"
+            f"\n{indent}  (effects (font (size {size} {size})))"
+            f"\n{indent})"
         )
 
 
@@ -526,63 +437,47 @@ class KiSymbol:
     beziers: list[KiSymbolBezier] = field(default_factory=lambda: [])
     texts: list[KiSymbolText] = field(default_factory=lambda: [])
 
-    def export_handler(
-        self, version: int = KICAD_SYM_VERSION_20211014
-    ) -> dict[str, str | list[str]]:
+    # Units of a multi-unit symbol, emitted instead of the symbol's own items
+    units: list[KiSymbol] = field(default_factory=lambda: [])
+
+    def _emit_unit(
+        self, write: Write, library_id: str, unit: int, version: int
+    ) -> None:
+        write(f'\n    (symbol "{library_id}_{unit}_1"')
+        items: Iterator[_SymbolItem] = itertools.chain(
+            self.rectangles,
+            self.circles,
+            self.arcs,
+            self.polygons,
+            self.beziers,
+            self.texts,
+            self.pins,
+        )
+        for item in items:
+            item.emit(write, "      ", version)
+        write("\n    )")
+
+    def emit(self, write: Write, version: int = KICAD_SYM_VERSION_20211014) -> None:
+        """Write the symbol to *write* piece by piece, in a single pass."""
         self.info.y_low = min(pin.pos_y for pin in self.pins) if self.pins else 0
         self.info.y_high = max(pin.pos_y for pin in self.pins) if self.pins else 0
 
-        sym_export_data: dict[str, str | list[str]] = {}
-        for _field in fields(self):
-            shapes = getattr(self, _field.name)
-            if isinstance(shapes, list):
-                values: list[str] = []
-                for sub_symbol in shapes:
-                    export_method = getattr(sub_symbol, "export", None)
-                    if export_method is None:
-                        raise ValueError(f"{type(sub_symbol).__name__} has no export()")
-                    values.append(export_method(version=version))
-                sym_export_data[_field.name] = values
-            else:
-                export_method = getattr(shapes, "export", None)
-                if export_method is None:
-                    raise ValueError(f"{type(shapes).__name__} has no export()")
-                sym_export_data[_field.name] = export_method(version=version)
-        return sym_export_data
-
-    def export(self, version: int = KICAD_SYM_VERSION_20211014) -> str:
-        sym_export_data = self.export_handler(version=version)
-        sym_info = sym_export_data.pop("info")
-        sym_pins = sym_export_data.pop("pins")
-        sym_graphic_items = itertools.chain.from_iterable(sym_export_data.values())
-
         if version >= KICAD_SYM_VERSION_20241209:
             sym_attrs = "(exclude_from_sim no)\n    (in_bom yes)\n    (on_board yes)"
         else:
             sym_attrs = "(in_bom yes)\n    (on_board yes)"
 
-        component_data = textwrap.indent(
-            textwrap.dedent(
-                """
-            (symbol "{library_id}"
-              {sym_attrs}
-              {symbol_properties}
-              (symbol "{library_id}_0_1"
-                {graphic_items}
-                {pins}
-              )
-            )"""
-            ),
-            "  ",
-        ).format(
-            library_id=sanitize_fields(self.info.name),
-            sym_attrs=sym_attrs,
-            symbol_properties=textwrap.indent(
-                textwrap.dedent("".join(sym_info)), "  " * 2
-            ),
-            graphic_items=textwrap.indent(
-                textwrap.dedent("".join(sym_graphic_items)), "  " * 3
-            ),
-            pins=textwrap.indent(textwrap.dedent("".join(sym_pins)), "  " * 3),
-        )
-        return re.sub(r"\n\s*\n", "\n", component_data, flags=re.MULTILINE)
+        library_id = sanitize_fields(self.info.name)
+        write(f'\n  (symbol "{library_id}"\n    {sym_attrs}')
+        self.info.emit(write, "    ", version)
+        if self.units:
+            for unit, unit_symbol in enumerate(self.units, start=1):
+                unit_symbol._emit_unit(write, library_id, unit, version)
+        else:
+            self._emit_unit(write, library_id, 0, version)
+        write("\n  )")
+
+    def export(self, version: int = KICAD_SYM_VERSION_20211014) -> str:
+        parts: list[str] = []
+        self.emit(parts.append, version)
+        return "".join(parts)
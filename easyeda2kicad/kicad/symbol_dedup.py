@@ -0,0 +1,106 @@
+"""
+Derived symbols for parts that share their graphics and pins.
+
+Parts that differ only in their properties (value, MPN, LCSC Part, ...) can
+be written as KiCad derived symbols: ``(symbol "B" (extends "A") ...)`` holds
+just the properties of part B and takes everything else from symbol A, which
+must come first in the library.
+
+The geometry of a symbol is fingerprinted from its s-expression with the
+properties and the symbol name left out. Converted symbols and symbols read
+from a library are compared the same way, so only symbols with byte-identical
+graphics are ever merged.
+"""
+
+from __future__ import annotations
+
+# Global imports
+import hashlib
+import re
+from typing import NamedTuple
+
+_HEADER_REGEX = re.compile(r'\s*\(symbol\s+"((?:[^"\\]|\\.)*)"')
+_TOKEN_REGEX = re.compile(r'"(?:[^"\\]|\\.)*"|[()]')
+_HEAD_REGEX = re.compile(r'\s*([^\s()"]+)')
+
+
+class _Child(NamedTuple):
+    head: str
+    start: int
+    end: int
+
+
+class SymbolShape(NamedTuple):
+    # fingerprint of the graphics and pins, None for a derived symbol
+    geometry: str | None
+    # name of the symbol it extends, None for a complete symbol
+    extends: str | None
+
+
+def _parse(content: str) -> tuple[str, int, list[_Child]] | None:
+    """Name, end of the header and child lists of the symbol in *content*.
+
+    Returns None if *content* is not a single well-formed symbol.
+    """
+    header = _HEADER_REGEX.match(content)
+    if header is None:
+        return None
+    children: list[_Child] = []
+    depth = 1
+    child_start = -1
+    for token in _TOKEN_REGEX.finditer(content, header.end()):
+        if token.group() == "(":
+            depth += 1
+            if depth == 2:
+                child_start = token.start()
+        elif token.group() == ")":
+            depth -= 1
+            if depth == 1:
+                head = _HEAD_REGEX.match(content, child_start + 1)
+                children.append(
+                    _Child(head.group(1) if head else "", child_start, token.end())
+                )
+            elif depth == 0:
+                if content[token.end() :].strip():
+                    return None
+                return header.group(1), header.end(), children
+    return None
+
+
+def symbol_shape(content: str) -> SymbolShape:
+    """Geometry fingerprint and base symbol of the symbol in *content*."""
+    parsed = _parse(content)
+    if parsed is None:
+        return SymbolShape(None, None)
+    name, _, children = parsed
+    unit_prefix = f'(symbol "{name}_'
+    digest = hashlib.sha256()
+    for child in children:
+        text = content[child.start : child.end]
+        if child.head == "extends":
+            base = _TOKEN_REGEX.search(text, len("(extends"))
+            if base is None or not base.group().startswith('"'):
+                return SymbolShape(None, None)
+            return SymbolShape(None, base.group()[1:-1])
+        if child.head == "property":
+            continue
+        if child.head == "symbol" and text.startswith(unit_prefix):
+            # units are named after their symbol
+            text = '(symbol "_' + text[len(unit_prefix) :]
+        digest.update(text.encode("utf-8") + b"\n")
+    return SymbolShape(digest.hexdigest(), None)
+
+
+def derive_symbol(content: str, base: str) -> str:
+    """The symbol in *content* as a derived symbol of *base*: properties only."""
+    parsed = _parse(content)
+    if parsed is None:
+        raise ValueError("Not a symbol s-expression")
+    _, header_end, children = parsed
+    indent = content[header_end : children[0].start] if children else "\n    "
+    parts = [content[:header_end], f'{indent}(extends "{base}")']
+    for child in children:
+        if child.head == "property":
+            parts.append(indent + content[child.start : child.end])
+    parts.append(content[children[-1].end if children else header_end :])
+    return "".join(parts)
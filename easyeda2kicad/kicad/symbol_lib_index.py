@@ -0,0 +1,854 @@
+"""
+Sidecar index and batched writes for .kicad_sym libraries.
+
+The index maps every top-level symbol of a library to its byte range and a
+hash of its content. Existence checks then do not read the library, and a
+symbol is added or replaced by splicing its byte range: the rest of the
+library is copied as raw bytes, without parsing, into a temporary file that
+replaces it.
+
+It is stored next to the library as ``<lib>.idx`` and only trusted while the
+size and mtime of the library match the values recorded in it. Otherwise, e.g.
+after the library was edited in KiCad, the library is scanned again.
+
+``SymbolLibrary`` applies the symbols of a whole batch in memory and writes
+the library once. A batch of new symbols only is written in place after the
+last symbol; the bytes it overwrites are saved to ``<lib>.journal`` first, so
+an interrupted append is undone by ``recover_symbol_lib``.
+"""
+
+from __future__ import annotations
+
+# Global imports
+import copy
+import hashlib
+import json
+import logging
+import mmap
+import os
+import re
+import shutil
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
+from pathlib import Path
+from typing import Any, BinaryIO
+
+# Local imports
+from .._version import GENERATOR_URL
+from .output_files import WriteStats, atomic_file, fsync_directory, write_atomic
+from .output_files import encode_text as _encode
+from .parameters_kicad_symbol import KICAD_SYM_VERSIONS_SORTED
+from .symbol_dedup import SymbolShape, derive_symbol, symbol_shape
+
+SYMBOL_LIB_INDEX_VERSION = 2
+
+_SYM_LIB_REGEX = r'\n(\s*)\(symbol "{component_name}".*?\n\1\)(?=\n|$)'
+
+# Same delimiters as _SYM_LIB_REGEX: a symbol starts at the newline before its
+# indented header and ends at the first line holding only a ")" with the same
+# indentation.
+_HEADER_REGEX = re.compile(rb'\r?\n([^\S\r\n]*)\(symbol "((?:[^"\\]|\\.)*)"')
+_EDITOR_GENERATOR = b"(generator kicad_symbol_editor)"
+
+# Indexes of the libraries used by this process, see load_symbol_lib_index
+_INDEX_CACHE: dict[str, SymbolLibIndex] = {}
+
+
+@dataclass
+class IndexedSymbol:
+    start: int
+    end: int
+    digest: str
+    # computed on demand, see _fill_shapes
+    shape: SymbolShape | None = None
+
+
+@dataclass
+class SymbolLibIndex:
+    size: int = 0
+    mtime_ns: int = 0
+    # offset of the last ")" of the library, where new symbols are inserted
+    close: int = -1
+    # the library was saved by KiCad, its generator has to be replaced
+    needs_rewrite: bool = False
+    symbols: dict[str, IndexedSymbol] = field(default_factory=dict)
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "version": SYMBOL_LIB_INDEX_VERSION,
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "close": self.close,
+            "needs_rewrite": self.needs_rewrite,
+            "symbols": {
+                name: [
+                    sym.start,
+                    sym.end,
+                    sym.digest,
+                    None if sym.shape is None else list(sym.shape),
+                ]
+                for name, sym in self.symbols.items()
+            },
+        }
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> SymbolLibIndex:
+        if data.get("version") != SYMBOL_LIB_INDEX_VERSION:
+            raise ValueError(f"Unsupported symbol lib index: {data.get('version')}")
+        return cls(
+            size=int(data["size"]),
+            mtime_ns=int(data["mtime_ns"]),
+            close=int(data["close"]),
+            needs_rewrite=bool(data["needs_rewrite"]),
+            symbols={
+                name: IndexedSymbol(
+                    int(start),
+                    int(end),
+                    str(digest),
+                    None if shape is None else SymbolShape(*shape),
+                )
+                for name, (start, end, digest, shape) in data["symbols"].items()
+            },
+        )
+
+
+def read_symbol_lib_version(lib_path: str | None) -> int:
+    """Return the .kicad_sym format version to use for the given library file.
+
+    - If lib_path is None or the file cannot be read: oldest known version.
+    - If the file has no (version ...) field: oldest known version.
+    - Otherwise: the largest known version that is <= the version in the file.
+    """
+    if lib_path is not None:
+        try:
+            with open(lib_path, encoding="utf-8") as f:
+                content = f.read(512)  # version is always near the top
+            match = re.search(r"\(version\s+(\d+)\)", content)
+            if match:
+                file_version = int(match.group(1))
+                result = KICAD_SYM_VERSIONS_SORTED[0]
+                for v in KICAD_SYM_VERSIONS_SORTED:
+                    if v <= file_version:
+                        result = v
+                return result
+        except OSError:
+            pass
+    return KICAD_SYM_VERSIONS_SORTED[0]
+
+
+def empty_symbol_lib(version: int, generator: str = GENERATOR_URL) -> str:
+    return f"(kicad_symbol_lib\n  (version {version})\n  (generator {generator})\n)"
+
+
+def rewrite_symbol_lib(
+    current: str, component_name: str, component_content: str
+) -> str:
+    """Return the library text *current* with the symbol added or replaced."""
+    pattern = _SYM_LIB_REGEX.format(component_name=re.escape(component_name))
+    if re.search(pattern, current, flags=re.DOTALL):
+        # Symbol exists — replace it
+        new_lib = re.sub(
+            pattern,
+            lambda _: component_content.rstrip("\n"),
+            current,
+            flags=re.DOTALL,
+        )
+    else:
+        # Symbol is new — insert before closing parenthesis
+        last_paren_pos = current.rfind(")")
+        if last_paren_pos == -1:
+            raise ValueError("Invalid KiCad library file: no closing parenthesis found")
+        sep = "" if component_content.endswith("\n") else "\n"
+        new_lib = (
+            current[:last_paren_pos]
+            + component_content
+            + sep
+            + current[last_paren_pos:]
+        )
+
+    return new_lib.replace(_EDITOR_GENERATOR.decode(), f"(generator {GENERATOR_URL})")
+
+
+def symbol_lib_index_path(lib_path: str) -> Path:
+    return Path(f"{lib_path}.idx")
+
+
+def symbol_lib_journal_path(lib_path: str) -> Path:
+    return Path(f"{lib_path}.journal")
+
+
+def recover_symbol_lib(lib_path: str) -> bool:
+    """Undo an append to the library that was interrupted.
+
+    The journal holds the end of the library as it was before the append.
+    It is dropped without restoring anything if the library has a size the
+    append cannot have left (it was rewritten since). Returns True if the
+    library was restored.
+    """
+    journal_path = symbol_lib_journal_path(lib_path)
+    try:
+        with open(journal_path, "rb") as journal_file:
+            journal = journal_file.read()
+    except FileNotFoundError:
+        return False
+    header, _, tail = journal.partition(b"\n")
+    try:
+        close, old_size, new_size = (int(value) for value in header.split())
+        size = os.stat(lib_path).st_size
+    except (ValueError, FileNotFoundError):
+        close = old_size = new_size = size = -1
+
+    restored = False
+    if 0 <= close and close + len(tail) == old_size <= size <= new_size:
+        with open(lib_path, "r+b") as lib_file:
+            lib_file.seek(close)
+            lib_file.write(tail)
+            lib_file.truncate()
+            lib_file.flush()
+            os.fsync(lib_file.fileno())
+        invalidate_symbol_lib_index(lib_path)
+        logging.warning(f"Restored {lib_path} after an interrupted write")
+        restored = True
+    else:
+        logging.warning(f"Ignoring stale journal {journal_path}")
+    journal_path.unlink()
+    return restored
+
+
+def _decode(data: bytes | bytearray) -> str:
+    # as read by Path.read_text
+    return data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+@lru_cache(maxsize=16)
+def _closing_regex(indent: bytes) -> re.Pattern[bytes]:
+    return re.compile(rb"\r?\n" + re.escape(indent) + rb"\)(?=\r?\n|\Z)")
+
+
+def _scan_symbols(data: bytes, base: int = 0) -> list[tuple[str, IndexedSymbol]]:
+    """Top-level symbols of *data* (sub-units are skipped), offsets + *base*."""
+    found: list[tuple[str, IndexedSymbol]] = []
+    pos = 0
+    while True:
+        header = _HEADER_REGEX.search(data, pos)
+        if header is None:
+            return found
+        closing = _closing_regex(header.group(1)).search(data, header.end())
+        if closing is None:
+            pos = header.end()
+            continue
+        start, end = header.start(), closing.end()
+        name = header.group(2).decode("utf-8")
+        found.append(
+            (name, IndexedSymbol(base + start, base + end, _digest(data[start:end])))
+        )
+        pos = end
+
+
+def scan_symbol_lib(data: bytes) -> SymbolLibIndex | None:
+    """Index the library *data*, None if it holds the same symbol twice."""
+    index = SymbolLibIndex(
+        close=data.rfind(b")"), needs_rewrite=_EDITOR_GENERATOR in data
+    )
+    for name, symbol in _scan_symbols(data):
+        if name in index.symbols:
+            return None
+        index.symbols[name] = symbol
+    return index
+
+
+def _stat(lib_path: str) -> tuple[int, int]:
+    stat = os.stat(lib_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _is_current(index: SymbolLibIndex, stat: tuple[int, int]) -> bool:
+    return (index.size, index.mtime_ns) == stat
+
+
+def _save(lib_path: str, index: SymbolLibIndex) -> None:
+    index.size, index.mtime_ns = _stat(lib_path)
+    _INDEX_CACHE[lib_path] = index
+    index_path = symbol_lib_index_path(lib_path)
+    tmp_path = index_path.with_name(f"{index_path.name}.tmp")
+    try:
+        tmp_path.write_text(json.dumps(index.to_json()), encoding="utf-8")
+        os.replace(tmp_path, index_path)
+    except OSError as e:
+        logging.debug(f"Could not write symbol lib index {index_path}: {e}")
+
+
+def invalidate_symbol_lib_index(lib_path: str) -> None:
+    """Forget the index after the library was rewritten as a whole."""
+    _INDEX_CACHE.pop(lib_path, None)
+    try:
+        symbol_lib_index_path(lib_path).unlink(missing_ok=True)
+    except OSError as e:
+        logging.debug(f"Could not remove symbol lib index of {lib_path}: {e}")
+
+
+def load_symbol_lib_index(lib_path: str, scan: bool = True) -> SymbolLibIndex | None:
+    """Index of the library at *lib_path*, scanning it only if needed.
+
+    Returns None if the library cannot be indexed (see ``scan_symbol_lib``)
+    or, with *scan* False, if there is no current index.
+    """
+    stat = _stat(lib_path)
+    cached = _INDEX_CACHE.get(lib_path)
+    if cached is not None and _is_current(cached, stat):
+        return cached
+
+    index_path = symbol_lib_index_path(lib_path)
+    if index_path.is_file():
+        try:
+            stored = SymbolLibIndex.from_json(
+                json.loads(index_path.read_text(encoding="utf-8"))
+            )
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logging.debug(f"Ignoring symbol lib index {index_path}: {e}")
+        else:
+            if _is_current(stored, stat):
+                _INDEX_CACHE[lib_path] = stored
+                return stored
+
+    if not scan:
+        return None
+    logging.debug(f"Indexing symbol lib: {lib_path}")
+    index = scan_symbol_lib(Path(lib_path).read_bytes())
+    if index is None:
+        invalidate_symbol_lib_index(lib_path)
+        return None
+    _save(lib_path, index)
+    return index
+
+
+def _splice_range(
+    index: SymbolLibIndex, component_name: str, component_content: str
+) -> tuple[int, int, bytes] | None:
+    """Byte range to replace and its new content, None if the symbol is unchanged."""
+    old = index.symbols.get(component_name)
+    if old is None:
+        # insert before the closing parenthesis of the library
+        sep = "" if component_content.endswith("\n") else "\n"
+        return index.close, index.close, _encode(component_content + sep)
+    new = _encode(component_content.rstrip("\n"))
+    if _digest(new) == old.digest:
+        return None
+    return old.start, old.end, new
+
+
+def _reindex(
+    index: SymbolLibIndex,
+    component_name: str,
+    start: int,
+    end: int,
+    new: bytes,
+    around: tuple[bytes, bytes],
+) -> bool:
+    """Update *index* after the bytes start:end were replaced by *new*.
+
+    *around* holds the byte before *start* and the two bytes after *end*.
+    Returns False if the library holds a symbol twice now.
+    """
+    index.symbols.pop(component_name, None)
+    delta = len(new) - (end - start)
+    for symbol in index.symbols.values():
+        if symbol.start >= end:
+            symbol.start += delta
+            symbol.end += delta
+    index.close += delta
+    before, after = around
+    for name, symbol in _scan_symbols(before + new + after, base=start - len(before)):
+        if name in index.symbols:
+            return False
+        index.symbols[name] = symbol
+    return True
+
+
+def splice_symbol(
+    lib_path: str,
+    component_name: str,
+    component_content: str,
+    stats: WriteStats | None = None,
+) -> bool:
+    """Add or replace a symbol by splicing its byte range.
+
+    The bytes around the range are copied as they are (nothing is parsed or
+    re-encoded) into a temporary file that replaces the library, so a crash
+    never leaves a half-written library. A symbol whose hash matches the index
+    is left untouched. Returns False if the library has to be rewritten as a
+    whole instead (it cannot be indexed or was saved by KiCad).
+    """
+    index = load_symbol_lib_index(lib_path)
+    if index is None or index.needs_rewrite or index.close == -1:
+        return False
+    if _EDITOR_GENERATOR.decode() in component_content:
+        return False
+    splice = _splice_range(index, component_name, component_content)
+    if stats is not None:
+        stats.record(splice is not None)
+    if splice is None:
+        return True
+    start, end, new = splice
+
+    with open(lib_path, "rb") as lib_file:
+        with atomic_file(lib_path) as out_file:
+            _copy_bytes(lib_file, out_file, start)
+            lib_file.seek(start - 1 if start else 0)
+            before = lib_file.read(1) if start else b""
+            out_file.write(new)
+            lib_file.seek(end)
+            after = lib_file.read(2)
+            out_file.write(after)
+            shutil.copyfileobj(lib_file, out_file)
+
+    if _reindex(index, component_name, start, end, new, (before, after)):
+        _save(lib_path, index)
+    else:
+        invalidate_symbol_lib_index(lib_path)
+    return True
+
+
+def _find_symbol(data: bytes | bytearray | mmap.mmap, component_name: str) -> bool:
+    """Byte search for a symbol, finding the same symbols as _SYM_LIB_REGEX."""
+    header = f'(symbol "{component_name}"'.encode()
+    pos = data.find(header)
+    while pos != -1:
+        line_start = data.rfind(b"\n", 0, pos) + 1
+        indent = bytes(data[line_start:pos])
+        if line_start and not indent.strip():
+            if _closing_regex(indent).search(data, pos):
+                return True
+        pos = data.find(header, pos + 1)
+    return False
+
+
+def find_symbol_in_lib(lib_path: str, component_name: str) -> bool:
+    """Whether the library holds the symbol, searched in a memory map of it."""
+    with open(lib_path, "rb") as lib_file:
+        try:
+            with mmap.mmap(lib_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return _find_symbol(data, component_name)
+        except ValueError:  # empty file
+            return False
+
+
+def _fill_shapes(index: SymbolLibIndex, data: bytes | bytearray) -> bool:
+    """Compute the missing symbol shapes of *index* from the library *data*.
+
+    Returns True if any shape was missing.
+    """
+    missing = [symbol for symbol in index.symbols.values() if symbol.shape is None]
+    for symbol in missing:
+        symbol.shape = symbol_shape(_decode(data[symbol.start : symbol.end]))
+    return bool(missing)
+
+
+def _indexed_shapes(lib_path: str) -> SymbolLibIndex | None:
+    """Index of the library file with all symbol shapes, None if not indexable."""
+    index = load_symbol_lib_index(lib_path)
+    if index is not None and _fill_shapes(index, Path(lib_path).read_bytes()):
+        _save(lib_path, index)
+    return index
+
+
+def _dedup_content(
+    index: SymbolLibIndex,
+    component_name: str,
+    component_content: str,
+    pending: dict[str, str] | None = None,
+) -> tuple[str, str | None]:
+    """*component_content* as a derived symbol if possible, see ``symbol_dedup``.
+
+    The base is the first complete symbol of the library with the same
+    geometry; it has to come before the symbol in the library. *pending* maps
+    the geometries of complete symbols to be appended to the library to
+    their names. All shapes of *index* must be known.
+
+    Returns the content and its geometry if it is written as a complete symbol.
+    """
+    geometry = symbol_shape(component_content).geometry
+    if geometry is None:
+        return component_content, None
+    current = index.symbols.get(component_name)
+    if current is not None:
+        derived = sum(
+            symbol.shape is not None and symbol.shape.extends == component_name
+            for symbol in index.symbols.values()
+        )
+        if derived:
+            if current.shape is not None and current.shape.geometry != geometry:
+                logging.warning(
+                    f"Symbol {component_name} is extended by {derived} symbol(s), "
+                    "they now use its new graphics and pins"
+                )
+            return component_content, geometry
+
+    base = min(
+        (
+            (symbol.start, name)
+            for name, symbol in index.symbols.items()
+            if name != component_name
+            and symbol.shape is not None
+            and symbol.shape.geometry == geometry
+            and (current is None or symbol.start < current.start)
+        ),
+        default=None,
+    )
+    if base is not None:
+        return derive_symbol(component_content, base[1]), None
+    if current is None and pending and geometry in pending:
+        return derive_symbol(component_content, pending[geometry]), None
+    return component_content, geometry
+
+
+def derive_in_symbol_lib(
+    lib_path: str, component_name: str, component_content: str
+) -> str:
+    """*component_content* as a derived symbol of a symbol of the library file
+    with the same geometry, unchanged if there is none."""
+    if not Path(lib_path).is_file():
+        return component_content
+    index = _indexed_shapes(lib_path)
+    if index is None or index.close == -1:
+        return component_content
+    return _dedup_content(index, component_name, component_content)[0]
+
+
+def _copy_bytes(src: BinaryIO, dst: BinaryIO, size: int) -> None:
+    """Copy the first *size* bytes of *src* to *dst*, in chunks."""
+    while size > 0:
+        chunk = src.read(min(size, 1 << 20))
+        if not chunk:
+            raise OSError("File shortened while being copied")
+        dst.write(chunk)
+        size -= len(chunk)
+
+
+def _replace_file(lib_path: str, data: bytes | bytearray) -> None:
+    write_atomic(lib_path, data)
+
+
+def compact_symbol_lib(lib_path: str) -> int | None:
+    """Write every symbol with the geometry of an earlier symbol as derived symbol.
+
+    Symbols that are extended by others stay complete. Returns the number of
+    symbols turned into derived symbols, None if the library cannot be indexed.
+    """
+    recover_symbol_lib(lib_path)
+    data = Path(lib_path).read_bytes()
+    index = scan_symbol_lib(data)
+    if index is None or index.close == -1:
+        logging.error(f"Can't compact {lib_path}: it holds a symbol twice")
+        return None
+    _fill_shapes(index, data)
+    extended = {
+        symbol.shape.extends for symbol in index.symbols.values() if symbol.shape
+    }
+
+    bases: dict[str, str] = {}
+    compacted = bytearray()
+    pos = count = 0
+    for name, symbol in sorted(index.symbols.items(), key=lambda x: x[1].start):
+        geometry = symbol.shape.geometry if symbol.shape else None
+        if geometry is None:
+            continue
+        base = bases.setdefault(geometry, name)
+        if base == name or name in extended:
+            continue
+        content = _decode(data[symbol.start : symbol.end])
+        compacted += data[pos : symbol.start] + _encode(derive_symbol(content, base))
+        pos = symbol.end
+        count += 1
+    if not count:
+        return 0
+
+    compacted += data[pos:]
+    _replace_file(
+        lib_path,
+        compacted.replace(_EDITOR_GENERATOR, f"(generator {GENERATOR_URL})".encode()),
+    )
+    invalidate_symbol_lib_index(lib_path)
+    return count
+
+
+class SymbolLibrary:
+    """A .kicad_sym library read at most once and written once.
+
+    Symbols written inside the ``with`` block are applied in memory and the
+    library is replaced atomically (temporary file + rename) when the block
+    is left. Existence checks use the index (or a byte search in a memory map
+    of the library) and do not read the library.
+
+    If only new symbols are written, the library is not parsed or loaded:
+    they are written in place over its closing parenthesis, which is written
+    again after them, so the cost does not depend on the size of the library.
+    An append interrupted by a crash is undone when the library is opened
+    again, see ``recover_symbol_lib``.
+
+    With *dedup*, symbols with the graphics and pins of a symbol already in
+    the library are written as derived symbols of it, see ``symbol_dedup``.
+    """
+
+    def __init__(
+        self, lib_path: str, stats: WriteStats | None = None, dedup: bool = False
+    ) -> None:
+        self.lib_path = lib_path
+        recover_symbol_lib(lib_path)
+        self.changed = False
+        # symbols written and left unchanged, if given
+        self.stats = stats
+        self.dedup = dedup
+        self._data: bytearray | None = None
+        # index of self._data, None if the library cannot be indexed
+        self._index: SymbolLibIndex | None = None
+        # new symbols written while the library is not loaded
+        self._appended: dict[str, str] = {}
+        # geometry -> name of the complete symbols in self._appended
+        self._appended_bases: dict[str, str] = {}
+        # existence of symbols in the library file, see _on_disk
+        self._on_disk_cache: dict[str, bool] = {}
+
+    def __enter__(self) -> SymbolLibrary:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.flush()
+
+    @cached_property
+    def version(self) -> int:
+        """Format version of the library, see ``read_symbol_lib_version``."""
+        return read_symbol_lib_version(self.lib_path)
+
+    def _on_disk(self, component_name: str) -> bool:
+        if component_name not in self._on_disk_cache:
+            index = load_symbol_lib_index(self.lib_path, scan=False)
+            if index is not None:
+                found = component_name in index.symbols
+            else:
+                found = find_symbol_in_lib(self.lib_path, component_name)
+            self._on_disk_cache[component_name] = found
+        return self._on_disk_cache[component_name]
+
+    def _load(self, version: int) -> bytearray:
+        if self._data is None:
+            if not Path(self.lib_path).is_file():
+                self._data = bytearray(_encode(empty_symbol_lib(version)))
+                self._index = scan_symbol_lib(bytes(self._data))
+                logging.debug(f"Created symbol lib: {self.lib_path}")
+            else:
+                index = load_symbol_lib_index(self.lib_path)
+                self._data = bytearray(Path(self.lib_path).read_bytes())
+                if index is not None and index.size == len(self._data):
+                    # the cached index must stay valid for the file on disk
+                    self._index = copy.deepcopy(index)
+                else:
+                    self._index = scan_symbol_lib(bytes(self._data))
+            appended, self._appended = self._appended, {}
+            self._appended_bases.clear()
+            for component_name, component_content in appended.items():
+                self._write_loaded(self._data, component_name, component_content)
+        return self._data
+
+    def id_already_in(self, component_name: str) -> bool:
+        """Same as ``id_already_in_symbol_lib``, for the library in memory."""
+        if self._data is None:
+            found = component_name in self._appended or (
+                Path(self.lib_path).is_file() and self._on_disk(component_name)
+            )
+        elif self._index is not None:
+            found = component_name in self._index.symbols
+        else:
+            found = _find_symbol(self._data, component_name)
+        if found:
+            logging.warning(f"This id is already in {self.lib_path}")
+        return found
+
+    def write_component(
+        self,
+        component_name: str,
+        component_content: str,
+        version: int = KICAD_SYM_VERSIONS_SORTED[0],
+    ) -> None:
+        """Add or replace a symbol, see ``write_component_in_symbol_lib_file``.
+
+        *version* is only used if the library does not exist yet.
+        """
+        if self.dedup:
+            component_content = self._derive(component_name, component_content, version)
+        if self._data is None and self._unchanged_on_disk(
+            component_name, component_content
+        ):
+            written = False
+        elif (
+            self._data is None
+            and component_name not in self._appended
+            and Path(self.lib_path).is_file()
+            and not self._on_disk(component_name)
+            and _EDITOR_GENERATOR.decode() not in component_content
+        ):
+            self._appended[component_name] = component_content
+            self.changed = written = True
+        else:
+            written = self._write_loaded(
+                self._load(version), component_name, component_content
+            )
+        if self.stats is not None:
+            self.stats.record(written)
+
+    def _derive(self, component_name: str, component_content: str, version: int) -> str:
+        """The symbol as a derived symbol if possible, see ``_dedup_content``."""
+        if self._data is None and component_name in self._appended:
+            self._load(version)
+        if self._data is not None:
+            if self._index is None or self._index.close == -1:
+                return component_content
+            _fill_shapes(self._index, self._data)
+            return _dedup_content(self._index, component_name, component_content)[0]
+
+        if not Path(self.lib_path).is_file():
+            return component_content
+        index = _indexed_shapes(self.lib_path)
+        if index is None or index.close == -1:
+            return component_content
+        content, geometry = _dedup_content(
+            index, component_name, component_content, self._appended_bases
+        )
+        if geometry is not None and component_name not in index.symbols:
+            # appended when the library is written
+            self._appended_bases.setdefault(geometry, component_name)
+        return content
+
+    def _unchanged_on_disk(self, component_name: str, component_content: str) -> bool:
+        """Whether the library file holds the symbol as is, known from its index."""
+        if component_name in self._appended or not Path(self.lib_path).is_file():
+            return False
+        index = load_symbol_lib_index(self.lib_path, scan=False)
+        return (
+            index is not None
+            and not index.needs_rewrite
+            and component_name in index.symbols
+            and _splice_range(index, component_name, component_content) is None
+        )
+
+    def _write_loaded(
+        self, data: bytearray, component_name: str, component_content: str
+    ) -> bool:
+        """Apply a symbol to the library in memory, returns False if unchanged."""
+        index = self._index
+        if index is None or index.close == -1:
+            new_lib = _encode(
+                rewrite_symbol_lib(_decode(data), component_name, component_content)
+            )
+            if new_lib == data:
+                return False
+            data[:] = new_lib
+            self.changed = True
+            return True
+
+        splice = _splice_range(index, component_name, component_content)
+        if splice is not None:
+            start, end, new = splice
+            around = (bytes(data[start - 1 : start]), bytes(data[end : end + 2]))
+            data[start:end] = new
+            if not _reindex(index, component_name, start, end, new, around):
+                self._index = None
+            self.changed = True
+            return True
+        if index.needs_rewrite:
+            # the generator is replaced on every write
+            self.changed = True
+            return True
+        return False
+
+    def _append_in_place(self) -> bool:
+        """Insert the new symbols before the closing parenthesis of the library.
+
+        Only the end of the file is written: the new symbols go over the
+        closing parenthesis, which is written again after them. The bytes
+        from the parenthesis on are saved to the journal (and synced) first;
+        a failed write is undone right away, a crash when the library is
+        opened again. Returns False if the library has to be rewritten as a
+        whole instead.
+        """
+        index = load_symbol_lib_index(self.lib_path, scan=False)
+        with open(self.lib_path, "rb") as lib_file:
+            try:
+                with mmap.mmap(lib_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    close = data.rfind(b")")
+                    if index is not None:
+                        needs_rewrite = index.needs_rewrite
+                    else:
+                        needs_rewrite = data.find(_EDITOR_GENERATOR) != -1
+                    if close == -1 or needs_rewrite:
+                        return False
+                    before, tail = data[close - 1 : close], data[close:]
+            except ValueError:  # empty file
+                return False
+        new = b"".join(
+            _encode(content if content.endswith("\n") else content + "\n")
+            for content in self._appended.values()
+        )
+        journal_path = symbol_lib_journal_path(self.lib_path)
+        old_size = close + len(tail)
+        with open(self.lib_path, "r+b") as lib_file:
+            header = f"{close} {old_size} {old_size + len(new)}\n".encode()
+            write_atomic(journal_path, header + tail, fsync=True)
+            fsync_directory(journal_path.parent)
+            try:
+                lib_file.seek(close)
+                lib_file.write(new + tail)
+                lib_file.flush()
+                os.fsync(lib_file.fileno())
+            except BaseException:
+                try:
+                    lib_file.close()
+                except OSError:
+                    pass
+                recover_symbol_lib(self.lib_path)
+                raise
+        journal_path.unlink()
+        self._appended.clear()
+
+        if index is None:
+            return True
+        index.close += len(new)
+        for name, symbol in _scan_symbols(
+            before + new + tail[:2], base=close - len(before)
+        ):
+            if name in index.symbols:
+                invalidate_symbol_lib_index(self.lib_path)
+                return True
+            index.symbols[name] = symbol
+        _save(self.lib_path, index)
+        return True
+
+    def flush(self) -> None:
+        """Write the library if symbols were added or replaced."""
+        if not self.changed:
+            return
+        self._on_disk_cache.clear()
+        if self._data is None:
+            if self._append_in_place():
+                self.changed = False
+                return
+        data = self._load(KICAD_SYM_VERSIONS_SORTED[0])
+
+        index = self._index
+        if _EDITOR_GENERATOR in data:
+            data[:] = data.replace(
+                _EDITOR_GENERATOR, f"(generator {GENERATOR_URL})".encode()
+            )
+            index = self._index = scan_symbol_lib(bytes(data))
+
+        _replace_file(self.lib_path, data)
+        self.changed = False
+
+        if index is None:
+            invalidate_symbol_lib_index(self.lib_path)
+        else:
+            _save(self.lib_path, copy.deepcopy(index))
@@ -7,6 +7,8 @@ from pathlib import Path
 
 import pytest
 
+from easyeda2kicad.kicad import geometry_kernel as gk
+
 
 def pytest_addoption(parser: pytest.Parser) -> None:
     """Add custom command line options."""
@@ -38,3 +40,12 @@ def reference_dir() -> Path:
     ref_dir = Path(__file__).parent / "reference_outputs"
     ref_dir.mkdir(exist_ok=True)
     return ref_dir
+
+
+@pytest.fixture(params=[False, True], ids=["array", "numpy"])
+def backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> bool:
+    """Run the geometry kernel with array("d") columns and with NumPy."""
+    if request.param and not gk.HAS_NUMPY:
+        pytest.skip("numpy not installed")
+    monkeypatch.setattr(gk, "HAS_NUMPY", request.param)
+    return bool(request.param)
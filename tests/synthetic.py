@@ -0,0 +1,370 @@
+"""Synthetic EasyEDA API payloads for benchmarks and scaling tests.
+
+The generated shape strings follow the real EasyEDA formats closely enough to
+exercise every importer/exporter branch (pins with dots/clocks, rounded
+rectangles, paths, arcs, all pad shapes, tracks, solid regions, a 3D node).
+``FakeApi`` and ``seed_cache`` feed such payloads to the CLI code paths without
+network access.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from pathlib import Path
+from typing import Any
+
+
+def pin_line(
+    i: int,
+    x: float,
+    y: float,
+    rot: int,
+    name: str,
+    num: str,
+    dot: int = 0,
+    clock: int = 0,
+) -> str:
+    length = 10 if i % 3 else 20
+    sign = -1 if rot in (0, 90) else 1
+    h = f"h {sign * length}" if i % 4 else f"v {sign * length}"
+    return (
+        f"P~show~{i % 5}~{num}~{x}~{y}~{rot}~gge{i}~0"
+        f"^^{x}~{y}"
+        f"^^M {x} {y} {h}~#880000"
+        f"^^1~{x + 3}~{y + 4}~0~{name}~start~~~#0000FF"
+        f"^^1~{x - 4}~{y - 1}~0~{num}~end~~~#0000FF"
+        f"^^{dot}~{x + 1}~{y}"
+        f"^^{clock}~M {x} {y - 3} L {x + 3} {y} L {x} {y + 3}"
+    )
+
+
+def symbol_shapes(
+    pins: int, polylines: int, seed: int = 0, extras: bool = True
+) -> list[str]:
+    shapes = []
+    side = max(1, pins // 4)
+    for i in range(pins):
+        s = i // side % 4
+        k = i % side
+        if s == 0:
+            x, y, rot = 390, 300 + 10 * k, 180
+        elif s == 1:
+            x, y, rot = 510, 300 + 10 * k, 0
+        elif s == 2:
+            x, y, rot = 400 + 10 * k, 290, 90
+        else:
+            x, y, rot = 400 + 10 * k, 410 + seed, 270
+        name = f"IO{i}#" if i % 7 == 0 else (f"A/B{i}" if i % 11 == 0 else f"P {i}")
+        shapes.append(
+            pin_line(
+                i,
+                x,
+                y,
+                rot,
+                name,
+                str(i + 1),
+                dot=int(i % 5 == 0),
+                clock=int(i % 6 == 0),
+            )
+        )
+    for i in range(polylines):
+        pts = " ".join(
+            f"{400 + (i + j) % 50 + 0.5} {300 + (i * j) % 40}" for j in range(4)
+        )
+        fill = "#880000" if i % 3 == 0 else "none"
+        shapes.append(f"PL~{pts}~#880000~1~0~{fill}~ggepl{i}~0")
+    if extras:
+        shapes += [
+            "R~400~290~~~110~120~#880000~1~0~#FFFFFF~gger1~0",
+            "R~405~295~2~2~20~10~#880000~1~0~none~gger2~0",
+            "PG~400 300 410 300 405 310~#880000~1~0~none~ggepg~0",
+            "PT~M 400 300 L 410 300 C 412 305 414 305 416 300 Z~#880000~1~0~none~ggept1~0",
+            "PT~M 400 320 Q 405 315 410 320 L 420 325~#880000~1~0~none~ggept2~0",
+            "C~405~305~5~#880000~1~0~none~ggec~0",
+            "C~425.5~305~2.5~#880000~1~0~#880000~ggec2~0",
+            "E~405~315~5~5~#880000~1~0~none~ggee~0",
+            "E~405~315~5~3~#880000~1~0~none~ggee2~0",
+            "A~M 400 300 A 10 10 0 0 1 410 310~~#880000~1~0~none~ggea~0",
+            "A~M 420 300 A 5 8 30 1 0 430 305~~#880000~1~0~none~ggea2~0",
+            'T~L~400~280~0~#0000FF~~7pt~~~start~comment~Hello "x"~1~start~ggt~0~pinpart',
+            "T~L~400~285~90~#0000FF~~9~~~start~comment~Vert~1~start~ggt2~0~pinpart",
+        ]
+    return shapes
+
+
+def footprint_shapes(pads: int, tracks: int, regions: int, seed: int = 0) -> list[str]:
+    shapes = []
+    n = max(1, int(math.sqrt(max(pads, 1))))
+    for i in range(pads):
+        x = 4000 + (i % n) * 3.937 - n * 2
+        y = 3000 + (i // n) * 3.937 - n * 2
+        kind = i % 6
+        if kind == 0:
+            shapes.append(
+                f"PAD~RECT~{x}~{y}~2.5~1.2~1~GND~{i + 1}~0~~{(i * 45) % 360}~ggp{i}~0~~Y~0~0~0.2~{x},{y}"
+            )
+        elif kind == 1:
+            shapes.append(
+                f"PAD~ELLIPSE~{x}~{y}~2~2~1~~A({i + 1})~0~~0~ggp{i}~0~~Y~0~0~0.2~"
+            )
+        elif kind == 2:
+            shapes.append(
+                f"PAD~OVAL~{x}~{y}~6~3~11~~{i + 1}~1.2~~270~ggp{i}~0~~Y~0~0~0.2~"
+            )
+        elif kind == 3:
+            shapes.append(
+                f"PAD~OVAL~{x}~{y}~6~9~11~~{i + 1}~1~~90~ggp{i}~4~~Y~0~0~0.2~"
+            )
+        elif kind == 4:
+            pts = (
+                f"{x - 1} {y - 1} {x + 1.5} {y - 1} {x + 1} {y + 1} {x - 1} {y + 1.25}"
+            )
+            shapes.append(
+                f"PAD~POLYGON~{x}~{y}~3~3~1~~{i + 1}~0~{pts}~0~ggp{i}~0~~Y~0~0~0.2~"
+            )
+        else:
+            shapes.append(
+                f"PAD~RECT~{x}~{y}~2~2~2~~{i + 1}~0~~181~ggp{i}~0~~N~0~0~0.2~"
+            )
+    for i in range(tracks):
+        pts = " ".join(
+            f"{3980 + (i * 7 + j * 3) % 40} {2980 + (i * 3 + j * 5) % 40}"
+            for j in range(3 + i % 3)
+        )
+        layer = [3, 4, 13, 99, 12, 10][i % 6]
+        shapes.append(f"TRACK~{0.5 + (i % 3) * 0.25}~{layer}~~{pts}~ggt{i}~0")
+    for i in range(regions):
+        x = 3990 + (i % 20)
+        y = 2990 + (i // 20) % 20
+        layer = [3, 4, 13, 14, 99, 100, 5][i % 7]
+        kind = ["solid", "npth", "cutout"][i % 3]
+        if i % 4 == 0:
+            path = f"M {x} {y} L {x + 2} {y} L {x + 2} {y + 2} L {x} {y + 2} Z"
+        elif i % 4 == 1:
+            path = f"M{x},{y} H{x + 3} V{y + 3} H{x} Z"
+        elif i % 4 == 2:
+            path = f"M {x} {y} L {x + 3} {y} A 1.5 1.5 0 0 1 {x + 3} {y + 3} L {x} {y + 3} Z"
+        else:
+            path = f"M {x} {y} L {x + 1} {y}"
+        shapes.append(f"SOLIDREGION~{layer}~~{path}~{kind}~ggr{i}~~~~0")
+    shapes += [
+        "CIRCLE~4000~3000~2~1~3~ggc1~0",
+        "CIRCLE~4010~3000~1.5~0.5~101~ggc2~0",
+        "ARC~1~3~~M 3990 3000 A 10 10 0 0 1 4010 3000~~gga1~0",
+        "ARC~0.8~13~~M3990,3005 A12,8 30 1 0 4005,3015~~gga2~0",
+        "ARC~0.8~13~~M 3990 3005 A 0 0 0 1 0 4005 3015~~gga3~0",
+        "RECT~3990~2990~20~20~3~ggr1~0~1~none~",
+        "RECT~3992~2992~5~5~13~ggr2~0~~none~",
+        "TEXT~P~4000~2980~0.8~0~0~3~~4.5~REF~M 1 1~~ggtx1~0",
+        "TEXT~N~4000~3020~0.8~270~0~4~~6~VAL~M 1 1~none~ggtx2~0",
+        "HOLE~4000~3010~1.5~ggh1~0",
+        "VIA~4005~3005~2.4~~0.6~ggv1~0",
+    ]
+    node = {
+        "gId": "g1",
+        "nodeName": "g",
+        "nodeType": 1,
+        "layerid": "19",
+        "attrs": {
+            "c_width": "20",
+            "c_height": "20",
+            "c_rotation": "0,0,90",
+            "z": "1.5",
+            "id": "g1",
+            "uuid": f"model{seed}",
+            "c_origin": f"{4000 + seed},3001",
+            "title": f"MODEL_{seed}",
+            "layerid": "19",
+        },
+        "childNodes": [
+            {
+                "gId": "g1_o",
+                "nodeName": "polyline",
+                "attrs": {"points": "3990 2990 4012 2990 4012 3010 3990 3010"},
+            }
+        ],
+    }
+    shapes.append("SVGNODE~" + json.dumps(node))
+    return shapes
+
+
+def obj_text(vertices: int, materials: int = 2) -> str:
+    out = []
+    for m in range(materials):
+        out.append(
+            f"newmtl mat{m}\nKa 0.{m + 1} 0.2 0.3\nKd 0.{m + 4} 0.5 0.6\nKs 0.1 0.1 0.1\nd 0.{m}\nendmtl\n"
+        )
+    for i in range(vertices):
+        out.append(
+            f"v {math.sin(i) * 3:.4f} {math.cos(i) * 2:.4f} {(i % 17) * 0.1:.4f}\n"
+        )
+    per = max(1, vertices // materials)
+    for m in range(materials):
+        out.append(f"usemtl mat{m}\n")
+        start = m * per + 1
+        for j in range(start, min(start + per, vertices) - 2, 2):
+            out.append(f"f {j}//{j} {j + 1}//{j + 1} {j + 2}//{j + 2}\n")
+    out.append("usemtl missing\nf 1 2 3\n")
+    return "".join(out)
+
+
+def cad_data(
+    name: str = "SYNTH",
+    pins: int = 16,
+    polylines: int = 4,
+    pads: int = 12,
+    tracks: int = 8,
+    regions: int = 8,
+    units: int = 0,
+    seed: int = 0,
+    lcsc: str = "C999",
+) -> dict[str, Any]:
+    def unit(n_pins: int, s: int) -> dict[str, Any]:
+        return {
+            "dataStr": {
+                "head": {"x": "455", "y": "355", "c_para": {"name": name, "pre": "U?"}},
+                "BBox": {"x": "385", "y": "285", "width": "130", "height": "130"},
+                "shape": symbol_shapes(n_pins, 1, seed=s, extras=False),
+            }
+        }
+
+    data: dict[str, Any] = {
+        "title": name,
+        "description": "Synthetic part",
+        "tags": ["synthetic", "bench"],
+        "lcsc": {"number": lcsc, "url": f"https://lcsc.com/{lcsc}"},
+        "SMT": True,
+        "dataStr": {
+            "head": {
+                "x": "455",
+                "y": "355",
+                "c_para": {
+                    "name": f"{name}(TR)",
+                    "pre": "U?",
+                    "package": f"PKG-{name}",
+                    "Manufacturer": "ACME",
+                    "Manufacturer Part": f"{name}-MPN",
+                },
+            },
+            "BBox": {"x": "385.3", "y": "285.7", "width": "130", "height": "130"},
+            "shape": symbol_shapes(pins, polylines, seed=seed),
+        },
+        "packageDetail": {
+            "title": f"PKG-{name}",
+            "dataStr": {
+                "head": {
+                    "x": "4000",
+                    "y": "3000",
+                    "c_para": {"package": f"PKG-{name}", "3DModel": "m"},
+                },
+                "canvas": "CA~1000~1000~#000000~yes~#FFFFFF~10~1000~1000~line~0.5~mil~1~45~visible~0.5~4000~3000~0~yes",
+                "shape": footprint_shapes(pads, tracks, regions, seed=seed),
+                "BBox": {"x": "3980", "y": "2980", "width": "40", "height": "40"},
+            },
+        },
+    }
+    if units:
+        data["subparts"] = [unit(max(2, pins // units), s) for s in range(units)]
+    return data
+
+
+def bga_symbol_data(pins: int = 2000, lcsc: str = "C999") -> dict[str, Any]:
+    """Large single-unit symbol, e.g. a BGA with *pins* pins."""
+    return cad_data(name="BGA", pins=pins, polylines=20, pads=4, lcsc=lcsc)
+
+
+def large_footprint_data(pads: int = 1500, lcsc: str = "C999") -> dict[str, Any]:
+    """Footprint with *pads* pads of every shape plus tracks and regions."""
+    return cad_data(
+        name="FP", pins=4, pads=pads, tracks=pads // 4, regions=pads // 10, lcsc=lcsc
+    )
+
+
+def scaled_cad_data(size: int, lcsc: str = "C999") -> dict[str, Any]:
+    """Part with *size* pins and pads; polylines, tracks and regions grow along."""
+    return cad_data(
+        name="SCALE",
+        pins=size,
+        polylines=size // 10,
+        pads=size,
+        tracks=size // 4,
+        regions=size // 10,
+        lcsc=lcsc,
+    )
+
+
+def kicad_symbol(name: str, pins: int = 20) -> str:
+    """A .kicad_sym symbol entry as written by the exporter (~190 bytes per pin)."""
+    pin_lines = "".join(
+        f"      (pin passive line\n        (at -7.62 {i * 2.54:.2f} 0)\n"
+        f"        (length 2.54)\n"
+        f'        (name "P{i}" (effects (font (size 1.27 1.27))))\n'
+        f'        (number "{i + 1}" (effects (font (size 1.27 1.27))))\n      )\n'
+        for i in range(pins)
+    )
+    return (
+        f'\n  (symbol "{name}"\n    (in_bom yes)\n    (on_board yes)\n'
+        f'    (symbol "{name}_0_1"\n{pin_lines}    )\n  )\n'
+    )
+
+
+class FakeApi:
+    """Serves one synthetic component and counts the 3D downloads.
+
+    With *obj_vertices* the OBJ model is ``obj_text(obj_vertices)``.
+    """
+
+    use_cache = False
+    blob_store = None
+
+    def __init__(self, data: dict[str, Any], obj_vertices: int = 0) -> None:
+        self.data = data
+        self.obj_vertices = obj_vertices
+        self.downloads = 0
+
+    def get_cad_data_of_component(self, **_: Any) -> dict[str, Any]:
+        return self.data
+
+    def get_raw_3d_model_obj(self, uuid: str) -> str:
+        self.downloads += 1
+        if self.obj_vertices:
+            return obj_text(self.obj_vertices)
+        return "v 0 0 0\nv 1 0 0\nv 0 1 0\nf 1 2 3\n"
+
+    def get_step_3d_model(self, uuid: str) -> bytes:
+        self.downloads += 1
+        return b"STEP"
+
+
+def cli_arguments(tmp_path: Path, **actions: bool) -> dict[str, Any]:
+    """Validated ``_process_component`` arguments writing below *tmp_path*."""
+    args: dict[str, Any] = {
+        "output": str(tmp_path / "lib"),
+        "symbol": False,
+        "footprint": False,
+        "svg": False,
+        "3d": False,
+        "overwrite": False,
+        "project_relative": False,
+        "use_cache": False,
+        "custom_fields": {},
+    }
+    args.update(actions)
+    return args
+
+
+def seed_cache(work: Path, components: dict[str, dict[str, Any]]) -> None:
+    """Write *components* (LCSC id -> cad data) and their 3D models into the
+    ``.easyeda_cache`` folder below *work*, as a warm ``--use-cache`` run sees it.
+    """
+    cache = work / ".easyeda_cache"
+    cache.mkdir(parents=True, exist_ok=True)
+    for lcsc_id, data in components.items():
+        payload = {"success": True, "result": data}
+        (cache / f"{lcsc_id}.json").write_text(json.dumps(payload))
+        for line in data["packageDetail"]["dataStr"]["shape"]:
+            if line.startswith("SVGNODE~"):
+                uuid = json.loads(line.split("~")[1])["attrs"]["uuid"]
+                (cache / f"{uuid}.obj").write_text(obj_text(100 + len(uuid)))
+                (cache / f"{uuid}.step").write_bytes(uuid.encode() * 8)
@@ -0,0 +1,316 @@
+"""Tests for the OBJ parser and the OBJ to WRL conversion."""
+
+from __future__ import annotations
+
+import io
+import logging
+import mmap
+import re
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from easyeda2kicad.easyeda.parameters_easyeda import Ee3dModel, Ee3dModelBase
+from easyeda2kicad.kicad.export_kicad_3d_model import (
+    VRML_HEADER,
+    generate_wrl_model,
+    get_materials,
+    get_vertices,
+    parse_obj,
+)
+from easyeda2kicad.kicad.parameters_kicad_footprint import Ki3dModel, Ki3dModelBase
+
+from .synthetic import obj_text
+
+# ---------------------------------------------------------------------------
+# Conversion before the single-pass parser, the reference for the output
+# ---------------------------------------------------------------------------
+
+
+def _legacy_materials(obj_data: str) -> dict[str, dict[str, str | list[str]]]:
+    material_regex = "newmtl .*?endmtl"
+    matchs = re.findall(pattern=material_regex, string=obj_data, flags=re.DOTALL)
+
+    materials = {}
+    for match in matchs:
+        material = {}
+        material_id = None
+        for value in match.splitlines():
+            if value.startswith("newmtl"):
+                material_id = value.split()[1]
+            elif value.startswith("Ka"):
+                material["ambient_color"] = value.split()[1:]
+            elif value.startswith("Kd"):
+                material["diffuse_color"] = value.split()[1:]
+            elif value.startswith("Ks"):
+                material["specular_color"] = value.split()[1:]
+            elif value.startswith("d "):
+                # EasyEDA uses d as transparency directly (0.0 = opaque, 1.0 = transparent),
+                # which matches VRML transparency semantics — use value as-is.
+                try:
+                    material["transparency"] = str(round(float(value.split()[1]), 4))
+                except (ValueError, IndexError):
+                    material["transparency"] = "0"
+
+        if material_id is not None:
+            materials[material_id] = material
+    return materials
+
+
+def _legacy_vertices(
+    obj_data: str,
+    offset_x: float = 0.0,
+    offset_y: float = 0.0,
+    offset_z: float = 0.0,
+) -> list[str]:
+    result = []
+    for line in obj_data.splitlines():
+        parts = line.split()
+        if len(parts) < 4 or parts[0] != "v":
+            continue
+        x, y, z = float(parts[1]), float(parts[2]), float(parts[3])
+        result.append(
+            " ".join(
+                [
+                    str(round((x + offset_x) / 2.54, 4)),
+                    str(round((y + offset_y) / 2.54, 4)),
+                    str(round((z + offset_z) / 2.54, 4)),
+                ]
+            )
+        )
+    return result
+
+
+def _legacy_bbox(
+    raw_obj: str,
+) -> tuple[tuple[float, float], tuple[float, float], tuple[float, float]] | None:
+    """Returns ((x_min, x_max), (y_min, y_max), (z_min, z_max)) or None if no vertices."""
+    x_vals, y_vals, z_vals = [], [], []
+    for line in raw_obj.splitlines():
+        parts = line.split()
+        if len(parts) < 4 or parts[0] != "v":
+            continue
+        x_vals.append(float(parts[1]))
+        y_vals.append(float(parts[2]))
+        z_vals.append(float(parts[3]))
+
+    if not x_vals:
+        return None
+
+    return (
+        (min(x_vals), max(x_vals)),
+        (min(y_vals), max(y_vals)),
+        (min(z_vals), max(z_vals)),
+    )
+
+
+def _legacy_generate_wrl_model(model_3d: Ee3dModel) -> Ki3dModel:
+    if not model_3d.raw_obj:
+        return Ki3dModel(
+            translation=Ki3dModelBase(),
+            rotation=Ki3dModelBase(),
+            name=model_3d.name,
+            raw_wrl=None,
+        )
+
+    materials = _legacy_materials(obj_data=model_3d.raw_obj)
+
+    # Step 1: Center XY on (0,0); shift Z so bottom sits at z=0 (always).
+    # Step 2: Apply EE metadata offset (c_origin - canvas_origin) in mm.
+    # translate(-bbox_cx, -bbox_cy, -z_min) then apply EE offset,
+    # applied unconditionally for both SMD and THT.
+    offset_x, offset_y, offset_z = 0.0, 0.0, 0.0
+    bbox = _legacy_bbox(model_3d.raw_obj)
+    if bbox:
+        (x_min, x_max), (y_min, y_max), (z_min, _) = bbox
+        offset_x = -(x_min + x_max) / 2.0
+        offset_y = -(y_min + y_max) / 2.0
+        offset_z = -z_min
+    # Add EE placement offset (already in mm, same unit as OBJ vertices)
+    offset_x += model_3d.translation.x
+    offset_y += model_3d.translation.y
+    offset_z += model_3d.translation.z
+    logging.debug(
+        f"3D centering offset: X={offset_x:.2f} Y={offset_y:.2f} Z={offset_z:.2f}"
+    )
+
+    vertices = _legacy_vertices(
+        obj_data=model_3d.raw_obj,
+        offset_x=offset_x,
+        offset_y=offset_y,
+        offset_z=offset_z,
+    )
+
+    raw_wrl = VRML_HEADER
+    shapes = model_3d.raw_obj.split("usemtl")[1:]
+    if not shapes:
+        logging.warning(
+            f"3D model '{model_3d.name}': OBJ has no 'usemtl' sections; no geometry exported"
+        )
+        return Ki3dModel(
+            translation=Ki3dModelBase(),
+            rotation=Ki3dModelBase(),
+            name=model_3d.name,
+            raw_wrl=None,
+        )
+    for shape in shapes:
+        lines = shape.splitlines()
+        material_name = lines[0].replace(" ", "")
+        material = materials.get(material_name)
+        if material is None:
+            logging.warning(
+                f"3D model material '{material_name}' not found, skipping shape"
+            )
+            continue
+        index_counter = 0
+        link_dict = {}
+        coord_index = []
+        points = []
+        for line in lines[1:]:
+            if line.strip() and line.split()[0] == "f":
+                face = [int(tok.split("/")[0]) for tok in line.split()[1:]]
+                face_index = []
+                for index in face:
+                    if index not in link_dict:
+                        link_dict[index] = index_counter
+                        face_index.append(str(index_counter))
+                        points.append(vertices[index - 1])
+                        index_counter += 1
+                    else:
+                        face_index.append(str(link_dict[index]))
+                face_index.append("-1")
+                coord_index.append(",".join(face_index) + ",")
+
+        # ambientIntensity: VRML expects a scalar (0-1), not an RGB triplet.
+        # Compute luminance from Ka using Rec.601 weights.
+        try:
+            ka = material.get("ambient_color", ["0.2", "0.2", "0.2"])
+            ambient_intensity = round(
+                0.299 * float(ka[0]) + 0.587 * float(ka[1]) + 0.114 * float(ka[2]), 4
+            )
+        except (ValueError, IndexError):
+            ambient_intensity = 0.2
+
+        transparency = material.get("transparency", "0")
+
+        shape_str = textwrap.dedent(
+            f"""
+            Shape{{
+                appearance Appearance {{
+                    material  Material 	{{
+                        diffuseColor {" ".join(material["diffuse_color"])}
+                        specularColor {" ".join(material["specular_color"])}
+                        ambientIntensity {ambient_intensity}
+                        transparency {transparency}
+                        shininess 0.5
+                    }}
+                }}
+                geometry IndexedFaceSet {{
+                    ccw TRUE
+                    solid FALSE
+                    coord DEF co Coordinate {{
+                        point [
+                            {(", ").join(points)}
+                        ]
+                    }}
+                    coordIndex [
+                        {"".join(coord_index)}
+                    ]
+                }}
+            }}"""
+        )
+
+        raw_wrl += shape_str
+
+    return Ki3dModel(
+        translation=Ki3dModelBase(),
+        rotation=Ki3dModelBase(),
+        name=model_3d.name,
+        raw_wrl=raw_wrl,
+    )
+
+
+MATERIAL = "newmtl m\nKa 0.2 0.2 0.2\nKd 1 0 0\nKs 0.5 0.5 0.5\nd 0.25\nendmtl\n"
+
+# OBJ files, in the layout of EasyEDA and with less common syntax
+OBJS = {
+    "synthetic": obj_text(300, materials=3),
+    "crlf": obj_text(50).replace("\n", "\r\n"),
+    "materials last": "v 0 0 0\nv 1 0 0\nv 0 1 2\nusemtl m\nf 1 2 3\n" + MATERIAL,
+    "relative and shared indices": (
+        MATERIAL + "v 0 0 0\nv 1 0 0\nv 0 1 2\nv 5 5 5\n"
+        "usemtl m\nf 1/1/1 2/2/2 3\nf -1 3 4\nusemtl  m \nf 4 2 1\nf\n"
+    ),
+    "empty sections": MATERIAL + "v 1 2 3\nusemtl m\nusemtl m\n",
+    # with the translation 0.0 the y offset is -0.0, z is NaN
+    "signed zeros": MATERIAL + "v 0 0 nan\nv -0 -0 1\nv 1 0 2\nusemtl m\nf 1 2 3\n",
+    "inline keywords": (
+        "# newmtl c\nKd 1 1 1\nKs 0 0 0 endmtl newmtl m\nKd 0 0 1\nKs 1 1 1\nendmtl\n"
+        "v 0 0 0\nv 1 0 0\nv 0 1 2\nusemtl m\nf 1 2 3 usemtl c\nf 3 2 1\n"
+    ),
+}
+
+
+def _model(raw_obj: str, translation: float = 0.0) -> Ee3dModel:
+    return Ee3dModel(
+        name="MODEL",
+        uuid="uuid",
+        translation=Ee3dModelBase(translation, -translation, translation / 2),
+        rotation=Ee3dModelBase(),
+        raw_obj=raw_obj,
+    )
+
+
+class TestParseObj:
+    @pytest.mark.parametrize("name", OBJS)
+    def test_matches_legacy(self, name: str) -> None:
+        raw_obj = OBJS[name]
+        model = parse_obj(raw_obj)
+        assert model.materials == _legacy_materials(raw_obj)
+        # repr tells NaN and -0.0 apart
+        assert repr(model.bbox()) == repr(_legacy_bbox(raw_obj))
+        assert get_vertices(raw_obj, 1, 2, 3) == _legacy_vertices(raw_obj, 1, 2, 3)
+        assert get_materials(raw_obj) == _legacy_materials(raw_obj)
+
+    def test_sections(self) -> None:
+        model = parse_obj(OBJS["relative and shared indices"])
+        assert [s.material for s in model.shapes] == ["m", "m"]
+        assert list(model.shapes[0].corners) == [1, 2, 3, -1, 3, 4]
+        assert list(model.shapes[0].face_ends) == [3, 6]
+        assert list(model.shapes[1].face_ends) == [3, 3]
+
+    def test_sources(self, tmp_path: Path) -> None:
+        raw_obj = OBJS["crlf"]
+        expected = parse_obj(raw_obj)
+        path = tmp_path / "model.obj"
+        path.write_bytes(raw_obj.encode("utf-8"))
+        assert parse_obj(raw_obj.encode("utf-8")) == expected
+        assert parse_obj(io.StringIO(raw_obj, newline="")) == expected
+        with open(path, "rb") as file:
+            assert parse_obj(file) == expected
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                assert parse_obj(mapped) == expected
+
+    def test_no_vertices(self) -> None:
+        assert parse_obj("usemtl m\n").bbox() is None
+
+
+class TestGenerateWrl:
+    @pytest.mark.parametrize("name", OBJS)
+    @pytest.mark.parametrize("translation", [0.0, 1.25])
+    def test_matches_legacy(
+        self, name: str, translation: float, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        model_3d = _model(OBJS[name], translation)
+        with caplog.at_level(logging.WARNING):
+            legacy = _legacy_generate_wrl_model(model_3d)
+        legacy_warnings = caplog.messages[:]
+        caplog.clear()
+        with caplog.at_level(logging.WARNING):
+            assert generate_wrl_model(model_3d) == legacy
+        assert caplog.messages == legacy_warnings
+
+    def test_without_sections(self) -> None:
+        assert generate_wrl_model(_model("v 1 2 3\n")).raw_wrl is None
+        assert generate_wrl_model(_model("")).raw_wrl is None
@@ -0,0 +1,252 @@
+"""Tests for converting components in worker processes (--jobs)."""
+
+from __future__ import annotations
+
+import copy
+import logging
+import pickle
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from easyeda2kicad.__main__ import main
+from easyeda2kicad.batch import ComponentConversion, FootprintBatch
+from easyeda2kicad.kicad import export_kicad_footprint
+from easyeda2kicad.kicad.export_kicad_footprint import ExporterFootprintKicad
+
+from .synthetic import FakeApi, cad_data, cli_arguments, seed_cache
+
+COMPONENTS = {
+    "C1": cad_data(name="ONE", pins=8, pads=8, seed=0),
+    "C2": cad_data(name="MULTI", units=2, pins=12, seed=1),
+    "C3": cad_data(name="THREE", pins=40, pads=40, tracks=20, seed=2),
+}
+
+
+def _run(work: Path, *extra: str) -> dict[str, bytes]:
+    out = work / "out"
+    out.mkdir(exist_ok=True)
+    rc = main(
+        [
+            "--lcsc_id",
+            *COMPONENTS,
+            "--full",
+            "--use-cache",
+            "--output",
+            str(out / "lib"),
+        ]
+        + list(extra)
+    )
+    assert rc == 0
+    return {
+        str(p.relative_to(out)): p.read_bytes()
+        for p in sorted(out.rglob("*"))
+        # the symbol lib index records the mtime of the library
+        if p.is_file() and p.suffix != ".idx"
+    }
+
+
+class TestProcessPool:
+    def test_pool_output_identical_to_serial(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.chdir(tmp_path)
+        seed_cache(tmp_path, COMPONENTS)
+        serial = _run(tmp_path)
+        for path in (tmp_path / "out").rglob("*"):
+            if path.is_file():
+                path.unlink()
+        pooled = _run(tmp_path, "--jobs", "2")
+        assert pooled == serial
+        assert "lib.pretty/PKG-ONE.kicad_mod" in pooled
+
+    def test_failed_conversion_only_fails_its_component(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        monkeypatch.chdir(tmp_path)
+        broken = cad_data(name="BAD", pins=4, seed=3)
+        broken["dataStr"]["head"] = {}  # the symbol cannot be imported
+        seed_cache(tmp_path, {**COMPONENTS, "C4": broken})
+        out = tmp_path / "out"
+        out.mkdir()
+        argv = ["--lcsc_id", "C1", "C4", "C3", "--full", "--use-cache"]
+        argv += ["--output", str(out / "lib"), "--jobs", "2"]
+        with caplog.at_level(logging.ERROR):
+            assert main(argv) == 1
+        assert "Failed to convert part C4" in caplog.text
+        symbols = (out / "lib.kicad_sym").read_text(encoding="utf-8")
+        assert '(symbol "ONE"' in symbols and '(symbol "THREE"' in symbols
+        assert '(symbol "BAD"' not in symbols
+        assert (out / "lib.pretty" / "PKG-THREE.kicad_mod").is_file()
+
+    def test_invalid_jobs(self) -> None:
+        assert main(["--lcsc_id", "C1", "--symbol", "--jobs", "-1"]) == 1
+
+
+def _through_process_boundary(conversion: ComponentConversion) -> ComponentConversion:
+    """What a worker (or the parent) receives from the pool."""
+    result: ComponentConversion = pickle.loads(pickle.dumps(conversion))  # noqa: S301
+    return result
+
+
+class TestComponentConversion:
+    def test_results_are_sent_back_without_inputs(self, tmp_path: Path) -> None:
+        api = FakeApi(COMPONENTS["C3"])
+        args = cli_arguments(tmp_path, symbol=True, footprint=True)
+        conversion = ComponentConversion(COMPONENTS["C3"], args, api)  # type: ignore[arg-type]
+
+        sent = _through_process_boundary(conversion)
+        assert sent.api is None
+        assert sent.cad_data == COMPONENTS["C3"]
+
+        returned = _through_process_boundary(sent.prepare())
+        assert returned.cad_data == {}
+        assert "symbol_exporter" not in vars(returned)
+        assert returned.footprint_info.name == "PKG-THREE"
+        assert returned.symbol_content == conversion.symbol_content
+        assert returned.footprint_content == conversion.footprint_content
+
+    def test_serial_conversion_is_lazy(self, tmp_path: Path) -> None:
+        args = cli_arguments(tmp_path, footprint=True)
+        conversion = ComponentConversion(COMPONENTS["C1"], args)
+        assert conversion.footprint_info.name == "PKG-ONE"
+        assert "footprint_content" not in vars(conversion)
+
+
+def _sharing(data: dict[str, Any], package_of: dict[str, Any]) -> dict[str, Any]:
+    """*data* with the package (footprint) of *package_of*."""
+    data = copy.deepcopy(data)
+    data["packageDetail"] = copy.deepcopy(package_of["packageDetail"])
+    return data
+
+
+# C11 and C13 share the package of C10, C12 has its own
+SHARED = {
+    "C10": cad_data(name="R0", pads=2, lcsc="C10"),
+    "C11": _sharing(cad_data(name="R1", lcsc="C11"), cad_data(name="R0", pads=2)),
+    "C12": cad_data(name="U0", pads=8, seed=1, lcsc="C12"),
+    "C13": _sharing(cad_data(name="R2", lcsc="C13"), cad_data(name="R0", pads=2)),
+}
+
+
+def _footprint_run(work: Path, components: dict[str, Any], *extra: str) -> int:
+    seed_cache(work, components)
+    out = work / "out"
+    out.mkdir(exist_ok=True)
+    argv = ["--lcsc_id", *components, "--footprint", "--use-cache"]
+    return main(argv + ["--output", str(out / "lib"), *extra])
+
+
+class TestFootprintBatch:
+    def test_shared_package_written_once(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        monkeypatch.chdir(tmp_path)
+        rendered = []
+        render = ExporterFootprintKicad.render
+        monkeypatch.setattr(
+            ExporterFootprintKicad,
+            "render",
+            lambda self, **kw: (
+                rendered.append(self.output.info.name) or render(self, **kw)
+            ),
+        )
+        with caplog.at_level(logging.INFO):
+            assert _footprint_run(tmp_path, SHARED) == 0
+
+        assert rendered == ["PKG-R0", "PKG-U0"]
+        pretty = tmp_path / "out" / "lib.pretty"
+        assert sorted(p.name for p in pretty.iterdir()) == [
+            "PKG-R0.kicad_mod",
+            "PKG-U0.kicad_mod",
+        ]
+        assert '"LCSC Part" "C10"' in (pretty / "PKG-R0.kicad_mod").read_text()
+        assert "4 footprints requested, 2 distinct written (dedup ratio 2.00)" in (
+            caplog.text
+        )
+
+    def test_pool_matches_serial(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.chdir(tmp_path)
+        assert _footprint_run(tmp_path, SHARED) == 0
+        pretty = tmp_path / "out" / "lib.pretty"
+        serial = {p.name: p.read_bytes() for p in pretty.iterdir()}
+        for path in pretty.iterdir():
+            path.unlink()
+        assert _footprint_run(tmp_path, SHARED, "--jobs", "2") == 0
+        assert {p.name: p.read_bytes() for p in pretty.iterdir()} == serial
+
+    def test_repeated_packages_are_not_converted_ahead(self, tmp_path: Path) -> None:
+        args = cli_arguments(tmp_path, footprint=True)
+        conversions = [ComponentConversion(data, args) for data in SHARED.values()]
+        FootprintBatch().mark_shared(conversions)
+        assert [c.footprint_shared for c in conversions] == [False, True, False, True]
+        for conversion in conversions:
+            conversion.prepare()
+        prepared = ["footprint_content" in vars(c) for c in conversions]
+        assert prepared == [True, False, True, False]
+
+    def test_collision_is_not_overwritten(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        monkeypatch.chdir(tmp_path)
+        # same package name, different pads
+        other = cad_data(name="R0", pads=4, seed=3, lcsc="C11")
+        components = {"C10": SHARED["C10"], "C11": other}
+        assert _footprint_run(tmp_path, components, "--overwrite") == 1
+        written = (tmp_path / "out" / "lib.pretty" / "PKG-R0.kicad_mod").read_text()
+        assert '"LCSC Part" "C10"' in written
+        assert "differs from the one written for C10" in caplog.text
+
+    def test_collision_keeps_other_outputs(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.chdir(tmp_path)
+        other = cad_data(name="R0", pads=4, seed=3, lcsc="C11")
+        components = {"C10": SHARED["C10"], "C11": other}
+        assert _footprint_run(tmp_path, components, "--overwrite", "--3d") == 1
+        # the footprint of C11 is skipped, its 3D model is still written
+        models = sorted(p.name for p in (tmp_path / "out" / "lib.3dshapes").iterdir())
+        assert models == [
+            "MODEL_0.step",
+            "MODEL_0.wrl",
+            "MODEL_3.step",
+            "MODEL_3.wrl",
+        ]
+
+    def test_failed_write_is_not_shared(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        monkeypatch.chdir(tmp_path)
+        write = export_kicad_footprint.write_atomic
+        calls = []
+
+        def fail_first(path: Path, data: bytes, fsync: bool = False) -> None:
+            calls.append(path)
+            if len(calls) == 1:
+                raise OSError(28, "No space left on device")
+            write(path, data, fsync=fsync)
+
+        monkeypatch.setattr(export_kicad_footprint, "write_atomic", fail_first)
+        with caplog.at_level(logging.INFO):
+            assert _footprint_run(tmp_path, SHARED) == 1
+
+        assert "Failed to write the footprint for ID: C10" in caplog.text
+        # C11 has the same package, it writes the footprint instead of C10
+        written = (tmp_path / "out" / "lib.pretty" / "PKG-R0.kicad_mod").read_text()
+        assert '"LCSC Part" "C11"' in written
+        assert "4 footprints requested, 2 distinct written" in caplog.text
@@ -0,0 +1,888 @@
+"""Micro-benchmarks for the import/export hot paths on large synthetic parts.
+
+Run with ``pytest tests/test_benchmarks.py -s`` to see the timings.
+Thresholds are deliberately loose so the suite stays stable on slow CI.
+"""
+
+from __future__ import annotations
+
+import gc
+import json
+import os
+import re
+import shutil
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import fields
+from pathlib import Path
+from typing import Any, get_type_hints
+
+import pytest
+
+from easyeda2kicad.__main__ import _process_component, main
+from easyeda2kicad.easyeda import easyeda_importer, iter_import
+from easyeda2kicad.easyeda.easyeda_importer import (
+    _SCHEMAS,
+    EasyedaFootprintImporter,
+    EasyedaSymbolImporter,
+    _converter_for,
+)
+from easyeda2kicad.easyeda.parameters_easyeda import (
+    Ee3dModel,
+    Ee3dModelBase,
+    EeFootprintArc,
+    EeFootprintCircle,
+    EeFootprintHole,
+    EeFootprintPad,
+    EeFootprintRectangle,
+    EeFootprintSolidRegion,
+    EeFootprintText,
+    EeFootprintTrack,
+    EeFootprintVia,
+    EeSymbolPinName,
+    EeSymbolPinSettings,
+    _safe_int,
+)
+from easyeda2kicad.easyeda.easyeda_svg_renderer import render_footprint_svg
+from easyeda2kicad.easyeda.svg_path_parser import (
+    _parse_svg_path_cached,
+    _path_commands,
+    parse_path,
+    parse_svg_path,
+)
+from easyeda2kicad.kicad import geometry_kernel as gk
+from easyeda2kicad.kicad import output_files, symbol_lib_index
+from easyeda2kicad.kicad.export_kicad_3d_model import generate_wrl_model
+from easyeda2kicad.kicad.export_kicad_footprint import (
+    ExporterFootprintKicad,
+    FootprintLibWriter,
+    _parse_solid_region_path,
+    compute_arc,
+    fp_to_ki,
+    write_footprint_file,
+)
+from easyeda2kicad.kicad.export_kicad_symbol import (
+    _SYM_LIB_REGEX,
+    convert_to_kicad,
+    id_already_in_symbol_lib,
+    write_component_in_symbol_lib_file,
+)
+from easyeda2kicad.kicad.footprint_columns import TrackColumns
+from easyeda2kicad.kicad.output_files import encode_text, write_atomic
+from easyeda2kicad.kicad.parameters_kicad_symbol import KICAD_SYM_VERSION_20251024
+from easyeda2kicad.kicad.symbol_lib_index import (
+    SymbolLibrary,
+    load_symbol_lib_index,
+)
+
+from .synthetic import (
+    FakeApi,
+    bga_symbol_data,
+    cad_data,
+    cli_arguments,
+    kicad_symbol,
+    large_footprint_data,
+    obj_text,
+    seed_cache,
+)
+from .test_3d_model import _legacy_generate_wrl_model
+from .test_footprint_writer import _legacy_render
+from .test_symbol_lib_index import LIB_HEADER, _legacy_write
+
+pytestmark = pytest.mark.slow
+
+
+def _best_of(func: Callable[[], Any], repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+# Per-line construction as it was done before the schema cache:
+# dataclasses.fields() and typing.get_type_hints() on every shape line.
+def _legacy_build(cls: type, values: list[str], convert: bool = True) -> Any:
+    field_dict = dict(zip([f.name for f in fields(cls)], values))
+    if convert:
+        type_hints = get_type_hints(cls)
+        for key, value in field_dict.items():
+            converter = _converter_for(type_hints[key]) if key in type_hints else None
+            if converter is not None:
+                field_dict[key] = converter(value)
+    return cls(**field_dict)
+
+
+def _pin_segments(data: dict[str, Any]) -> list[list[list[str]]]:
+    return [
+        [seg.split("~") for seg in line.split("^^")]
+        for line in data["dataStr"]["shape"]
+        if line.startswith("P~")
+    ]
+
+
+def _footprint_rows(data: dict[str, Any], prefix: str) -> list[list[str]]:
+    return [
+        line.split("~")[1:]
+        for line in data["packageDetail"]["dataStr"]["shape"]
+        if line.startswith(prefix)
+    ]
+
+
+class TestSchemaConstruction:
+    def test_bga_symbol_pins(
+        self, record_property: Callable[[str, object], None]
+    ) -> None:
+        pins = _pin_segments(bga_symbol_data(pins=2000))
+        assert len(pins) == 2000
+
+        def legacy() -> list[Any]:
+            return [
+                (
+                    _legacy_build(EeSymbolPinSettings, seg[0][1:]),
+                    _legacy_build(EeSymbolPinName, seg[3]),
+                )
+                for seg in pins
+            ]
+
+        def schema() -> list[Any]:
+            return [
+                (
+                    _SCHEMAS[EeSymbolPinSettings].build(seg[0][1:]),
+                    _SCHEMAS[EeSymbolPinName].build(seg[3]),
+                )
+                for seg in pins
+            ]
+
+        assert schema() == legacy()
+        t_legacy, t_schema = _best_of(legacy), _best_of(schema)
+        record_property("legacy_ms", round(t_legacy * 1e3, 1))
+        record_property("schema_ms", round(t_schema * 1e3, 1))
+
+    def test_footprint_pads(
+        self, record_property: Callable[[str, object], None]
+    ) -> None:
+        data = large_footprint_data(pads=1500)
+        pads = _footprint_rows(data, "PAD~")
+        tracks = _footprint_rows(data, "TRACK~")
+        assert len(pads) == 1500
+
+        def legacy() -> list[Any]:
+            return [_legacy_build(EeFootprintPad, row[:18], False) for row in pads] + [
+                _legacy_build(EeFootprintTrack, row, False) for row in tracks
+            ]
+
+        def schema() -> list[Any]:
+            return [
+                _SCHEMAS[EeFootprintPad].build(row, convert=False) for row in pads
+            ] + [_SCHEMAS[EeFootprintTrack].build(row, convert=False) for row in tracks]
+
+        assert schema() == legacy()
+        t_legacy, t_schema = _best_of(legacy), _best_of(schema)
+        record_property("legacy_ms", round(t_legacy * 1e3, 1))
+        record_property("schema_ms", round(t_schema * 1e3, 1))
+
+
+_LEGACY_CHAIN = (
+    ("PAD", EeFootprintPad),
+    ("TRACK", EeFootprintTrack),
+    ("HOLE", EeFootprintHole),
+    ("VIA", EeFootprintVia),
+    ("CIRCLE", EeFootprintCircle),
+    ("ARC", EeFootprintArc),
+    ("RECT", EeFootprintRectangle),
+    ("TEXT", EeFootprintText),
+)
+
+
+# Footprint shape loop as it was before the single-pass tokenizer: two
+# splits per line, an if/elif chain and a second scan for the SVGNODE.
+def _legacy_footprint_pass(lines: list[str]) -> list[Any]:
+    shapes: list[Any] = []
+    for line in lines:
+        ee_designator = line.split("~")[0]
+        ee_fields = line.split("~")[1:]
+        for designator, cls in _LEGACY_CHAIN:
+            if ee_designator == designator:
+                shapes.append(_legacy_build(cls, ee_fields[:18], False))
+                break
+        else:
+            if ee_designator == "SOLIDREGION" and len(ee_fields) >= 4:
+                shapes.append(
+                    EeFootprintSolidRegion(
+                        layer_id=_safe_int(ee_fields[0], 3),
+                        path=ee_fields[2],
+                        region_type=ee_fields[3],
+                    )
+                )
+    for line in lines:
+        if line.split("~")[0] == "SVGNODE":
+            break
+    return shapes
+
+
+class TestFootprintTokenizer:
+    def test_track_and_region_heavy_footprint(
+        self, record_property: Callable[[str, object], None]
+    ) -> None:
+        data = cad_data(name="FP", pins=4, pads=200, tracks=6000, regions=3000)
+        lines = data["packageDetail"]["dataStr"]["shape"]
+
+        def importer() -> Any:
+            return EasyedaFootprintImporter(data).get_footprint()
+
+        footprint = importer()
+        assert len(footprint.tracks) == 6000
+        assert len(footprint.solid_regions) == 3000
+        assert footprint.model_3d is not None
+        collected = ("pads", "tracks", "holes", "vias", "circles", "arcs")
+        collected += ("rectangles", "texts", "solid_regions")
+        assert len(_legacy_footprint_pass(lines)) == sum(
+            len(getattr(footprint, name)) for name in collected
+        )
+
+        t_legacy = _best_of(lambda: _legacy_footprint_pass(lines))
+        t_import = _best_of(importer)
+        record_property("legacy_loop_ms", round(t_legacy * 1e3, 1))
+        record_property("single_pass_ms", round(t_import * 1e3, 1))
+
+
+class TestImporterTimings:
+    def test_symbol_import(
+        self, record_property: Callable[[str, object], None]
+    ) -> None:
+        data = bga_symbol_data(pins=2000)
+        elapsed = _best_of(lambda: EasyedaSymbolImporter(data))
+        record_property("import_ms", round(elapsed * 1e3, 1))
+        assert len(EasyedaSymbolImporter(data).get_symbol().pins) == 2000
+
+    def test_footprint_import(
+        self, record_property: Callable[[str, object], None]
+    ) -> None:
+        data = large_footprint_data(pads=1500)
+        elapsed = _best_of(lambda: EasyedaFootprintImporter(data))
+        record_property("import_ms", round(elapsed * 1e3, 1))
+        assert len(EasyedaFootprintImporter(data).get_footprint().pads) == 1500
+
+    def test_schemas_built_at_import(self) -> None:
+        assert EeSymbolPinSettings in easyeda_importer._SCHEMAS
+        assert _SCHEMAS[EeFootprintPad].names[:3] == ("shape", "center_x", "center_y")
+
+
+def _retained_bytes(build: Callable[[], Any]) -> tuple[Any, int]:
+    """Bytes still allocated after *build* returns (i.e. held by its result)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        gc.collect()
+        return result, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+class TestMemoryFootprint:
+    def test_bytes_per_pin(
+        self, record_property: Callable[[str, object], None]
+    ) -> None:
+        data = bga_symbol_data(pins=2000)
+        symbol, size = _retained_bytes(lambda: EasyedaSymbolImporter(data).get_symbol())
+        per_pin = size / len(symbol.pins)
+        record_property("bytes_per_pin", round(per_pin))
+        assert not hasattr(symbol.pins[0].settings, "__dict__")
+        # ~1400 bytes per pin with plain (dict based) dataclasses
+        assert per_pin < 1150
+
+    def test_bytes_per_pad(
+        self, record_property: Callable[[str, object], None]
+    ) -> None:
+        data = large_footprint_data(pads=1500)
+        pads, size = _retained_bytes(
+            lambda: EasyedaFootprintImporter(data).get_footprint().pads
+        )
+        per_pad = size / len(pads)
+        record_property("bytes_per_pad", round(per_pad))
+        assert not hasattr(pads[0], "__dict__")
+        # ~590 bytes per pad with plain (dict based) dataclasses
+        assert per_pad < 520
+
+    def test_repeated_strings_are_shared(self) -> None:
+        symbol = EasyedaSymbolImporter(bga_symbol_data(pins=50)).get_symbol()
+        assert symbol.pins[0].pin_path.color is symbol.pins[1].pin_path.color
+        assert symbol.pins[0].name.text_anchor is symbol.pins[1].name.text_anchor
+
+
+class TestColumnarGeometry:
+    def test_track_points(self, record_property: Callable[[str, object], None]) -> None:
+        data = cad_data(name="FP", pins=4, pads=10, tracks=6000, regions=0)
+        footprint = EasyedaFootprintImporter(data).get_footprint()
+
+        def scalar() -> list[float]:
+            xs: list[float] = []
+            for track in footprint.tracks:
+                points = [fp_to_ki(p) for p in track.points.split()]
+                xs.extend(p - 1.0 for p in points[0::2])
+            return xs
+
+        def columns() -> list[float]:
+            cols = TrackColumns.from_tracks(footprint.tracks).offset(1.0, 1.0)
+            return gk.to_list(cols.xs)
+
+        assert columns() == scalar()
+        t_scalar, t_columns = _best_of(scalar), _best_of(columns)
+        record_property("backend", "numpy" if gk.HAS_NUMPY else "array")
+        record_property("scalar_ms", round(t_scalar * 1e3, 1))
+        record_property("columns_ms", round(t_columns * 1e3, 1))
+
+    def test_arcs(self, record_property: Callable[[str, object], None]) -> None:
+        count = 20000
+        arcs = [
+            (
+                (i * 7 % 41) / 2,
+                (i * 11 % 37) / 2,
+                1.0 + i % 9,
+                0.5 + i % 5,
+                float(i % 90),
+                i % 2 == 0,
+                i % 3 == 0,
+                (i * 13 % 43) / 2,
+                (i * 17 % 31) / 2,
+            )
+            for i in range(count)
+        ]
+        columns = [list(values) for values in zip(*arcs)]
+        start_x, start_y, rx, ry = (gk.as_column(v) for v in columns[:4])
+        end_x, end_y = (gk.as_column(v) for v in columns[7:])
+
+        def scalar() -> list[tuple[float, float, float]]:
+            return [compute_arc(*arc) for arc in arcs]
+
+        def batched() -> Any:
+            return gk.arc_centers(start_x, start_y, rx, ry, *columns[4:7], end_x, end_y)
+
+        assert [gk.to_list(col) for col in batched()] == [
+            list(values) for values in zip(*scalar())
+        ]
+        t_scalar, t_batched = _best_of(scalar), _best_of(batched)
+        record_property("backend", "numpy" if gk.HAS_NUMPY else "array")
+        record_property("one_by_one_ms", round(t_scalar * 1e3, 1))
+        record_property("columns_ms", round(t_batched * 1e3, 1))
+
+    def test_footprint_conversion(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        record_property: Callable[[str, object], None],
+    ) -> None:
+        data = large_footprint_data(pads=3000)
+        data["packageDetail"]["dataStr"]["shape"] += [
+            f"ARC~0.8~13~~M {3990 + i % 20} 3005 A {5 + i % 7} {4 + i % 5}"
+            f" {i % 90} {i % 2} {i // 2 % 2} 4005 {3015 + i % 11}~~gga{i}~0"
+            for i in range(3000)
+        ]
+        footprint = EasyedaFootprintImporter(data).get_footprint()
+        timings: dict[str, float] = {}
+        rendered = set()
+        for backend in ("array", "numpy") if gk.HAS_NUMPY else ("array",):
+            monkeypatch.setattr(gk, "HAS_NUMPY", backend == "numpy")
+            timings[backend] = _best_of(lambda: ExporterFootprintKicad(footprint))
+            rendered.add(ExporterFootprintKicad(footprint).render("models"))
+        assert len(rendered) == 1
+        for name, elapsed in timings.items():
+            record_property(f"{name}_ms", round(elapsed * 1e3, 1))
+
+
+class TestActionTimings:
+    """Each CLI action only pays for the sections it emits."""
+
+    @pytest.mark.parametrize("action", ["symbol", "footprint", "3d", "existing"])
+    def test_process_component(
+        self,
+        action: str,
+        tmp_path: Path,
+        record_property: Callable[[str, object], None],
+    ) -> None:
+        api: Any = FakeApi(cad_data(name="BIG", pins=1000, pads=1500, tracks=800))
+        # "existing": footprint already written and --overwrite not given
+        args = cli_arguments(
+            tmp_path,
+            overwrite=action != "existing",
+            **{"footprint" if action == "existing" else action: True},
+        )
+        assert _process_component(args, api, lcsc_id="C999")
+        elapsed = _best_of(lambda: _process_component(args, api, lcsc_id="C999"))
+        record_property("elapsed_ms", round(elapsed * 1e3, 1))
+
+
+def _peak_bytes(func: Callable[[], Any]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class TestBulkImport:
+    def test_memory_does_not_grow_with_dump_size(
+        self, tmp_path: Path, record_property: Callable[[str, object], None]
+    ) -> None:
+        record = json.dumps(cad_data(name="P", pins=32, pads=32, tracks=16))
+        small, large = tmp_path / "small.jsonl", tmp_path / "large.jsonl"
+        small.write_text((record + "\n") * 10)
+        large.write_text((record + "\n") * 100)
+
+        def consume(path: Path) -> Callable[[], Any]:
+            return lambda: sum(1 for _ in iter_import(path))
+
+        peak_small, peak_large = (
+            _peak_bytes(consume(small)),
+            _peak_bytes(consume(large)),
+        )
+        elapsed = _best_of(consume(large), repeat=1)
+        record_property("elapsed_ms", round(elapsed * 1e3, 1))
+        record_property("peak_kib_10_records", round(peak_small / 1024))
+        record_property("peak_kib_100_records", round(peak_large / 1024))
+        assert peak_large < peak_small * 1.5
+
+
+class TestPoolScaling:
+    """``--jobs`` on a warm cache: wall time for 1 to 32 worker processes."""
+
+    def test_jobs(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        record_property: Callable[[str, object], None],
+    ) -> None:
+        components = {
+            f"C{100 + i}": cad_data(
+                name=f"P{i}", pins=300, pads=300, tracks=100, seed=i, lcsc=f"C{100 + i}"
+            )
+            for i in range(12)
+        }
+        seed_cache(tmp_path, components)
+        monkeypatch.chdir(tmp_path)
+        cores = os.cpu_count() or 1
+
+        outputs: dict[int, dict[str, bytes]] = {}
+        timings: dict[int, float] = {}
+        for jobs in (1, 2, 4, 8, 16, 32):
+            if jobs > max(cores, 2):
+                break
+            # same output folder each time: footprints reference the 3D path
+            out = tmp_path / "out"
+            shutil.rmtree(out, ignore_errors=True)
+            out.mkdir()
+            argv = ["--lcsc_id", *components, "--full", "--use-cache"]
+            argv += ["--output", str(out / "lib"), "--jobs", str(jobs)]
+            timings[jobs] = _best_of(lambda: main([*argv, "--overwrite"]), repeat=1)
+            outputs[jobs] = {
+                str(p.relative_to(out)): p.read_bytes()
+                for p in out.rglob("*")
+                if p.is_file() and p.suffix != ".idx"
+            }
+
+        record_property("cores", cores)
+        for jobs, elapsed in timings.items():
+            record_property(f"jobs_{jobs}_ms", round(elapsed * 1e3))
+        assert all(files == outputs[1] for files in outputs.values())
+
+
+# SOLIDREGION path parsing as it was before the shared SVG path parser
+def _legacy_solid_region_path(
+    path: str, bbox_x_px: float, bbox_y_px: float
+) -> list[tuple[float, float]]:
+    points: list[tuple[float, float]] = []
+    cur_x = cur_y = 0.0
+    for token in re.split(r"(?=[MLHVAZmlhvaz])", path.strip()):
+        token = token.strip()
+        if not token:
+            continue
+        cmd = token[0]
+        args = [a for a in re.split(r"[,\s]+", token[1:].strip()) if a]
+        if cmd in "ML" and len(args) >= 2:
+            cur_x, cur_y = float(args[0]), float(args[1])
+        elif cmd == "H" and args:
+            cur_x = float(args[0])
+        elif cmd == "V" and args:
+            cur_y = float(args[0])
+        elif cmd == "A" and len(args) >= 7:
+            cur_x, cur_y = float(args[5]), float(args[6])
+        else:
+            if cmd == "Z" and points and points[0] != points[-1]:
+                points.append(points[0])
+            continue
+        points.append((fp_to_ki(cur_x - bbox_x_px), fp_to_ki(cur_y - bbox_y_px)))
+    return points
+
+
+class TestSvgPathCache:
+    def test_repeated_arc_paths(
+        self, record_property: Callable[[str, object], None]
+    ) -> None:
+        # 2000 arcs drawn from 20 distinct shapes, as in symbols with many units
+        paths = [
+            f"M {400 + i % 20} 300 A 5 5 0 0 1 {410 + i % 20} 300" for i in range(2000)
+        ]
+
+        def legacy() -> list[Any]:
+            return [list(_path_commands(parse_path.__wrapped__(p))) for p in paths]
+
+        def cached() -> list[Any]:
+            _parse_svg_path_cached.cache_clear()
+            parse_path.cache_clear()
+            return [parse_svg_path(p) for p in paths]
+
+        assert cached() == legacy()
+        t_legacy, t_cached = _best_of(legacy), _best_of(cached)
+        record_property("uncached_ms", round(t_legacy * 1e3, 1))
+        record_property("cached_ms", round(t_cached * 1e3, 1))
+
+    def test_solid_regions(
+        self, record_property: Callable[[str, object], None]
+    ) -> None:
+        data = cad_data(name="FP", pads=40, regions=4000)
+        shapes = data["packageDetail"]["dataStr"]["shape"]
+        paths = [
+            line.split("~")[3] for line in shapes if line.startswith("SOLIDREGION~")
+        ]
+        bbox = 3990.0, 2990.0
+
+        def legacy() -> list[Any]:
+            return [_legacy_solid_region_path(p, *bbox) for p in paths]
+
+        def shared(clear: bool) -> Callable[[], list[Any]]:
+            def parse() -> list[Any]:
+                if clear:
+                    parse_path.cache_clear()
+                return [_parse_solid_region_path(p, *bbox) for p in paths]
+
+            return parse
+
+        assert shared(clear=True)() == legacy()
+        t_legacy = _best_of(legacy)
+        t_cold, t_warm = _best_of(shared(clear=True)), _best_of(shared(clear=False))
+        # the footprint SVG reads the same paths again, from the cache
+        t_render = _best_of(lambda: render_footprint_svg(data))
+        record_property("re_split_ms", round(t_legacy * 1e3, 1))
+        record_property("shared_parser_ms", round(t_cold * 1e3, 1))
+        record_property("shared_parser_cached_ms", round(t_warm * 1e3, 1))
+        record_property("footprint_svg_ms", round(t_render * 1e3, 1))
+
+
+class TestSymbolLibWrites:
+    def test_adding_to_a_large_library(
+        self, tmp_path: Path, record_property: Callable[[str, object], None]
+    ) -> None:
+        existing = "".join(kicad_symbol(f"OLD{i}") for i in range(2000))
+        header = LIB_HEADER.format(generator="easyeda2kicad")
+        new = {f"NEW{i}": kicad_symbol(f"NEW{i}") for i in range(20)}
+        indexed, legacy = tmp_path / "indexed.kicad_sym", tmp_path / "legacy.kicad_sym"
+        for lib in (indexed, legacy):
+            lib.write_text(header.replace("\n)", existing + ")"), encoding="utf-8")
+
+        def add_legacy() -> None:
+            for name, content in new.items():
+                current = legacy.read_text(encoding="utf-8")
+                pattern = _SYM_LIB_REGEX.format(component_name=name)
+                assert not re.search(pattern, current, flags=re.DOTALL)
+                _legacy_write(legacy, name, content)
+
+        def add_indexed() -> None:
+            for name, content in new.items():
+                assert not id_already_in_symbol_lib(str(indexed), name)
+                write_component_in_symbol_lib_file(str(indexed), name, content)
+
+        # the first write scans the library once to build the index
+        t_scan = _best_of(lambda: load_symbol_lib_index(str(indexed)), 1)
+        t_legacy = _best_of(add_legacy, repeat=1)
+        t_indexed = _best_of(add_indexed, repeat=1)
+        assert indexed.read_bytes() == legacy.read_bytes()
+        record_property("library_bytes", indexed.stat().st_size)
+        record_property("full_rewrite_ms", round(t_legacy * 1e3, 1))
+        record_property("indexed_ms", round(t_indexed * 1e3, 1))
+        record_property("index_scan_ms", round(t_scan * 1e3, 1))
+
+    def test_session_scales_linearly(
+        self, tmp_path: Path, record_property: Callable[[str, object], None]
+    ) -> None:
+        existing = "".join(kicad_symbol(f"OLD{i}") for i in range(500))
+        header = LIB_HEADER.format(generator="easyeda2kicad")
+        lib = tmp_path / "lib.kicad_sym"
+
+        def add(count: int) -> Callable[[], None]:
+            def run() -> None:
+                lib.write_text(header.replace("\n)", existing + ")"))
+                with SymbolLibrary(str(lib)) as library:
+                    for i in range(count):
+                        assert not library.id_already_in(f"NEW{i}")
+                        library.write_component(f"NEW{i}", kicad_symbol(f"NEW{i}"))
+
+            return run
+
+        timings = {count: _best_of(add(count), repeat=2) for count in (100, 200, 400)}
+        for count, elapsed in timings.items():
+            record_property(f"add_{count}_ms", round(elapsed * 1e3, 1))
+
+    def test_tail_append_cost(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        record_property: Callable[[str, object], None],
+    ) -> None:
+        # bytes written to the library, its temporary files and its journal
+        written: dict[str, int] = {}
+
+        def counting_open(file: Any, mode: str = "r", *args: Any, **kw: Any) -> Any:
+            opened = open(file, mode, *args, **kw)
+            name = Path(file).name
+            if mode != "rb" and not name.endswith(".idx"):
+                write = opened.write
+
+                def counted(data: bytes) -> int:
+                    lib = next(lib for lib in written if lib in name)
+                    written[lib if lib == name else f"{lib}+tmp"] += len(data)
+                    return write(data)
+
+                opened.write = counted
+            return opened
+
+        monkeypatch.setattr(symbol_lib_index, "open", counting_open, raising=False)
+        monkeypatch.setattr(output_files, "open", counting_open, raising=False)
+
+        header = LIB_HEADER.format(generator="easyeda2kicad")
+        new = {f"NEW{i}": kicad_symbol(f"NEW{i}") for i in range(20)}
+
+        def add(lib: Path, load: bool = False) -> Callable[[], None]:
+            def run() -> None:
+                with SymbolLibrary(str(lib)) as library:
+                    if load:
+                        library._load(library.version)  # as for a replacement
+                    for name, content in new.items():
+                        assert not library.id_already_in(name)
+                        library.write_component(name, content)
+
+            return run
+
+        def rewrite(lib: Path) -> Callable[[], None]:
+            return add(lib, load=True)
+
+        # append: byte search in a memory map, indexed: sidecar index is current
+        modes = {"append": add, "indexed": add, "rewrite": rewrite}
+        timings: dict[tuple[str, int], float] = {}
+        for count in (500, 4000):
+            existing = "".join(kicad_symbol(f"OLD{i}") for i in range(count))
+            for mode, action in modes.items():
+                lib = tmp_path / f"{mode}{count}.kicad_sym"
+                lib.write_text(header.replace("\n)", existing + ")"))
+                if mode == "indexed":
+                    load_symbol_lib_index(str(lib))  # left by an earlier run
+                written[lib.name] = written[f"{lib.name}+tmp"] = 0
+                timings[mode, count] = _best_of(action(lib), repeat=1)
+
+        for (mode, count), elapsed in timings.items():
+            record_property(f"{mode}_{count}_ms", round(elapsed * 1e3, 1))
+            lib_name = f"{mode}{count}.kicad_sym"
+            record_property(f"{mode}_{count}_bytes_written", written[lib_name])
+            record_property(
+                f"{mode}_{count}_tmp_bytes_written", written[f"{lib_name}+tmp"]
+            )
+        for count in (500, 4000):
+            libs = {
+                (tmp_path / f"{mode}{count}.kicad_sym").read_bytes() for mode in modes
+            }
+            assert len(libs) == 1
+        # appending writes the new symbols, plus the end of the library to
+        # the journal, whatever the size of the library
+        appended = len(encode_text("".join(new.values()))) + len(b")")
+        for mode in ("append", "indexed"):
+            for count in (500, 4000):
+                assert written[f"{mode}{count}.kicad_sym"] == appended
+                assert written[f"{mode}{count}.kicad_sym+tmp"] < 100
+        rewritten = [written[f"rewrite{count}.kicad_sym+tmp"] for count in (500, 4000)]
+        assert rewritten[1] > 4 * rewritten[0]
+
+
+# Multi-unit symbols as they were built before the units were emitted directly:
+# the _0_1 block of each rendered unit spliced into the main symbol
+def _legacy_integrate_sub_units(
+    main_symbol: str, sub_symbols: list[str], component_name: str
+) -> str:
+    name = re.escape(component_name)
+    sub_units = []
+    for i, sub_content in enumerate(sub_symbols, 1):
+        match = re.search(
+            rf'( +)\(symbol "{name}_0_1".*?\n\1\)(?=\n)', sub_content, re.DOTALL
+        )
+        if match:
+            sub_units.append(
+                match.group(0).replace(
+                    f'"{component_name}_0_1"', f'"{component_name}_{i}_1"'
+                )
+            )
+    return re.sub(
+        rf'( *)\(symbol "{name}_0_1".*?\n\1\)',
+        "\n".join(sub_units),
+        main_symbol,
+        count=1,
+        flags=re.DOTALL,
+    )
+
+
+class TestSymbolExport:
+    def test_large_symbol(
+        self, tmp_path: Path, record_property: Callable[[str, object], None]
+    ) -> None:
+        symbols = {
+            pins: convert_to_kicad(
+                EasyedaSymbolImporter(bga_symbol_data(pins=pins)).get_symbol()
+            )
+            for pins in (500, 2000)
+        }
+        timings = {
+            pins: _best_of(lambda: symbol.export(KICAD_SYM_VERSION_20251024))
+            for pins, symbol in symbols.items()
+        }
+        streamed = tmp_path / "streamed.kicad_sym"
+        with open(streamed, "w", encoding="utf-8", newline="") as out:
+            t_stream = _best_of(
+                lambda: symbols[2000].emit(out.write, KICAD_SYM_VERSION_20251024), 1
+            )
+        exported = symbols[2000].export(KICAD_SYM_VERSION_20251024)
+        assert streamed.read_text(encoding="utf-8") == exported
+
+        record_property("bytes_2000_pins", len(exported))
+        for pins, elapsed in timings.items():
+            record_property(f"export_{pins}_pins_ms", round(elapsed * 1e3, 1))
+        record_property("streamed_2000_pins_ms", round(t_stream * 1e3, 1))
+
+    def test_many_units(self, record_property: Callable[[str, object], None]) -> None:
+        ee_symbol = EasyedaSymbolImporter(
+            cad_data(name="FPGA", units=40, pins=1600)
+        ).get_symbol()
+        symbol = convert_to_kicad(ee_symbol)
+        version = KICAD_SYM_VERSION_20251024
+
+        # each unit rendered to text and spliced in with regular expressions
+        def legacy() -> str:
+            units, symbol.units = symbol.units, []
+            try:
+                main = symbol.export(version)
+                subs = [unit.export(version) for unit in units]
+            finally:
+                symbol.units = units
+            return _legacy_integrate_sub_units(main, subs, ee_symbol.info.name)
+
+        assert symbol.export(version) == legacy()
+        t_legacy = _best_of(legacy)
+        t_structural = _best_of(lambda: symbol.export(version))
+        record_property("text_splicing_ms", round(t_legacy * 1e3, 1))
+        record_property("structural_ms", round(t_structural * 1e3, 1))
+
+
+class TestFootprintExport:
+    @pytest.mark.parametrize(
+        "label, data",
+        [
+            ("1500 pads", large_footprint_data(pads=1500)),
+            ("3000 solid regions", cad_data(name="FP", pads=40, regions=3000)),
+        ],
+    )
+    def test_emit(
+        self,
+        tmp_path: Path,
+        label: str,
+        data: dict[str, Any],
+        record_property: Callable[[str, object], None],
+    ) -> None:
+        exporter = ExporterFootprintKicad(
+            EasyedaFootprintImporter(data).get_footprint()
+        )
+        content = exporter.render("models")
+        assert content == _legacy_render(exporter.output, "models")
+
+        t_legacy = _best_of(lambda: _legacy_render(exporter.output, "models"))
+        t_render = _best_of(lambda: exporter.render("models"))
+        streamed = tmp_path / "streamed.kicad_mod"
+        with open(streamed, "w", encoding="utf-8", newline="") as out:
+            t_stream = _best_of(lambda: exporter.emit(out.write, "models"), 1)
+        assert streamed.read_text(encoding="utf-8") == content
+
+        record_property("bytes", len(content))
+        record_property("templates_ms", round(t_legacy * 1e3, 1))
+        record_property("emitters_ms", round(t_render * 1e3, 1))
+        record_property("streamed_ms", round(t_stream * 1e3, 1))
+
+
+class TestFootprintLibWrite:
+    def test_pretty_directory(
+        self, tmp_path: Path, record_property: Callable[[str, object], None]
+    ) -> None:
+        content = ExporterFootprintKicad(
+            EasyedaFootprintImporter(cad_data(name="FP", pads=60)).get_footprint()
+        ).render("models")
+        names = [f"FP{i}.kicad_mod" for i in range(2000)]
+
+        def serial(pretty: Path) -> None:
+            # is_file probe and plain write per footprint
+            for name in names:
+                if not (pretty / name).is_file():
+                    write_footprint_file(str(pretty / name), content)
+
+        def serial_durable(pretty: Path) -> None:
+            pretty.mkdir()
+            for name in names:
+                write_atomic(pretty / name, encode_text(content), fsync=True)
+
+        def pooled(pretty: Path, fsync: bool) -> None:
+            with FootprintLibWriter(str(pretty), fsync=fsync) as writer:
+                for name in names:
+                    if not writer.exists(name):
+                        writer.write(name, content)
+
+        runs = iter(range(100))
+
+        def fresh() -> Path:
+            return tmp_path / f"run{next(runs)}.pretty"
+
+        t_serial = _best_of(lambda: serial(fresh()))
+        t_pooled = _best_of(lambda: pooled(fresh(), fsync=False))
+        t_serial_durable = _best_of(lambda: serial_durable(fresh()))
+        t_durable = _best_of(lambda: pooled(fresh(), fsync=True))
+        pretty = fresh()
+        pooled(pretty, fsync=True)
+        assert sorted(p.name for p in pretty.iterdir()) == sorted(names)
+
+        record_property("serial_ms", round(t_serial * 1e3, 1))
+        record_property("thread_pool_ms", round(t_pooled * 1e3, 1))
+        record_property("serial_fsync_ms", round(t_serial_durable * 1e3, 1))
+        record_property("thread_pool_fsync_ms", round(t_durable * 1e3, 1))
+
+
+class TestObjToWrl:
+    def test_connector_model(
+        self, record_property: Callable[[str, object], None]
+    ) -> None:
+        model_3d = Ee3dModel(
+            name="CONN",
+            uuid="uuid",
+            translation=Ee3dModelBase(1.5, -0.5, 0.2),
+            rotation=Ee3dModelBase(),
+            raw_obj=obj_text(200_000, materials=4),
+        )
+        wrl = generate_wrl_model(model_3d)
+        assert wrl == _legacy_generate_wrl_model(model_3d)
+
+        t_legacy = _best_of(lambda: _legacy_generate_wrl_model(model_3d), 2)
+        t_new = _best_of(lambda: generate_wrl_model(model_3d), 2)
+        peak_legacy = _peak_bytes(lambda: _legacy_generate_wrl_model(model_3d))
+        peak_new = _peak_bytes(lambda: generate_wrl_model(model_3d))
+        record_property("legacy_ms", round(t_legacy * 1e3))
+        record_property("single_pass_ms", round(t_new * 1e3))
+        record_property("legacy_peak_bytes", peak_legacy)
+        record_property("single_pass_peak_bytes", peak_new)
+        assert peak_new < peak_legacy
@@ -0,0 +1,197 @@
+"""Tests for the content-addressed 3D asset store."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from easyeda2kicad.__main__ import main
+from easyeda2kicad.easyeda.blob_store import BlobStore, blob_digest
+from easyeda2kicad.easyeda.easyeda_api import EasyedaApi
+from easyeda2kicad.easyeda.parameters_easyeda import Ee3dModel, Ee3dModelBase
+from easyeda2kicad.kicad.export_kicad_3d_model import Exporter3dModelKicad
+
+from .synthetic import cad_data, seed_cache
+
+OBJ = (
+    "newmtl m0\nKa 0.2 0.2 0.2\nKd 0.5 0.5 0.5\nKs 0.1 0.1 0.1\nd 0\nendmtl\n"
+    "v 0 0 0\nv 1 0 0\nv 0 1 0\nusemtl m0\nf 1 2 3\n"
+)
+
+
+def _model(name: str = "PKG") -> Ee3dModel:
+    return Ee3dModel(
+        name=name,
+        uuid="u1",
+        translation=Ee3dModelBase(),
+        rotation=Ee3dModelBase(),
+        raw_obj=OBJ,
+        step=b"ISO-10303-21;\nDATA;\n",
+    )
+
+
+class TestBlobStore:
+    def test_put_is_idempotent(self, tmp_path: Path) -> None:
+        store = BlobStore(tmp_path / "blobs")
+        d1 = store.put(b"abc")
+        d2 = store.put(b"abc")
+        assert d1 == d2 == blob_digest(b"abc")
+        assert store.get(d1) == b"abc"
+        assert len(list((tmp_path / "blobs").rglob("*"))) == 2  # shard dir + blob
+
+    @pytest.mark.parametrize("mode", ["auto", "copy"])
+    def test_materialize_content(self, tmp_path: Path, mode: str) -> None:
+        store = BlobStore(tmp_path / "blobs", mode=mode)
+        dest = tmp_path / "out" / "x.step"
+        method = store.write(b"payload", dest)
+        assert dest.read_bytes() == b"payload"
+        # hardlinks are never made unless asked for
+        assert method in ("reflink", "copy")
+        if mode == "copy":
+            assert method == "copy"
+
+    def test_editing_output_in_place_keeps_blob(self, tmp_path: Path) -> None:
+        store = BlobStore(tmp_path / "blobs")
+        dest = tmp_path / "x.wrl"
+        digest = store.put(b"model")
+        store.materialize(digest, dest)
+        with open(dest, "r+b") as file:
+            file.write(b"MODEL")
+        assert store.get(digest) == b"model"
+
+    def test_damaged_blob_is_detected_and_replaced(
+        self, tmp_path: Path, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        store = BlobStore(tmp_path / "blobs", mode="hardlink")
+        digest = store.put(b"model")
+        store.path_for(digest).write_bytes(b"mod")  # e.g. a truncated write
+        assert store.get(digest) is None
+        assert "does not match its digest" in caplog.text
+        assert store.put(b"model") == digest
+        assert store.get(digest) == b"model"
+
+    def test_put_does_not_reread_existing_blob(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        store = BlobStore(tmp_path / "blobs")
+        digest = store.put(b"model")
+
+        def no_read(self: Path) -> bytes:
+            raise AssertionError(f"{self} was read back")
+
+        monkeypatch.setattr(Path, "read_bytes", no_read)
+        assert store.put(b"model") == digest
+
+    def test_hardlink_falls_back_to_copy(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        store = BlobStore(tmp_path / "blobs", mode="hardlink")
+
+        def cross_device(src: object, dst: object) -> None:
+            raise OSError(18, "Invalid cross-device link")
+
+        monkeypatch.setattr(os, "link", cross_device)
+        dest = tmp_path / "x.step"
+        assert store.write(b"data", dest) == "copy"
+        assert dest.read_bytes() == b"data"
+
+    def test_second_materialize_is_unchanged(self, tmp_path: Path) -> None:
+        store = BlobStore(tmp_path / "blobs", mode="hardlink")
+        dest = tmp_path / "x.wrl"
+        assert store.write(b"data", dest) == "hardlink"
+        assert store.write(b"data", dest) == "unchanged"
+
+    def test_replacing_does_not_touch_shared_blob(self, tmp_path: Path) -> None:
+        store = BlobStore(tmp_path / "blobs", mode="hardlink")
+        a, b = tmp_path / "a.step", tmp_path / "b.step"
+        digest = store.put(b"old")
+        store.materialize(digest, a)
+        store.materialize(digest, b)
+        store.write(b"new", a)
+        assert a.read_bytes() == b"new"
+        assert b.read_bytes() == b"old"
+        assert store.get(digest) == b"old"
+
+    def test_missing_blob_raises(self, tmp_path: Path) -> None:
+        store = BlobStore(tmp_path / "blobs")
+        with pytest.raises(FileNotFoundError):
+            store.materialize("00" * 32, tmp_path / "x")
+
+    def test_unknown_mode(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError):
+            BlobStore(tmp_path, mode="symlink")
+
+
+class TestExporterWithBlobStore:
+    def test_same_bytes_as_plain_export(self, tmp_path: Path) -> None:
+        exporter = Exporter3dModelKicad(_model())
+        exporter.export(str(tmp_path / "plain.3dshapes"))
+        store = BlobStore(tmp_path / "blobs")
+        for i in range(3):
+            exporter.export(str(tmp_path / f"lib{i}.3dshapes"), blob_store=store)
+
+        for ext in ("wrl", "step"):
+            expected = (tmp_path / "plain.3dshapes" / f"PKG.{ext}").read_bytes()
+            for i in range(3):
+                out = tmp_path / f"lib{i}.3dshapes" / f"PKG.{ext}"
+                assert out.read_bytes() == expected
+        # one blob per asset, no matter how many libraries were built
+        assert len([p for p in (tmp_path / "blobs").rglob("*") if p.is_file()]) == 2
+
+    def test_plain_export_breaks_hardlink(self, tmp_path: Path) -> None:
+        store = BlobStore(tmp_path / "blobs", mode="hardlink")
+        out_dir = tmp_path / "lib.3dshapes"
+        Exporter3dModelKicad(_model()).export(str(out_dir), blob_store=store)
+        step = out_dir / "PKG.step"
+        digest = blob_digest(step.read_bytes())
+
+        other = _model()
+        other.step = b"changed"
+        Exporter3dModelKicad(other).export(str(out_dir))
+        assert step.read_bytes() == b"changed"
+        assert store.get(digest) == b"ISO-10303-21;\nDATA;\n"
+
+
+class TestApiCacheUsesBlobStore:
+    def test_step_cache_is_linked_blob(self, tmp_path: Path) -> None:
+        api = EasyedaApi(use_cache=True)
+        api.cache_dir = tmp_path
+        cache_path = api.get_cache_path("uuid1", "step")
+        api._write_to_cache(cache_path, b"STEPDATA", binary=True)
+        assert cache_path.read_bytes() == b"STEPDATA"
+        assert api.blob_store.has(blob_digest(b"STEPDATA"))
+        blob = api.blob_store.path_for(blob_digest(b"STEPDATA"))
+        # the cache entry is the blob itself, not a second copy
+        assert os.path.samefile(cache_path, blob)
+
+    def test_cache_entry_is_linked_whatever_the_blob_mode(self, tmp_path: Path) -> None:
+        api = EasyedaApi(use_cache=True)
+        api.cache_dir = tmp_path
+        api.blob_mode = "copy"
+        assert api.blob_store.mode == "copy"
+        cache_path = api.get_cache_path("uuid1", "obj")
+        api._write_to_cache(cache_path, "v 0 0 0\n")
+        blob = api.blob_store.path_for(blob_digest(b"v 0 0 0\n"))
+        assert os.path.samefile(cache_path, blob)
+
+
+class TestBlobModeOption:
+    @pytest.mark.parametrize("mode", ["hardlink", "copy"])
+    def test_option_selects_materialize_mode(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mode: str
+    ) -> None:
+        monkeypatch.chdir(tmp_path)
+        seed_cache(tmp_path, {"C1": cad_data(name="ONE", pins=4, pads=4)})
+        argv = ["--lcsc_id", "C1", "--3d", "--use-cache", "--blob-mode", mode]
+        assert main(argv + ["--output", str(tmp_path / "lib")]) == 0
+
+        wrl = next((tmp_path / "lib.3dshapes").glob("*.wrl"))
+        blob = BlobStore(tmp_path / ".easyeda_cache" / "blobs").path_for(
+            blob_digest(wrl.read_bytes())
+        )
+        assert os.path.samefile(wrl, blob) == (mode == "hardlink")
+
+    def test_unknown_mode_is_rejected(self) -> None:
+        assert main(["--lcsc_id", "C1", "--3d", "--blob-mode", "symlink"]) == 2
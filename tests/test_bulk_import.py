@@ -0,0 +1,72 @@
+"""Tests for streaming imports of JSONL component dumps."""
+
+from __future__ import annotations
+
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+
+from easyeda2kicad.easyeda import BulkImportStats, iter_import
+
+from .synthetic import cad_data
+
+
+def _write_dump(path: Path, count: int, bad_lines: tuple[str, ...] = ()) -> Path:
+    lines = []
+    for i in range(count):
+        data = cad_data(name=f"P{i}", pins=4, pads=4, lcsc=f"C{100 + i}")
+        # alternate raw API responses and bare result objects
+        record = {"success": True, "result": data} if i % 2 else data
+        lines.append(json.dumps(record))
+    lines[1:1] = bad_lines
+    text = "\n".join(lines) + "\n"
+    if path.suffix == ".gz":
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        path.write_text(text, encoding="utf-8")
+    return path
+
+
+class TestIterImport:
+    def test_yields_requested_sections(self, tmp_path: Path) -> None:
+        dump = _write_dump(tmp_path / "dump.jsonl", 3)
+        records = list(iter_import(dump, want={"symbol"}))
+        assert [r.lcsc_id for r in records] == ["C100", "C101", "C102"]
+        assert records[0].symbol is not None
+        assert records[0].symbol.info.name == "P0"
+        assert records[0].footprint is None and records[0].model_3d is None
+
+    def test_gzip_dump_and_3d(self, tmp_path: Path) -> None:
+        dump = _write_dump(tmp_path / "dump.jsonl.gz", 2)
+        records = list(iter_import(dump, want=("footprint", "3d")))
+        assert len(records) == 2
+        assert records[1].footprint is not None
+        assert records[1].model_3d is not None
+
+    def test_malformed_records_are_counted(self, tmp_path: Path) -> None:
+        bad = ('{"truncated": ', "[1, 2]", '{"result": {"dataStr": {}}}', "")
+        dump = _write_dump(tmp_path / "dump.jsonl", 3, bad_lines=bad)
+        stats = BulkImportStats()
+        records = list(iter_import(dump, stats=stats))
+        assert [r.line_number for r in records] == [1, 6, 7]
+        assert (stats.records, stats.imported, stats.errors) == (6, 3, 3)
+        assert stats.error_types == {
+            "JSONDecodeError": 1,
+            "TypeError": 1,
+            "KeyError": 1,
+        }
+
+    def test_is_lazy(self, tmp_path: Path) -> None:
+        dump = _write_dump(tmp_path / "dump.jsonl", 2, bad_lines=("oops",))
+        stats = BulkImportStats()
+        first = next(iter_import(dump, stats=stats))
+        assert first.line_number == 1
+        assert stats.records == 1
+
+    def test_unknown_section(self, tmp_path: Path) -> None:
+        dump = _write_dump(tmp_path / "dump.jsonl", 1)
+        with pytest.raises(ValueError):
+            next(iter_import(dump, want={"schematic"}))
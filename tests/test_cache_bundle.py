@@ -0,0 +1,219 @@
+"""Tests for packing/unpacking .easyeda_cache bundles — no network required."""
+
+from __future__ import annotations
+
+import json
+import urllib.error
+import zipfile
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from easyeda2kicad.__main__ import main
+from easyeda2kicad.easyeda.cache_bundle import (
+    BUNDLE_INDEX,
+    CacheBundle,
+    export_cache_bundle,
+    import_cache_bundle,
+    read_bom_lcsc_ids,
+)
+from easyeda2kicad.easyeda.easyeda_api import EasyedaApi
+
+
+def _cad_data(model_uuid: str | None) -> dict[str, Any]:
+    shapes = []
+    if model_uuid:
+        node = {
+            "attrs": {
+                "uuid": model_uuid,
+                "title": "MODEL",
+                "c_origin": "4000,3000",
+                "c_rotation": "0,0,0",
+                "z": "0",
+            }
+        }
+        shapes.append("SVGNODE~" + json.dumps(node))
+    return {
+        "title": "PART",
+        "dataStr": {"head": {"x": "0", "y": "0"}, "shape": []},
+        "packageDetail": {
+            "dataStr": {"head": {"x": "4000", "y": "3000"}, "shape": shapes}
+        },
+    }
+
+
+SYMBOL_SVG = '<svg xmlns="http://www.w3.org/2000/svg"><g id="sym"/></svg>'
+FOOTPRINT_SVG = '<svg xmlns="http://www.w3.org/2000/svg"><g id="fp"/></svg>'
+
+
+def _svg_endpoint(request: Any, *args: Any, **kwargs: Any) -> MagicMock:
+    """Serve the /svgs endpoint only; every other request fails."""
+    if not request.full_url.endswith("/svgs"):
+        raise urllib.error.URLError("no network in test")
+    body = {"result": [{"svg": SYMBOL_SVG}, {"svg": FOOTPRINT_SVG}]}
+    resp = MagicMock()
+    resp.read.return_value = json.dumps(body).encode()
+    resp.__enter__ = lambda s: s
+    resp.__exit__ = MagicMock(return_value=False)
+    return resp
+
+
+def _no_network(*args: Any, **kwargs: Any) -> None:
+    raise urllib.error.URLError("no network in test")
+
+
+@pytest.fixture()
+def seeded_api(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> EasyedaApi:
+    """C1 is fully cached, the SVGs of C2 still have to be fetched."""
+    monkeypatch.setattr("urllib.request.urlopen", _svg_endpoint)
+    api = EasyedaApi(use_cache=True)
+    api.cache_dir = tmp_path / "cache"
+    api.cache_dir.mkdir()
+    for lcsc_id, model_uuid in (("C1", "m1"), ("C2", None)):
+        payload = {"success": True, "result": _cad_data(model_uuid)}
+        (api.cache_dir / f"{lcsc_id}.json").write_text(json.dumps(payload))
+    svgs = {"symbol": SYMBOL_SVG, "footprint": FOOTPRINT_SVG}
+    (api.cache_dir / "C1_svg.json").write_text(json.dumps(svgs))
+    (api.cache_dir / "m1.obj").write_text("v 0 0 0\n")
+    (api.cache_dir / "m1.step").write_bytes(b"STEP")
+    return api
+
+
+class TestBom:
+    def test_reads_lcsc_column(self, tmp_path: Path) -> None:
+        bom = tmp_path / "bom.csv"
+        bom.write_text(
+            "Comment,Designator,LCSC\n10k,R1,C25804\n10k,R2,C25804\n"
+            'MCU,U1,"C2040, C123"\n100n,C7,C1525\nConn,J1,C\n'
+        )
+        assert read_bom_lcsc_ids(bom) == ["C25804", "C2040", "C123", "C1525"]
+
+    def test_without_lcsc_header_skips_designators(self, tmp_path: Path) -> None:
+        bom = tmp_path / "bom.csv"
+        bom.write_text("Reference,Value,Part\nC1,100n,C1525\nC2,1u,C52923\n")
+        assert read_bom_lcsc_ids(bom) == ["C1525", "C52923"]
+
+    def test_semicolon_delimited(self, tmp_path: Path) -> None:
+        bom = tmp_path / "bom.csv"
+        bom.write_text("Ref;LCSC Part\nC1;C1525\n")
+        assert read_bom_lcsc_ids(bom) == ["C1525"]
+
+
+class TestBundleRoundTrip:
+    def test_export_contains_needed_entries(
+        self, seeded_api: EasyedaApi, tmp_path: Path
+    ) -> None:
+        bundle = tmp_path / "seed.zip"
+        assert export_cache_bundle(bundle, seeded_api, lcsc_ids=["C1", "C2"])
+        with zipfile.ZipFile(bundle) as zf:
+            index = json.loads(zf.read(BUNDLE_INDEX))
+            assert zf.getinfo("C1.json").compress_type == zipfile.ZIP_DEFLATED
+        assert index["components"]["C1"] == [
+            "C1.json",
+            "C1_svg.json",
+            "m1.obj",
+            "m1.step",
+        ]
+        assert index["components"]["C2"] == ["C2.json", "C2_svg.json"]
+
+    def test_import_into_empty_cache(
+        self, seeded_api: EasyedaApi, tmp_path: Path
+    ) -> None:
+        bundle = tmp_path / "seed.zip"
+        export_cache_bundle(bundle, seeded_api, lcsc_ids=["C1"])
+        target = tmp_path / "runner_cache"
+        assert import_cache_bundle(bundle, target) == 4
+        assert (target / "m1.step").read_bytes() == b"STEP"
+        # already present entries are left alone
+        assert import_cache_bundle(bundle, target) == 0
+
+    def test_api_reads_directly_from_bundle(
+        self, seeded_api: EasyedaApi, tmp_path: Path
+    ) -> None:
+        bundle = tmp_path / "seed.zip"
+        export_cache_bundle(bundle, seeded_api, lcsc_ids=["C1"])
+
+        api = EasyedaApi(use_cache=False)
+        api.cache_dir = tmp_path / "nowhere"
+        with CacheBundle(bundle) as cb:
+            api.cache_bundle = cb
+            assert api.get_cad_data_of_component(lcsc_id="C1")["title"] == "PART"
+            assert api.get_raw_3d_model_obj("m1") == "v 0 0 0\n"
+            assert api.get_step_3d_model("m1") == b"STEP"
+        assert not api.cache_dir.exists()
+
+    def test_corrupt_entry_is_ignored(
+        self, seeded_api: EasyedaApi, tmp_path: Path
+    ) -> None:
+        bundle = tmp_path / "seed.zip"
+        export_cache_bundle(bundle, seeded_api, lcsc_ids=["C1"])
+        with zipfile.ZipFile(bundle) as zf:
+            members = {n: zf.read(n) for n in zf.namelist()}
+        members["m1.step"] = b"XXXX"
+        with zipfile.ZipFile(bundle, "w") as zf:
+            for name, data in members.items():
+                zf.writestr(name, data)
+        with CacheBundle(bundle) as cb:
+            assert cb.read("m1.step") is None
+            assert cb.read("C1.json") is not None
+
+    def test_rejects_non_bundle(self, tmp_path: Path) -> None:
+        path = tmp_path / "x.zip"
+        with zipfile.ZipFile(path, "w") as zf:
+            zf.writestr("foo", "bar")
+        with pytest.raises(ValueError):
+            CacheBundle(path)
+
+
+class TestCli:
+    def test_export_then_convert_from_bundle(
+        self,
+        seeded_api: EasyedaApi,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.chdir(seeded_api.cache_dir.parent)
+        seeded_api.cache_dir.rename(tmp_path / ".easyeda_cache")
+        bom = tmp_path / "bom.csv"
+        bom.write_text("Ref,LCSC\nU1,C1\nU2,C2\n")
+        bundle = tmp_path / "seed.zip"
+        assert main(["--bom", str(bom), "--export-cache-bundle", str(bundle)]) == 0
+
+        runner = tmp_path / "runner"
+        runner.mkdir()
+        monkeypatch.chdir(runner)
+        assert main(["--import-cache-bundle", str(bundle)]) == 0
+        assert (runner / ".easyeda_cache" / "C2.json").is_file()
+
+    def test_render_svg_offline_from_imported_bundle(
+        self,
+        seeded_api: EasyedaApi,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        bundle = tmp_path / "seed.zip"
+        assert export_cache_bundle(bundle, seeded_api, lcsc_ids=["C2"])
+
+        runner = tmp_path / "runner"
+        runner.mkdir()
+        monkeypatch.chdir(runner)
+        monkeypatch.setattr("urllib.request.urlopen", _no_network)
+        assert main(["--import-cache-bundle", str(bundle)]) == 0
+
+        api = EasyedaApi(use_cache=True)
+        assert api.get_svg_from_api("C2") == {
+            "symbol": SYMBOL_SVG,
+            "footprint": FOOTPRINT_SVG,
+        }
+        (runner / "lib").mkdir()
+        output = runner / "lib" / "parts"
+        args = ["--lcsc_id", "C2", "--svg", "--use-cache", "--output", str(output)]
+        assert main(args) == 0
+        assert (runner / "lib" / "parts.svgs" / "C2_symbol.svg").is_file()
+        assert (runner / "lib" / "parts.svgs" / "C2_footprint.svg").is_file()
+
+    def test_missing_bundle_file(self, tmp_path: Path) -> None:
+        missing = str(tmp_path / "nope.zip")
+        assert main(["--lcsc_id", "C1", "--svg", "--cache-bundle", missing]) == 1
@@ -46,18 +46,18 @@ def api_with_cache(tmp_path: Path) -> EasyedaApi:
 
 
 # ---------------------------------------------------------------------------
-# _get_cache_path
+# get_cache_path
 # ---------------------------------------------------------------------------
 
 
 class TestGetCachePath:
     def test_returns_path_with_extension(self, api_with_cache: EasyedaApi) -> None:
-        p = api_with_cache._get_cache_path("C12345", "json")
+        p = api_with_cache.get_cache_path("C12345", "json")
         assert p.suffix == ".json"
         assert "C12345" in p.name
 
     def test_sanitizes_slashes(self, api_with_cache: EasyedaApi) -> None:
-        p = api_with_cache._get_cache_path("a/b\\c", "obj")
+        p = api_with_cache.get_cache_path("a/b\\c", "obj")
         assert "/" not in p.name
         assert "\\" not in p.name
 
@@ -69,13 +69,13 @@ class TestGetCachePath:
 
 class TestCacheRoundtripText:
     def test_write_and_read_plain_text(self, api_with_cache: EasyedaApi) -> None:
-        path = api_with_cache._get_cache_path("test_plain", "txt")
+        path = api_with_cache.get_cache_path("test_plain", "txt")
         api_with_cache._write_to_cache(path, "hello cache")
         result = api_with_cache._read_from_cache(path, binary=False)
         assert result == "hello cache"
 
     def test_write_json_pretty_prints(self, api_with_cache: EasyedaApi) -> None:
-        path = api_with_cache._get_cache_path("test_json", "json")
+        path = api_with_cache.get_cache_path("test_json", "json")
         api_with_cache._write_to_cache(path, '{"a":1}')
         content = path.read_text()
         assert "\n" in content  # pretty-printed
@@ -83,20 +83,20 @@ class TestCacheRoundtripText:
     def test_write_invalid_json_falls_back_to_plain(
         self, api_with_cache: EasyedaApi
     ) -> None:
-        path = api_with_cache._get_cache_path("test_badjson", "json")
+        path = api_with_cache.get_cache_path("test_badjson", "json")
         api_with_cache._write_to_cache(path, "not-json{{{")
         assert path.exists()
 
     def test_read_returns_none_if_file_missing(
         self, api_with_cache: EasyedaApi
     ) -> None:
-        path = api_with_cache._get_cache_path("nonexistent", "json")
+        path = api_with_cache.get_cache_path("nonexistent", "json")
         assert api_with_cache._read_from_cache(path) is None
 
     def test_no_write_when_cache_disabled(self, tmp_path: Path) -> None:
         api = EasyedaApi(use_cache=False)
         api.cache_dir = tmp_path
-        path = api._get_cache_path("disabled", "txt")
+        path = api.get_cache_path("disabled", "txt")
         api._write_to_cache(path, "data")
         assert not path.exists()
 
@@ -115,7 +115,7 @@ class TestCacheRoundtripText:
 
 class TestCacheRoundtripBinary:
     def test_write_and_read_binary(self, api_with_cache: EasyedaApi) -> None:
-        path = api_with_cache._get_cache_path("test_bin", "step")
+        path = api_with_cache.get_cache_path("test_bin", "step")
         data = b"\x00\x01\x02\xff"
         api_with_cache._write_to_cache(path, data, binary=True)
         result = api_with_cache._read_from_cache(path, binary=True)
@@ -125,7 +125,7 @@ class TestCacheRoundtripBinary:
         self, api_with_cache: EasyedaApi
     ) -> None:
         # Write binary, read as text → returns str (not bytes)
-        path = api_with_cache._get_cache_path("test_bin2", "step")
+        path = api_with_cache.get_cache_path("test_bin2", "step")
         api_with_cache._write_to_cache(path, b"ABC", binary=True)
         result = api_with_cache._read_from_cache(path, binary=False)
         assert isinstance(result, str)
@@ -139,7 +139,7 @@ class TestCacheRoundtripBinary:
 class TestGetInfoCacheHit:
     def test_returns_cached_json(self, api_with_cache: EasyedaApi) -> None:
         payload = {"success": True, "result": {"foo": "bar"}}
-        path = api_with_cache._get_cache_path("C99999", "json")
+        path = api_with_cache.get_cache_path("C99999", "json")
         path.write_text(json.dumps(payload))
 
         result = api_with_cache.get_info_from_easyeda_api("C99999")
@@ -149,7 +149,7 @@ class TestGetInfoCacheHit:
         self, api_with_cache: EasyedaApi, monkeypatch: pytest.MonkeyPatch
     ) -> None:
         # Write broken JSON to cache → should attempt network (patched to fail gracefully)
-        path = api_with_cache._get_cache_path("C88888", "json")
+        path = api_with_cache.get_cache_path("C88888", "json")
         path.write_text("broken{{{")
 
         import urllib.error
@@ -170,7 +170,7 @@ class TestGetInfoCacheHit:
 class TestGet3dModelObjCacheHit:
     def test_returns_cached_obj(self, api_with_cache: EasyedaApi) -> None:
         obj_data = "v 0 0 0\nv 1 0 0\n"
-        path = api_with_cache._get_cache_path("uuid-abc", "obj")
+        path = api_with_cache.get_cache_path("uuid-abc", "obj")
         path.write_text(obj_data)
 
         result = api_with_cache.get_raw_3d_model_obj("uuid-abc")
@@ -185,7 +185,7 @@ class TestGet3dModelObjCacheHit:
 class TestGetStepCacheHit:
     def test_returns_cached_step(self, api_with_cache: EasyedaApi) -> None:
         step_data = b"ISO-10303-21;"
-        path = api_with_cache._get_cache_path("uuid-step", "step")
+        path = api_with_cache.get_cache_path("uuid-step", "step")
         path.write_bytes(step_data)
 
         result = api_with_cache.get_step_3d_model("uuid-step")
@@ -200,7 +200,7 @@ class TestGetStepCacheHit:
 class TestGetSvgFromApiCacheHit:
     def test_returns_cached_svg(self, api_with_cache: EasyedaApi) -> None:
         payload = {"symbol": "<svg>sym</svg>", "footprint": "<svg>fp</svg>"}
-        path = api_with_cache._get_cache_path("C1591_svg", "json")
+        path = api_with_cache.get_cache_path("C1591_svg", "json")
         path.write_text(json.dumps(payload))
 
         result = api_with_cache.get_svg_from_api("C1591")
@@ -209,7 +209,7 @@ class TestGetSvgFromApiCacheHit:
     def test_invalid_cache_falls_through_to_network(
         self, api_with_cache: EasyedaApi, monkeypatch: pytest.MonkeyPatch
     ) -> None:
-        path = api_with_cache._get_cache_path("C1591_svg", "json")
+        path = api_with_cache.get_cache_path("C1591_svg", "json")
         path.write_text("broken{{{")
 
         import urllib.error
@@ -274,7 +274,7 @@ class TestGetInfoNetworkPath:
             "urllib.request.urlopen", lambda *a, **kw: _fake_response(body)
         )
         api.get_info_from_easyeda_api("C44444")
-        cache_file = api._get_cache_path("C44444", "json")
+        cache_file = api.get_cache_path("C44444", "json")
         assert cache_file.exists()
 
     def test_success_false_returns_empty(self, monkeypatch: pytest.MonkeyPatch) -> None:
@@ -356,7 +356,7 @@ class TestGet3dModelObjNetworkPath:
             lambda *a, **kw: _fake_response(obj_text.encode()),
         )
         api.get_raw_3d_model_obj("uuid-cache")
-        assert api._get_cache_path("uuid-cache", "obj").exists()
+        assert api.get_cache_path("uuid-cache", "obj").exists()
 
 
 # ---------------------------------------------------------------------------
@@ -403,7 +403,7 @@ class TestGetStepNetworkPath:
             lambda *a, **kw: _fake_response(step_bytes),
         )
         api.get_step_3d_model("uuid-step-cache")
-        assert api._get_cache_path("uuid-step-cache", "step").exists()
+        assert api.get_cache_path("uuid-step-cache", "step").exists()
 
 
 # ---------------------------------------------------------------------------
@@ -476,7 +476,7 @@ class TestGetSvgFromApiNetworkPath:
             "urllib.request.urlopen", lambda *a, **kw: _fake_response(body)
         )
         api.get_svg_from_api("C0004")
-        assert api._get_cache_path("C0004_svg", "json").exists()
+        assert api.get_cache_path("C0004_svg", "json").exists()
 
 
 # ---------------------------------------------------------------------------
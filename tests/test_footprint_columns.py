@@ -0,0 +1,124 @@
+"""Tests for the columnar pad/track geometry — results must match the scalar helpers."""
+
+from __future__ import annotations
+
+import pytest
+
+from easyeda2kicad.easyeda.easyeda_importer import EasyedaFootprintImporter
+from easyeda2kicad.kicad import geometry_kernel as gk
+from easyeda2kicad.kicad.export_kicad_footprint import (
+    ExporterFootprintKicad,
+    angle_to_ki,
+    fp_to_ki,
+)
+from easyeda2kicad.kicad.footprint_columns import PadColumns, TrackColumns
+
+from .synthetic import large_footprint_data
+
+
+def _tokens(count: int) -> list[str]:
+    values = [f"{(i * 7919) % 100003 / 10 - 5000:.4f}" for i in range(count)]
+    # values just next to a rounding tie after the mm conversion
+    values += ["0.0246063", "3937.0078740", "1.9685", "-1.9685", "", "nan", "x"]
+    return values
+
+
+class TestGeometryKernel:
+    def test_to_mm_matches_fp_to_ki(self, backend: bool) -> None:
+        tokens = _tokens(5000)
+        assert gk.to_list(gk.to_mm(gk.parse_column(tokens))) == [
+            fp_to_ki(t) for t in tokens
+        ]
+
+    def test_parse_mm_matches_fp_to_ki(self, backend: bool) -> None:
+        tokens = _tokens(500)
+        expected = [fp_to_ki(t) for t in tokens]
+        assert gk.to_list(gk.parse_mm(tokens)) == expected
+        assert gk.to_list(gk.parse_mm(tokens[:-3])) == expected[:-3]
+
+    def test_angle_and_clamp(self, backend: bool) -> None:
+        values = [0.0, 90.0, 180.0, 180.5, 270.0, 359.9, 0.004, float("nan")]
+        col = gk.as_column(values)
+        assert gk.to_list(gk.angle_to_ki(col)) == [angle_to_ki(v) for v in values]
+        clamped = gk.to_list(gk.clamp_min(col, 0.01))
+        assert clamped[:-1] == [max(v, 0.01) for v in values[:-1]]
+
+    def test_subtract_and_repeat(self, backend: bool) -> None:
+        col = gk.as_column([1.5, -2.0, 0.1])
+        assert gk.to_list(gk.repeat(col, [2, 0, 1])) == [1.5, 1.5, 0.1]
+        assert gk.to_list(gk.subtract(col, gk.as_column([0.5, -2.0, 0.3]))) == [
+            1.0,
+            0.0,
+            0.1 - 0.3,
+        ]
+
+    def test_arc_centers_match_arc_center(self, backend: bool) -> None:
+        def value(i: int, k: int, span: float) -> float:
+            return ((i * 7919 + k * 104729) % 100003) / 100003 * 2 * span - span
+
+        radii = [0.0, 1e-4, -3.0, 0.5]
+        arcs = [
+            (
+                value(i, 0, 20),
+                value(i, 1, 20),
+                radii[i % 4] if i % 5 == 0 else value(i, 2, 10),
+                radii[i // 4 % 4] if i % 7 == 0 else value(i, 3, 10),
+                [0.0, 30.0, 90.0, 400.0, -45.0, value(i, 4, 180)][i % 6],
+                i % 2 == 0,
+                i % 3 == 0,
+                value(i, 5, 20),
+                value(i, 6, 20),
+            )
+            for i in range(2000)
+        ]
+        # coincident end points and a half circle
+        arcs += [(1, 0, 1, 1, 0, False, True, 1, 0), (-1, 0, 1, 1, 0, 0, 1, 1, 0)]
+        columns = [list(values) for values in zip(*arcs)]
+        result = gk.arc_centers(
+            *(gk.as_column(values) for values in columns[:4]),
+            columns[4],
+            columns[5],
+            columns[6],
+            *(gk.as_column(values) for values in columns[7:]),
+        )
+        expected = [
+            gk.arc_center(*arc) if arc[3] != 0 else (0.0, 0.0, 0.0) for arc in arcs
+        ]
+        # repr tells -0.0 from 0.0, both are written differently
+        for col, values in zip(result, zip(*expected)):
+            assert [repr(v) for v in gk.to_list(col)] == [
+                repr(float(v)) for v in values
+            ]
+
+
+def test_footprint_export_independent_of_backend(
+    backend: bool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    footprint = EasyedaFootprintImporter(large_footprint_data(pads=120)).get_footprint()
+    exporter = ExporterFootprintKicad(footprint)
+    assert exporter.output.arcs and any(pad.polygon for pad in exporter.output.pads)
+    rendered = exporter.render("models")
+    monkeypatch.setattr(gk, "HAS_NUMPY", not backend and gk.HAS_NUMPY)
+    assert ExporterFootprintKicad(footprint).render("models") == rendered
+
+
+class TestFootprintColumns:
+    def test_pad_offset(self, backend: bool) -> None:
+        data = large_footprint_data(pads=20)
+        footprint = EasyedaFootprintImporter(data).get_footprint()
+        moved = PadColumns.from_pads(footprint.pads).offset(1.5, -2.0)
+        assert gk.to_list(moved.center_x) == [p.center_x - 1.5 for p in footprint.pads]
+        assert gk.to_list(moved.center_y) == [p.center_y + 2.0 for p in footprint.pads]
+
+    def test_track_points(self, backend: bool) -> None:
+        data = large_footprint_data(pads=20)
+        footprint = EasyedaFootprintImporter(data).get_footprint()
+        footprint.tracks[0].points = "1 2 3 4 5"  # dangling coordinate
+        footprint.tracks[1].points = ""
+        cols = TrackColumns.from_tracks(footprint.tracks)
+        assert len(cols) == len(footprint.tracks)
+        xs = gk.to_list(cols.xs)
+        for i, track in enumerate(footprint.tracks):
+            tokens = track.points.split()
+            expected = [fp_to_ki(t) for t in tokens[: len(tokens) & ~1 : 2]]
+            assert xs[cols.starts[i] : cols.starts[i + 1]] == expected
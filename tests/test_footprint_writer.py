@@ -1,16 +1,43 @@
 """Unit tests for footprint writer helper functions."""
 
+import io
 import math
 
 import pytest
 
-from easyeda2kicad.easyeda.easyeda_importer import _sanitize_footprint_name
+from easyeda2kicad.easyeda.easyeda_importer import (
+    EasyedaFootprintImporter,
+    _sanitize_footprint_name,
+)
+from easyeda2kicad.easyeda.parameters_easyeda import EeFootprintSolidRegion
 from easyeda2kicad.kicad.export_kicad_footprint import (
+    ExporterFootprintKicad,
+    _convert_solid_region,
     angle_to_ki,
     compute_arc,
     drill_to_ki,
     fp_to_ki,
 )
+from easyeda2kicad.kicad.parameters_kicad_footprint import (
+    KI_ARC,
+    KI_CIRCLE,
+    KI_END_FILE,
+    KI_FAB_REF,
+    KI_FP_POLY,
+    KI_FP_TYPE,
+    KI_HOLE,
+    KI_LINE,
+    KI_MODEL_3D,
+    KI_MODULE_INFO,
+    KI_PACKAGE_VALUE,
+    KI_PAD,
+    KI_REFERENCE,
+    KI_TEXT,
+    KI_VIA,
+    KiFootprint,
+)
+
+from .synthetic import cad_data
 
 TOL = 1e-6
 
@@ -179,3 +206,155 @@ class TestSanitizeFootprintName:
 
     def test_mixed_illegal_chars(self) -> None:
         assert _sanitize_footprint_name("USB/Serial:1\\2") == "USB_Serial_1_2"
+
+
+# ---------------------------------------------------------------------------
+# Streaming .kicad_mod writer
+# ---------------------------------------------------------------------------
+
+
+def _legacy_render(ki: KiFootprint, model_3d_path: str) -> str:
+    """.kicad_mod built from the KI_* templates, as it was before the emitters."""
+    ki_lib = KI_MODULE_INFO.format(
+        package_lib="easyeda2kicad", package_name=ki.info.name, edit="5DC5F6A4"
+    )
+    if ki.info.description:
+        ki_lib += f'\t(descr "{ki.info.description}")\n'
+    if ki.info.fp_type:
+        ki_lib += KI_FP_TYPE.format(
+            component_type=("smd" if ki.info.fp_type == "smd" else "through_hole")
+        )
+    y_low = min((pad.pos_y for pad in ki.pads), default=0)
+    y_high = max((pad.pos_y for pad in ki.pads), default=0)
+    ki_lib += KI_REFERENCE.format(pos_x=0.0, pos_y=y_low - 4)
+    ki_lib += KI_PACKAGE_VALUE.format(
+        package_name=ki.info.name, pos_x=0.0, pos_y=y_high + 4
+    )
+    ki_lib += KI_FAB_REF
+    if ki.info.lcsc_id:
+        ki_lib += f'\t(property "LCSC Part" "{ki.info.lcsc_id}")\n'
+    if ki.info.manufacturer:
+        ki_lib += f'\t(property "Manufacturer" "{ki.info.manufacturer}")\n'
+    if ki.info.mpn:
+        ki_lib += f'\t(property "MPN" "{ki.info.mpn}")\n'
+    for track in ki.tracks + ki.rectangles:
+        for i in range(len(track.points_start_x)):
+            ki_lib += KI_LINE.format(
+                start_x=track.points_start_x[i],
+                start_y=track.points_start_y[i],
+                end_x=track.points_end_x[i],
+                end_y=track.points_end_y[i],
+                layers=track.layers,
+                stroke_width=track.stroke_width,
+            )
+    for pad in ki.pads:
+        ki_lib += KI_PAD.format(**vars(pad))
+    for hole in ki.holes:
+        ki_lib += KI_HOLE.format(**vars(hole))
+    for via in ki.vias:
+        ki_lib += KI_VIA.format(**vars(via))
+    for circle in ki.circles:
+        ki_lib += KI_CIRCLE.format(**vars(circle))
+    for arc in ki.arcs:
+        ki_lib += KI_ARC.format(**vars(arc))
+    for text in ki.texts:
+        ki_lib += KI_TEXT.format(**vars(text))
+    for region in ki.solid_regions:
+        pts = region.points
+        if region.layer == "F.CrtYd":
+            for i in range(len(pts) - 1):
+                ki_lib += KI_LINE.format(
+                    start_x=pts[i][0],
+                    start_y=pts[i][1],
+                    end_x=pts[i + 1][0],
+                    end_y=pts[i + 1][1],
+                    layers="F.CrtYd",
+                    stroke_width=0.05,
+                )
+        else:
+            pts_str = " ".join(f"(xy {x:.6f} {y:.6f})" for x, y in pts)
+            ki_lib += KI_FP_POLY.format(pts=pts_str, layer=region.layer)
+    if ki.model_3d is not None:
+        ki_lib += KI_MODEL_3D.format(
+            file_3d=f"{model_3d_path}/{ki.model_3d.name}.wrl",
+            pos_x=ki.model_3d.translation.x,
+            pos_y=ki.model_3d.translation.y,
+            pos_z=ki.model_3d.translation.z,
+            rot_x=ki.model_3d.rotation.x,
+            rot_y=ki.model_3d.rotation.y,
+            rot_z=ki.model_3d.rotation.z,
+        )
+    return ki_lib + KI_END_FILE
+
+
+def _exporter(**kwargs: int) -> ExporterFootprintKicad:
+    data = cad_data(name="FP", **kwargs)
+    return ExporterFootprintKicad(EasyedaFootprintImporter(data).get_footprint())
+
+
+class TestFootprintEmit:
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_matches_templates(self, seed: int) -> None:
+        exporter = _exporter(pads=60, tracks=20, regions=21, seed=seed)
+        ki = exporter.output
+        # every kind of element is covered
+        assert ki.holes and ki.vias and ki.circles and ki.arcs and ki.texts
+        assert any(pad.polygon for pad in ki.pads)
+        assert {region.layer == "F.CrtYd" for region in ki.solid_regions} == {
+            True,
+            False,
+        }
+        assert exporter.render("models") == _legacy_render(ki, "models")
+
+    def test_stream_to_file(self) -> None:
+        exporter = _exporter(pads=30, regions=10)
+        out = io.StringIO()
+        exporter.emit(out.write, "models", "step")
+        assert out.getvalue() == exporter.render("models", "step")
+        assert '\t(model "models/MODEL_0.step"\n' in out.getvalue()
+
+
+# ---------------------------------------------------------------------------
+# SOLIDREGION paths
+# ---------------------------------------------------------------------------
+
+# Before the shared SVG path parser, only absolute M/L/H/V/A were read: a C/Q
+# segment was dropped (its points taken for the preceding command), relative
+# l/h/v and the implicit line-to pairs after M added no point, so the paths
+# below collapsed to a sliver or a single point (region skipped). They now
+# give the fp_poly below: every segment adds its end point.
+
+SQUARE_POLY = (
+    "\t(fp_poly (pts (xy 0.000000 0.000000) (xy 2.540000 0.000000)"
+    " (xy 2.540000 2.540000) (xy 0.000000 2.540000) (xy 0.000000 0.000000))"
+    ' (stroke (width 0) (type solid)) (fill solid) (layer "F.SilkS"))\n'
+)
+
+
+def _region_output(path: str) -> str:
+    region = _convert_solid_region(EeFootprintSolidRegion(3, path, "solid"), 4000, 3000)
+    assert region is not None
+    out: list[str] = []
+    region.emit(out.append)
+    return "".join(out)
+
+
+class TestSolidRegionPath:
+    def test_curves_add_their_end_point(self) -> None:
+        path = "M 4000 3000 L 4010 3000 C 4012 3002 4012 3008 4010 3010"
+        path += " Q 4005 3012 4000 3010 Z"
+        assert _region_output(path) == SQUARE_POLY
+
+    def test_relative_commands(self) -> None:
+        assert _region_output("M 4000 3000 l 10 0 v 10 h -10 z") == SQUARE_POLY
+
+    def test_implicit_line_to_after_move(self) -> None:
+        assert _region_output("M 4000 3000 4010 3000 4010 3010 Z") == (
+            "\t(fp_poly (pts (xy 0.000000 0.000000) (xy 2.540000 0.000000)"
+            " (xy 2.540000 2.540000) (xy 0.000000 0.000000))"
+            ' (stroke (width 0) (type solid)) (fill solid) (layer "F.SilkS"))\n'
+        )
+
+    def test_absolute_path_is_unchanged(self) -> None:
+        path = "M 4000 3000 L 4010 3000 V 3010 H 4000 Z"
+        assert _region_output(path) == SQUARE_POLY
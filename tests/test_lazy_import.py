@@ -0,0 +1,77 @@
+"""Tests for the demand-driven importers — no network required."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from easyeda2kicad.__main__ import _process_component
+from easyeda2kicad.easyeda.easyeda_importer import (
+    Easyeda3dModelImporter,
+    EasyedaFootprintImporter,
+    EasyedaSymbolImporter,
+)
+
+from .synthetic import FakeApi, cad_data, cli_arguments
+
+
+class TestLazyImporters:
+    def test_nothing_is_parsed_on_construction(self) -> None:
+        data = cad_data(name="LAZY", pins=8, pads=8, tracks=4, regions=2)
+        symbol = EasyedaSymbolImporter(data)
+        footprint = EasyedaFootprintImporter(data)
+        assert "output" not in vars(symbol)
+        assert "output" not in vars(footprint)
+        assert symbol.get_symbol() is symbol.output
+        assert len(symbol.output.pins) == 8
+
+    def test_footprint_info_reads_only_the_header(self) -> None:
+        data = cad_data(name="LAZY", pins=4, pads=8, tracks=4, regions=2)
+        importer = EasyedaFootprintImporter(data)
+        info = importer.info
+        assert "output" not in vars(importer)
+        assert info == EasyedaFootprintImporter(data).get_footprint().info
+
+    def test_footprint_model_3d_without_shapes(self) -> None:
+        data = cad_data(name="LAZY", pins=4, pads=8, tracks=4, regions=2)
+        importer = EasyedaFootprintImporter(data)
+        model = importer.model_3d
+        assert model is not None
+        assert "output" not in vars(importer)
+        assert model == EasyedaFootprintImporter(data).get_footprint().model_3d
+
+    def test_3d_download_deferred_until_output(self) -> None:
+        api = FakeApi(cad_data(name="LAZY", pins=4, pads=4, tracks=0, regions=0))
+        importer = Easyeda3dModelImporter(
+            api.data,
+            download_raw_3d_model=True,
+            api=api,  # type: ignore[arg-type]
+        )
+        assert api.downloads == 0
+        assert importer.output is not None
+        assert importer.output.step == b"STEP"
+        assert api.downloads == 2
+
+
+class TestCliActions:
+    def test_existing_footprint_skips_shape_parsing(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        api = FakeApi(cad_data(name="LAZY", pins=4, pads=8, tracks=4, regions=2))
+        args = cli_arguments(tmp_path, footprint=True)
+        assert _process_component(args, api, lcsc_id="C999")  # type: ignore[arg-type]
+
+        def fail(*_: Any, **__: Any) -> None:
+            raise AssertionError("footprint shapes parsed")
+
+        monkeypatch.setattr(EasyedaFootprintImporter, "extract_easyeda_data", fail)
+        assert not _process_component(args, api, lcsc_id="C999")  # type: ignore[arg-type]
+
+    def test_footprint_action_downloads_nothing(self, tmp_path: Path) -> None:
+        api = FakeApi(cad_data(name="LAZY", pins=4, pads=8, tracks=4, regions=2))
+        args = cli_arguments(tmp_path, symbol=True, footprint=True)
+        assert _process_component(args, api, lcsc_id="C999")  # type: ignore[arg-type]
+        assert api.downloads == 0
+        assert (tmp_path / "lib.kicad_sym").is_file()
@@ -0,0 +1,249 @@
+"""Tests for leaving unchanged output files untouched (--overwrite)."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from easyeda2kicad.__main__ import main
+from easyeda2kicad.kicad import export_kicad_footprint, output_files
+from easyeda2kicad.kicad.export_kicad_footprint import FootprintLibWriter
+from easyeda2kicad.kicad.export_kicad_symbol import write_component_in_symbol_lib_file
+from easyeda2kicad.kicad.output_files import WriteStats, write_atomic, write_if_changed
+from easyeda2kicad.kicad.symbol_lib_index import SymbolLibrary
+
+from .synthetic import cad_data, seed_cache
+
+COMPONENTS = {
+    "C1": cad_data(name="ONE", pins=8, pads=8, seed=0),
+    "C2": cad_data(name="MULTI", units=2, pins=12, seed=1),
+}
+
+SYMBOL = '\n  (symbol "P0"\n    (property "Reference" "U")\n  )\n'
+
+
+def _mtimes(out: Path) -> dict[str, int]:
+    return {
+        str(p.relative_to(out)): p.stat().st_mtime_ns
+        for p in sorted(out.rglob("*"))
+        if p.is_file() and p.suffix != ".idx"
+    }
+
+
+def _age(out: Path) -> None:
+    """Move the mtimes into the past, so that any rewrite changes them."""
+    for path in out.rglob("*"):
+        if path.is_file() and path.suffix != ".idx":
+            os.utime(path, ns=(10**18, 10**18))
+
+
+class TestWriteIfChanged:
+    def test_identical_content_is_not_written(self, tmp_path: Path) -> None:
+        path = tmp_path / "out.txt"
+        stats = WriteStats()
+        assert write_if_changed(path, b"abc", stats)
+        os.utime(path, ns=(10**18, 10**18))
+        assert not write_if_changed(path, b"abc", stats)
+        assert path.stat().st_mtime_ns == 10**18
+        assert write_if_changed(path, b"abd", stats)
+        assert path.read_bytes() == b"abd"
+        assert (stats.written, stats.skipped) == (2, 1)
+
+    def test_linked_file_is_replaced(self, tmp_path: Path) -> None:
+        shared, path = tmp_path / "shared", tmp_path / "out"
+        shared.write_bytes(b"blob")
+        os.link(shared, path)
+        assert write_if_changed(path, b"new")
+        assert path.read_bytes() == b"new"
+        assert shared.read_bytes() == b"blob"
+
+    def test_symlink_target_is_written(self, tmp_path: Path) -> None:
+        target, link = tmp_path / "target", tmp_path / "link"
+        target.write_bytes(b"old")
+        link.symlink_to(target)
+        write_atomic(link, b"new", fsync=True)
+        assert link.is_symlink()
+        assert target.read_bytes() == b"new"
+
+    def test_permissions_are_kept(self, tmp_path: Path) -> None:
+        path = tmp_path / "shared.kicad_sym"
+        path.write_bytes(b"old")
+        path.chmod(0o664)
+        write_atomic(path, b"new")
+        assert path.read_bytes() == b"new"
+        assert path.stat().st_mode & 0o777 == 0o664
+
+    def test_interrupted_write_keeps_old_file(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        path = tmp_path / "out"
+        path.write_bytes(b"old")
+
+        def interrupted(*_: object) -> None:
+            raise KeyboardInterrupt
+
+        monkeypatch.setattr(output_files.os, "replace", interrupted)
+        with pytest.raises(KeyboardInterrupt):
+            write_if_changed(path, b"new")
+        assert path.read_bytes() == b"old"
+        assert [p.name for p in tmp_path.iterdir()] == ["out"]
+
+
+class TestFootprintLibWriter:
+    def test_writes_and_skips_unchanged(self, tmp_path: Path) -> None:
+        pretty = tmp_path / "lib.pretty"
+        stats = WriteStats()
+        with FootprintLibWriter(str(pretty), stats) as writer:
+            assert not writer.exists("A.kicad_mod")
+            for i in range(20):
+                writer.write(f"F{i}.kicad_mod", f"(footprint F{i})\n")
+            writer.write("F0.kicad_mod", "(footprint F0 changed)\n")
+            assert writer.exists("F19.kicad_mod")
+        assert len(list(pretty.iterdir())) == 20
+        assert (pretty / "F0.kicad_mod").read_text() == "(footprint F0 changed)\n"
+        assert (stats.written, stats.skipped) == (21, 0)
+
+        _age(pretty)
+        stats = WriteStats()
+        with FootprintLibWriter(str(pretty), stats, threads=2) as writer:
+            writer.write("F1.kicad_mod", "(footprint F1)\n")
+            writer.write("F2.kicad_mod", "(footprint F2 changed)\n")
+        assert (pretty / "F1.kicad_mod").stat().st_mtime_ns == 10**18
+        assert (pretty / "F2.kicad_mod").stat().st_mtime_ns != 10**18
+        assert (stats.written, stats.skipped) == (1, 1)
+
+    def test_directory_is_listed_once(self, tmp_path: Path) -> None:
+        (tmp_path / "A.kicad_mod").write_text("a")
+        writer = FootprintLibWriter(str(tmp_path))
+        assert writer.exists("A.kicad_mod")
+        # files created by others after the listing are not seen
+        (tmp_path / "B.kicad_mod").write_text("b")
+        assert not writer.exists("B.kicad_mod")
+
+    def test_failed_write_is_reported_per_component(
+        self, tmp_path: Path, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        stats = WriteStats()
+        with caplog.at_level("INFO"):
+            with FootprintLibWriter(str(tmp_path), stats) as writer:
+                writer.write("A.kicad_mod", "a", "C1")
+                writer.write("missing/B.kicad_mod", "b", "C2")
+                writer.write("C.kicad_mod", "c", "C3")
+        assert writer.failed == 1
+        # the writes after the failed one are completed and counted
+        assert (tmp_path / "C.kicad_mod").read_text() == "c"
+        assert (stats.written, stats.skipped) == (2, 0)
+        assert "Failed to write the footprint for ID: C2" in caplog.text
+        assert "Created Kicad footprint for ID: C3" in caplog.text
+        assert "Created Kicad footprint for ID: C2" not in caplog.text
+
+    def test_invalid_threads(self) -> None:
+        with pytest.raises(ValueError):
+            FootprintLibWriter("lib.pretty", threads=0)
+
+    def test_cli_syncs_files_and_directory_once(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.chdir(tmp_path)
+        seed_cache(tmp_path, COMPONENTS)
+        synced_files: list[str] = []
+        synced_dirs: list[str] = []
+        write = export_kicad_footprint.write_atomic
+
+        def recording_write(path: Path, data: bytes, fsync: bool = False) -> None:
+            if fsync:
+                synced_files.append(Path(path).name)
+            write(path, data, fsync=fsync)
+
+        monkeypatch.setattr(export_kicad_footprint, "write_atomic", recording_write)
+        monkeypatch.setattr(
+            export_kicad_footprint, "fsync_directory", lambda p: synced_dirs.append(p)
+        )
+        out = tmp_path / "out"
+        out.mkdir()
+        argv = ["--lcsc_id", *COMPONENTS, "--footprint", "--use-cache"]
+        assert main(argv + ["--output", str(out / "lib")]) == 0
+        assert sorted(synced_files) == sorted(
+            p.name for p in (out / "lib.pretty").iterdir()
+        )
+        assert synced_dirs == [out / "lib.pretty"]
+
+
+class TestSymbolLib:
+    def test_unchanged_symbol_is_not_written(self, tmp_path: Path) -> None:
+        lib = tmp_path / "lib.kicad_sym"
+        stats = WriteStats()
+        write_component_in_symbol_lib_file(str(lib), "P0", SYMBOL, stats=stats)
+        os.utime(lib, ns=(10**18, 10**18))
+        write_component_in_symbol_lib_file(str(lib), "P0", SYMBOL, stats=stats)
+        assert lib.stat().st_mtime_ns == 10**18
+        assert (stats.written, stats.skipped) == (1, 1)
+
+    def test_library_session_skips_without_reading(self, tmp_path: Path) -> None:
+        lib = tmp_path / "lib.kicad_sym"
+        write_component_in_symbol_lib_file(str(lib), "P0", SYMBOL)
+        before = lib.read_bytes()
+
+        stats = WriteStats()
+        with SymbolLibrary(str(lib), stats=stats) as library:
+            library.write_component("P0", SYMBOL)
+            # the index tells that the symbol is unchanged
+            assert library._data is None
+            assert not library.changed
+        assert lib.read_bytes() == before
+        assert (stats.written, stats.skipped) == (0, 1)
+
+
+class TestCli:
+    @pytest.mark.parametrize("jobs", ["1", "2"])
+    def test_second_overwrite_run_writes_nothing(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        caplog: pytest.LogCaptureFixture,
+        jobs: str,
+    ) -> None:
+        monkeypatch.chdir(tmp_path)
+        seed_cache(tmp_path, COMPONENTS)
+        out = tmp_path / "out"
+        out.mkdir()
+        argv = [
+            "--lcsc_id",
+            *COMPONENTS,
+            "--full",
+            "--svg",
+            "--use-cache",
+            "--overwrite",
+            "--jobs",
+            jobs,
+            "--output",
+            str(out / "lib"),
+        ]
+        assert main(argv) == 0
+        _age(out)
+        before = _mtimes(out)
+
+        caplog.clear()
+        with caplog.at_level("INFO"):
+            assert main(argv) == 0
+        assert _mtimes(out) == before
+        # per component: symbol, footprint, wrl, step and two SVGs
+        assert "0 outputs written, 12 unchanged" in caplog.text
+
+    def test_failed_footprint_write_fails_the_run(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.chdir(tmp_path)
+        seed_cache(tmp_path, COMPONENTS)
+        out = tmp_path / "out"
+        argv = ["--lcsc_id", "C1", "--footprint", "--use-cache", "--overwrite"]
+        argv += ["--output", str(out / "lib")]
+        out.mkdir()
+        assert main(argv) == 0
+        (footprint,) = (out / "lib.pretty").iterdir()
+        footprint.unlink()
+        # a directory in the way of the footprint file
+        footprint.mkdir()
+        assert main(argv) == 1
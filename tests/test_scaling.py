@@ -0,0 +1,114 @@
+"""Scaling of every conversion stage with the size of the component.
+
+Each stage is run on synthetic parts of growing size and a power law
+``cost = c * n**k`` is fitted to its cost. A stage fails if its exponent
+shows super-linear growth (a quadratic stage has k close to 2).
+
+The cost is the number of function calls counted by ``cProfile``, not the
+wall-clock time: it is the same on every run and every machine, so the fit
+does not depend on the load of the machine.
+
+Run with ``pytest tests/test_scaling.py -m slow -s`` to see the fitted curves.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import math
+import pstats
+from collections.abc import Callable, Sequence
+from typing import Any
+
+import pytest
+
+from easyeda2kicad.easyeda.easyeda_importer import (
+    Easyeda3dModelImporter,
+    EasyedaFootprintImporter,
+    EasyedaSymbolImporter,
+)
+from easyeda2kicad.easyeda.easyeda_svg_renderer import (
+    render_footprint_svg,
+    render_symbol_svg,
+)
+from easyeda2kicad.kicad.export_kicad_3d_model import generate_wrl_model
+from easyeda2kicad.kicad.export_kicad_footprint import ExporterFootprintKicad
+from easyeda2kicad.kicad.export_kicad_symbol import convert_to_kicad
+from easyeda2kicad.kicad.parameters_kicad_symbol import KICAD_SYM_VERSION_20251024
+
+from .synthetic import FakeApi, scaled_cad_data
+
+pytestmark = pytest.mark.slow
+
+SIZES = (250, 500, 1000, 2000)
+# A linear stage fits k = 1.0 (less with a fixed overhead)
+MAX_EXPONENT = 1.1
+
+
+def _calls(func: Callable[[], Any]) -> int:
+    """Number of function calls made by *func*."""
+    func()  # warm up caches and lazy imports
+    profiler = cProfile.Profile()
+    profiler.runcall(func)
+    calls: int = pstats.Stats(profiler).total_calls  # type: ignore[attr-defined]
+    return calls
+
+
+def loglog_slope(sizes: Sequence[int], costs: Sequence[float]) -> float:
+    """Least squares exponent k of ``cost = c * n**k``."""
+    xs = [math.log(n) for n in sizes]
+    ys = [math.log(c) for c in costs]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    cov = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    var = sum((x - mean_x) ** 2 for x in xs)
+    return cov / var
+
+
+def _stages(size: int) -> dict[str, Callable[[], Any]]:
+    """Every stage for a part of *size*, with its input prepared up front."""
+    data = scaled_cad_data(size)
+    ee_symbol = EasyedaSymbolImporter(data).get_symbol()
+    ki_symbol = convert_to_kicad(ee_symbol)
+    ee_footprint = EasyedaFootprintImporter(data).get_footprint()
+    fp_exporter = ExporterFootprintKicad(ee_footprint)
+    model_3d = Easyeda3dModelImporter(
+        easyeda_cp_cad_data=data,
+        download_raw_3d_model=True,
+        api=FakeApi(data, obj_vertices=20 * size),  # type: ignore[arg-type]
+    ).output
+    assert model_3d is not None
+
+    return {
+        "symbol import": lambda: EasyedaSymbolImporter(data).get_symbol(),
+        "symbol convert": lambda: convert_to_kicad(ee_symbol),
+        "symbol export": lambda: ki_symbol.export(KICAD_SYM_VERSION_20251024),
+        "footprint import": lambda: EasyedaFootprintImporter(data).get_footprint(),
+        "footprint convert": lambda: ExporterFootprintKicad(ee_footprint),
+        "footprint export": lambda: fp_exporter.render(model_3d_path="models"),
+        "OBJ to WRL": lambda: generate_wrl_model(model_3d),
+        "symbol SVG": lambda: render_symbol_svg(data),
+        "footprint SVG": lambda: render_footprint_svg(data),
+    }
+
+
+def test_loglog_slope() -> None:
+    sizes = (1, 2, 4, 8)
+    assert loglog_slope(sizes, [3.0 * n for n in sizes]) == pytest.approx(1.0)
+    assert loglog_slope(sizes, [0.5 * n * n for n in sizes]) == pytest.approx(2.0)
+
+
+def test_stages_scale_linearly() -> None:
+    stages = {size: _stages(size) for size in SIZES}
+    costs = {
+        stage: [_calls(stages[size][stage]) for size in SIZES]
+        for stage in stages[SIZES[0]]
+    }
+
+    slopes = {stage: loglog_slope(SIZES, c) for stage, c in costs.items()}
+    print(f"\nsize: {', '.join(str(n) for n in SIZES)} pins/pads")
+    for stage, stage_costs in costs.items():
+        calls = " ".join(f"{c:9d}" for c in stage_costs)
+        print(f"  {stage:17} {calls} calls   n^{slopes[stage]:.2f}")
+
+    super_linear = {s: round(k, 2) for s, k in slopes.items() if k > MAX_EXPONENT}
+    assert not super_linear
@@ -0,0 +1,122 @@
+"""Tests for the shared SVG path parser and the shapes built on it."""
+
+from __future__ import annotations
+
+import pytest
+
+from easyeda2kicad.easyeda.easyeda_svg_renderer import _bbox_from_path, _BBox
+from easyeda2kicad.easyeda.parameters_easyeda import EeSymbolBbox, EeSymbolPath
+from easyeda2kicad.easyeda.svg_path_parser import (
+    SvgPathLineTo,
+    SvgPathMoveTo,
+    SvgSegment,
+    parse_path,
+    parse_svg_path,
+)
+from easyeda2kicad.kicad.export_kicad_footprint import _parse_solid_region_path
+from easyeda2kicad.kicad.export_kicad_symbol import convert_ee_paths
+
+
+def _segments(path: str) -> list[tuple[str, tuple[float, ...]]]:
+    return [(s.command, s.args) for s in parse_path(path).segments]
+
+
+class TestParsePath:
+    def test_absolute_commands(self) -> None:
+        assert _segments(
+            "M 1 2 L 3 4 H 5 V 6 C 1 1 2 2 3 3 Q 4 4 5 5 A 1 2 30 0 1 7 8 Z"
+        ) == [
+            ("M", (1.0, 2.0)),
+            ("L", (3.0, 4.0)),
+            ("L", (5.0, 4.0)),
+            ("L", (5.0, 6.0)),
+            ("C", (1.0, 1.0, 2.0, 2.0, 3.0, 3.0)),
+            ("Q", (4.0, 4.0, 5.0, 5.0)),
+            ("A", (1.0, 2.0, 30.0, 0.0, 1.0, 7.0, 8.0)),
+            ("Z", ()),
+        ]
+
+    def test_relative_commands(self) -> None:
+        relative = "m 1 2 l 2 2 h 2 v 2 c 1 0 1 1 0 1 q 1 1 2 0 a 1 1 0 0 1 1 1 z l 1 1"
+        assert _segments(relative) == [
+            ("M", (1.0, 2.0)),
+            ("L", (3.0, 4.0)),
+            ("L", (5.0, 4.0)),
+            ("L", (5.0, 6.0)),
+            ("C", (6.0, 6.0, 6.0, 7.0, 5.0, 7.0)),
+            ("Q", (6.0, 8.0, 7.0, 7.0)),
+            ("A", (1.0, 1.0, 0.0, 0.0, 1.0, 8.0, 8.0)),
+            ("Z", ()),
+            # after Z the pen is back at the start of the subpath
+            ("L", (2.0, 3.0)),
+        ]
+
+    def test_number_syntax(self) -> None:
+        # commas, no separators, signs, exponents and ".5.5" as two numbers
+        assert _segments("M1,-2L+3-4 1e1 .5.5 1") == [
+            ("M", (1.0, -2.0)),
+            ("L", (3.0, -4.0)),
+            ("L", (10.0, 0.5)),
+            ("L", (0.5, 1.0)),
+        ]
+
+    def test_implicit_repetition(self) -> None:
+        # coordinates after the first pair of M are lines
+        assert _segments("M 0 0 1 1 2 2") == [
+            ("M", (0.0, 0.0)),
+            ("L", (1.0, 1.0)),
+            ("L", (2.0, 2.0)),
+        ]
+
+    def test_skipped_commands(self) -> None:
+        path = parse_path("M 0 0 X 9 L 1 1 2 T 5 5")
+        assert path.segments == (
+            SvgSegment("M", (0.0, 0.0)),
+            SvgSegment("L", (1.0, 1.0)),
+        )
+        assert path.skipped == ("X", "L", "T")
+
+    def test_points(self) -> None:
+        path = parse_path("M 0 0 C 1 5 2 5 3 0 A 5 5 0 0 1 9 9 Z")
+        assert path.points() == [(0, 0), (1, 5), (2, 5), (3, 0), (9, 9)]
+
+    def test_cached(self) -> None:
+        path = "M 7 7 L 8 8"
+        assert parse_path(path) is parse_path(path)
+
+
+class TestConsumers:
+    def test_svg_path_commands(self) -> None:
+        assert parse_svg_path("m 1 1 l 2 0") == [
+            SvgPathMoveTo(1.0, 1.0),
+            SvgPathLineTo(3.0, 1.0),
+        ]
+
+    def test_symbol_path_relative_matches_absolute(self) -> None:
+        def convert(path: str) -> tuple[list[object], list[object]]:
+            ee_path = EeSymbolPath(
+                paths=path,
+                stroke_color="",
+                stroke_width="1",
+                stroke_style="",
+                fill_color=False,
+                id="pt1",
+                is_locked=False,
+            )
+            polys, bezs = convert_ee_paths([ee_path], EeSymbolBbox(x=400, y=300))
+            return [p.points for p in polys], [b.points for b in bezs]
+
+        absolute = convert("M 400 300 L 410 300 L 410 310 C 410 315 405 315 400 310 Z")
+        assert convert("M400,300h10v10c0 5-5 5-10 0z") == absolute
+        assert absolute[0] and absolute[1]
+
+    def test_solid_region(self) -> None:
+        points = _parse_solid_region_path("M 10 10 h 2 v 2 Q 11 13 10 12 z", 10, 10)
+        assert points == pytest.approx(
+            [(0, 0), (0.508, 0), (0.508, 0.508), (0, 0.508), (0, 0)]
+        )
+
+    def test_renderer_bbox_covers_relative_pin_line(self) -> None:
+        bbox = _BBox()
+        _bbox_from_path("M 390 300 v 20", bbox)
+        assert (bbox.min_y, bbox.max_y) == (300, 320)
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import dataclasses
+import io
 import logging
 
 import pytest
@@ -19,20 +21,40 @@ from easyeda2kicad.easyeda.parameters_easyeda import (
     EeSymbolPinSettings,
     EeSymbolPolyline,
 )
+from easyeda2kicad.easyeda.easyeda_importer import EasyedaSymbolImporter
 from easyeda2kicad.easyeda.parameters_easyeda import EasyedaPinType
+from easyeda2kicad.easyeda.svg_path_parser import (
+    SvgPathEllipticalArc,
+    _parse_svg_path_cached,
+    parse_svg_path,
+)
+from easyeda2kicad.kicad import geometry_kernel as gk
 from easyeda2kicad.kicad.export_kicad_symbol import (
     convert_ee_arcs,
     convert_ee_paths,
     convert_ee_pins,
     convert_ee_polylines,
-    integrate_sub_units,
+    convert_to_kicad,
+    px_to_mm,
+    px_to_mm_grid,
 )
 from easyeda2kicad.kicad.parameters_kicad_symbol import (
     KICAD_SYM_VERSION_20211014,
     KICAD_SYM_VERSION_20220914,
+    KICAD_SYM_VERSION_20251024,
+    KICAD_SYM_VERSIONS_SORTED,
     KiPinStyle,
+    KiPinType,
+    KiSymbol,
+    KiSymbolInfo,
+    KiSymbolPin,
+    KiSymbolPolygon,
+    KiSymbolRectangle,
+    KiSymbolText,
 )
 
+from .synthetic import cad_data
+
 
 BBOX = EeSymbolBbox(x=400.0, y=300.0, width=100.0, height=100.0)
 
@@ -199,6 +221,54 @@ def test_convert_ee_paths_unknown_token() -> None:
     assert bezs == []
 
 
+# Relative commands were dropped before the shared path parser, the paths
+# below pin down the .kicad_sym output they produce now.
+
+
+def test_convert_ee_paths_relative_lines() -> None:
+    path = _make_path("M 400 300 l 10 0 v 10 h -10 z")
+    polys, bezs = convert_ee_paths([path], BBOX)
+    assert bezs == []
+    assert polys[0].export(KICAD_SYM_VERSION_20211014) == (
+        "\n            (polyline"
+        "\n              (pts"
+        "\n                (xy 0.00 -0.00) (xy 2.54 -0.00) (xy 2.54 -2.54)"
+        " (xy 0.00 -2.54) (xy 0.00 -0.00)"
+        "\n              )"
+        "\n              (stroke (width 0) (type default))"
+        "\n              (fill (type background))"
+        "\n            )"
+    )
+
+
+def test_convert_ee_paths_relative_curves() -> None:
+    path = _make_path("m 400 300 c 0 5 5 5 10 0 q 5 -5 10 0")
+    polys, bezs = convert_ee_paths([path], BBOX)
+    assert polys == []
+    assert len(bezs) == 2
+    assert bezs[0].points == [[0.0, 0.0], [0.0, -1.27], [1.27, -1.27], [2.54, 0.0]]
+    # q is elevated to a cubic starting at the end of c
+    assert [xy for point in bezs[1].points for xy in point] == pytest.approx(
+        [2.54, 0.0, 3.3867, 0.8467, 4.2333, 0.8467, 5.08, 0.0], abs=1e-4
+    )
+
+
+def test_convert_ee_paths_arc_is_skipped() -> None:
+    # the polyline jumps over the arc to the next point
+    path = _make_path("M 400 300 L 410 300 a 5 5 0 0 1 0 10 L 400 310")
+    polys, bezs = convert_ee_paths([path], BBOX)
+    assert bezs == []
+    assert [p.points for p in polys] == [[[0.0, 0.0], [2.54, 0.0], [0.0, -2.54]]]
+
+
+def test_convert_ee_paths_relative_after_arc() -> None:
+    # relative coordinates continue from the end point of the skipped arc
+    path = _make_path("M 400 300 A 5 5 0 0 1 410 300 l 0 10")
+    polys, bezs = convert_ee_paths([path], BBOX)
+    assert bezs == []
+    assert [p.points for p in polys] == [[[0.0, 0.0], [2.54, -2.54]]]
+
+
 def test_bezier_export_kicad7() -> None:
     # KiCad >= 20220914: emits (bezier ...) with 4 xy points
     path = _make_path("M 400 300 C 402 295 408 295 410 300")
@@ -288,23 +358,184 @@ def test_arc_zero_radius(caplog: pytest.LogCaptureFixture) -> None:
     assert "degenerate arc" in caplog.text
 
 
-# ---- integrate_sub_units ----
+def test_identical_arc_paths_are_parsed_once() -> None:
+    _parse_svg_path_cached.cache_clear()
+    arcs = [_make_arc("M 400 300 A 5 5 0 0 1 410 300") for _ in range(50)]
+    assert _parse_svg_path_cached.cache_info().misses == 1
+    assert arcs[0].path is not arcs[1].path
+    assert arcs[0].path[1] is arcs[1].path[1]
+    assert len(convert_ee_arcs(arcs, BBOX)) == 50
+
+
+def test_parsed_path_commands_are_immutable() -> None:
+    command = parse_svg_path("M 400 300 A 5 5 0 1 0 410 300")[1]
+    assert isinstance(command, SvgPathEllipticalArc)
+    assert command.flag_large_arc is True and command.flag_sweep is False
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        command.end_x = "0"  # type: ignore[misc]
+
+
+# ---- KiSymbol.export: s-expression layout ----
+
+
+def _op_amp() -> KiSymbol:
+    return KiSymbol(
+        info=KiSymbolInfo(
+            name="OP AMP",
+            prefix="U",
+            package="SOT-23-5",
+            manufacturer="",
+            datasheet="",
+            lcsc_id="C1",
+        ),
+        pins=[
+            KiSymbolPin(
+                name="IN#",
+                number="1",
+                style=KiPinStyle.line,
+                length=2.54,
+                type=KiPinType._input,
+                orientation=0,
+                pos_x=-7.62,
+                pos_y=2.54,
+            )
+        ],
+        rectangles=[KiSymbolRectangle(-5.08, 5.08, 5.08, -5.08)],
+        polygons=[KiSymbolPolygon(points=[[0, 0], [1.5, 2.25]], is_closed=True)],
+        texts=[KiSymbolText(text='say "hi"', pos_x=1, pos_y=2, rotation=90)],
+    )
+
+
+def test_symbol_export_layout() -> None:
+    expected = [
+        "",
+        '  (symbol "OPAMP"',
+        "    (exclude_from_sim no)",
+        "    (in_bom yes)",
+        "    (on_board yes)",
+        "    (property",
+        '      "Reference"',
+        '      "U"',
+        "      (at 0 7.62 0)",
+        "      (effects (font (size 1.27 1.27) ))",
+        "    )",
+        "    (property",
+        '      "Value"',
+        '      "OP AMP"',
+        "      (at 0 -2.54 0)",
+        "      (effects (font (size 1.27 1.27) ))",
+        "    )",
+        "    (property",
+        '      "Footprint"',
+        '      "SOT-23-5"',
+        "      (at 0 -5.08 0)",
+        "      (hide yes)",
+        "      (effects (font (size 1.27 1.27) ))",
+        "    )",
+        "    (property",
+        '      "LCSC Part"',
+        '      "C1"',
+        "      (at 0 -7.62 0)",
+        "      (hide yes)",
+        "      (effects (font (size 1.27 1.27) ))",
+        "    )",
+        '    (symbol "OPAMP_0_1"',
+        "      (rectangle",
+        "        (start -5.08 5.08)",
+        "        (end 5.08 -5.08)",
+        "        (stroke (width 0) (type default))",
+        "        (fill (type background))",
+        "      )",
+        "      (polyline",
+        "        (pts",
+        "          (xy 0.00 0.00) (xy 1.50 2.25)",
+        "        )",
+        "        (stroke (width 0) (type default))",
+        "        (fill (type background))",
+        "      )",
+        '      (text "say \\"hi\\""',
+        "        (at 1.00 2.00 90)",
+        "        (effects (font (size 1.27 1.27)))",
+        "      )",
+        "      (pin input line",
+        "        (at -7.62 2.54 180)",
+        "        (length 2.54)",
+        '        (name "~{IN}" (effects (font (size 1.27 1.27))))',
+        '        (number "1" (effects (font (size 1.27 1.27))))',
+        "      )",
+        "    )",
+        "  )",
+    ]
+    assert _op_amp().export(KICAD_SYM_VERSION_20251024) == "\n".join(expected)
+
+
+@pytest.mark.parametrize("version", KICAD_SYM_VERSIONS_SORTED)
+def test_symbol_emit_streams_export(version: int) -> None:
+    stream = io.StringIO()
+    _op_amp().emit(stream.write, version)
+    assert stream.getvalue() == _op_amp().export(version)
+    assert stream.getvalue().endswith("\n    )\n  )")
+    # same layout as the standalone item exports, indented into the symbol
+    rectangle = KiSymbolRectangle(-5.08, 5.08, 5.08, -5.08).export(version)
+    assert rectangle.replace("\n      ", "\n") in stream.getvalue()
+
+
+def test_symbol_export_units() -> None:
+    units = [_op_amp(), _op_amp()]
+    units[1].pins[0].number = "2"
+    symbol = _op_amp()
+    symbol.units = units
+    exported = symbol.export(KICAD_SYM_VERSION_20251024)
+
+    assert '"OPAMP_0_1"' not in exported
+    for i, unit in enumerate(units, start=1):
+        block = unit.export(KICAD_SYM_VERSION_20251024)
+        block = block[block.index('    (symbol "OPAMP_0_1"') : -len("\n  )")]
+        assert block.replace("_0_1", f"_{i}_1") in exported
+    assert exported.index('"OPAMP_1_1"') < exported.index('"OPAMP_2_1"')
+    assert exported.endswith(
+        '(number "2" (effects (font (size 1.27 1.27))))\n      )\n    )\n  )'
+    )
+
+
+def test_convert_to_kicad_units() -> None:
+    ee_symbol = EasyedaSymbolImporter(cad_data(name="MCU", units=3)).get_symbol()
+    ki_symbol = convert_to_kicad(ee_symbol)
+    assert len(ki_symbol.units) == 3
+    exported = ki_symbol.export(KICAD_SYM_VERSION_20251024)
+    assert [f'"MCU_{i}_1"' in exported for i in range(4)] == [False, True, True, True]
+
+
+# ---- batched pixel -> mm conversion ----
 
 
-def test_integrate_sub_units_empty() -> None:
-    main = '(symbol "Foo_0_1" (pin) )'
-    assert integrate_sub_units(main, [], "Foo") == main
+def _px_values() -> list[float]:
+    values = [(i * 7919) % 100003 / 10 - 5000 for i in range(2000)]
+    # exact rounding ties on the 1.27mm grid, values snapping to -0.0 and 0.0
+    return values + [2.5, -2.5, 7.5, -7.5, 0.0, -0.0, -1.0, 1.0, 0.1, -0.1, 1e-9]
 
 
-def test_integrate_sub_units_no_match() -> None:
-    main = '(symbol "Foo_0_1" (pin) )'
-    sub = '(symbol "Bar_0_1" (pin) )'
-    assert integrate_sub_units(main, [sub], "Foo") == main
+def test_px_to_mm_columns_match_scalars(backend: bool) -> None:
+    values = _px_values()
+    col = gk.as_column(values)
+    for origin in (0, 385, 287.5):
+        mm = gk.to_list(gk.px_to_mm(col, origin=origin))
+        assert mm == [px_to_mm(v - origin) for v in values]
+        snapped = gk.to_list(gk.px_to_mm_grid(col, origin=origin))
+        expected = [px_to_mm_grid(v - origin) for v in values]
+        assert snapped == expected
+        # "-0.00" and "0.00" are different in the exported file
+        assert [str(v) for v in snapped] == [str(v) for v in expected]
+        flipped = gk.to_list(gk.negate(gk.px_to_mm_grid(col, origin=origin)))
+        assert [str(v) for v in flipped] == [str(-v) for v in expected]
 
 
-def test_integrate_sub_units_replaces() -> None:
-    main = '  (symbol "Foo_0_1"\n    (pin)\n  )\n'
-    sub = '  (symbol "Foo_0_1"\n    (pin)\n  )\n'
-    result = integrate_sub_units(main, [sub], "Foo")
-    assert '"Foo_1_1"' in result
-    assert '"Foo_0_1"' not in result
+def test_symbol_export_independent_of_backend(
+    backend: bool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    ee_symbol = EasyedaSymbolImporter(
+        cad_data(name="MCU", pins=60, seed=4)
+    ).get_symbol()
+    exported = convert_to_kicad(ee_symbol).export(KICAD_SYM_VERSION_20251024)
+    monkeypatch.setattr(gk, "HAS_NUMPY", not backend and gk.HAS_NUMPY)
+    assert convert_to_kicad(ee_symbol).export(KICAD_SYM_VERSION_20251024) == exported
@@ -0,0 +1,151 @@
+"""Tests for writing parts with the same graphics as derived symbols (extends)."""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+import pytest
+
+from easyeda2kicad.__main__ import main
+from easyeda2kicad.easyeda.easyeda_importer import EasyedaSymbolImporter
+from easyeda2kicad.kicad.export_kicad_symbol import (
+    ExporterSymbolKicad,
+    write_component_in_symbol_lib_file,
+)
+from easyeda2kicad.kicad.symbol_dedup import derive_symbol, symbol_shape
+from easyeda2kicad.kicad.symbol_lib_index import (
+    SymbolLibIndex,
+    SymbolLibrary,
+    compact_symbol_lib,
+    load_symbol_lib_index,
+)
+
+from .synthetic import cad_data
+
+
+def _symbol(name: str, seed: int = 0, pins: int = 8) -> str:
+    data = cad_data(name=name, pins=pins, seed=seed)
+    symbol = EasyedaSymbolImporter(data).get_symbol()
+    return ExporterSymbolKicad(symbol, lib_path=None).export("lib")
+
+
+# (name, content) of 4 parts, R1 and R2 share the graphics of R0
+PARTS = [
+    ("R0", _symbol("R0")),
+    ("U0", _symbol("U0", seed=1, pins=12)),
+    ("R1", _symbol("R1")),
+    ("R2", _symbol("R2")),
+]
+
+
+def _extends(lib: Path) -> dict[str, str | None]:
+    index = load_symbol_lib_index(str(lib))
+    assert index is not None
+    text = lib.read_text(encoding="utf-8")
+    return {
+        name: symbol_shape(text[symbol.start : symbol.end]).extends
+        for name, symbol in index.symbols.items()
+    }
+
+
+class TestSymbolShape:
+    def test_properties_and_name_are_ignored(self) -> None:
+        r0, u0, r1 = (symbol_shape(content) for _, content in PARTS[:3])
+        assert r0.geometry is not None and r0.extends is None
+        assert r0.geometry == r1.geometry
+        assert r0.geometry != u0.geometry
+
+    def test_derived_symbol(self) -> None:
+        derived = derive_symbol(PARTS[2][1], "R0")
+        assert symbol_shape(derived) == (None, "R0")
+        assert derived.startswith('\n  (symbol "R1"\n    (extends "R0")\n    (property')
+        assert derived.endswith("\n  )")
+        assert '"R1_0_1"' not in derived and "(pin " not in derived
+        assert derived.count("(property") == PARTS[2][1].count("(property")
+
+    def test_malformed(self) -> None:
+        assert symbol_shape('  (symbol "X" (pin') == (None, None)
+        with pytest.raises(ValueError):
+            derive_symbol("(footprint x)", "R0")
+
+
+class TestIncremental:
+    def test_one_by_one(self, tmp_path: Path) -> None:
+        lib = tmp_path / "lib.kicad_sym"
+        for name, content in PARTS:
+            write_component_in_symbol_lib_file(str(lib), name, content, dedup=True)
+        assert _extends(lib) == {"R0": None, "U0": None, "R1": "R0", "R2": "R0"}
+        # the shapes are kept in the sidecar index, the one of the symbol
+        # written last is computed when it is needed
+        index = load_symbol_lib_index(str(lib))
+        assert index is not None
+        assert index.symbols["R1"].shape == (None, "R0")
+        assert index.symbols["R2"].shape is None
+        assert SymbolLibIndex.from_json(index.to_json()) == index
+
+    def test_session_matches_one_by_one(self, tmp_path: Path) -> None:
+        session, one_by_one = tmp_path / "a.kicad_sym", tmp_path / "b.kicad_sym"
+        # the library exists, so that new symbols are appended without loading it
+        for lib in (session, one_by_one):
+            write_component_in_symbol_lib_file(str(lib), *PARTS[1], dedup=True)
+        with SymbolLibrary(str(session), dedup=True) as library:
+            for name, content in PARTS:
+                library.write_component(name, content)
+            assert library._data is None
+        for name, content in PARTS:
+            write_component_in_symbol_lib_file(
+                str(one_by_one), name, content, dedup=True
+            )
+        assert session.read_bytes() == one_by_one.read_bytes()
+        assert _extends(session)["R2"] == "R0"
+
+    def test_base_must_come_first(self, tmp_path: Path) -> None:
+        lib = tmp_path / "lib.kicad_sym"
+        write_component_in_symbol_lib_file(str(lib), "R1", _symbol("R1", seed=5))
+        write_component_in_symbol_lib_file(str(lib), "R0", _symbol("R0"))
+        # R0 comes after R1 in the library, R1 cannot extend it
+        write_component_in_symbol_lib_file(str(lib), "R1", PARTS[2][1], dedup=True)
+        assert _extends(lib) == {"R1": None, "R0": None}
+
+    def test_changed_base_stays_complete(
+        self, tmp_path: Path, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        lib = tmp_path / "lib.kicad_sym"
+        for name, content in PARTS:
+            write_component_in_symbol_lib_file(str(lib), name, content, dedup=True)
+        with caplog.at_level(logging.WARNING):
+            write_component_in_symbol_lib_file(
+                str(lib), "R0", _symbol("R0", seed=5), dedup=True
+            )
+        assert "extended by 2 symbol(s)" in caplog.text
+        assert _extends(lib)["R0"] is None
+
+    def test_without_dedup(self, tmp_path: Path) -> None:
+        lib = tmp_path / "lib.kicad_sym"
+        for name, content in PARTS:
+            write_component_in_symbol_lib_file(str(lib), name, content)
+        assert set(_extends(lib).values()) == {None}
+
+
+class TestCompaction:
+    def test_matches_incremental(self, tmp_path: Path) -> None:
+        full, incremental = tmp_path / "a.kicad_sym", tmp_path / "b.kicad_sym"
+        for name, content in PARTS:
+            write_component_in_symbol_lib_file(str(full), name, content)
+            write_component_in_symbol_lib_file(
+                str(incremental), name, content, dedup=True
+            )
+        assert full.stat().st_size > incremental.stat().st_size
+        assert compact_symbol_lib(str(full)) == 2
+        assert full.read_bytes() == incremental.read_bytes()
+        assert compact_symbol_lib(str(full)) == 0
+
+    def test_cli(self, tmp_path: Path) -> None:
+        lib = tmp_path / "lib.kicad_sym"
+        for name, content in PARTS:
+            write_component_in_symbol_lib_file(str(lib), name, content)
+        output = str(tmp_path / "lib")
+        assert main(["--compact-symbol-lib", "--output", output]) == 0
+        assert _extends(lib)["R1"] == "R0"
+        assert main(["--compact-symbol-lib", "--output", str(tmp_path / "no")]) == 1
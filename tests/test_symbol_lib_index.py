@@ -0,0 +1,405 @@
+"""Tests for the .kicad_sym sidecar index — results must match the full rewrite."""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from easyeda2kicad._version import GENERATOR_URL
+from easyeda2kicad.kicad import symbol_lib_index
+from easyeda2kicad.kicad.export_kicad_symbol import (
+    _SYM_LIB_REGEX,
+    id_already_in_symbol_lib,
+    write_component_in_symbol_lib_file,
+)
+from easyeda2kicad.kicad.symbol_lib_index import (
+    SymbolLibrary,
+    find_symbol_in_lib,
+    load_symbol_lib_index,
+    recover_symbol_lib,
+    symbol_lib_index_path,
+    symbol_lib_journal_path,
+)
+
+LIB_HEADER = """\
+(kicad_symbol_lib
+  (version 20211014)
+  (generator {generator})
+)"""
+
+
+def _symbol(name: str, body: str = "") -> str:
+    return (
+        f'\n  (symbol "{name}"\n    (in_bom yes) (on_board yes){body}\n'
+        f'    (symbol "{name}_0_1"\n      (pin)\n    )\n  )\n'
+    )
+
+
+def _legacy_write(lib: Path, name: str, content: str) -> None:
+    """The previous implementation, rewriting the whole library."""
+    current = lib.read_text(encoding="utf-8")
+    pattern = _SYM_LIB_REGEX.format(component_name=re.escape(name))
+    if re.search(pattern, current, flags=re.DOTALL):
+        new_lib = re.sub(pattern, content.rstrip("\n"), current, flags=re.DOTALL)
+    else:
+        last_paren_pos = current.rfind(")")
+        sep = "" if content.endswith("\n") else "\n"
+        new_lib = current[:last_paren_pos] + content + sep + current[last_paren_pos:]
+    new_lib = new_lib.replace(
+        "(generator kicad_symbol_editor)", f"(generator {GENERATOR_URL})"
+    )
+    lib.write_text(new_lib, encoding="utf-8")
+
+
+def _libs(tmp_path: Path, generator: str = GENERATOR_URL) -> tuple[Path, Path]:
+    indexed, legacy = tmp_path / "indexed.kicad_sym", tmp_path / "legacy.kicad_sym"
+    for lib in (indexed, legacy):
+        lib.write_text(LIB_HEADER.format(generator=generator), encoding="utf-8")
+    return indexed, legacy
+
+
+def _half_write_open() -> Any:
+    """``open`` whose first in-place write stops halfway, e.g. on a full disk."""
+    failed = False
+
+    def _open(file: Any, mode: str = "r", *args: Any, **kwargs: Any) -> Any:
+        nonlocal failed
+        opened = open(file, mode, *args, **kwargs)
+        if mode == "r+b" and not failed:
+            failed = True
+            write = opened.write
+
+            def half_write(data: bytes) -> int:
+                write(data[: len(data) // 2])
+                opened.flush()
+                raise OSError(28, "No space left on device")
+
+            opened.write = half_write
+        return opened
+
+    return _open
+
+
+def _forget_cached_indexes() -> None:
+    symbol_lib_index._INDEX_CACHE.clear()
+
+
+class TestSplice:
+    def test_adds_and_replacements_match_full_rewrite(self, tmp_path: Path) -> None:
+        indexed, legacy = _libs(tmp_path)
+        writes = [(f"P{i}", _symbol(f"P{i}")) for i in range(6)]
+        # replacements growing, shrinking and keeping the size of a symbol
+        writes += [
+            ("P2", _symbol("P2", " (extra stuff)")),
+            ("P0", _symbol("P0", " (x)")),
+            ("P5", _symbol("P5")),
+            ("P2", _symbol("P2")),
+            ("P6", _symbol("P6").rstrip("\n")),
+            ("P3", _symbol("P3", " (ünïcode)")),
+        ]
+        for name, content in writes:
+            write_component_in_symbol_lib_file(str(indexed), name, content)
+            _legacy_write(legacy, name, content)
+            assert indexed.read_bytes() == legacy.read_bytes()
+
+        index = load_symbol_lib_index(str(indexed))
+        assert index is not None
+        assert sorted(index.symbols) == [f"P{i}" for i in range(7)]
+        data = indexed.read_bytes()
+        for name, symbol in index.symbols.items():
+            assert data[symbol.start :].startswith(f'\n  (symbol "{name}"'.encode())
+        scanned = symbol_lib_index.scan_symbol_lib(data)
+        assert scanned is not None
+        assert (scanned.close, scanned.symbols) == (index.close, index.symbols)
+
+    def test_unchanged_symbol_is_not_rewritten(self, tmp_path: Path) -> None:
+        lib, _ = _libs(tmp_path)
+        write_component_in_symbol_lib_file(str(lib), "P0", _symbol("P0"))
+        before = lib.stat().st_mtime_ns
+        write_component_in_symbol_lib_file(str(lib), "P0", _symbol("P0"))
+        assert lib.stat().st_mtime_ns == before
+
+    def test_failed_splice_leaves_library_intact(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        lib, _ = _libs(tmp_path)
+        write_component_in_symbol_lib_file(str(lib), "P0", _symbol("P0"))
+        before = lib.read_bytes()
+
+        def crash(src: object, dst: object) -> None:
+            raise OSError("disk full")
+
+        monkeypatch.setattr(symbol_lib_index.shutil, "copyfileobj", crash)
+        with pytest.raises(OSError):
+            write_component_in_symbol_lib_file(str(lib), "P0", _symbol("P0", " (x)"))
+        assert lib.read_bytes() == before
+        assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []
+
+    def test_kicad_saved_lib_is_rewritten(self, tmp_path: Path) -> None:
+        indexed, legacy = _libs(tmp_path, generator="kicad_symbol_editor")
+        for lib in (indexed, legacy):
+            lib.write_text(
+                lib.read_text().replace("\n)", _symbol("OLD") + ")"), encoding="utf-8"
+            )
+        assert id_already_in_symbol_lib(str(indexed), "OLD")
+        for name in ("NEW", "OLD", "NEW2"):
+            write_component_in_symbol_lib_file(str(indexed), name, _symbol(name))
+            _legacy_write(legacy, name, _symbol(name))
+            assert indexed.read_bytes() == legacy.read_bytes()
+        assert GENERATOR_URL in indexed.read_text()
+
+    def test_duplicate_symbols_fall_back_to_regex(self, tmp_path: Path) -> None:
+        indexed, legacy = _libs(tmp_path)
+        twice = _symbol("DUP") + _symbol("DUP")
+        for lib in (indexed, legacy):
+            lib.write_text(lib.read_text().replace("\n)", twice + ")"))
+        assert load_symbol_lib_index(str(indexed)) is None
+        assert id_already_in_symbol_lib(str(indexed), "DUP")
+        write_component_in_symbol_lib_file(str(indexed), "DUP", _symbol("DUP", " (x)"))
+        _legacy_write(legacy, "DUP", _symbol("DUP", " (x)"))
+        assert indexed.read_bytes() == legacy.read_bytes()
+
+
+class TestPersistentIndex:
+    def test_existence_check_does_not_read_the_library(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        lib, _ = _libs(tmp_path)
+        write_component_in_symbol_lib_file(str(lib), "P0", _symbol("P0"))
+        assert symbol_lib_index_path(str(lib)).is_file()
+        _forget_cached_indexes()
+
+        def fail(*_: Any) -> None:
+            raise AssertionError("library scanned")
+
+        monkeypatch.setattr(symbol_lib_index, "scan_symbol_lib", fail)
+        assert id_already_in_symbol_lib(str(lib), "P0")
+        assert not id_already_in_symbol_lib(str(lib), "P1")
+
+    def test_existence_check_does_not_write_an_index(self, tmp_path: Path) -> None:
+        lib, _ = _libs(tmp_path)
+        lib.write_text(lib.read_text().replace("\n)", _symbol("OLD") + ")"))
+        assert id_already_in_symbol_lib(str(lib), "OLD")
+        assert not id_already_in_symbol_lib(str(lib), "NEW")
+        assert not symbol_lib_index_path(str(lib)).exists()
+
+    def test_stale_index_is_rebuilt(self, tmp_path: Path) -> None:
+        lib, _ = _libs(tmp_path)
+        write_component_in_symbol_lib_file(str(lib), "P0", _symbol("P0"))
+        # edited elsewhere, e.g. in KiCad
+        lib.write_text(lib.read_text().replace("P0", "Q0"), encoding="utf-8")
+        assert not id_already_in_symbol_lib(str(lib), "P0")
+        assert id_already_in_symbol_lib(str(lib), "Q0")
+        _forget_cached_indexes()
+        assert id_already_in_symbol_lib(str(lib), "Q0")
+
+    def test_corrupt_index_is_ignored(self, tmp_path: Path) -> None:
+        lib, _ = _libs(tmp_path)
+        write_component_in_symbol_lib_file(str(lib), "P0", _symbol("P0"))
+        symbol_lib_index_path(str(lib)).write_text("{not json", encoding="utf-8")
+        _forget_cached_indexes()
+        assert id_already_in_symbol_lib(str(lib), "P0")
+
+
+def _session_writes() -> list[tuple[str, str]]:
+    writes = [(f"P{i}", _symbol(f"P{i}")) for i in range(4)]
+    writes += [("P1", _symbol("P1", " (x)")), ("P3", _symbol("P3"))]
+    return writes + [("P4", _symbol("P4"))]
+
+
+class TestSymbolLibrary:
+    @pytest.mark.parametrize(
+        "generator", [GENERATOR_URL, "kicad_symbol_editor"], ids=["ours", "kicad"]
+    )
+    def test_matches_writes_one_by_one(self, tmp_path: Path, generator: str) -> None:
+        session, one_by_one = _libs(tmp_path, generator=generator)
+        with SymbolLibrary(str(session)) as library:
+            for name, content in _session_writes():
+                library.write_component(name, content)
+        for name, content in _session_writes():
+            write_component_in_symbol_lib_file(str(one_by_one), name, content)
+        assert session.read_bytes() == one_by_one.read_bytes()
+
+    def test_creates_missing_library(self, tmp_path: Path) -> None:
+        session, one_by_one = tmp_path / "a.kicad_sym", tmp_path / "b.kicad_sym"
+        with SymbolLibrary(str(session)) as library:
+            assert not library.id_already_in("P0")
+            library.write_component("P0", _symbol("P0"), version=20241209)
+            assert library.id_already_in("P0")
+        write_component_in_symbol_lib_file(
+            str(one_by_one), "P0", _symbol("P0"), version=20241209
+        )
+        assert session.read_bytes() == one_by_one.read_bytes()
+
+    def test_written_once_on_exit(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        lib, _ = _libs(tmp_path)
+        before = lib.read_bytes()
+        replaced = []
+        monkeypatch.setattr(
+            symbol_lib_index.os, "replace", lambda *a: replaced.append(a[1])
+        )
+        with SymbolLibrary(str(lib)) as library:
+            for name, content in _session_writes():
+                library.write_component(name, content)
+            assert lib.read_bytes() == before
+        assert replaced.count(lib) == 1
+        assert not list(tmp_path.glob(".*.tmp"))
+
+    def test_unchanged_library_is_not_written(self, tmp_path: Path) -> None:
+        lib, _ = _libs(tmp_path)
+        write_component_in_symbol_lib_file(str(lib), "P0", _symbol("P0"))
+        before = lib.stat().st_mtime_ns
+        with SymbolLibrary(str(lib)) as library:
+            assert library.id_already_in("P0")
+            library.write_component("P0", _symbol("P0"))
+        assert lib.stat().st_mtime_ns == before
+
+    def test_index_is_current_after_flush(self, tmp_path: Path) -> None:
+        lib, _ = _libs(tmp_path)
+        with SymbolLibrary(str(lib)) as library:
+            for name, content in _session_writes():
+                library.write_component(name, content)
+        _forget_cached_indexes()
+        index = load_symbol_lib_index(str(lib))
+        scanned = symbol_lib_index.scan_symbol_lib(lib.read_bytes())
+        assert index is not None and scanned is not None
+        assert index.symbols == scanned.symbols
+
+    def test_duplicate_symbols(self, tmp_path: Path) -> None:
+        session, one_by_one = _libs(tmp_path)
+        twice = _symbol("DUP") + _symbol("DUP")
+        for lib in (session, one_by_one):
+            lib.write_text(lib.read_text().replace("\n)", twice + ")"))
+        with SymbolLibrary(str(session)) as library:
+            assert library.id_already_in("DUP")
+            library.write_component("DUP", _symbol("DUP", " (x)"))
+            library.write_component("NEW", _symbol("NEW"))
+        for name, content in [("DUP", _symbol("DUP", " (x)")), ("NEW", _symbol("NEW"))]:
+            write_component_in_symbol_lib_file(str(one_by_one), name, content)
+        assert session.read_bytes() == one_by_one.read_bytes()
+
+
+class TestTailAppend:
+    @pytest.mark.parametrize("indexed", [False, True], ids=["no-index", "index"])
+    @pytest.mark.parametrize(
+        "generator", [GENERATOR_URL, "kicad_symbol_editor"], ids=["ours", "kicad"]
+    )
+    def test_matches_writes_one_by_one(
+        self, tmp_path: Path, indexed: bool, generator: str
+    ) -> None:
+        session, one_by_one = _libs(tmp_path, generator=generator)
+        for lib in (session, one_by_one):
+            lib.write_text(lib.read_text().replace("\n)", _symbol("OLD") + ")"))
+        if indexed:
+            load_symbol_lib_index(str(session))
+        new = [(f"P{i}", _symbol(f"P{i}")) for i in range(3)] + [("Q", "x")]
+        with SymbolLibrary(str(session)) as library:
+            for name, content in new:
+                assert not library.id_already_in(name)
+                library.write_component(name, content)
+            assert library.id_already_in("P0")
+        for name, content in new:
+            write_component_in_symbol_lib_file(str(one_by_one), name, content)
+        assert session.read_bytes() == one_by_one.read_bytes()
+
+    def test_library_is_not_read(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        lib, _ = _libs(tmp_path)
+        lib.write_text(lib.read_text().replace("\n)", _symbol("OLD") + ")"))
+
+        def fail(*_: Any) -> None:
+            raise AssertionError("library read")
+
+        with monkeypatch.context() as patched:
+            patched.setattr(Path, "read_bytes", fail)
+            patched.setattr(Path, "read_text", fail)
+            with SymbolLibrary(str(lib)) as library:
+                assert library.id_already_in("OLD")
+                library.write_component("NEW", _symbol("NEW"))
+        assert id_already_in_symbol_lib(str(lib), "NEW")
+
+    def test_failed_append_keeps_library(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        lib, _ = _libs(tmp_path)
+        write_component_in_symbol_lib_file(str(lib), "OLD", _symbol("OLD"))
+        before = lib.read_bytes()
+
+        library = SymbolLibrary(str(lib))
+        library.write_component("NEW", _symbol("NEW"))
+        assert library._appended
+        monkeypatch.setattr(symbol_lib_index, "open", _half_write_open(), raising=False)
+        with pytest.raises(OSError):
+            library.flush()
+        assert lib.read_bytes() == before
+        assert not symbol_lib_journal_path(str(lib)).exists()
+        assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []
+
+    def test_crashed_append_is_undone_on_next_open(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        lib, one_by_one = _libs(tmp_path)
+        for path in (lib, one_by_one):
+            write_component_in_symbol_lib_file(str(path), "OLD", _symbol("OLD"))
+        before = lib.read_bytes()
+
+        with monkeypatch.context() as patched:
+            # the process dies in the middle of the write: nothing is undone
+            patched.setattr(symbol_lib_index, "open", _half_write_open(), raising=False)
+            patched.setattr(symbol_lib_index, "recover_symbol_lib", lambda _: False)
+            library = SymbolLibrary(str(lib))
+            library.write_component("NEW", _symbol("NEW"))
+            with pytest.raises(OSError):
+                library.flush()
+        assert lib.read_bytes() != before
+        assert symbol_lib_journal_path(str(lib)).is_file()
+
+        with SymbolLibrary(str(lib)) as library:
+            assert lib.read_bytes() == before
+            assert not symbol_lib_journal_path(str(lib)).exists()
+            assert not library.id_already_in("NEW")
+            library.write_component("NEW", _symbol("NEW"))
+        write_component_in_symbol_lib_file(str(one_by_one), "NEW", _symbol("NEW"))
+        assert lib.read_bytes() == one_by_one.read_bytes()
+
+    def test_stale_journal_is_ignored(
+        self, tmp_path: Path, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        lib, _ = _libs(tmp_path)
+        write_component_in_symbol_lib_file(str(lib), "OLD", _symbol("OLD"))
+        before = lib.read_bytes()
+        journal = symbol_lib_journal_path(str(lib))
+        # left by an append to a library that was rewritten since
+        journal.write_bytes(b"3 5 9\nxy")
+        assert not recover_symbol_lib(str(lib))
+        assert "Ignoring stale journal" in caplog.text
+        assert lib.read_bytes() == before
+        assert not journal.exists()
+
+    def test_index_is_updated(self, tmp_path: Path) -> None:
+        lib, _ = _libs(tmp_path)
+        write_component_in_symbol_lib_file(str(lib), "OLD", _symbol("OLD"))
+        with SymbolLibrary(str(lib)) as library:
+            library.write_component("NEW", _symbol("NEW"))
+        _forget_cached_indexes()
+        index = load_symbol_lib_index(str(lib), scan=False)
+        scanned = symbol_lib_index.scan_symbol_lib(lib.read_bytes())
+        assert index is not None and scanned is not None
+        assert (index.close, index.symbols) == (scanned.close, scanned.symbols)
+
+    def test_byte_search_matches_regex(self, tmp_path: Path) -> None:
+        lib, _ = _libs(tmp_path)
+        text = lib.read_text().replace(
+            "\n)", _symbol("P0") + _symbol("P10") + '\n  (symbol "OPEN"\n)'
+        )
+        lib.write_text(text)
+        for name in ("P0", "P1", "P10", "P0_0_1", "OPEN", "P", 'P0" (x'):
+            pattern = _SYM_LIB_REGEX.format(component_name=re.escape(name))
+            expected = bool(re.search(pattern, text, flags=re.DOTALL))
+            assert find_symbol_in_lib(str(lib), name) == expected, name